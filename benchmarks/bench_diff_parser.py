@@ -0,0 +1,92 @@
+"""
+Microbenchmark do parser de diff (scripts/diff/patch.py) com patches de 100 mil linhas.
+
+Compara a análise única com índices O(1) contra a abordagem anterior, que reescaneava o patch
+a cada comentário para descobrir a posição da linha na diff.
+
+Uso:
+    python benchmarks/bench_diff_parser.py [--lines 100000] [--lookups 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.diff.patch import ParsedPatch, parse_patch
+
+
+def make_patch(total_lines, hunk_size=40, seed=42):
+    """Gera um patch sintético com hunks de contexto, remoções e adições."""
+    rng = random.Random(seed)
+    lines = []
+    old_line = new_line = 1
+    while len(lines) < total_lines:
+        body = []
+        old_count = new_count = 0
+        for _ in range(hunk_size):
+            kind = rng.choice("  +-+")
+            body.append(f"{kind}    valor_{len(lines) + len(body)} = calcular({rng.randint(0, 999)})")
+            old_count += kind != "+"
+            new_count += kind != "-"
+        lines.append(f"@@ -{old_line},{old_count} +{new_line},{new_count} @@ def funcao():")
+        lines.extend(body)
+        old_line += old_count + 10
+        new_line += new_count + 10
+    return "\n".join(lines[:total_lines])
+
+
+def rescan_position(patch, target_line):
+    """Abordagem anterior: percorre o patch inteiro a cada consulta."""
+    new_line = 0
+    for index, line in enumerate(patch.split("\n")):
+        if line.startswith("@@"):
+            new_line = int(line.split(" ")[2].split(",")[0].replace("+", ""))
+        elif line.startswith("-"):
+            continue
+        else:
+            if new_line == target_line:
+                return index
+            new_line += 1
+    return None
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    patch = make_patch(args.lines)
+    parsed, parse_seconds = timed(lambda: ParsedPatch(patch))
+    targets = random.Random(7).sample(sorted(parsed.added_lines), min(args.lookups, len(parsed.added_lines)))
+
+    _, cached_seconds = timed(lambda: [parse_patch(patch) for _ in range(100)])
+    positions, lookup_seconds = timed(lambda: [parsed.position_for_line(line) for line in targets])
+    _, reverse_seconds = timed(lambda: [parsed.line_for_position(position) for position in positions])
+
+    # A abordagem anterior é medida em uma amostra pequena e extrapolada
+    sample = targets[:20]
+    legacy, legacy_seconds = timed(lambda: [rescan_position(patch, line) for line in sample])
+    assert legacy == positions[:len(sample)], "o parser e a abordagem anterior divergiram"
+    legacy_total = legacy_seconds / len(sample) * len(targets)
+
+    print(f"📄 Patch: {args.lines} linhas, {len(parsed.hunks)} hunks, {len(parsed.added_lines)} linhas adicionadas")
+    print(f"⏱️ Análise única: {parse_seconds * 1000:.1f} ms")
+    print(f"⏱️ 100 chamadas a parse_patch (1 análise + 99 acertos no cache): {cached_seconds * 1000:.1f} ms")
+    print(f"⏱️ {len(targets)} consultas linha -> posição: {lookup_seconds * 1000:.2f} ms")
+    print(f"⏱️ {len(targets)} consultas posição -> linha: {reverse_seconds * 1000:.2f} ms")
+    print(f"🐢 Reescaneando o patch a cada consulta (estimado): {legacy_total * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de inicialização do dispatcher (estilo `python -X importtime`), usado como
+proteção contra regressões: cada evento de PR inicia um processo novo.
+
+Importa `scripts.ai_dispatcher` em processos limpos, soma o tempo de import e falha se
+algum SDK pesado for carregado antes da escolha do provedor ou se o tempo exceder o limite.
+
+Uso:
+    python benchmarks/bench_dispatcher_startup.py [--runs 5] [--max-ms 50]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Módulos que não podem ser carregados apenas por importar o dispatcher
+HEAVY_MODULES = ("openai", "anthropic", "github", "requests", "httpx")
+
+
+def import_profile():
+    """
+    Importa o dispatcher com `-X importtime` em um processo limpo.
+
+    Returns:
+        tuple: (tempo total em ms, {módulo: tempo cumulativo em ms})
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import scripts.ai_dispatcher"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # Formato: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+
+    # Só os imports de primeiro nível (sem indentação) somam o tempo total
+    top_level = [
+        int(line.split("|")[1]) / 1000
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line and not line.split("|")[2].startswith("  ")
+    ]
+    return sum(top_level), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=50.0, help="limite para a mediana do tempo de import")
+    args = parser.parse_args()
+
+    totals = []
+    modules = {}
+    for _ in range(args.runs):
+        total, modules = import_profile()
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"⏱️ Import de scripts.ai_dispatcher: mediana {median:.1f} ms (mín {min(totals):.1f} ms, {args.runs} execuções)")
+    for name, cumulative in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]:
+        print(f"   {cumulative:8.1f} ms  {name}")
+
+    loaded = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+    if loaded:
+        print(f"❌ SDKs carregados antes da escolha do provedor: {', '.join(loaded)}")
+        return 1
+    if median > args.max_ms:
+        print(f"❌ Tempo de import acima do limite de {args.max_ms:.0f} ms")
+        return 1
+
+    print("✅ Inicialização dentro do esperado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Benchmark offline de ponta a ponta: executa cada provedor × tipo de revisão contra servidores locais
+que imitam o GitHub e as APIs de IA (benchmarks/stub_servers.py), sem rede e sem chaves reais.
+
+Gera um PR sintético de N arquivos × M hunks × K linhas e, para cada combinação, roda o dispatcher em
+um processo novo (como em um evento de PR), reportando o tempo de parede, as requisições por endpoint
+e os bytes/tokens enviados.
+
+Uso:
+    python benchmarks/bench_review_modes.py [--files 20] [--hunks 3] [--lines 10]
+        [--providers openai,gemini,claude] [--review-types 1,2,3,4]
+        [--provider-latency-ms 200] [--github-latency-ms 20] [--provider-rpm 0] [--github-rpm 0]
+        [--checkout] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from benchmarks.stub_servers import AnthropicStub, GeminiStub, GithubStub, OpenAIStub, SyntheticPR
+from scripts.ai_dispatcher import PROVIDERS, REVIEW_TYPE_SUFFIXES
+
+# Modelo usado por provedor (apenas para escolher janela de contexto e limites; os servidores ignoram)
+MODELS = {
+    "openai": "gpt-4o",
+    "claude": "claude-3-haiku-20240307",
+    "gemini": "gemini-1.5-flash",
+}
+
+WORKER = "from scripts.ai_dispatcher import ai_dispatcher; ai_dispatcher()"
+
+
+def run_combination(provider, review_type, pr, github, stubs, extra_env, timeout):
+    """
+    Executa o dispatcher para uma combinação e coleta as métricas dos servidores.
+
+    Returns:
+        dict: Resultado da combinação (tempo, status, requisições, bytes e tokens).
+    """
+    for stub in [github, *stubs.values()]:
+        stub.reset()
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        AI_PROVIDER=provider,
+        AI_API_KEY="chave-local",
+        AI_MODEL=MODELS[provider],
+        AI_VERSION="v1beta",
+        REVIEW_TYPE=review_type,
+        GITHUB_TOKEN="token-local",
+        GITHUB_REPOSITORY=pr.repo_name,
+        PR_NUMBER=str(pr.number),
+        GITHUB_API_URL=github.url,
+        OPENAI_API_BASE=f"{stubs['openai'].url}/v1",
+        ANTHROPIC_BASE_URL=stubs["claude"].url,
+        GEMINI_API_BASE=stubs["gemini"].url,
+        REVIEW_CACHE_PATH="",
+        **extra_env,
+    )
+
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", WORKER], cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout
+        )
+        output, returncode = result.stdout + result.stderr, result.returncode
+    except subprocess.TimeoutExpired as e:
+        output, returncode = f"{e.stdout or ''}{e.stderr or ''}\nTempo limite excedido.", -1
+    wall = time.perf_counter() - started
+
+    github_stats = github.stats()
+    provider_stats = stubs[provider].stats()
+    errors = github.error_comments()
+    return {
+        "provider": provider,
+        "review_type": review_type,
+        "mode": REVIEW_TYPE_SUFFIXES[review_type],
+        "ok": returncode == 0 and not errors,
+        "wall_seconds": round(wall, 3),
+        "github": github_stats,
+        "ai": provider_stats,
+        "errors": errors[:3],
+        "output_tail": tail(output) if returncode != 0 or errors else [],
+    }
+
+
+def tail(output, size=5):
+    """Últimas linhas da saída do dispatcher, priorizando as mensagens de erro do RAICO."""
+    lines = output.strip().splitlines()
+    messages = [line for line in lines if line.startswith("Erro")]
+    return (messages or lines)[-size:]
+
+
+def summarize(result):
+    """Totais de requisições, bytes e tokens de uma combinação."""
+    github = result["github"]["endpoints"].values()
+    ai = result["ai"]["endpoints"].values()
+    return {
+        "github_requests": sum(item["requests"] for item in github),
+        "ai_requests": sum(item["requests"] for item in ai),
+        "throttled": sum(item["throttled"] for item in [*github, *ai]),
+        "bytes_sent": sum(item["bytes_in"] for item in [*github, *ai]),
+        "ai_bytes_sent": sum(item["bytes_in"] for item in ai),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20, help="arquivos alterados no PR sintético")
+    parser.add_argument("--hunks", type=int, default=3, help="hunks por arquivo")
+    parser.add_argument("--lines", type=int, default=10, help="linhas por hunk")
+    parser.add_argument("--providers", default=",".join(PROVIDERS))
+    parser.add_argument("--review-types", default=",".join(REVIEW_TYPE_SUFFIXES))
+    parser.add_argument("--provider-latency-ms", type=float, default=200.0)
+    parser.add_argument("--github-latency-ms", type=float, default=20.0)
+    parser.add_argument("--chunk-delay-ms", type=float, default=5.0, help="intervalo entre eventos do streaming")
+    parser.add_argument("--provider-rpm", type=int, default=0, help="limite de requisições/min dos provedores (0: sem limite)")
+    parser.add_argument("--github-rpm", type=int, default=0, help="limite de requisições/min do GitHub (0: sem limite)")
+    parser.add_argument("--approval-ratio", type=float, default=0.7, help="fração dos arquivos aprovados")
+    parser.add_argument("--timeout", type=float, default=600.0, help="tempo máximo por combinação, em segundos")
+    parser.add_argument("--checkout", action="store_true", help="lê o conteúdo de um checkout git local do PR")
+    parser.add_argument("--env", action="append", default=[], help="variável extra para o RAICO (NOME=valor)")
+    parser.add_argument("--json", help="grava os resultados completos (com as rotas) neste arquivo")
+    args = parser.parse_args()
+
+    pr = SyntheticPR(args.files, args.hunks, args.lines)
+    github = GithubStub(pr, latency_ms=args.github_latency_ms, requests_per_minute=args.github_rpm).start()
+    provider_options = {
+        "latency_ms": args.provider_latency_ms,
+        "requests_per_minute": args.provider_rpm,
+        "chunk_delay_ms": args.chunk_delay_ms,
+        "approval_ratio": args.approval_ratio,
+    }
+    stubs = {
+        "openai": OpenAIStub(**provider_options).start(),
+        "claude": AnthropicStub(**provider_options).start(),
+        "gemini": GeminiStub(**provider_options).start(),
+    }
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    checkout_dir = tempfile.TemporaryDirectory(prefix="raico-checkout-") if args.checkout else None
+    extra_env.setdefault("REVIEW_CHECKOUT_PATH", pr.write_checkout(checkout_dir.name) if checkout_dir else "")
+
+    print(f"🧪 PR sintético: {args.files} arquivo(s) × {args.hunks} hunk(s) × {args.lines} linha(s)")
+    print(f"{'provedor':<8} {'modo':<12} {'status':<6} {'tempo(s)':>9} {'req gh':>7} {'req ia':>7} "
+          f"{'429':>5} {'bytes ia':>10} {'tokens ia':>10} {'em cache':>9}")
+
+    results = []
+    try:
+        for provider in args.providers.split(","):
+            for review_type in args.review_types.split(","):
+                result = run_combination(provider, review_type, pr, github, stubs, extra_env, args.timeout)
+                result["totals"] = summarize(result)
+                results.append(result)
+                totals = result["totals"]
+                status = "ok" if result["ok"] else "erro"
+                print(
+                    f"{provider:<8} {result['mode']:<12} {status:<6} {result['wall_seconds']:>9.2f} "
+                    f"{totals['github_requests']:>7} {totals['ai_requests']:>7} {totals['throttled']:>5} "
+                    f"{totals['ai_bytes_sent']:>10} {result['ai']['tokens_in']:>10} {result['ai']['cached_tokens']:>9}"
+                )
+                for line in result["errors"] + result["output_tail"]:
+                    print(f"   ↳ {line[:160]}")
+    finally:
+        for stub in [github, *stubs.values()]:
+            stub.stop()
+        if checkout_dir is not None:
+            checkout_dir.cleanup()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"pr": vars(args), "results": results}, file, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados gravados em {args.json}")
+
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        print(f"❌ {len(failed)} combinação(ões) falharam.")
+        return 1
+    print("✅ Todas as combinações concluídas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
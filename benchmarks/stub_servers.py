@@ -0,0 +1,627 @@
+"""
+Servidores locais que imitam a API REST do GitHub e as APIs dos provedores de IA (OpenAI, Anthropic e
+Gemini), usados pelos benchmarks para medir o RAICO sem rede e sem chaves reais.
+
+Cada servidor conta requisições e bytes por endpoint, aplica uma latência configurável e, opcionalmente,
+um limite de requisições por minuto (respondendo 429 com Retry-After quando excedido).
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.diff.line_review import LINE_REVIEW_INSTRUCTIONS
+from scripts.planning.request_planner import FILE_SECTION_PATTERN, estimate_tokens
+
+# Trechos enviados por evento nas respostas em streaming
+STREAM_CHUNK_CHARS = 24
+
+APPROVAL_TEXT = "✅ Alterações aprovadas\n\nCódigo claro, bem estruturado e com nomes descritivos. Bom trabalho!"
+PROBLEM_TEXT = (
+    "❌ Alterações precisam de correção\n\n"
+    "- A função não trata o caso de entrada vazia; valide o argumento antes de processá-lo.\n\n"
+    "- O laço recalcula o mesmo valor a cada iteração; mova o cálculo para fora do laço.\n\n"
+    "- Há uma exceção genérica sendo silenciada; registre o erro ou propague-o."
+)
+LINE_COMMENT_PATTERN = re.compile(r"^\s*(\d+) \+", re.MULTILINE)
+
+
+class SyntheticPR:
+    def __init__(self, files=20, hunks=3, lines=10, seed=42, repo_name="raico/bench", number=1):
+        """
+        Pull Request sintético com N arquivos, M hunks por arquivo e K linhas por hunk.
+
+        Args:
+            files (int): Quantidade de arquivos alterados.
+            hunks (int): Hunks por arquivo.
+            lines (int): Linhas por hunk (adições e contexto).
+            seed (int): Semente do gerador (o PR é determinístico).
+            repo_name (str): Repositório no formato "owner/repo".
+            number (int): Número do PR.
+        """
+        rng = random.Random(seed)
+        self.repo_name = repo_name
+        self.number = number
+        self.head_sha = hashlib.sha1(f"head-{seed}".encode()).hexdigest()
+        self.base_sha = hashlib.sha1(f"base-{seed}".encode()).hexdigest()
+        self.files = [self._make_file(index, hunks, lines, rng) for index in range(files)]
+
+    def write_checkout(self, path):
+        """
+        Cria um repositório git local com um commit da base e um do head do PR (simula o
+        `actions/checkout`). Os SHAs do PR passam a ser os dos commits criados.
+
+        Args:
+            path (str): Diretório do checkout (criado se não existir).
+
+        Returns:
+            str: Caminho do checkout.
+        """
+        git = ["git", "-C", path, "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+        subprocess.run(["git", "init", "-q", path], check=True)
+        for key, message in (("base_content", "base"), ("content", "head")):
+            for file in self.files:
+                target = os.path.join(path, file["filename"])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w", newline="") as handle:
+                    handle.write(file[key])
+            subprocess.run([*git, "add", "-A"], check=True)
+            subprocess.run([*git, "commit", "-q", "-m", message], check=True)
+            sha = subprocess.run([*git, "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+            setattr(self, f"{message}_sha", sha)
+        return path
+
+    @staticmethod
+    def _make_file(index, hunks, lines, rng, gap=5):
+        filename = f"src/modulo_{index:03d}.py"
+        content = []
+        base = []
+        patch = []
+        additions = deletions = 0
+        for hunk in range(hunks):
+            content.extend(f"# contexto {hunk}.{line}" for line in range(gap))
+            base.extend(f"# contexto {hunk}.{line}" for line in range(gap))
+            old_start = new_start = len(content) + 1
+            body = []
+            old_count = new_count = 0
+            for line in range(lines):
+                text = f"    valor_{hunk}_{line} = calcular({rng.randint(0, 999)})"
+                if line % 4 == 0:
+                    body.append(f" {text}")
+                    old_count += 1
+                else:
+                    body.append(f"+{text}")
+                    additions += 1
+                new_count += 1
+                content.append(text)
+            body.insert(1, f"-    antigo_{hunk} = None")
+            old_count += 1
+            deletions += 1
+            base.extend(line[1:] for line in body if line[0] in " -")
+            patch.append(f"@@ -{old_start},{old_count} +{new_start},{new_count} @@ def funcao_{hunk}():")
+            patch.extend(body)
+        text = "\n".join(content) + "\n"
+        return {
+            "filename": filename,
+            "sha": hashlib.sha1(f"blob {len(text.encode())}\0".encode() + text.encode()).hexdigest(),
+            "status": "modified",
+            "additions": additions,
+            "deletions": deletions,
+            "changes": additions + deletions,
+            "patch": "\n".join(patch),
+            "content": text,
+            "base_content": "\n".join(base) + "\n",
+        }
+
+
+class StubServer:
+    name = "stub"
+
+    def __init__(self, latency_ms=0, requests_per_minute=0, chunk_delay_ms=0):
+        """
+        Servidor HTTP local (thread em segundo plano) com métricas por endpoint.
+
+        Args:
+            latency_ms (float): Latência aplicada a cada resposta.
+            requests_per_minute (int): Limite de requisições por minuto (0 desativa).
+            chunk_delay_ms (float): Intervalo entre os eventos das respostas em streaming.
+        """
+        self.latency = latency_ms / 1000
+        self.chunk_delay = chunk_delay_ms / 1000
+        self.requests_per_minute = requests_per_minute
+        self._lock = threading.Lock()
+        self._tokens = float(requests_per_minute)
+        self._last_refill = time.monotonic()
+        self.reset()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def do_PATCH(self):
+                stub._handle(self, "PATCH")
+
+            def do_DELETE(self):
+                stub._handle(self, "DELETE")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        """Zera as métricas (chamado entre as combinações do benchmark)."""
+        with self._lock:
+            self.endpoints = defaultdict(lambda: {"requests": 0, "bytes_in": 0, "bytes_out": 0, "throttled": 0})
+            self.tokens_in = 0
+            self.tokens_out = 0
+            self.cached_tokens = 0
+            self.events = []
+
+    def stats(self):
+        """
+        Métricas acumuladas desde o último `reset`.
+
+        Returns:
+            dict: endpoints (requisições e bytes por rota), tokens_in, cached_tokens e tokens_out.
+        """
+        with self._lock:
+            return {
+                "endpoints": {name: dict(values) for name, values in sorted(self.endpoints.items())},
+                "tokens_in": self.tokens_in,
+                "cached_tokens": self.cached_tokens,
+                "tokens_out": self.tokens_out,
+            }
+
+    def _allow(self):
+        if not self.requests_per_minute:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            rate = self.requests_per_minute / 60
+            self._tokens = min(self.requests_per_minute, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _handle(self, handler, method):
+        parts = urlsplit(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+
+        route = self.route(method, parts.path)
+        endpoint = f"{method} {route[0] if route else parts.path}"
+        with self._lock:
+            self.endpoints[endpoint]["requests"] += 1
+            self.endpoints[endpoint]["bytes_in"] += len(raw)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if not self._allow():
+            with self._lock:
+                self.endpoints[endpoint]["throttled"] += 1
+            self._send(handler, endpoint, 429, {"error": "rate limited"}, {"Retry-After": "1"})
+            return
+        if route is None:
+            self._send(handler, endpoint, 404, {"message": "Not Found"})
+            return
+
+        _, action, params = route
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        result = action(body=body, query=query, **params)
+        if isinstance(result, StreamingResult):
+            self._stream(handler, endpoint, result)
+        else:
+            self._send(handler, endpoint, *result)
+
+    def route(self, method, path):
+        """Retorna (nome da rota, ação, parâmetros) ou None; implementado pelas subclasses."""
+        return None
+
+    def _send(self, handler, endpoint, status, payload, headers=None):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        handler.send_response(status)
+        content_type = "text/plain; charset=utf-8" if isinstance(payload, bytes) else "application/json"
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+        with self._lock:
+            self.endpoints[endpoint]["bytes_out"] += len(data)
+
+    def _stream(self, handler, endpoint, result):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        sent = 0
+        try:
+            for event in result.events:
+                data = event.encode()
+                handler.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                handler.wfile.flush()
+                sent += len(data)
+                if self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente interrompeu o streaming (ex: aprovação identificada)
+            handler.close_connection = True
+        with self._lock:
+            self.endpoints[endpoint]["bytes_out"] += sent
+
+
+class StreamingResult:
+    def __init__(self, events):
+        """Resposta em Server-Sent Events (gerador de eventos já formatados)."""
+        self.events = events
+
+
+class GithubStub(StubServer):
+    name = "github"
+
+    def __init__(self, pr, **kwargs):
+        """
+        API REST do GitHub para um único PR sintético.
+
+        Args:
+            pr (SyntheticPR): Pull Request servido.
+            **kwargs: Latência e limite de requisições (ver `StubServer`).
+        """
+        super().__init__(**kwargs)
+        self.pr = pr
+        self._files = {file["filename"]: file for file in pr.files}
+        self._blobs = {file["sha"]: file for file in pr.files}
+        self._comment_ids = iter(range(1000, 10 ** 9))
+        repo = re.escape(pr.repo_name)
+        number = pr.number
+        self.routes = [
+            ("GET", rf"/repos/{repo}", "/repos/{repo}", self.get_repo),
+            ("GET", rf"/repos/{repo}/pulls/{number}", "/repos/{repo}/pulls/{n}", self.get_pull),
+            ("GET", rf"/repos/{repo}/pulls/{number}/files", "/repos/{repo}/pulls/{n}/files", self.get_files),
+            ("GET", rf"/repos/{repo}/issues/{number}/comments", "/repos/{repo}/issues/{n}/comments", self.empty_list),
+            ("GET", rf"/repos/{repo}/pulls/{number}/comments", "/repos/{repo}/pulls/{n}/comments", self.empty_list),
+            ("GET", rf"/repos/{repo}/pulls/{number}/reviews", "/repos/{repo}/pulls/{n}/reviews", self.empty_list),
+            ("POST", rf"/repos/{repo}/issues/{number}/comments", "/repos/{repo}/issues/{n}/comments", self.comment),
+            ("POST", rf"/repos/{repo}/pulls/{number}/comments", "/repos/{repo}/pulls/{n}/comments", self.comment),
+            ("POST", rf"/repos/{repo}/pulls/{number}/reviews", "/repos/{repo}/pulls/{n}/reviews", self.review),
+            ("PATCH", rf"/repos/{repo}/(issues|pulls)/comments/\d+", "/repos/{repo}/comments/{id}", self.comment),
+            ("DELETE", rf"/repos/{repo}/(issues|pulls)/comments/\d+", "/repos/{repo}/comments/{id}", self.deleted),
+            ("GET", r"/raw/[0-9a-f]+/(?P<path>.+)", "/raw/{sha}/{path}", self.get_raw),
+            ("GET", rf"/repos/{repo}/git/blobs/(?P<sha>[0-9a-f]+)", "/repos/{repo}/git/blobs/{sha}", self.get_blob),
+        ]
+
+    def route(self, method, path):
+        for route_method, pattern, name, action in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                return name, action, {key: value for key, value in match.groupdict().items() if value}
+        return None
+
+    def _repo_json(self):
+        owner, name = self.pr.repo_name.split("/")
+        return {
+            "id": 1,
+            "name": name,
+            "full_name": self.pr.repo_name,
+            "owner": {"login": owner, "id": 1},
+            "url": f"{self.url}/repos/{self.pr.repo_name}",
+            "default_branch": "main",
+        }
+
+    def get_repo(self, body, query):
+        return 200, self._repo_json()
+
+    def get_pull(self, body, query):
+        repo = self._repo_json()
+        base = f"{self.url}/repos/{self.pr.repo_name}"
+        return 200, {
+            "id": self.pr.number,
+            "number": self.pr.number,
+            "state": "open",
+            "title": "PR sintético",
+            "url": f"{base}/pulls/{self.pr.number}",
+            "issue_url": f"{base}/issues/{self.pr.number}",
+            "user": {"login": "dev", "id": 2},
+            "head": {"sha": self.pr.head_sha, "ref": "feature", "repo": repo},
+            "base": {"sha": self.pr.base_sha, "ref": "main", "repo": repo},
+        }
+
+    def get_files(self, body, query):
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        files = self.pr.files[(page - 1) * per_page:page * per_page]
+        payload = [
+            {
+                **{key: value for key, value in file.items() if key not in ("content", "base_content")},
+                "raw_url": f"{self.url}/raw/{self.pr.head_sha}/{file['filename']}",
+                "blob_url": f"{self.url}/blob/{self.pr.head_sha}/{file['filename']}",
+                "contents_url": f"{self.url}/repos/{self.pr.repo_name}/contents/{file['filename']}",
+            }
+            for file in files
+        ]
+        headers = {}
+        if page * per_page < len(self.pr.files):
+            # Como o GitHub: a próxima página e a última
+            url = f"{self.url}/repos/{self.pr.repo_name}/pulls/{self.pr.number}/files"
+            last = -(-len(self.pr.files) // per_page)
+            headers["Link"] = f'<{url}?per_page={per_page}&page={page + 1}>; rel="next", <{url}?per_page={per_page}&page={last}>; rel="last"'
+        return 200, payload, headers
+
+    def get_raw(self, body, query, path):
+        file = self._files.get(path)
+        if file is None:
+            return 404, {"message": "Not Found"}
+        return 200, file["content"].encode()
+
+    def get_blob(self, body, query, sha):
+        file = self._blobs.get(sha)
+        if file is None:
+            return 404, {"message": "Not Found"}
+        return 200, file["content"].encode()
+
+    def empty_list(self, body, query):
+        return 200, []
+
+    def comment(self, body, query):
+        with self._lock:
+            self.events.append(("comment", body.get("body", "")))
+        return 201, {"id": next(self._comment_ids), "body": body.get("body", ""), "user": {"login": "github-actions[bot]"}}
+
+    def review(self, body, query):
+        with self._lock:
+            self.events.append(("review", len(body.get("comments", []))))
+        return 200, {"id": next(self._comment_ids), "state": body.get("event", "COMMENTED")}
+
+    def deleted(self, body, query):
+        return 204, b""
+
+    def error_comments(self):
+        """Comentários de erro publicados pelo RAICO (indicam falha da combinação avaliada)."""
+        with self._lock:
+            return [text for kind, text in self.events if kind == "comment" and "Erro no review" in text]
+
+
+class ProviderStub(StubServer):
+    def __init__(self, approval_ratio=0.7, **kwargs):
+        """
+        API de um provedor de IA que responde revisões determinísticas.
+
+        Args:
+            approval_ratio (float): Fração dos arquivos aprovados sem comentários.
+            **kwargs: Latência, limite de requisições e intervalo do streaming (ver `StubServer`).
+        """
+        super().__init__(**kwargs)
+        self.approval_ratio = approval_ratio
+
+    def reset(self):
+        super().reset()
+        # Cada combinação começa com o cache de prefixos do provedor vazio
+        self._seen_prefixes = set()
+
+    def review_text(self, system, user):
+        """Resposta do "modelo" para o prompt, no formato esperado pelo modo de revisão."""
+        prompt = f"{system}\n{user}"
+        if LINE_REVIEW_INSTRUCTIONS[:60] in prompt:
+            lines = LINE_COMMENT_PATTERN.findall(user)
+            if not lines or self._approved(user):
+                return "[]"
+            return json.dumps([{"line": int(lines[0]), "comment": "Considere extrair este cálculo para uma função."}])
+
+        paths = FILE_SECTION_PATTERN.findall(user)
+        if len(paths) > 1:
+            sections = [f"=== ARQUIVO: {path} ===\n{self._verdict(path)}" for path in paths]
+            return "\n\n".join(sections)
+        return self._verdict(user)
+
+    def _approved(self, key):
+        digest = int(hashlib.sha1(key.encode()).hexdigest()[:8], 16)
+        return digest % 1000 < self.approval_ratio * 1000
+
+    def _verdict(self, key):
+        return APPROVAL_TEXT if self._approved(key) else PROBLEM_TEXT
+
+    def account(self, system, user, output):
+        """Contabiliza os tokens da requisição; o prefixo já visto conta como lido do cache."""
+        cached = 0
+        with self._lock:
+            if system and system in self._seen_prefixes:
+                cached = estimate_tokens(system)
+            elif system:
+                self._seen_prefixes.add(system)
+            prompt_tokens = estimate_tokens(system or "") + estimate_tokens(user)
+            self.tokens_in += prompt_tokens
+            self.cached_tokens += cached
+            self.tokens_out += estimate_tokens(output)
+        return prompt_tokens, cached, estimate_tokens(output)
+
+    @staticmethod
+    def chunks(text):
+        return [text[index:index + STREAM_CHUNK_CHARS] for index in range(0, len(text), STREAM_CHUNK_CHARS)]
+
+
+class OpenAIStub(ProviderStub):
+    name = "openai"
+
+    def route(self, method, path):
+        if method == "POST" and path.endswith("/chat/completions"):
+            return "/v1/chat/completions", self.chat_completions, {}
+        return None
+
+    def chat_completions(self, body, query):
+        messages = body.get("messages", [])
+        system = "\n".join(message["content"] for message in messages if message["role"] == "system")
+        user = "\n".join(message["content"] for message in messages if message["role"] == "user")
+        text = self.review_text(system, user)
+        prompt_tokens, cached, output_tokens = self.account(system, user, text)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+        if not body.get("stream"):
+            return 200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        def events():
+            for chunk in self.chunks(text):
+                data = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": chunk}}]}
+                yield f"data: {json.dumps(data)}\n\n"
+            yield f"data: {json.dumps({'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResult(events())
+
+
+class AnthropicStub(ProviderStub):
+    name = "claude"
+
+    def route(self, method, path):
+        if method == "POST" and path.endswith("/messages"):
+            return "/v1/messages", self.messages, {}
+        return None
+
+    def messages(self, body, query):
+        system = body.get("system") or ""
+        if isinstance(system, list):
+            system = "\n".join(block.get("text", "") for block in system)
+        user = "\n".join(
+            message["content"] if isinstance(message["content"], str) else json.dumps(message["content"])
+            for message in body.get("messages", [])
+        )
+        text = self.review_text(system, user)
+        prompt_tokens, cached, output_tokens = self.account(system, user, text)
+        usage = {
+            "input_tokens": prompt_tokens - cached,
+            "cache_read_input_tokens": cached,
+            "cache_creation_input_tokens": 0,
+            "output_tokens": output_tokens,
+        }
+        message = {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+        if not body.get("stream"):
+            return 200, message
+
+        def event(kind, data):
+            return f"event: {kind}\ndata: {json.dumps({'type': kind, **data})}\n\n"
+
+        def events():
+            yield event("message_start", {"message": {**message, "content": [], "usage": {**usage, "output_tokens": 1}}})
+            yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+            for chunk in self.chunks(text):
+                yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            yield event("content_block_stop", {"index": 0})
+            yield event("message_delta", {"delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": output_tokens}})
+            yield event("message_stop", {})
+
+        return StreamingResult(events())
+
+
+class GeminiStub(ProviderStub):
+    name = "gemini"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._cached_contents = {}
+
+    def route(self, method, path):
+        if method != "POST":
+            return None
+        if path.endswith(":generateContent"):
+            return "/{version}/models/{model}:generateContent", self.generate_content, {}
+        if path.endswith(":streamGenerateContent"):
+            return "/{version}/models/{model}:streamGenerateContent", self.stream_generate_content, {}
+        if path.endswith("/cachedContents"):
+            return "/{version}/cachedContents", self.create_cached_content, {}
+        return None
+
+    def create_cached_content(self, body, query):
+        name = f"cachedContents/{len(self._cached_contents) + 1}"
+        self._cached_contents[name] = body.get("systemInstruction", {}).get("parts", [{}])[0].get("text", "")
+        return 200, {"name": name, "model": body.get("model")}
+
+    def _review(self, body):
+        if body.get("cachedContent"):
+            system = self._cached_contents.get(body["cachedContent"], "")
+        else:
+            system = "\n".join(part.get("text", "") for part in body.get("systemInstruction", {}).get("parts", []))
+        user = "\n".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        text = self.review_text(system, user)
+        prompt_tokens, cached, output_tokens = self.account(system, user, text)
+        usage = {
+            "promptTokenCount": prompt_tokens,
+            "cachedContentTokenCount": cached,
+            "candidatesTokenCount": output_tokens,
+        }
+        return text, usage
+
+    def generate_content(self, body, query):
+        text, usage = self._review(body)
+        return 200, {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}], "usageMetadata": usage}
+
+    def stream_generate_content(self, body, query):
+        text, usage = self._review(body)
+
+        def events():
+            chunks = self.chunks(text)
+            for index, chunk in enumerate(chunks):
+                data = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+                if index == len(chunks) - 1:
+                    data["usageMetadata"] = usage
+                yield f"data: {json.dumps(data)}\r\n\r\n"
+
+        return StreamingResult(events())
@@ -1,22 +1,10 @@
+import argparse
+import importlib
 import os
+import threading
 from enum import Enum
 
-from scripts.gemini_pr_review_file import gemini_pr_review_file
-from scripts.gemini_pr_review_line import gemini_pr_review_line
-from scripts.gemini_pr_review_line_inline import gemini_pr_review_line_inline
-from scripts.gemini_pr_review_file_inline import gemini_pr_review_file_inline
-
-
-from scripts.openai_pr_review_file import openai_pr_review_file
-from scripts.openai_pr_review_line import openai_pr_review_line
-from scripts.openai_pr_review_line_inline import openai_pr_review_line_inline
-from scripts.openai_pr_review_file_inline import openai_pr_review_file_inline
-
-
-from scripts.claude_pr_review_file import claude_pr_review_file  
-from scripts.claude_pr_review_line import claude_pr_review_line
-from scripts.claude_pr_review_line_inline import claude_pr_review_line_inline
-from scripts.claude_pr_review_file_inline import claude_pr_review_file_inline
+from scripts.telemetry import run_telemetry
 
 
 class ReviewType(Enum):
@@ -24,197 +12,183 @@ class ReviewType(Enum):
     LINE_DIFF_REVIEW = "2"  # Revisão baseada em mudanças linha por linha, e comenta no PR
     INLINE_COMMENT_REVIEW = "3"  # Revisão baseada em mudanças linha por linha, e comenta no Diff
     FILE_INLINE_REVIEW = "4"  # Revisão baseada no arquivo completo, e comenta no Diff
+    AUTO_REVIEW = "auto"  # Arquivo completo ou diff, escolhido por arquivo dentro do orçamento de tokens, e comenta no PR
 
 
-def ai_dispatcher():
-    """
-    Dispatcher para decidir qual lógica de análise usar com base no ai_provider e review_type.
-    """
-    # Carregar variáveis do ambiente
-    ai_provider = os.getenv("AI_PROVIDER")
-    ai_api_key = os.getenv("AI_API_KEY")
-    ai_model = os.getenv("AI_MODEL")
-    ai_version = os.getenv("AI_VERSION")
-    github_token = os.getenv("GITHUB_TOKEN")
-    repo_name = os.getenv("GITHUB_REPOSITORY")
-    pr_number = os.getenv("PR_NUMBER")
-    prompt_path = os.getenv("PROMPT_PATH", "scripts/prompts/review_pr_default.txt")
-    review_type = os.getenv("REVIEW_TYPE", ReviewType.LINE_DIFF_REVIEW.value)
-
-    # Provider OpenAI - File Diff Review
-    def method_openai_pr_review_file():
-        return openai_pr_review_file(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
+# Provedores Integrados
+PROVIDERS = ("openai", "gemini", "claude")
 
-    # Provider OpenAI - Line Diff Review
-    def method_openai_pr_review_line():
-        return openai_pr_review_line(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            ai_model=ai_model,
-            prompt_path=prompt_path,
-        )
+# Sufixo do módulo de cada tipo de revisão (ex: scripts/openai_pr_review_line_inline.py)
+REVIEW_TYPE_SUFFIXES = {
+    ReviewType.FILE_DIFF_REVIEW.value: "file",
+    ReviewType.LINE_DIFF_REVIEW.value: "line",
+    ReviewType.INLINE_COMMENT_REVIEW.value: "line_inline",
+    ReviewType.FILE_INLINE_REVIEW.value: "file_inline",
+    ReviewType.AUTO_REVIEW.value: "auto",
+}
 
-    # Provider OpenIA - Inline Comment Review
-    def method_openai_pr_review_inline():
-        return openai_pr_review_line_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
+# Prompt usado quando PROMPT_PATH não é informado
+DEFAULT_PROMPT_PATH = "scripts/prompts/review_pr_default.txt"
 
-    # Provider Gemini - File Diff Review
-    def method_gemini_pr_review_file():
-        return gemini_pr_review_file(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model,
-            ai_version=ai_version
-        )
+# Provedores cuja função de revisão também recebe a versão da API (ai_version)
+VERSIONED_PROVIDERS = {"gemini"}
 
-    # Provider Gemini - Line Diff Review
-    def method_gemini_pr_review_line():
-        return gemini_pr_review_line(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model,
-            ai_version=ai_version
-        )
+# Registro (provedor, tipo de revisão) -> "módulo:função".
+# Os módulos (e os SDKs que eles carregam) só são importados quando o método é usado.
+REVIEW_REGISTRY = {
+    (provider, review_type): f"scripts.{provider}_pr_review_{suffix}:{provider}_pr_review_{suffix}"
+    for provider in PROVIDERS
+    for review_type, suffix in REVIEW_TYPE_SUFFIXES.items()
+}
 
-    # Provider Gemini - Inline Comment Review
-    def method_gemini_pr_review_inline():
-        return gemini_pr_review_line_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model,
-            ai_version=ai_version
-        )
+_resolved_methods = {}
+_resolve_lock = threading.Lock()
 
-    # Provider Claude - File Diff Review
-    def method_claude_pr_review_file():
-        return claude_pr_review_file(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
 
-    # Provider Claude - Line Diff Review
-    def method_claude_pr_review_line():
-        return claude_pr_review_line(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
+def resolve_review_method(ai_provider, review_type):
+    """
+    Obtém a função de revisão do provedor e tipo informados, importando o módulo no primeiro uso.
 
-    # Provider Claude - Inline Comment Review
-    def method_claude_pr_review_inline():
-        return claude_pr_review_line_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
+    Args:
+        ai_provider (str): Provedor de IA (openai, gemini ou claude).
+        review_type (str): Tipo de revisão (valor de ReviewType).
 
-# Provider OpenAI - File Inline Review
-    def method_openai_pr_review_file_inline():
-        return openai_pr_review_file_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
+    Returns:
+        callable: Função de revisão (ex: openai_pr_review_file).
 
-    # Provider Gemini - File Inline Review
-    def method_gemini_pr_review_file_inline():
-        return gemini_pr_review_file_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model,
-            ai_version=ai_version
+    Raises:
+        ValueError: Provedor ou tipo de revisão não suportado.
+    """
+    if ai_provider not in PROVIDERS:
+        raise ValueError(f"Provedor de IA '{ai_provider}' não suportado.")
+
+    key = (ai_provider, review_type)
+    if key not in REVIEW_REGISTRY:
+        raise ValueError(f"Tipo de revisão '{review_type}' não suportado para o provedor '{ai_provider}'.")
+
+    with _resolve_lock:
+        if key not in _resolved_methods:
+            module_name, function_name = REVIEW_REGISTRY[key].split(":")
+            _resolved_methods[key] = getattr(importlib.import_module(module_name), function_name)
+        return _resolved_methods[key]
+
+
+def is_dry_run():
+    """Indica se apenas o plano de revisão deve ser mostrado (REVIEW_DRY_RUN, padrão: false)."""
+    return os.getenv("REVIEW_DRY_RUN", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ReviewSettings:
+    def __init__(self, ai_provider, ai_api_key, ai_model, github_token, ai_version=None,
+                 prompt_path=DEFAULT_PROMPT_PATH, review_type=ReviewType.LINE_DIFF_REVIEW.value, max_concurrency=None):
+        """
+        Configuração das revisões: provedor, credenciais, prompt e tipo de revisão.
+
+        Args:
+            ai_provider (str): Provedor de IA (openai, gemini ou claude).
+            ai_api_key (str): Chave de autenticação da API do provedor.
+            ai_model (str): Modelo da IA.
+            github_token (str): Token de autenticação do GitHub.
+            ai_version (str): Versão da API (apenas Gemini).
+            prompt_path (str): Caminho para o arquivo de prompt personalizado.
+            review_type (str): Tipo de revisão (valor de ReviewType).
+            max_concurrency (int): Arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
+        """
+        self.ai_provider = ai_provider
+        self.ai_api_key = ai_api_key
+        self.ai_model = ai_model
+        self.github_token = github_token
+        self.ai_version = ai_version
+        self.prompt_path = prompt_path
+        self.review_type = review_type
+        self.max_concurrency = max_concurrency
+
+    @classmethod
+    def from_env(cls):
+        """
+        Lê a configuração de AI_PROVIDER, AI_API_KEY, AI_MODEL, AI_VERSION, GITHUB_TOKEN,
+        PROMPT_PATH, REVIEW_TYPE e MAX_CONCURRENCY.
+
+        Returns:
+            ReviewSettings: Configuração das revisões.
+        """
+        return cls(
+            ai_provider=os.getenv("AI_PROVIDER"),
+            ai_api_key=os.getenv("AI_API_KEY"),
+            ai_model=os.getenv("AI_MODEL"),
+            github_token=os.getenv("GITHUB_TOKEN"),
+            ai_version=os.getenv("AI_VERSION"),
+            prompt_path=os.getenv("PROMPT_PATH", DEFAULT_PROMPT_PATH),
+            review_type=os.getenv("REVIEW_TYPE", ReviewType.LINE_DIFF_REVIEW.value),
+            max_concurrency=os.getenv("MAX_CONCURRENCY"),  # Arquivos analisados em paralelo (padrão: 4)
         )
 
-    # Provider Claude - File Inline Review
-    def method_claude_pr_review_file_inline():
-        return claude_pr_review_file_inline(
-            ai_api_key=ai_api_key,
-            github_token=github_token,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            prompt_path=prompt_path,
-            ai_model=ai_model
-        )
 
+def run_review(settings, repo_name, pr_number, review_type=None):
+    """
+    Executa a revisão de um PR com o método do provedor e do tipo de revisão configurados.
 
-# Provedores Integrados
-    provider_methods = {
-        "openai": {
-            ReviewType.FILE_DIFF_REVIEW.value: method_openai_pr_review_file,
-            ReviewType.LINE_DIFF_REVIEW.value: method_openai_pr_review_line,
-            ReviewType.INLINE_COMMENT_REVIEW.value: method_openai_pr_review_inline,
-            ReviewType.FILE_INLINE_REVIEW.value: method_openai_pr_review_file_inline,
-
-        },
-        "gemini": {
-            ReviewType.FILE_DIFF_REVIEW.value: method_gemini_pr_review_file,
-            ReviewType.LINE_DIFF_REVIEW.value: method_gemini_pr_review_line,
-            ReviewType.INLINE_COMMENT_REVIEW.value: method_gemini_pr_review_inline,
-            ReviewType.FILE_INLINE_REVIEW.value: method_gemini_pr_review_file_inline,
-
-        },
-        "claude": {
-            ReviewType.FILE_DIFF_REVIEW.value: method_claude_pr_review_file,
-            ReviewType.LINE_DIFF_REVIEW.value: method_claude_pr_review_line,
-            ReviewType.INLINE_COMMENT_REVIEW.value: method_claude_pr_review_inline,
-            ReviewType.FILE_INLINE_REVIEW.value: method_claude_pr_review_file_inline,
-
-        },
+    Args:
+        settings (ReviewSettings): Configuração das revisões.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        review_type (str): Tipo de revisão (padrão: o da configuração).
+    """
+    review_type = review_type or settings.review_type
+    review_method = resolve_review_method(settings.ai_provider, review_type)
+
+    kwargs = {
+        "ai_api_key": settings.ai_api_key,
+        "github_token": settings.github_token,
+        "repo_name": repo_name,
+        "pr_number": pr_number,
+        "prompt_path": settings.prompt_path,
+        "ai_model": settings.ai_model,
+        "max_concurrency": settings.max_concurrency,
     }
+    if settings.ai_provider in VERSIONED_PROVIDERS:
+        kwargs["ai_version"] = settings.ai_version
+
+    review_method(**kwargs)  # Chama o método correto
+
+
+def ai_dispatcher(plan_only=None):
+    """
+    Dispatcher para decidir qual lógica de análise usar com base no ai_provider e review_type.
+
+    Args:
+        plan_only (bool): Apenas mostra as requisições, tokens e custo estimados de cada tipo de
+            revisão, sem chamar a IA (padrão: REVIEW_DRY_RUN).
+    """
+    # Carregar variáveis do ambiente
+    settings = ReviewSettings.from_env()
+    repo_name = os.getenv("GITHUB_REPOSITORY")
+    pr_number = os.getenv("PR_NUMBER")
+
+    if plan_only is None:
+        plan_only = is_dry_run()
+    if plan_only:
+        # O planejamento só consulta o GitHub; os SDKs dos provedores não são carregados
+        from scripts.planning.review_plan import plan_pr_review
+
+        plan_pr_review(settings.ai_provider, settings.github_token, repo_name, pr_number, settings.prompt_path, settings.ai_model)
+        return
 
     # Executar o método correspondente ao ai_provider e review_type
     try:
-        if ai_provider in provider_methods:
-            if review_type in provider_methods[ai_provider]:
-                provider_methods[ai_provider][review_type]()  # Chama o método correto
-            else:
-                raise ValueError(f"Tipo de revisão '{review_type}' não suportado para o provedor '{ai_provider}'.")
-        else:
-            raise ValueError(f"Provedor de IA '{ai_provider}' não suportado.")
+        run_review(settings, repo_name, pr_number)
     except Exception as e:
-        print(f"Erro ao executar o provedor de IA '{ai_provider}' com tipo de revisão '{review_type}': {e}")
+        print(f"Erro ao executar o provedor de IA '{settings.ai_provider}' com tipo de revisão '{settings.review_type}': {e}")
         raise
+    finally:
+        # Tempos por fase, latência por endpoint, tokens e contadores (JSON + resumo do job)
+        run_telemetry.emit(
+            provider=settings.ai_provider, model=settings.ai_model, review_type=settings.review_type,
+            repository=repo_name, pr=pr_number,
+        )
 
 if __name__ == "__main__":
-    ai_dispatcher()
+    parser = argparse.ArgumentParser(description="Revisão de Pull Requests com IA (configurada por variáveis de ambiente).")
+    parser.add_argument("--plan", "--dry-run", action="store_true", dest="plan",
+                        help="mostra o plano de revisão (requisições, tokens e custo estimados) sem chamar a IA")
+    ai_dispatcher(plan_only=parser.parse_args().plan or None)
@@ -0,0 +1 @@
+# Este arquivo pode estar vazio, usado apenas para transformar a pasta em um módulo.
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+Revisa vários PRs em um único processo (ex: varredura noturna dos PRs abertos).
+
+Os PRs vêm de uma lista ("owner/repo#7", URLs ou um arquivo com um por linha) ou de uma busca
+do GitHub (ex: todos os PRs abertos com o label X nos repositórios informados). As revisões
+compartilham os pools HTTP, o cache de revisões, os clientes dos provedores e o agendador de
+rate limit; BATCH_WORKERS PRs são revisados em paralelo, cada um com até MAX_CONCURRENCY arquivos.
+
+Exemplos:
+    python -m scripts.batch.batch_review --pr owner/repo#7 --pr https://github.com/owner/outro/pull/12
+    python -m scripts.batch.batch_review --repo owner/repo --repo owner/outro --label revisar-ia --workers 8
+    python -m scripts.batch.batch_review --prs-file prs.txt --plan
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from scripts.ai_dispatcher import ReviewSettings, run_review
+from scripts.server.webhook import ReviewRequest
+from scripts.server.worker_pool import CANCELLED, DONE, FAILED, ReviewWorkerPool
+from scripts.telemetry import run_telemetry
+
+# PRs revisados em paralelo quando BATCH_WORKERS não é informado
+DEFAULT_BATCH_WORKERS = 4
+
+# Resultados por página na busca de PRs (máximo da API de busca do GitHub)
+SEARCH_PAGE_SIZE = 100
+
+# "owner/repo#7", "owner/repo/pull/7", "https://github.com/owner/repo/pull/7" ou "#7"/"7" (com --default-repo)
+PR_URL_PATTERN = re.compile(r"^(?:https?://[^/]+/)?(?P<repo>[\w.-]+/[\w.-]+)/pulls?/(?P<number>\d+)/?$")
+PR_REF_PATTERN = re.compile(r"^(?:(?P<repo>[\w.-]+/[\w.-]+)#|#)?(?P<number>\d+)$")
+
+
+def parse_pr_ref(text, default_repo=None):
+    """
+    Converte uma referência de PR em um pedido de revisão.
+
+    Args:
+        text (str): "owner/repo#7", URL do PR, ou apenas o número (com `default_repo`).
+        default_repo (str): Repositório usado quando a referência não informa um.
+
+    Returns:
+        ReviewRequest: Pedido de revisão do PR.
+
+    Raises:
+        ValueError: Referência inválida ou sem repositório.
+    """
+    text = text.strip()
+    match = PR_URL_PATTERN.match(text) or PR_REF_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Referência de PR inválida: '{text}' (use owner/repo#7 ou a URL do PR).")
+    repo_name = match.group("repo") or default_repo
+    if not repo_name:
+        raise ValueError(f"Referência '{text}' sem repositório (use owner/repo#7 ou --default-repo).")
+    return ReviewRequest(repo_name, int(match.group("number")), source="batch")
+
+
+def read_pr_refs(path):
+    """
+    Lê as referências de PR de um arquivo (uma por linha; linhas vazias e comentários iniciados por '# ' são ignorados).
+
+    Args:
+        path (str): Caminho do arquivo ("-" para a entrada padrão).
+
+    Returns:
+        list: Referências, na ordem do arquivo.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as file:
+            lines = file.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("# ")]
+
+
+def build_search_query(repos=(), labels=(), query=None):
+    """
+    Monta a busca do GitHub pelos PRs abertos dos repositórios e labels informados.
+
+    Args:
+        repos (list): Repositórios no formato "owner/repo" (vazio: qualquer repositório acessível).
+        labels (list): Labels exigidos (todos devem estar presentes).
+        query (str): Qualificadores adicionais (ex: "org:minha-org draft:false").
+
+    Returns:
+        str: Busca no formato da API de busca do GitHub.
+    """
+    terms = ["is:pr", "is:open", "archived:false"]
+    terms += [f"repo:{repo}" for repo in repos]
+    terms += [f'label:"{label}"' if " " in label else f"label:{label}" for label in labels]
+    if query:
+        terms.append(query)
+    return " ".join(terms)
+
+
+def search_pull_requests(github_token, query, limit=None):
+    """
+    Busca os PRs que atendem à consulta (a API de busca devolve no máximo 1000 resultados).
+
+    Args:
+        github_token (str): Token de autenticação do GitHub.
+        query (str): Busca (ver `build_search_query`).
+        limit (int): Quantidade máxima de PRs (padrão: todos os encontrados).
+
+    Returns:
+        list: ReviewRequest de cada PR encontrado, na ordem da busca.
+    """
+    # O cliente do handler usa as conexões com pool e o agendador de rate limit compartilhados
+    from scripts.github_handler.commented_pr import GithubPRHandler
+
+    client = GithubPRHandler(github_token).github_client
+    client.per_page = SEARCH_PAGE_SIZE
+
+    requests = []
+    for issue in client.search_issues(query):
+        if limit and len(requests) >= limit:
+            break
+        # repository_url: <api>/repos/owner/repo (evita uma requisição por PR para obter o repositório)
+        repo_name = "/".join(issue.raw_data["repository_url"].rstrip("/").split("/")[-2:])
+        requests.append(ReviewRequest(repo_name, issue.number, source="batch"))
+    return requests
+
+
+def unique_requests(requests):
+    """Remove pedidos repetidos para o mesmo PR, mantendo a primeira ocorrência."""
+    seen = set()
+    unique = []
+    for request in requests:
+        key = (request.repo_name, request.pr_number)
+        if key not in seen:
+            seen.add(key)
+            unique.append(request)
+    return unique
+
+
+def run_batch(requests, run_job, workers=None):
+    """
+    Revisa os PRs com a fila e os workers do modo servidor, no mesmo processo.
+
+    Args:
+        requests (list): ReviewRequest de cada PR.
+        run_job (callable): Recebe o ReviewRequest e executa a revisão.
+        workers (int): PRs revisados em paralelo (padrão: BATCH_WORKERS).
+
+    Returns:
+        list: ReviewJob de cada PR, na ordem dos pedidos.
+    """
+    requests = unique_requests(requests)
+    if not requests:
+        return []
+
+    workers = int(workers or os.getenv("BATCH_WORKERS") or DEFAULT_BATCH_WORKERS)
+    pool = ReviewWorkerPool(run_job, workers=min(workers, len(requests)), max_queue=len(requests)).start()
+    try:
+        jobs = [pool.submit(request) for request in requests]
+        pool.join()
+    finally:
+        pool.stop()
+    return jobs
+
+
+def summarize(jobs):
+    """
+    Resumo da execução em lote.
+
+    Args:
+        jobs (list): ReviewJob retornados por `run_batch`.
+
+    Returns:
+        dict: Quantidade por situação, duração total e PRs com falha.
+    """
+    statuses = {}
+    for job in jobs:
+        statuses[job.status] = statuses.get(job.status, 0) + 1
+    started = [job.started_at for job in jobs if job.started_at]
+    finished = [job.finished_at for job in jobs if job.finished_at]
+    return {
+        "prs": len(jobs),
+        "statuses": statuses,
+        "elapsed_seconds": round(max(finished) - min(started), 3) if started and finished else 0.0,
+        "failed": [
+            {"repository": job.request.repo_name, "pr": job.request.pr_number, "error": job.error}
+            for job in jobs if job.status in (FAILED, CANCELLED)
+        ],
+    }
+
+
+def collect_requests(args, github_token):
+    """Pedidos de revisão das referências, do arquivo e da busca informados na linha de comando."""
+    refs = list(args.pr or [])
+    for path in args.prs_file or []:
+        refs += read_pr_refs(path)
+    requests = [parse_pr_ref(ref, args.default_repo) for ref in refs]
+
+    if args.repo or args.label or args.query:
+        query = build_search_query(args.repo or [], args.label or [], args.query)
+        print(f"🔎 Buscando PRs: {query}")
+        requests += search_pull_requests(github_token, query, args.limit)
+    return unique_requests(requests)[:args.limit] if args.limit else unique_requests(requests)
+
+
+def batch_review(argv=None):
+    """
+    Revisão em lote, com a configuração das variáveis de ambiente do dispatcher.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+
+    Returns:
+        int: Código de saída (1 se alguma revisão falhou).
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pr", action="append", help="PR a revisar (owner/repo#7 ou URL); pode ser repetido")
+    parser.add_argument("--prs-file", action="append", help="arquivo com um PR por linha ('-' para a entrada padrão)")
+    parser.add_argument("--default-repo", default=os.getenv("GITHUB_REPOSITORY"), help="repositório das referências sem owner/repo")
+    parser.add_argument("--repo", action="append", help="busca os PRs abertos deste repositório; pode ser repetido")
+    parser.add_argument("--label", action="append", help="só PRs com este label; pode ser repetido")
+    parser.add_argument("--query", help="qualificadores extras da busca (ex: 'org:minha-org draft:false')")
+    parser.add_argument("--limit", type=int, help="quantidade máxima de PRs")
+    parser.add_argument("--workers", type=int, help=f"PRs revisados em paralelo (padrão: BATCH_WORKERS ou {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument("--review-type", help="tipo de revisão (padrão: REVIEW_TYPE)")
+    parser.add_argument("--plan", "--dry-run", action="store_true", help="mostra o plano de revisão de cada PR sem chamar a IA")
+    parser.add_argument("--report", help="grava o resultado de cada PR neste arquivo JSON")
+    args = parser.parse_args(argv)
+
+    settings = ReviewSettings.from_env()
+    if args.review_type:
+        settings.review_type = args.review_type
+    requests = collect_requests(args, settings.github_token)
+    if not requests:
+        print("ℹ️ Nenhum PR encontrado para revisar.")
+        return 0
+
+    if args.plan:
+        from scripts.planning.review_plan import plan_pr_review
+
+        def run_job(request):
+            plan_pr_review(settings.ai_provider, settings.github_token, request.repo_name, request.pr_number,
+                           settings.prompt_path, settings.ai_model)
+    else:
+        def run_job(request):
+            run_review(settings, request.repo_name, request.pr_number)
+
+    print(f"📦 Revisando {len(requests)} PR(s) em lote ({settings.ai_provider}/{settings.ai_model}, tipo {settings.review_type}).")
+    try:
+        jobs = run_batch(requests, run_job, args.workers)
+    finally:
+        from scripts.cache.review_cache import get_review_cache
+        from scripts.github_handler.async_client import close_async_clients
+        from scripts.transport.sessions import close_sessions
+
+        get_review_cache().close()
+        close_sessions()
+        close_async_clients()
+
+    summary = summarize(jobs)
+    done, failed = summary["statuses"].get(DONE, 0), len(summary["failed"])
+    print(f"🏁 Lote concluído em {summary['elapsed_seconds']}s: ✅ {done} revisado(s), ❌ {failed} com falha.")
+    for failure in summary["failed"]:
+        print(f"   ❌ {failure['repository']}#{failure['pr']}: {failure['error']}")
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump({**summary, "jobs": [job.to_dict() for job in jobs]}, file, indent=2, ensure_ascii=False)
+        print(f"📝 Resultado gravado em {args.report}.")
+
+    # Uma única telemetria para o lote inteiro (fases, endpoints e tokens somados de todos os PRs)
+    run_telemetry.emit(
+        provider=settings.ai_provider, model=settings.ai_model, review_type=settings.review_type,
+        mode="batch", prs=len(jobs),
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(batch_review())
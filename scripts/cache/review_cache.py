@@ -0,0 +1,240 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from scripts.telemetry import run_telemetry
+
+# Local padrão do cache (persistido entre execuções da Action via actions/cache)
+DEFAULT_CACHE_PATH = ".raico_cache/reviews.sqlite3"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_DAYS = 14
+
+
+def hash_text(text):
+    """
+    Calcula o hash SHA-256 de um texto.
+
+    Args:
+        text (str): Texto a ser resumido.
+
+    Returns:
+        str: Hash hexadecimal.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def make_cache_key(ai_provider, ai_model, prompt, review_type, content_id):
+    """
+    Monta a chave de cache endereçada por conteúdo.
+
+    Args:
+        ai_provider (str): Provedor de IA (openai, gemini ou claude).
+        ai_model (str): Modelo utilizado.
+        prompt (str): Texto do prompt (apenas o hash entra na chave).
+        review_type (str): Tipo de revisão (ex: file, line, line_inline, file_inline).
+        content_id (str): Identificador do conteúdo analisado (ex: caminho + SHA do blob ou hash do patch).
+
+    Returns:
+        str: Chave hexadecimal.
+    """
+    parts = [ai_provider or "", ai_model or "", hash_text(prompt), review_type, content_id]
+    return hash_text("\x1f".join(parts))
+
+
+class ReviewCache:
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_DAYS * 86400):
+        """
+        Cache de feedbacks da IA em SQLite, com expiração por TTL e remoção LRU por quantidade.
+
+        Args:
+            path (str): Caminho do arquivo SQLite.
+            max_entries (int): Número máximo de entradas mantidas.
+            ttl_seconds (float): Tempo de vida de cada entrada, em segundos.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Compartilhado entre os workers da análise concorrente (acesso serializado pelo lock)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_reviews_accessed ON reviews (accessed_at)")
+        self._connection.commit()
+
+    def get(self, key):
+        """
+        Busca um feedback no cache.
+
+        Args:
+            key (str): Chave gerada por `make_cache_key`.
+
+        Returns:
+            str | None: Feedback armazenado ou None (ausente ou expirado).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM reviews WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._connection.execute("DELETE FROM reviews WHERE key = ?", (key,))
+                    self._connection.commit()
+                self.misses += 1
+                run_telemetry.increment("review_cache_misses")
+                return None
+
+            self._connection.execute("UPDATE reviews SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+            run_telemetry.increment("review_cache_hits")
+            return row[0]
+
+    def set(self, key, value):
+        """
+        Armazena um feedback e aplica a política de remoção (TTL + LRU).
+
+        Respostas incompletas (ex: interrompidas pelo limite de tokens) não são armazenadas.
+
+        Args:
+            key (str): Chave gerada por `make_cache_key`.
+            value (str): Feedback a ser armazenado.
+        """
+        if not getattr(value, "cacheable", True):
+            return
+
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reviews (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, str(value), now, now),
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now):
+        """Remove entradas expiradas e, se necessário, as menos acessadas recentemente."""
+        self._connection.execute("DELETE FROM reviews WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM reviews").fetchone()
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM reviews WHERE key IN ("
+                " SELECT key FROM reviews ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def get_or_compute(self, key, compute, is_cacheable=None):
+        """
+        Retorna o feedback do cache ou o calcula (chamando o provedor) e armazena.
+
+        Args:
+            key (str): Chave gerada por `make_cache_key`.
+            compute (callable): Função sem argumentos que gera o feedback (None se não houver o que analisar).
+            is_cacheable (callable): Decide se o resultado pode ser armazenado (ex: ignora erros).
+
+        Returns:
+            str: Feedback do cache ou recém-calculado (None se `compute` não gerou feedback).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        if value is None:
+            return None
+        if is_cacheable is None or is_cacheable(value):
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        """
+        Contadores do cache na execução atual.
+
+        Returns:
+            dict: hits, misses e entradas armazenadas.
+        """
+        with self._lock:
+            (entries,) = self._connection.execute("SELECT COUNT(*) FROM reviews").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def log_stats(self):
+        """Imprime os contadores do cache."""
+        stats = self.stats()
+        print(f"🗄️ Cache de revisões: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['entries']} entrada(s).")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class NullReviewCache:
+    """Cache desativado (REVIEW_CACHE_PATH vazio): sempre consulta o provedor."""
+
+    hits = 0
+    misses = 0
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def get_or_compute(self, key, compute, is_cacheable=None):
+        return compute()
+
+    def stats(self):
+        return {"hits": 0, "misses": 0, "entries": 0}
+
+    def log_stats(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_review_cache = None
+_review_cache_lock = threading.Lock()
+
+
+def get_review_cache():
+    """
+    Obtém o cache de revisões compartilhado, configurado pelas variáveis de ambiente
+    REVIEW_CACHE_PATH, REVIEW_CACHE_MAX_ENTRIES e REVIEW_CACHE_TTL_DAYS.
+
+    Returns:
+        ReviewCache | NullReviewCache: Cache da execução.
+    """
+    global _review_cache
+    with _review_cache_lock:
+        if _review_cache is None:
+            path = os.getenv("REVIEW_CACHE_PATH", DEFAULT_CACHE_PATH)
+            if not path:
+                _review_cache = NullReviewCache()
+            else:
+                try:
+                    max_entries = int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+                    ttl_days = float(os.getenv("REVIEW_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS))
+                except ValueError:
+                    max_entries, ttl_days = DEFAULT_MAX_ENTRIES, DEFAULT_TTL_DAYS
+                try:
+                    _review_cache = ReviewCache(path, max_entries, ttl_days * 86400)
+                except sqlite3.Error as e:
+                    print(f"Cache de revisões indisponível ({e}); seguindo sem cache.")
+                    _review_cache = NullReviewCache()
+        return _review_cache
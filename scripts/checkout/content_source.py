@@ -0,0 +1,125 @@
+import threading
+
+import requests
+
+from scripts.checkout.local_git import GitCheckout
+from scripts.github_handler.github_connection import get_api_url
+from scripts.telemetry import run_telemetry
+from scripts.transport import sessions
+
+
+class GithubBlobSource:
+    def __init__(self, api_url, repo_name, github_token):
+        """
+        Lê o conteúdo dos arquivos pela API de blobs do GitHub (autenticada, funciona em repositórios privados).
+
+        Args:
+            api_url (str): URL base da API do GitHub.
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            github_token (str): Token de autenticação do GitHub.
+        """
+        self.url = f"{api_url}/repos/{repo_name}/git/blobs/{{sha}}"
+        self.headers = {"Authorization": f"Bearer {github_token}", "Accept": "application/vnd.github.raw"}
+
+    def read(self, file):
+        """
+        Baixa o blob do arquivo no head do PR.
+
+        Args:
+            file (File): Arquivo do PR (usa `sha`).
+
+        Returns:
+            str: Conteúdo do arquivo.
+
+        Raises:
+            requests.RequestException: Se o download falhar.
+        """
+        response = sessions.get(self.url.format(sha=file.sha), headers=self.headers)
+        response.raise_for_status()
+        return response.content.decode("utf-8", errors="replace")
+
+
+class ContentSource:
+    def __init__(self, checkout, remote):
+        """
+        Origem do conteúdo dos arquivos do PR: o checkout local e, como fallback, a API do GitHub.
+
+        Args:
+            checkout (GitCheckout | None): Checkout local do repositório revisado.
+            remote (GithubBlobSource): Leitura via HTTP, usada quando o blob não está no checkout.
+        """
+        self.checkout = checkout
+        self.remote = remote
+
+    def read(self, file):
+        """
+        Conteúdo do arquivo no head do PR, identificado pelo SHA do blob.
+
+        Args:
+            file (File): Arquivo do PR (usa `sha` e `filename`).
+
+        Returns:
+            str: Conteúdo do arquivo.
+
+        Raises:
+            requests.RequestException: Se o blob não estiver no checkout e o download falhar.
+        """
+        if self.checkout is not None:
+            text = self.checkout.read_text(file.sha, file.filename)
+            if text is not None:
+                run_telemetry.increment("content_local_reads")
+                return text
+        run_telemetry.increment("content_http_reads")
+        return self.remote.read(file)
+
+    def read_text(self, file):
+        """
+        Conteúdo do arquivo, ou None quando o download falhar (o arquivo não deve ser analisado).
+
+        Args:
+            file (File): Arquivo do PR.
+
+        Returns:
+            str: Conteúdo do arquivo ou None.
+        """
+        try:
+            return self.read(file)
+        except requests.RequestException as e:
+            print(f"⚠️ Erro ao obter o conteúdo de `{file.filename}`: {e}")
+            return None
+
+
+_checkout = None
+_checkout_loaded = False
+_lock = threading.Lock()
+
+
+def get_checkout():
+    """
+    Checkout local compartilhado pela execução (REVIEW_CHECKOUT_PATH ou GITHUB_WORKSPACE).
+
+    Returns:
+        GitCheckout | None: Checkout encontrado ou None (o conteúdo será baixado via HTTP).
+    """
+    global _checkout, _checkout_loaded
+    with _lock:
+        if not _checkout_loaded:
+            _checkout = GitCheckout.discover()
+            _checkout_loaded = True
+            if _checkout is not None:
+                print(f"📂 Lendo o conteúdo dos arquivos do checkout local em {_checkout.path}.")
+        return _checkout
+
+
+def get_content_source(repo_name, github_token):
+    """
+    Origem do conteúdo dos arquivos de um repositório (checkout local com fallback HTTP).
+
+    Args:
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        github_token (str): Token de autenticação do GitHub.
+
+    Returns:
+        ContentSource: Origem do conteúdo.
+    """
+    return ContentSource(get_checkout(), GithubBlobSource(get_api_url(), repo_name, github_token))
@@ -0,0 +1,270 @@
+import codecs
+import os
+import re
+import subprocess
+
+# Status do `git diff --raw` -> status dos arquivos na API do GitHub
+GIT_STATUS = {
+    "A": "added",
+    "D": "removed",
+    "M": "modified",
+    "R": "renamed",
+    "C": "copied",
+    "T": "changed",
+}
+
+# SHA usado pelo git para o lado inexistente (arquivo adicionado ou removido)
+NULL_SHA = "0" * 40
+
+
+def is_local_diff_enabled():
+    """Indica se a lista de arquivos e os patches podem ser calculados no checkout (REVIEW_LOCAL_DIFF, padrão: true)."""
+    return os.getenv("REVIEW_LOCAL_DIFF", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+class LocalFile:
+    def __init__(self, filename, status, sha, previous_filename=None):
+        """
+        Arquivo alterado calculado no checkout, com os mesmos atributos usados do `File` do PyGithub.
+
+        Args:
+            filename (str): Caminho do arquivo no head.
+            status (str): added, removed, modified, renamed, copied ou changed.
+            sha (str): SHA do blob no head (ou na base, para arquivos removidos).
+            previous_filename (str): Caminho anterior (renomeações e cópias).
+        """
+        self.filename = filename
+        self.status = status
+        self.sha = sha
+        self.previous_filename = previous_filename
+        self.patch = None
+        self.additions = 0
+        self.deletions = 0
+
+    @property
+    def changes(self):
+        return self.additions + self.deletions
+
+    def __repr__(self):
+        return f"LocalFile({self.filename!r}, {self.status!r}, +{self.additions}/-{self.deletions})"
+
+
+def parse_raw_diff(output):
+    """
+    Lê a saída de `git diff --raw -z --no-abbrev`.
+
+    Args:
+        output (bytes): Saída do comando.
+
+    Returns:
+        list: LocalFile de cada arquivo alterado, na ordem da diff (ainda sem patch).
+    """
+    fields = output.split(b"\0")
+    files = []
+    index = 0
+    while index < len(fields) and fields[index].startswith(b":"):
+        _, _, old_sha, new_sha, status = fields[index][1:].decode().split(" ")
+        kind = status[0]
+        if kind in ("R", "C"):
+            previous, path = fields[index + 1].decode(errors="replace"), fields[index + 2].decode(errors="replace")
+            index += 3
+        else:
+            previous, path = None, fields[index + 1].decode(errors="replace")
+            index += 2
+        sha = old_sha if new_sha == NULL_SHA else new_sha
+        files.append(LocalFile(path, GIT_STATUS.get(kind, "modified"), sha, previous))
+    return files
+
+
+def unquote_path(path):
+    """
+    Remove as aspas e os escapes que o git usa em caminhos com caracteres especiais.
+
+    Args:
+        path (str): Caminho como aparece no cabeçalho da diff.
+
+    Returns:
+        str: Caminho original.
+    """
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    return codecs.escape_decode(path[1:-1].encode())[0].decode("utf-8", errors="replace")
+
+
+def parse_header_path(header):
+    """
+    Extrai o caminho no head do cabeçalho `diff --git a/<caminho> b/<caminho>`.
+
+    Args:
+        header (str): Linha do cabeçalho.
+
+    Returns:
+        str: Caminho do arquivo (None se não for possível identificá-lo pelo cabeçalho).
+    """
+    paths = header[len("diff --git "):]
+    quoted = re.fullmatch(r'("(?:[^"\\]|\\.)*"|a/\S.*?) ("(?:[^"\\]|\\.)*")', paths)
+    if quoted:
+        return unquote_path(quoted.group(2))[2:]
+    # Sem renomeação os dois lados são iguais: "a/" + caminho + " b/" + caminho
+    size = (len(paths) - 5) // 2
+    if size > 0 and paths.startswith("a/") and paths[2 + size:5 + size] == " b/" and paths[2:2 + size] == paths[5 + size:]:
+        return paths[2:2 + size]
+    return None
+
+
+def iter_file_patches(lines):
+    """
+    Separa a saída de `git diff` (patch) por arquivo, identificando o caminho de cada seção.
+
+    Args:
+        lines (iterable): Linhas da diff (bytes), na ordem em que o git as produz.
+
+    Yields:
+        tuple: (caminho no head, patch a partir do primeiro "@@" ou None se não houver hunks, adições, remoções).
+    """
+    started = False
+    path, patch, additions, deletions = None, [], 0, 0
+    for raw in lines:
+        line = raw.decode("utf-8", errors="replace").rstrip("\n")
+        if line.startswith("diff --git "):
+            if started:
+                yield path, ("\n".join(patch) or None), additions, deletions
+            started = True
+            path, patch, additions, deletions = parse_header_path(line), [], 0, 0
+        elif line.startswith("@@") or patch:
+            patch.append(line)
+            if line.startswith("+"):
+                additions += 1
+            elif line.startswith("-"):
+                deletions += 1
+        elif line.startswith(("rename to ", "copy to ")):
+            path = unquote_path(line.split(" to ", 1)[1])
+    if started:
+        yield path, ("\n".join(patch) or None), additions, deletions
+
+
+def iter_patches(lines):
+    """
+    Separa a saída de `git diff` (patch) por arquivo, no formato do campo `patch` da API do GitHub.
+
+    Args:
+        lines (iterable): Linhas da diff (bytes), na ordem em que o git as produz.
+
+    Yields:
+        tuple: (patch a partir do primeiro "@@" ou None se não houver hunks, adições, remoções).
+    """
+    for _, patch, additions, deletions in iter_file_patches(lines):
+        yield patch, additions, deletions
+
+
+def ensure_commits(checkout, *shas):
+    """
+    Garante que os commits estão no checkout, buscando-os do remoto `origin` se preciso.
+
+    Args:
+        checkout (GitCheckout): Checkout local.
+        *shas (str): Commits necessários.
+
+    Returns:
+        bool: True se todos os commits estiverem disponíveis.
+    """
+    def missing():
+        result = []
+        for sha in shas:
+            try:
+                checkout.run("cat-file", "-e", f"{sha}^{{commit}}")
+            except subprocess.CalledProcessError:
+                result.append(sha)
+        return result
+
+    absent = missing()
+    if not absent:
+        return True
+    try:
+        checkout.run("fetch", "--quiet", "--no-tags", "origin", *absent)
+    except subprocess.CalledProcessError:
+        return False
+    return not missing()
+
+
+def iter_changed_files(checkout, base_sha, head_sha):
+    """
+    Calcula os arquivos alterados e seus patches com `git diff base...head` no checkout.
+
+    Os arquivos são entregues à medida que a diff é lida (sem carregar toda a saída em memória),
+    sem o limite de 3000 arquivos nem a omissão de patches grandes da API do GitHub.
+
+    Args:
+        checkout (GitCheckout): Checkout local.
+        base_sha (str): SHA da base (a diff parte do merge-base, como na aba "Files changed").
+        head_sha (str): SHA do head.
+
+    Yields:
+        LocalFile: Arquivo alterado, com patch, adições e remoções.
+
+    Raises:
+        subprocess.CalledProcessError: Se o git não conseguir calcular a diff.
+    """
+    revisions = f"{base_sha}...{head_sha}"
+    options = ["--no-color", "--no-ext-diff", "--find-renames", "--no-textconv"]
+    files = parse_raw_diff(checkout.run("diff", *options, "--raw", "-z", "--no-abbrev", revisions))
+
+    process = subprocess.Popen(
+        ["git", "-C", checkout.path, "-c", "core.quotePath=false", "diff", *options,
+         "--src-prefix=a/", "--dst-prefix=b/", "--patch", "--unified=3", revisions],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # As seções seguem a ordem da saída --raw, mas nem sempre uma por arquivo: uma mudança de
+        # tipo (T, ex.: arquivo -> symlink) gera duas seções (remoção e criação) para o mesmo caminho.
+        # Cada seção é associada ao arquivo pelo caminho do cabeçalho; a última seção (lado novo) prevalece.
+        by_path = {file.filename: file for file in files}
+        pending = iter(files)
+        current = None
+        for path, patch, additions, deletions in iter_file_patches(process.stdout):
+            if current is None or current.filename != path:
+                match = by_path.pop(path, None)
+                if match is None:
+                    continue
+                if current is not None:
+                    yield current
+                # Arquivos sem seção própria na diff são entregues sem patch
+                for file in pending:
+                    if file is match:
+                        break
+                    yield file
+                current = match
+            current.patch, current.additions, current.deletions = patch, additions, deletions
+        if current is not None:
+            yield current
+        yield from pending
+    finally:
+        process.stdout.close()
+        if process.wait() not in (0, -13):
+            raise subprocess.CalledProcessError(process.returncode, "git diff")
+
+
+def load_changed_files(checkout, base_sha, head_sha):
+    """
+    Lista os arquivos alterados pelo checkout local, quando possível.
+
+    Args:
+        checkout (GitCheckout | None): Checkout local.
+        base_sha (str): SHA da base.
+        head_sha (str): SHA do head.
+
+    Returns:
+        list | None: Arquivos alterados ou None para usar a API paginada do GitHub.
+    """
+    if checkout is None or not is_local_diff_enabled():
+        return None
+    if not ensure_commits(checkout, base_sha, head_sha):
+        print(f"⚠️ Commits {base_sha[:7]}/{head_sha[:7]} ausentes do checkout; usando a API do GitHub.")
+        return None
+    try:
+        files = list(iter_changed_files(checkout, base_sha, head_sha))
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ Não foi possível calcular a diff no checkout ({e}); usando a API do GitHub.")
+        return None
+    print(f"📂 {len(files)} arquivo(s) alterado(s) calculado(s) no checkout local.")
+    return files
@@ -0,0 +1,197 @@
+import hashlib
+import mmap
+import os
+import subprocess
+import threading
+
+# Blobs a partir deste tamanho são lidos da árvore de trabalho via mmap, sem passar pelo processo git
+MMAP_MIN_BYTES = 256 * 1024
+
+
+def get_checkout_path():
+    """
+    Diretório do repositório revisado (REVIEW_CHECKOUT_PATH ou, no GitHub Actions, GITHUB_WORKSPACE).
+
+    Returns:
+        str | None: Caminho do checkout, se configurado.
+    """
+    return os.getenv("REVIEW_CHECKOUT_PATH") or os.getenv("GITHUB_WORKSPACE") or None
+
+
+def git_blob_sha(data):
+    """
+    SHA do blob no formato do git (sha1 de "blob <tamanho>\\0" + conteúdo).
+
+    Args:
+        data (bytes | mmap.mmap): Conteúdo do arquivo.
+
+    Returns:
+        str: SHA hexadecimal, comparável com o `sha` dos arquivos do PR.
+    """
+    digest = hashlib.sha1(f"blob {len(data)}\0".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class GitCheckout:
+    def __init__(self, path):
+        """
+        Acesso ao banco de objetos de um checkout local do repositório revisado.
+
+        Os blobs são lidos por um único processo `git cat-file --batch`, mantido aberto durante a
+        execução e compartilhado (com lock) entre as análises concorrentes.
+
+        Args:
+            path (str): Raiz do repositório (diretório de trabalho).
+        """
+        self.path = path
+        self._batch = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def discover(cls, path=None):
+        """
+        Localiza o checkout, se houver um repositório git no caminho informado.
+
+        Args:
+            path (str): Diretório do checkout (padrão: `get_checkout_path()`).
+
+        Returns:
+            GitCheckout | None: Checkout encontrado ou None.
+        """
+        path = path or get_checkout_path()
+        if not path or not os.path.isdir(path):
+            return None
+        try:
+            top = subprocess.run(
+                ["git", "-C", path, "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return cls(top) if top else None
+
+    def run(self, *args):
+        """
+        Executa um comando git no checkout.
+
+        Args:
+            *args (str): Argumentos do comando (ex: "rev-parse", "HEAD").
+
+        Returns:
+            bytes: Saída padrão do comando.
+
+        Raises:
+            subprocess.CalledProcessError: Se o comando falhar.
+        """
+        # Sem prompts de credenciais: um `git fetch` sem acesso ao remoto deve falhar, não travar
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        return subprocess.run(["git", "-C", self.path, *args], capture_output=True, check=True, env=env).stdout
+
+    def read_blob(self, sha):
+        """
+        Lê um blob do banco de objetos pelo SHA.
+
+        Args:
+            sha (str): SHA do blob.
+
+        Returns:
+            bytes | None: Conteúdo do blob ou None se o objeto não existir no checkout.
+        """
+        with self._lock:
+            try:
+                batch = self._get_batch()
+                batch.stdin.write(f"{sha}\n".encode())
+                batch.stdin.flush()
+                header = batch.stdout.readline().decode().split()
+                if len(header) != 3:
+                    return None
+                # O conteúdo é sempre consumido, mesmo que o objeto não seja um blob
+                data = batch.stdout.read(int(header[2]) + 1)[:-1]
+                if header[1] != "blob":
+                    return None
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Falha ao ler o blob {sha[:7]} do checkout local: {e}")
+                self._close_batch()
+                return None
+        return data
+
+    def blob_sizes(self, shas):
+        """
+        Tamanho (em bytes) de vários blobs, consultados de uma só vez (`git cat-file --batch-check`).
+
+        Args:
+            shas (list): SHAs dos blobs.
+
+        Returns:
+            dict: SHA -> tamanho, apenas dos blobs presentes no checkout.
+        """
+        if not shas:
+            return {}
+        try:
+            output = subprocess.run(
+                ["git", "-C", self.path, "cat-file", "--batch-check"],
+                input="".join(f"{sha}\n" for sha in shas).encode(), capture_output=True, check=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return {}
+        sizes = {}
+        for line in output.decode().splitlines():
+            fields = line.split()
+            if len(fields) == 3 and fields[1] == "blob":
+                sizes[fields[0]] = int(fields[2])
+        return sizes
+
+    def read_text(self, sha, file_path=None):
+        """
+        Conteúdo de um blob como texto.
+
+        Arquivos grandes cujo conteúdo na árvore de trabalho corresponde ao blob (mesmo SHA) são
+        lidos via mmap; os demais vêm do banco de objetos.
+
+        Args:
+            sha (str): SHA do blob.
+            file_path (str): Caminho do arquivo no repositório (habilita a leitura via mmap).
+
+        Returns:
+            str | None: Texto do arquivo ou None se o blob não estiver disponível localmente.
+        """
+        if file_path:
+            text = self._read_worktree(sha, os.path.join(self.path, file_path))
+            if text is not None:
+                return text
+        data = self.read_blob(sha)
+        return data.decode("utf-8", errors="replace") if data is not None else None
+
+    def _read_worktree(self, sha, path):
+        """Lê o arquivo da árvore de trabalho via mmap se for grande e idêntico ao blob."""
+        try:
+            if os.path.getsize(path) < MMAP_MIN_BYTES:
+                return None
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if git_blob_sha(data) != sha:
+                    return None
+                return str(data, "utf-8", errors="replace")
+        except (OSError, ValueError):
+            return None
+
+    def _get_batch(self):
+        if self._batch is None or self._batch.poll() is not None:
+            self._batch = subprocess.Popen(
+                ["git", "-C", self.path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        return self._batch
+
+    def _close_batch(self):
+        if self._batch is not None:
+            try:
+                self._batch.stdin.close()
+                self._batch.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._batch.kill()
+            self._batch = None
+
+    def close(self):
+        """Encerra o processo `git cat-file` (se aberto)."""
+        with self._lock:
+            self._close_batch()
@@ -1,7 +1,12 @@
+from scripts.cache.review_cache import get_review_cache, hash_text, make_cache_key
 from scripts.github_handler.commented_pr import GithubPRHandler
-import anthropic
+from scripts.planning.request_planner import PACKED_INSTRUCTIONS, get_content_budget, review_files_in_batches
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
 
-def claude_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model="claude-2"):
+def claude_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model="claude-2", max_concurrency=None):
     """
     Função principal para revisar as linhas alteradas de um Pull Request (PR) utilizando a API Claude AI.
 
@@ -12,9 +17,14 @@ def claude_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt
         pr_number (int): Número do Pull Request.
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da IA Claude (ex: claude-2).
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
 
-    client = anthropic.Anthropic(api_key=ai_api_key)
+    # Cliente Claude compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("claude", ai_api_key, ai_model)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
 
     def load_prompt():
         """
@@ -41,55 +51,59 @@ def claude_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt
         Returns:
             str: Resposta do modelo Claude.
         """
-        full_prompt = f"""
-        {prompt}
-        Arquivo: {file_path}
-        Alterações (diff):
-        ```diff
-        {patch_content}
-        ```
-        """
+        payload = build_user_prompt(file_path, ("Alterações (diff):", "diff", patch_content))
 
         try:
-            response = client.messages.create(
-                model=ai_model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": full_prompt}]
-            )
-            return response.content[0].text
-        except anthropic.APIError as e:
+            return completer.complete(payload, system=build_system_prompt(prompt, PACKED_INSTRUCTIONS))
+        except ProviderError as e:
             return f"Erro ao processar o arquivo {file_path} com o modelo {ai_model}: {e}"
 
     try:
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
+        # Arquivos com alterações a revisar (a ordem original é preservada no feedback)
+        files = []
+        for file in snapshot.files_to_review():
+            if not snapshot.get_review_patch(file):
+                print(f"Ignorando {file.filename} (sem alterações no PR).")
+                continue
+            files.append(file)
+
+        # Agrupa os arquivos pequenos e divide os grandes conforme a janela de contexto do modelo.
+        # O feedback de cada arquivo continua em cache individualmente, enquanto o patch não mudar
+        feedbacks = review_files_in_batches(
+            files,
+            cache_key=lambda file: make_cache_key("claude", ai_model, prompt, "line", f"{file.filename}@{hash_text(snapshot.get_review_patch(file))}"),
+            load_content=snapshot.get_review_patch,
+            analyze=lambda label, content: analyze_patch_with_claude(label, content, prompt),
+            budget_tokens=get_content_budget(ai_model, prompt),
+            review_cache=review_cache,
+            is_cacheable=lambda text: "Erro ao processar" not in text,
+            max_concurrency=max_concurrency,
+        )
+
+        # Lista para consolidar o feedback gerado
         overall_feedback = []
-
-        for file in pr.get_files():
-            file_path = file.filename
-            patch_content = file.patch
-
-            if not patch_content:
-                print(f"Ignorando {file_path} (sem alterações no PR).")
+        for file in files:
+            feedback = feedbacks.get(file.filename)
+            if not feedback:
                 continue
-
-            feedback = analyze_patch_with_claude(file_path, patch_content, prompt)
-
             if "Erro ao processar o arquivo" in feedback:
-                overall_feedback.append(
-                    f"**Erro ao analisar o arquivo `{file_path}`:**\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"**Erro ao analisar o arquivo `{file.filename}`:**\n\n{feedback}\n\n---")
             else:
-                overall_feedback.append(
-                    f"### Arquivo: `{file_path}`\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"### Arquivo: `{file.filename}`\n\n{feedback}\n\n---")
 
         github_handler.post_feedback_comment(repo_name, pr_number, overall_feedback)
+        review_cache.log_stats()
+        log_usage_stats()
 
     except Exception as e:
         print(f"Erro ao revisar o PR com Claude: {e}")
         github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
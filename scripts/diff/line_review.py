@@ -0,0 +1,122 @@
+import json
+import re
+
+from scripts.diff.patch import ADDED, parse_patch
+
+# Tamanho máximo (em caracteres) do trecho de diff enviado em cada requisição.
+# Arquivos menores vão inteiros em uma única chamada; os maiores são divididos por hunks.
+DEFAULT_MAX_BATCH_CHARS = 12000
+
+# Instruções anexadas ao prompt para obter comentários ancorados por linha
+LINE_REVIEW_INSTRUCTIONS = """
+Cada linha do diff abaixo está prefixada pelo número da linha no arquivo novo.
+Revise apenas as linhas adicionadas (marcadas com "+").
+Responda SOMENTE com um array JSON no formato:
+[{"line": <número da linha no arquivo novo>, "comment": "<sugestão em markdown>"}]
+Se nenhuma linha precisar de comentário, responda com [].
+""".strip()
+
+
+class LineBatch:
+    __slots__ = ("text", "positions")
+
+    def __init__(self, text, positions):
+        """
+        Trecho de diff (um ou mais hunks) enviado em uma única requisição.
+
+        Args:
+            text (str): Hunks renderizados com o número da linha do arquivo novo.
+            positions (dict): Número da linha no arquivo novo -> posição na diff do PR,
+                apenas para as linhas adicionadas que podem receber comentário.
+        """
+        self.text = text
+        self.positions = positions
+
+
+def _render_hunk(hunk, is_pending):
+    """Renderiza um hunk com a numeração do arquivo novo e coleta as posições comentáveis."""
+    rendered, positions = [hunk.header], {}
+    for line in hunk.lines:
+        if line.new_line is None:
+            rendered.append(f"{'':>6} {line.kind}{line.text}")
+            continue
+        if line.kind == ADDED and is_pending(line.new_line):
+            positions[line.new_line] = line.position
+        rendered.append(f"{line.new_line:>6} {line.kind}{line.text}")
+    return "\n".join(rendered), positions
+
+
+def build_line_batches(patch, is_pending=None, max_chars=DEFAULT_MAX_BATCH_CHARS):
+    """
+    Agrupa os hunks do patch em lotes, um por requisição.
+
+    Args:
+        patch (str): Patch (unified diff) do arquivo, como retornado pela API do GitHub.
+        is_pending (callable): Recebe o número da linha no arquivo novo e indica se ela deve ser
+            revisada (ex: revisão incremental). Por padrão todas as linhas adicionadas são revisadas.
+        max_chars (int): Tamanho máximo aproximado de cada lote.
+
+    Returns:
+        list: Lotes (LineBatch) com pelo menos uma linha adicionada a revisar.
+    """
+    is_pending = is_pending or (lambda new_line: True)
+    batches = []
+    texts, positions, size = [], {}, 0
+
+    def flush():
+        if positions:
+            batches.append(LineBatch("\n".join(texts), dict(positions)))
+
+    for hunk in parse_patch(patch).hunks:
+        text, hunk_positions = _render_hunk(hunk, is_pending)
+        if not hunk_positions:
+            continue
+        if texts and size + len(text) > max_chars:
+            flush()
+            texts, positions, size = [], {}, 0
+        texts.append(text)
+        positions.update(hunk_positions)
+        size += len(text)
+
+    flush()
+    return batches
+
+
+def parse_line_comments(response_text):
+    """
+    Extrai os comentários por linha da resposta da IA.
+
+    Aceita o array JSON puro ou dentro de um bloco de código markdown.
+
+    Args:
+        response_text (str): Resposta do modelo.
+
+    Returns:
+        list: Pares (número da linha, comentário). Itens inválidos são ignorados.
+    """
+    text = (response_text or "").strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end < start:
+        return []
+
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return []
+
+    comments = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            line = int(item.get("line"))
+        except (TypeError, ValueError):
+            continue
+        comment = str(item.get("comment") or "").strip()
+        if comment:
+            comments.append((line, comment))
+    return comments
@@ -0,0 +1,182 @@
+import re
+from array import array
+from functools import lru_cache
+
+# Cabeçalho de hunk de um unified diff: @@ -a,b +c,d @@
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Tipos de linha do patch
+ADDED = "+"
+REMOVED = "-"
+CONTEXT = " "
+NO_NEWLINE = "\\"  # "\ No newline at end of file"
+HEADER = "@"
+
+# Valor usado nos índices quando a linha não existe em um dos lados da diff
+MISSING = -1
+
+
+class DiffLine:
+    __slots__ = ("kind", "position", "old_line", "new_line", "text")
+
+    def __init__(self, kind, position, old_line, new_line, text):
+        """
+        Linha de um patch.
+
+        Args:
+            kind (str): ADDED, REMOVED, CONTEXT, NO_NEWLINE ou HEADER.
+            position (int): Posição na diff do PR (a primeira linha após o primeiro "@@" é a posição 1).
+            old_line (int | None): Número da linha no arquivo antigo.
+            new_line (int | None): Número da linha no arquivo novo.
+            text (str): Conteúdo da linha, sem o prefixo.
+        """
+        self.kind = kind
+        self.position = position
+        self.old_line = old_line
+        self.new_line = new_line
+        self.text = text
+
+
+class Hunk:
+    __slots__ = ("header", "position", "old_start", "old_count", "new_start", "new_count", "lines")
+
+    def __init__(self, header, position, old_start, old_count, new_start, new_count):
+        """
+        Hunk de um patch (cabeçalho "@@" e as linhas seguintes).
+
+        Args:
+            header (str): Linha do cabeçalho.
+            position (int): Posição do cabeçalho na diff do PR.
+            old_start (int): Primeira linha do arquivo antigo.
+            old_count (int): Quantidade de linhas do arquivo antigo.
+            new_start (int): Primeira linha do arquivo novo.
+            new_count (int): Quantidade de linhas do arquivo novo.
+        """
+        self.header = header
+        self.position = position
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.lines = []
+
+
+class ParsedPatch:
+    def __init__(self, patch):
+        """
+        Patch (unified diff) de um arquivo, analisado uma única vez, com índices O(1)
+        entre linhas do arquivo novo e posições na diff.
+
+        A posição segue a convenção da API de reviews do GitHub: é o índice da linha no patch,
+        contando o primeiro cabeçalho "@@" como 0 (os cabeçalhos seguintes também contam).
+
+        Args:
+            patch (str): Patch do arquivo, como retornado pela API do GitHub.
+        """
+        self.patch = patch or ""
+        self.hunks = []
+        self.lines = []
+        self.added_lines = set()
+
+        # Posição -> linha do arquivo novo (MISSING para cabeçalhos e linhas removidas)
+        self._new_line_by_position = array("l")
+        # Linha do arquivo novo -> posição na diff
+        self._position_by_new_line = {}
+
+        self._parse()
+
+    def _parse(self):
+        hunk = None
+        old_line = new_line = 0
+        new_line_by_position = self._new_line_by_position
+        position_by_new_line = self._position_by_new_line
+
+        for position, raw in enumerate(self.patch.split("\n")):
+            match = HUNK_HEADER.match(raw)
+            if match:
+                old_line, new_line = int(match.group(1)), int(match.group(3))
+                hunk = Hunk(
+                    raw, position, old_line, int(match.group(2) or 1), new_line, int(match.group(4) or 1)
+                )
+                self.hunks.append(hunk)
+                line = DiffLine(HEADER, position, None, None, raw)
+            elif hunk is None:
+                # Conteúdo antes do primeiro hunk (não deveria ocorrer nos patches do GitHub)
+                line = DiffLine(CONTEXT, position, None, None, raw)
+            elif raw.startswith(REMOVED):
+                line = DiffLine(REMOVED, position, old_line, None, raw[1:])
+                old_line += 1
+            elif raw.startswith(ADDED):
+                line = DiffLine(ADDED, position, None, new_line, raw[1:])
+                self.added_lines.add(new_line)
+                new_line += 1
+            elif raw.startswith(NO_NEWLINE):
+                line = DiffLine(NO_NEWLINE, position, None, None, raw[1:])
+            else:
+                line = DiffLine(CONTEXT, position, old_line, new_line, raw[1:])
+                old_line += 1
+                new_line += 1
+
+            if hunk is not None and line.kind != HEADER:
+                hunk.lines.append(line)
+            self.lines.append(line)
+
+            if line.new_line is None:
+                new_line_by_position.append(MISSING)
+            else:
+                new_line_by_position.append(line.new_line)
+                position_by_new_line[line.new_line] = position
+
+    def position_for_line(self, new_line):
+        """
+        Posição na diff de uma linha do arquivo novo.
+
+        Args:
+            new_line (int): Número da linha no arquivo novo.
+
+        Returns:
+            int | None: Posição na diff, ou None se a linha não aparece no patch.
+        """
+        return self._position_by_new_line.get(new_line)
+
+    def line_for_position(self, position):
+        """
+        Linha do arquivo novo correspondente a uma posição na diff.
+
+        Args:
+            position (int): Posição na diff.
+
+        Returns:
+            int | None: Número da linha no arquivo novo, ou None (cabeçalho, linha removida ou fora do patch).
+        """
+        if not 0 <= position < len(self._new_line_by_position):
+            return None
+        new_line = self._new_line_by_position[position]
+        return None if new_line == MISSING else new_line
+
+    def first_added_position(self):
+        """
+        Posição da primeira linha adicionada (ou, sem adições, da primeira linha comentável).
+
+        Returns:
+            int | None: Posição na diff, ou None para patches vazios.
+        """
+        if self.added_lines:
+            return self._position_by_new_line[min(self.added_lines)]
+        if self._position_by_new_line:
+            return min(self._position_by_new_line.values())
+        return None
+
+
+@lru_cache(maxsize=512)
+def parse_patch(patch):
+    """
+    Analisa o patch de um arquivo, reaproveitando o resultado para o mesmo texto.
+
+    Args:
+        patch (str): Patch (unified diff) do arquivo.
+
+    Returns:
+        ParsedPatch: Patch analisado (somente leitura).
+    """
+    return ParsedPatch(patch)
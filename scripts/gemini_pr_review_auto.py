@@ -0,0 +1,19 @@
+from scripts.pr_review_auto import pr_review_auto
+
+
+def gemini_pr_review_auto(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version, max_concurrency=None):
+    """
+    Revisa um Pull Request (PR) com a API Gemini, escolhendo por arquivo entre o arquivo completo e a diff.
+
+    Args:
+        ai_api_key (str): Chave de autenticação da API Gemini.
+        github_token (str): Token de autenticação do GitHub.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        prompt_path (str): Caminho para o arquivo de prompt personalizado.
+        ai_model (str): Modelo da API Gemini.
+        ai_version (str): Versão da API Gemini.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
+    """
+    pr_review_auto("gemini", ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model,
+                   ai_version=ai_version, max_concurrency=max_concurrency)
@@ -1,8 +1,14 @@
+from scripts.cache.review_cache import get_review_cache, make_cache_key
+from scripts.checkout.content_source import get_content_source
 from scripts.github_handler.commented_pr import GithubPRHandler
-import requests
+from scripts.planning.request_planner import PACKED_INSTRUCTIONS, get_content_budget, review_files_in_batches
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
 
 # Função principal para revisar um Pull Request (PR).
-def gemini_pr_review_file(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version):
+def gemini_pr_review_file(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version, max_concurrency=None):
     """
     Função principal para revisar um Pull Request (PR) utilizando a API Gemini e GitHub.
 
@@ -14,7 +20,17 @@ def gemini_pr_review_file(ai_api_key, github_token, repo_name, pr_number, prompt
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da API Gemini.
         ai_version (str): Versão da API Gemini.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
+    # Cliente Gemini compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("gemini", ai_api_key, ai_model, ai_version)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
+
+    # Conteúdo dos arquivos lido do checkout local (com fallback para a API do GitHub)
+    content_source = get_content_source(repo_name, github_token)
+
     # Função auxiliar para carregar o prompt
     def load_prompt():
         try:
@@ -27,36 +43,14 @@ def gemini_pr_review_file(ai_api_key, github_token, repo_name, pr_number, prompt
 
     # Função para enviar o conteúdo de um arquivo para análise pela API Gemini.
     def analyze_file_with_gemini(file_path, file_content, prompt):
-        # Define a URL da API Gemini com os parâmetros fornecidos.
-        url = f"https://generativelanguage.googleapis.com/{ai_version}/models/{ai_model}:generateContent?key={ai_api_key}"
-        headers = {"Content-Type": "application/json"}
-        
-        # Cria o payload para a requisição, combinando o prompt e o conteúdo do arquivo.
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": f"{prompt}\n\nArquivo: {file_path}\n\n{file_content}"}
-                    ]
-                }
-            ]
-        }
+        # Monta o prompt da requisição, combinando o prompt e o conteúdo do arquivo.
+        payload = build_user_prompt(file_path, ("Código:", "", file_content))
 
         try:
-            # Envia a requisição POST para a API Gemini.
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()  # Lança exceção se houver erro na resposta.
-
-            # Extrai o texto gerado pela IA a partir da resposta.
-            data = response.json()
-            generated_text = (
-                data.get("candidates", [{}])[0]
-                .get("content", {})
-                .get("parts", [{}])[0]
-                .get("text", "Nenhuma análise fornecida.")
-            )
+            # Envia o prompt para a API Gemini (com retentativas e fallback).
+            generated_text = completer.complete(payload, system=build_system_prompt(prompt, PACKED_INSTRUCTIONS)) or "Nenhuma análise fornecida."
             return generated_text.strip()  # Retorna o texto gerado pela IA.
-        except requests.RequestException as e:
+        except ProviderError as e:
             # Retorna uma mensagem de erro se houver problema na requisição.
             return f"Erro ao processar o arquivo {file_path} com o Gemini: {e}"
 
@@ -65,35 +59,49 @@ def gemini_pr_review_file(ai_api_key, github_token, repo_name, pr_number, prompt
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        # Deleta comentários anteriores
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
-        # Lista de feedback
-        overall_feedback = []
-
-        # Itera sobre os arquivos do PR e analisa
-        for file in pr.get_files():
-            file_path = file.filename
+        # Arquivos com alterações a revisar (a ordem original é preservada no feedback)
+        files = []
+        for file in snapshot.files_to_review():
             if not file.patch:
-                print(f"Ignorando {file_path} (sem alterações no PR).")
+                print(f"Ignorando {file.filename} (sem alterações no PR).")
                 continue
+            files.append(file)
 
-            file_content = requests.get(file.raw_url).text
-            feedback = analyze_file_with_gemini(file_path, file_content, prompt)
+        # Agrupa os arquivos pequenos e divide os grandes conforme a janela de contexto do modelo.
+        # O feedback de cada arquivo continua em cache individualmente, enquanto o blob não mudar
+        feedbacks = review_files_in_batches(
+            files,
+            cache_key=lambda file: make_cache_key("gemini", ai_model, prompt, "file", f"{file.filename}@{file.sha}"),
+            load_content=content_source.read_text,
+            analyze=lambda label, content: analyze_file_with_gemini(label, content, prompt),
+            budget_tokens=get_content_budget(ai_model, prompt),
+            review_cache=review_cache,
+            is_cacheable=lambda text: "Erro ao processar" not in text,
+            max_concurrency=max_concurrency,
+        )
 
+        # Lista para consolidar o feedback gerado
+        overall_feedback = []
+        for file in files:
+            feedback = feedbacks.get(file.filename)
+            if not feedback:
+                continue
             if "Erro ao processar o arquivo" in feedback:
-                overall_feedback.append(
-                    f"**Erro ao analisar o arquivo `{file_path}`:**\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"**Erro ao analisar o arquivo `{file.filename}`:**\n\n{feedback}\n\n---")
             else:
-                overall_feedback.append(
-                    f"### Arquivo: `{file_path}`\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"### Arquivo: `{file.filename}`\n\n{feedback}\n\n---")
 
         # Publica o comentário no PR com o feedback
         github_handler.post_feedback_comment(repo_name, pr_number, overall_feedback)
+        review_cache.log_stats()
+        log_usage_stats()
 
     except Exception as e:
         print(f"Erro ao revisar o PR com Gemini: {e}")
-        github_handler.post_error_comment(repo_name, pr_number, str(e))
\ No newline at end of file
+        github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
\ No newline at end of file
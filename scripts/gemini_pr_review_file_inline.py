@@ -1,8 +1,17 @@
+from scripts.cache.review_cache import get_review_cache, hash_text, make_cache_key
+from scripts.checkout.content_source import get_content_source
+from scripts.diff.patch import parse_patch
 from scripts.github_handler.commented_pr import GithubPRHandler
-import requests
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.streaming import is_plain_approval
+from scripts.providers.usage import log_usage_stats
+from scripts.telemetry import run_telemetry
+from scripts.utils.concurrency import run_concurrently
 
 # Função principal para revisar um arquivo inteiro alterado no Pull Request (PR).
-def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version):
+def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version, max_concurrency=None):
     """
     Função para revisar um arquivo inteiro alterado em um Pull Request (PR) utilizando a API Gemini,
     adicionando comentários diretamente na diff com contexto completo.
@@ -15,7 +24,16 @@ def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da API Gemini.
         ai_version (str): Versão da API Gemini.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
+    # Cliente Gemini compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("gemini", ai_api_key, ai_model, ai_version)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
+
+    # Conteúdo dos arquivos lido do checkout local (com fallback para a API do GitHub)
+    content_source = get_content_source(repo_name, github_token)
 
     def load_prompt():
         """Carrega o texto do prompt a partir de um arquivo."""
@@ -25,22 +43,18 @@ def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file não encontrado em: {prompt_path}")
 
-    def fetch_file_content(file_url):
+    @run_telemetry.phase("fetch_content")
+    def fetch_file_content(file):
         """
         Obtém o conteúdo completo do arquivo para fornecer mais contexto.
 
         Args:
-            file_url (str): URL do arquivo no GitHub.
+            file (File): Arquivo do PR (lido do checkout local ou, como fallback, da API do GitHub).
 
         Returns:
-            str: Conteúdo do arquivo como texto.
+            str: Conteúdo do arquivo como texto (None se o download falhar).
         """
-        try:
-            response = requests.get(file_url)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            return f"Erro ao obter o conteúdo do arquivo: {e}"
+        return content_source.read_text(file)
 
     def analyze_file_with_gemini(file_path, file_content, patch_content, prompt):
         """
@@ -53,97 +67,67 @@ def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
             prompt (str): Texto do prompt.
 
         Returns:
-            list: Lista de sugestões organizadas por linha modificada.
+            str: Resposta do modelo, com uma sugestão por parágrafo (mantém as marcas de truncamento/fallback).
         """
-        url = f"https://generativelanguage.googleapis.com/{ai_version}/models/{ai_model}:generateContent?key={ai_api_key}"
-        headers = {"Content-Type": "application/json"}
-
-        # Criar o payload com o código completo e o patch do arquivo
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": f"""
-                            {prompt}
-                            Arquivo: {file_path}
-
-                            **Conteúdo completo do arquivo atualizado:**
-                            ```python
-                            {file_content}
-                            ```
-
-                            **Alterações aplicadas:**
-                            ```diff
-                            {patch_content}
-                            ```
-                            """
-                        }
-                    ]
-                }
-            ]
-        }
 
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-
-            data = response.json()
-            generated_text = (
-                data.get("candidates", [{}])[0]
-                .get("content", {})
-                .get("parts", [{}])[0]
-                .get("text", "Nenhuma análise fornecida.")
-            )
+        # Montar o prompt com o código completo e o patch do arquivo
+        payload = build_user_prompt(
+            file_path,
+            ("Conteúdo completo do arquivo atualizado:", "", file_content),
+            ("Alterações aplicadas:", "diff", patch_content),
+        )
 
-            # Dividir sugestões para cada alteração (separação fictícia por linhas)
-            suggestions = generated_text.strip().split("\n\n")  # Divide sugestões baseadas em parágrafos
-            return suggestions
-        except requests.RequestException as e:
-            return [f"Erro ao processar o arquivo {file_path} com o Gemini: {e}"]
+        try:
+            return completer.complete(payload, system=build_system_prompt(prompt)) or "Nenhuma análise fornecida."
+        except ProviderError as e:
+            return f"Erro ao processar o arquivo {file_path} com o Gemini: {e}"
 
     try:
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        # Obtém o PR e exclui comentários anteriores
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
-        # Itera sobre os arquivos do PR e analisa todas as mudanças
-        for file in pr.get_files():
+        def review_file(file):
+            """Analisa um arquivo do PR e publica as sugestões na diff."""
             file_path = file.filename
-            file_url = file.raw_url  # URL do arquivo atualizado
             patch_content = file.patch  # Obtém apenas as alterações (diff)
 
             print(f"🔍 Analisando arquivo: {file_path}")
 
-            # Obtém o conteúdo completo do arquivo
-            file_content = fetch_file_content(file_url)
-
             # Analisa o arquivo inteiro e gera sugestões para cada modificação
-            suggestions = analyze_file_with_gemini(file_path, file_content, patch_content, prompt)
-
-            # Identificar as linhas alteradas no patch
-            modified_lines = []
-            line_position = 0
-            for line in patch_content.split("\n"):
-                if line.startswith("@@"):
-                    # Extrai a posição real da linha a partir do diff
-                    try:
-                        line_position = int(line.split(" ")[1].split(",")[0].replace("-", ""))
-                    except ValueError:
-                        continue
-                elif line.startswith("+") and not line.startswith("+++"):
-                    modified_lines.append(line_position)
-                    line_position += 1
+            # (o conteúdo só é baixado se não houver feedback em cache para o blob e o patch)
+            cache_key = make_cache_key(
+                "gemini", ai_model, prompt, "file_inline", f"{file_path}@{file.sha}:{hash_text(patch_content)}"
+            )
+            def analyze():
+                # Sem conteúdo (falha no download), nada é enviado à IA nem armazenado no cache
+                file_content = fetch_file_content(file)
+                if file_content is None:
+                    return None
+                return analyze_file_with_gemini(file_path, file_content, patch_content, prompt)
+
+            feedback = review_cache.get_or_compute(
+                cache_key, analyze, is_cacheable=lambda text: "Erro ao processar" not in text
+            )
+            if feedback is None:
+                print(f"⏭️ Ignorando `{file_path}`: conteúdo indisponível.")
+                return
+            # Dividir sugestões para cada alteração (separação fictícia por parágrafos), depois do cache
+            suggestions = feedback.strip().split("\n\n")
+
+            # Linhas adicionadas (numeração do arquivo novo), a partir do patch analisado uma única vez
+            modified_lines = sorted(parse_patch(patch_content).added_lines)
 
             # Iterar sobre cada linha alterada e adicionar um comentário inline corretamente
             last_position = None
+            group_line = None
             grouped_suggestions = []
-            
+
             for i, suggestion in enumerate(suggestions):
-                if "✅ Alterações Aprovadas" in suggestion:
+                if is_plain_approval(suggestion):
                     print(f"✔️ Nenhum comentário necessário para `{file_path}` (Alteração aprovada)")
                     continue
 
@@ -158,18 +142,33 @@ def gemini_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
                 else:
                     if grouped_suggestions:
                         comment_text = "\n\n".join(grouped_suggestions)
-                        github_handler.post_inline_comment_with_diff(repo_name, pr_number, file_path, patch_content, comment_text)
+                        github_handler.post_inline_comment_with_diff(
+                            repo_name, pr_number, file_path, patch_content, comment_text, new_line=group_line
+                        )
                     grouped_suggestions = [suggestion]
+                    group_line = line_number
 
                 last_position = line_number
 
             # Postar o último grupo de comentários
             if grouped_suggestions:
                 comment_text = "\n\n".join(grouped_suggestions)
-                github_handler.post_inline_comment_with_diff(repo_name, pr_number, file_path, patch_content, comment_text)
+                github_handler.post_inline_comment_with_diff(
+                    repo_name, pr_number, file_path, patch_content, comment_text, new_line=group_line
+                )
 
             print(f"✅ Revisão concluída para `{file_path}`\n")
 
+        # Analisa os arquivos em paralelo; o handler enfileira os comentários inline
+        run_concurrently(review_file, snapshot.files_to_review(), max_concurrency)
+
+        # Publica todos os comentários inline em uma única review
+        github_handler.submit_inline_review(repo_name, pr_number)
+        review_cache.log_stats()
+        log_usage_stats()
+
     except Exception as e:
         print(f"Erro ao revisar o PR com Gemini: {e}")
         github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
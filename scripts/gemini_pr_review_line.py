@@ -1,8 +1,13 @@
+from scripts.cache.review_cache import get_review_cache, hash_text, make_cache_key
 from scripts.github_handler.commented_pr import GithubPRHandler
-import requests
+from scripts.planning.request_planner import PACKED_INSTRUCTIONS, get_content_budget, review_files_in_batches
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
 
 # Função principal para revisar as linhas alteradas de um Pull Request (PR).
-def gemini_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version):
+def gemini_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version, max_concurrency=None):
     """
     Função principal para revisar as linhas alteradas de um Pull Request (PR) utilizando a API Gemini e GitHub.
 
@@ -14,7 +19,14 @@ def gemini_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da API Gemini.
         ai_version (str): Versão da API Gemini.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
+    # Cliente Gemini compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("gemini", ai_api_key, ai_model, ai_version)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
+
     # Função auxiliar para carregar o prompt
     def load_prompt():
         try:
@@ -25,69 +37,62 @@ def gemini_pr_review_line(ai_api_key, github_token, repo_name, pr_number, prompt
 
     # Função para enviar o patch de um arquivo para análise pela API Gemini.
     def analyze_patch_with_gemini(file_path, patch_content, prompt):
-        url = f"https://generativelanguage.googleapis.com/{ai_version}/models/{ai_model}:generateContent?key={ai_api_key}"
-        headers = {"Content-Type": "application/json"}
-        
-        # Cria o payload com o prompt e o patch do arquivo
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": f"{prompt}\n\nArquivo: {file_path}\n\nAlterações:\n```diff\n{patch_content}\n```"}
-                    ]
-                }
-            ]
-        }
+        # Monta o prompt com o patch do arquivo
+        payload = build_user_prompt(file_path, ("Alterações (diff):", "diff", patch_content))
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()  # Levanta exceção se houver erro na resposta
-
-            data = response.json()
-            generated_text = (
-                data.get("candidates", [{}])[0]
-                .get("content", {})
-                .get("parts", [{}])[0]
-                .get("text", "Nenhuma análise fornecida.")
-            )
+            generated_text = completer.complete(payload, system=build_system_prompt(prompt, PACKED_INSTRUCTIONS)) or "Nenhuma análise fornecida."
             return generated_text.strip()
-        except requests.RequestException as e:
+        except ProviderError as e:
             return f"Erro ao processar o arquivo {file_path} com o Gemini: {e}"
 
     try:
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        # Deleta comentários anteriores
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
-
-        overall_feedback = []
-
-        # Itera sobre os arquivos do PR e analisa apenas os patches
-        for file in pr.get_files():
-            file_path = file.filename
-            patch_content = file.patch  # Obtemos as alterações (diff)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
-            if not patch_content:
-                print(f"Ignorando {file_path} (sem alterações no PR).")
+        # Arquivos com alterações a revisar (a ordem original é preservada no feedback)
+        files = []
+        for file in snapshot.files_to_review():
+            if not snapshot.get_review_patch(file):
+                print(f"Ignorando {file.filename} (sem alterações no PR).")
                 continue
+            files.append(file)
 
-            # Analisa o patch com a API Gemini
-            feedback = analyze_patch_with_gemini(file_path, patch_content, prompt)
+        # Agrupa os arquivos pequenos e divide os grandes conforme a janela de contexto do modelo.
+        # O feedback de cada arquivo continua em cache individualmente, enquanto o patch não mudar
+        feedbacks = review_files_in_batches(
+            files,
+            cache_key=lambda file: make_cache_key("gemini", ai_model, prompt, "line", f"{file.filename}@{hash_text(snapshot.get_review_patch(file))}"),
+            load_content=snapshot.get_review_patch,
+            analyze=lambda label, content: analyze_patch_with_gemini(label, content, prompt),
+            budget_tokens=get_content_budget(ai_model, prompt),
+            review_cache=review_cache,
+            is_cacheable=lambda text: "Erro ao processar" not in text,
+            max_concurrency=max_concurrency,
+        )
 
+        # Lista para consolidar o feedback gerado
+        overall_feedback = []
+        for file in files:
+            feedback = feedbacks.get(file.filename)
+            if not feedback:
+                continue
             if "Erro ao processar o arquivo" in feedback:
-                overall_feedback.append(
-                    f"**Erro ao analisar o arquivo `{file_path}`:**\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"**Erro ao analisar o arquivo `{file.filename}`:**\n\n{feedback}\n\n---")
             else:
-                overall_feedback.append(
-                    f"### Arquivo: `{file_path}`\n\n{feedback}\n\n---"
-                )
+                overall_feedback.append(f"### Arquivo: `{file.filename}`\n\n{feedback}\n\n---")
 
         # Publica o comentário no PR com o feedback consolidado
         github_handler.post_feedback_comment(repo_name, pr_number, overall_feedback)
+        review_cache.log_stats()
+        log_usage_stats()
 
     except Exception as e:
         print(f"Erro ao revisar o PR com Gemini: {e}")
         github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
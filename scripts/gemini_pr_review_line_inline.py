@@ -1,8 +1,14 @@
+from scripts.cache.review_cache import get_review_cache, hash_text, make_cache_key
+from scripts.diff.line_review import LINE_REVIEW_INSTRUCTIONS, build_line_batches, parse_line_comments
 from scripts.github_handler.commented_pr import GithubPRHandler
-import requests
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
+from scripts.utils.concurrency import run_concurrently
 
 # Função principal para revisar as linhas alteradas de um Pull Request (PR).
-def gemini_pr_review_line_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version):
+def gemini_pr_review_line_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, ai_version, max_concurrency=None):
     """
     Função para revisar as linhas alteradas de um Pull Request (PR) utilizando a API Gemini,
     adicionando comentários diretamente na diff.
@@ -15,7 +21,13 @@ def gemini_pr_review_line_inline(ai_api_key, github_token, repo_name, pr_number,
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da API Gemini.
         ai_version (str): Versão da API Gemini.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
+    # Cliente Gemini compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("gemini", ai_api_key, ai_model, ai_version)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
 
     def load_prompt():
         """Carrega o texto do prompt a partir de um arquivo."""
@@ -25,79 +37,79 @@ def gemini_pr_review_line_inline(ai_api_key, github_token, repo_name, pr_number,
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file não encontrado em: {prompt_path}")
 
-    def analyze_patch_with_gemini(file_path, patch_line, prompt):
+    def analyze_hunks_with_gemini(file_path, hunks_text, prompt):
         """
-        Analisa uma única linha alterada com base na API Gemini e no prompt.
+        Analisa de uma só vez os hunks de um arquivo com base na API Gemini e no prompt.
 
         Args:
             file_path (str): Caminho do arquivo.
-            patch_line (str): Linha alterada no código.
+            hunks_text (str): Hunks do arquivo, numerados pelas linhas do arquivo novo.
             prompt (str): Texto do prompt.
 
         Returns:
-            str: Resposta do modelo Gemini.
+            str: Resposta do modelo Gemini (array JSON de comentários por linha).
         """
-        url = f"https://generativelanguage.googleapis.com/{ai_version}/models/{ai_model}:generateContent?key={ai_api_key}"
-        headers = {"Content-Type": "application/json"}
-
-        # Criar o payload com o prompt e a linha alterada
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": f"{prompt}\n\nArquivo: {file_path}\n\nLinha alterada:\n```diff\n{patch_line}\n```"}
-                    ]
-                }
-            ]
-        }
+
+        # Montar o prompt com os hunks do arquivo
+        payload = build_user_prompt(file_path, ("Hunks:", "diff", hunks_text))
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-
-            data = response.json()
-            generated_text = (
-                data.get("candidates", [{}])[0]
-                .get("content", {})
-                .get("parts", [{}])[0]
-                .get("text", "Nenhuma análise fornecida.")
-            )
+            generated_text = completer.complete(payload, system=build_system_prompt(prompt, LINE_REVIEW_INSTRUCTIONS)) or "[]"
             return generated_text.strip()
-        except requests.RequestException as e:
-            return f"Erro ao processar a linha `{patch_line}` no arquivo `{file_path}`: {e}"
+        except ProviderError as e:
+            return f"Erro ao processar os hunks do arquivo `{file_path}`: {e}"
 
     try:
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        # Obtém o PR e exclui comentários anteriores
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
-        # Itera sobre os arquivos do PR e analisa as linhas alteradas
-        for file in pr.get_files():
+        def review_file(file):
+            """Analisa as linhas adicionadas de um arquivo do PR e publica as sugestões na diff."""
             file_path = file.filename
             patch_content = file.patch  # Apenas as alterações no arquivo
 
             if not patch_content:
                 print(f"Ignorando {file_path} (sem alterações no PR).")
-                continue
-
-            patch_lines = patch_content.split("\n")
-            position = 1  # Posição da linha no diff
-
-            for line in patch_lines:
-                if line.startswith("+") and not line.startswith("+++"):  # Apenas linhas adicionadas
-                    feedback = analyze_patch_with_gemini(file_path, line, prompt)
-
-                    if "Erro ao processar" in feedback:
-                        print(f"Erro ao analisar `{file_path}` na linha `{line}`: {feedback}")
-                    else:
-                        comment_text = f"**Sugestão para `{file_path}`:**\n\n{feedback}"
-                        github_handler.post_inline_comment(repo_name, pr_number, file_path, position, comment_text)
-
-                position += 1  # Atualiza a posição da linha
+                return
+
+            # Um lote por arquivo (ou por grupo de hunks, em arquivos grandes), em vez de uma chamada por linha.
+            # No modo incremental, só as linhas adicionadas desde a última revisão podem receber comentários.
+            batches = build_line_batches(patch_content, is_pending=lambda new_line: snapshot.is_line_pending(file_path, new_line))
+
+            for batch in batches:
+                cache_key = make_cache_key("gemini", ai_model, prompt, "line_inline", f"{file_path}:{hash_text(batch.text)}")
+                feedback = review_cache.get_or_compute(
+                    cache_key,
+                    lambda: analyze_hunks_with_gemini(file_path, batch.text, prompt),
+                    is_cacheable=lambda text: "Erro ao processar" not in text,
+                )
+
+                if "Erro ao processar" in feedback:
+                    print(f"Erro ao analisar `{file_path}`: {feedback}")
+                    continue
+
+                for new_line, comment in parse_line_comments(feedback):
+                    position = batch.positions.get(new_line)
+                    if position is None:
+                        print(f"Ignorando comentário para a linha {new_line} de `{file_path}` (fora das linhas adicionadas).")
+                        continue
+                    comment_text = f"**Sugestão para `{file_path}`:**\n\n{comment}"
+                    github_handler.post_inline_comment(repo_name, pr_number, file_path, position, comment_text)
+
+        # Analisa os arquivos do PR em paralelo; o handler enfileira os comentários inline
+        run_concurrently(review_file, snapshot.files_to_review(), max_concurrency)
+
+        # Publica todos os comentários inline em uma única review
+        github_handler.submit_inline_review(repo_name, pr_number)
+        review_cache.log_stats()
+        log_usage_stats()
 
     except Exception as e:
         print(f"Erro ao revisar o PR com Gemini: {e}")
         github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
@@ -0,0 +1,368 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from github.GithubException import GithubException
+
+from scripts.github_handler.github_connection import get_api_url
+from scripts.github_handler.reconciler import ISSUE_COMMENT, REVIEW_COMMENT, ExistingComment
+from scripts.telemetry import run_telemetry
+from scripts.transport import rate_limiter, sessions
+from scripts.utils import cancellation
+
+# Itens por página (máximo aceito pela API REST do GitHub)
+MAX_PER_PAGE = 100
+
+# Páginas buscadas ao mesmo tempo depois da primeira (a lista de arquivos de um PR tem até 30 páginas de 100)
+DEFAULT_PAGE_CONCURRENCY = 16
+
+LINK_PATTERN = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+def is_concurrent_pagination_enabled():
+    """Indica se as listas paginadas do GitHub são buscadas com o cliente assíncrono (GITHUB_CONCURRENT_PAGINATION, padrão: true)."""
+    return os.getenv("GITHUB_CONCURRENT_PAGINATION", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_page_concurrency():
+    """Páginas buscadas em paralelo (variável GITHUB_PAGE_CONCURRENCY)."""
+    try:
+        return max(1, int(os.getenv("GITHUB_PAGE_CONCURRENCY", DEFAULT_PAGE_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_PAGE_CONCURRENCY
+
+
+def parse_link_header(value):
+    """
+    Lê o cabeçalho Link da paginação do GitHub.
+
+    Args:
+        value (str): Ex: '<https://api.github.com/...&page=2>; rel="next", <...&page=15>; rel="last"'.
+
+    Returns:
+        dict: rel -> URL (ex: {"next": ..., "last": ...}).
+    """
+    return {rel: url for url, rel in LINK_PATTERN.findall(value or "")}
+
+
+def page_number(url):
+    """Número da página de uma URL de paginação (None se ausente)."""
+    if not url:
+        return None
+    values = parse_qs(urlsplit(url).query).get("page")
+    return int(values[-1]) if values and values[-1].isdigit() else None
+
+
+class PullFile:
+    def __init__(self, filename, status, sha, patch=None, additions=0, deletions=0, changes=0, previous_filename=None):
+        """
+        Arquivo alterado devolvido pela API REST, com os mesmos atributos usados do `File` do PyGithub.
+
+        Args:
+            filename (str): Caminho do arquivo no head.
+            status (str): added, removed, modified, renamed, copied ou changed.
+            sha (str): SHA do blob.
+            patch (str): Patch do arquivo (None em binários ou diffs grandes demais).
+            additions (int): Linhas adicionadas.
+            deletions (int): Linhas removidas.
+            changes (int): Linhas alteradas.
+            previous_filename (str): Caminho anterior (renomeações).
+        """
+        self.filename = filename
+        self.status = status
+        self.sha = sha
+        self.patch = patch
+        self.additions = additions
+        self.deletions = deletions
+        self.changes = changes
+        self.previous_filename = previous_filename
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["filename"], data.get("status"), data.get("sha"), data.get("patch"),
+            data.get("additions", 0), data.get("deletions", 0), data.get("changes", 0), data.get("previous_filename"),
+        )
+
+    def __repr__(self):
+        return f"PullFile({self.filename!r}, {self.status!r}, +{self.additions}/-{self.deletions})"
+
+
+class AsyncGithubClient:
+    def __init__(self, github_token, api_url=None, per_page=MAX_PER_PAGE, page_concurrency=None, transport=None):
+        """
+        Cliente assíncrono (asyncio + httpx) dos endpoints da API REST do GitHub usados pelo RAICO.
+
+        Nas listas paginadas a primeira página informa, no cabeçalho Link, a última; as demais são
+        buscadas em paralelo, então listar os 1500 arquivos de um PR custa cerca de duas latências
+        em vez de uma por página. Todas as chamadas usam um único pool de conexões e passam pelo
+        agendador de rate limit do host, como as da sessão compartilhada (`scripts.transport.sessions`).
+
+        Args:
+            github_token (str): Token de autenticação para a API do GitHub.
+            api_url (str): URL base da API (padrão: GITHUB_API_URL).
+            per_page (int): Itens por página (máximo: 100).
+            page_concurrency (int): Páginas buscadas em paralelo (padrão: GITHUB_PAGE_CONCURRENCY).
+            transport (httpx.AsyncBaseTransport): Transporte alternativo (para testes).
+        """
+        self.api_url = (api_url or get_api_url()).rstrip("/")
+        self.per_page = min(per_page, MAX_PER_PAGE)
+        self.page_concurrency = page_concurrency or get_page_concurrency()
+
+        pool_size = max(sessions.get_pool_size(), self.page_concurrency)
+        connect_timeout, read_timeout = sessions.get_timeout()
+        self.client = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {github_token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def request(self, method, path, **kwargs):
+        """
+        Executa uma requisição, aguardando a vez no agendador de rate limit e reenviando após 429.
+
+        Args:
+            method (str): Método HTTP.
+            path (str): Caminho a partir da URL base (ex: /repos/owner/repo/pulls/7) ou URL completa.
+            **kwargs: Argumentos repassados para `httpx.AsyncClient.request`.
+
+        Returns:
+            httpx.Response: Resposta bem-sucedida.
+
+        Raises:
+            GithubException: Se a API responder com erro (mesma exceção do PyGithub).
+            ReviewCancelled: Se a revisão for cancelada (a reserva de rate limit é devolvida).
+        """
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        limiter = rate_limiter.get_limiter(url)
+        tokens = rate_limiter.estimate_request_tokens(kwargs.get("json"))
+
+        max_waits = rate_limiter.get_max_waits()
+        for attempt in range(max_waits + 1):
+            cancellation.checkpoint()
+            wait = limiter.reserve(tokens)
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                    cancellation.checkpoint()
+                except (asyncio.CancelledError, cancellation.ReviewCancelled):
+                    # A requisição não será enviada: a cota reservada volta para as outras chamadas
+                    limiter.refund(tokens)
+                    raise
+
+            started = time.monotonic()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except Exception:
+                run_telemetry.record_request(method, url, None, time.monotonic() - started)
+                raise
+            run_telemetry.record_request(method, url, response.status_code, time.monotonic() - started)
+            pause = limiter.observe(response.status_code, response.headers)
+            if pause is None or attempt == max_waits:
+                break
+            print(f"⏳ Limite de requisições atingido em {urlsplit(url).netloc}; aguardando {pause:.1f}s.")
+            run_telemetry.increment("rate_limit_waits")
+
+        if response.status_code >= 400:
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"message": response.text}
+            raise GithubException(response.status_code, data, dict(response.headers))
+        return response
+
+    async def get(self, path, params=None):
+        """GET que devolve o corpo JSON."""
+        return (await self.request("GET", path, params=params)).json()
+
+    async def paginate(self, path, params=None):
+        """
+        Busca todas as páginas de uma lista: a primeira informa a última (rel="last") e as demais
+        são buscadas em paralelo, até `page_concurrency` por vez.
+
+        Args:
+            path (str): Caminho do endpoint paginado.
+            params (dict): Parâmetros adicionais da consulta.
+
+        Returns:
+            list: Itens de todas as páginas, na ordem da API.
+        """
+        params = dict(params or {}, per_page=self.per_page)
+        first = await self.request("GET", path, params=dict(params, page=1))
+        items = first.json()
+        links = parse_link_header(first.headers.get("link"))
+
+        last = page_number(links.get("last"))
+        if last and last > 1:
+            semaphore = asyncio.Semaphore(self.page_concurrency)
+
+            async def fetch(page):
+                async with semaphore:
+                    return await self.get(path, dict(params, page=page))
+
+            for page_items in await asyncio.gather(*(fetch(page) for page in range(2, last + 1))):
+                items.extend(page_items)
+            return items
+
+        # Sem rel="last" (ex: servidores que só informam a próxima página): segue rel="next"
+        next_url = links.get("next")
+        while next_url:
+            response = await self.request("GET", next_url)
+            items.extend(response.json())
+            next_url = parse_link_header(response.headers.get("link")).get("next")
+        return items
+
+    # Leitura
+
+    async def get_pull(self, repo_name, pr_number):
+        return await self.get(f"/repos/{repo_name}/pulls/{int(pr_number)}")
+
+    async def get_pull_files(self, repo_name, pr_number):
+        """Arquivos alterados no PR (até 3000, limite da API), como PullFile."""
+        files = await self.paginate(f"/repos/{repo_name}/pulls/{int(pr_number)}/files")
+        return [PullFile.from_json(file) for file in files]
+
+    async def get_issue_comments(self, repo_name, pr_number):
+        return await self.paginate(f"/repos/{repo_name}/issues/{int(pr_number)}/comments")
+
+    async def get_review_comments(self, repo_name, pr_number):
+        return await self.paginate(f"/repos/{repo_name}/pulls/{int(pr_number)}/comments")
+
+    async def get_reviews(self, repo_name, pr_number):
+        return await self.paginate(f"/repos/{repo_name}/pulls/{int(pr_number)}/reviews")
+
+    # Operações do GithubPRHandler
+
+    async def get_last_reviewed_sha(self, repo_name, pr_number, bot_username="github-actions[bot]"):
+        """
+        Último head revisado, gravado como marcador oculto nos comentários e reviews do bot
+        (ver `GithubPRHandler.get_last_reviewed_sha`).
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            bot_username (str): Nome do bot que fez os comentários.
+
+        Returns:
+            str | None: SHA do último head revisado, ou None se o PR nunca foi revisado.
+        """
+        # Import tardio: o commented_pr importa este módulo
+        from scripts.github_handler.commented_pr import LAST_REVIEWED_PATTERN
+
+        comments, reviews = await asyncio.gather(
+            self.get_issue_comments(repo_name, pr_number), self.get_reviews(repo_name, pr_number)
+        )
+        candidates = []
+        for item in comments + reviews:
+            if (item.get("user") or {}).get("login") != bot_username:
+                continue
+            match = LAST_REVIEWED_PATTERN.search(item.get("body") or "")
+            # Datas ISO 8601 em UTC: a ordem das strings é a ordem cronológica
+            timestamp = item.get("created_at") or item.get("submitted_at")
+            if match and timestamp:
+                candidates.append((timestamp, match.group(1)))
+        return max(candidates)[1] if candidates else None
+
+    async def get_bot_comments(self, repo_name, pr_number, bot_username="github-actions[bot]"):
+        """
+        Comentários de issue e de review publicados pelo bot, buscados ao mesmo tempo.
+
+        Returns:
+            list: ExistingComment de cada comentário.
+        """
+        issue_comments, review_comments = await asyncio.gather(
+            self.get_issue_comments(repo_name, pr_number), self.get_review_comments(repo_name, pr_number)
+        )
+        return [
+            ExistingComment(kind, comment["id"], comment.get("body"))
+            for kind, comments in ((ISSUE_COMMENT, issue_comments), (REVIEW_COMMENT, review_comments))
+            for comment in comments
+            if (comment.get("user") or {}).get("login") == bot_username
+        ]
+
+
+
+# Laço de eventos compartilhado: o código síncrono (workers e threads da análise) usa o mesmo
+# cliente, e portanto o mesmo pool de conexões, através de `run_sync`.
+_loop = None
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="raico-github-async", daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine):
+    """
+    Executa a corrotina no laço compartilhado e aguarda o resultado (ponte para o código síncrono).
+
+    O token de cancelamento da revisão de quem chamou acompanha a corrotina.
+
+    Args:
+        coroutine: Corrotina a executar (ex: `client.get_pull_files(...)`).
+
+    Returns:
+        Resultado da corrotina.
+    """
+    token = cancellation.current_token()
+
+    async def scoped():
+        with cancellation.cancellation_scope(token):
+            return await coroutine
+
+    return asyncio.run_coroutine_threadsafe(scoped(), _get_loop()).result()
+
+
+def get_async_client(github_token):
+    """
+    Obtém o cliente compartilhado do token (e de GITHUB_API_URL), criando-o no primeiro uso.
+
+    Args:
+        github_token (str): Token de autenticação para a API do GitHub.
+
+    Returns:
+        AsyncGithubClient: Cliente a ser usado com `run_sync` (ou dentro do laço compartilhado).
+    """
+    key = (github_token, get_api_url())
+    with _lock:
+        if key not in _clients:
+            _clients[key] = AsyncGithubClient(github_token, api_url=key[1])
+        return _clients[key]
+
+
+def close_async_clients():
+    """Fecha os clientes e encerra o laço compartilhado (ao final de execuções longas)."""
+    global _loop
+    with _lock:
+        clients, loop = list(_clients.values()), _loop
+        _clients.clear()
+        _loop = None
+    if loop is None:
+        return
+    for client in clients:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
@@ -1,5 +1,30 @@
-import requests
+import os
+import re
+import threading
+
 from github import Github
+from github.GithubException import GithubException
+
+from scripts.diff.patch import parse_patch
+from scripts.github_handler.async_client import get_async_client, is_concurrent_pagination_enabled, run_sync
+from scripts.github_handler.github_connection import get_api_url, install_pooled_connections
+from scripts.github_handler.pr_snapshot import PRSnapshot
+from scripts.github_handler.reconciler import (
+    ISSUE_COMMENT,
+    REVIEW_COMMENT,
+    DesiredComment,
+    ExistingComment,
+    plan_reconciliation,
+)
+from scripts.github_handler.review_buffer import ReviewBuffer
+from scripts.telemetry import run_telemetry
+from scripts.transport import sessions
+from scripts.utils import cancellation
+from scripts.utils.concurrency import run_concurrently
+
+# Marcador oculto gravado nos comentários do bot com o último head revisado (modo incremental)
+LAST_REVIEWED_MARKER = "<!-- raico:last-reviewed-sha={sha} -->"
+LAST_REVIEWED_PATTERN = re.compile(r"<!-- raico:last-reviewed-sha=([0-9a-f]{7,40}) -->")
 
 class GithubPRHandler:
     def __init__(self, github_token):
@@ -10,7 +35,23 @@ class GithubPRHandler:
             github_token (str): Token de autenticação para a API do GitHub.
         """
         self.github_token = github_token
-        self.github_client = Github(github_token)
+        # As conexões do PyGithub usam a sessão compartilhada do host (pool + agendador de rate limit)
+        install_pooled_connections()
+        self.api_url = get_api_url()
+        self.github_client = Github(
+            github_token,
+            base_url=self.api_url,
+            timeout=int(sessions.get_timeout()[1]),  # PyGithub exige um inteiro
+            pool_size=sessions.get_pool_size(),
+        )
+
+        # O handler é compartilhado entre os workers da análise concorrente:
+        # o lock serializa as escritas no PR e protege o cache de snapshots.
+        self._lock = threading.RLock()
+        self._snapshots = {}
+
+        # Comentários inline aguardando publicação em lote, por (repo_name, pr_number)
+        self._review_buffers = {}
 
     def get_pull_request(self, repo_name, pr_number):
         """
@@ -23,8 +64,107 @@ class GithubPRHandler:
         Returns:
             PullRequest: Objeto do Pull Request.
         """
-        repo = self.github_client.get_repo(repo_name)
-        return repo.get_pull(int(pr_number))
+        return self.get_snapshot(repo_name, pr_number).pull_request
+
+    def get_snapshot(self, repo_name, pr_number):
+        """
+        Obtém o snapshot do Pull Request, buscando-o na API apenas na primeira chamada.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+
+        Returns:
+            PRSnapshot: Repositório, PR, SHAs de head/base e arquivos alterados com patches.
+        """
+        key = (repo_name, int(pr_number))
+        with self._lock:
+            if key not in self._snapshots:
+                with run_telemetry.phase("fetch_pr"):
+                    self._snapshots[key] = PRSnapshot.load(self.github_client, repo_name, pr_number, self.github_token)
+            return self._snapshots[key]
+
+    def get_review_buffer(self, repo_name, pr_number):
+        """
+        Obtém a fila de comentários inline do Pull Request.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+
+        Returns:
+            ReviewBuffer: Fila de comentários que serão publicados em uma review.
+        """
+        key = (repo_name, int(pr_number))
+        with self._lock:
+            if key not in self._review_buffers:
+                self._review_buffers[key] = ReviewBuffer()
+            return self._review_buffers[key]
+
+    def get_last_reviewed_sha(self, repo_name, pr_number, bot_username="github-actions[bot]"):
+        """
+        Busca o último head revisado, gravado como marcador oculto nos comentários e reviews do bot.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            bot_username (str): Nome do bot que fez os comentários (padrão: github-actions[bot]).
+
+        Returns:
+            str | None: SHA do último head revisado, ou None se o PR nunca foi revisado.
+        """
+        if is_concurrent_pagination_enabled():
+            # Comentários e reviews buscados ao mesmo tempo, com as páginas em paralelo
+            return run_sync(get_async_client(self.github_token).get_last_reviewed_sha(repo_name, pr_number, bot_username))
+
+        pr = self.get_pull_request(repo_name, pr_number)
+        candidates = []
+        for item in list(pr.get_issue_comments()) + list(pr.get_reviews()):
+            if item.user is None or item.user.login != bot_username:
+                continue
+            match = LAST_REVIEWED_PATTERN.search(item.body or "")
+            timestamp = getattr(item, "created_at", None) or getattr(item, "submitted_at", None)
+            if match and timestamp is not None:
+                candidates.append((timestamp, match.group(1)))
+
+        return max(candidates)[1] if candidates else None
+
+    @run_telemetry.phase("fetch_pr")
+    def prepare_incremental_review(self, repo_name, pr_number, enabled=None):
+        """
+        Ativa a revisão incremental quando habilitada (REVIEW_INCREMENTAL=true) e o PR já foi revisado.
+
+        Nesse modo apenas os hunks alterados desde o último head revisado são enviados para a IA
+        e a reconciliação não deleta os comentários existentes sobre código não alterado.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            enabled (bool): Força (ou desativa) o modo incremental; por padrão lê REVIEW_INCREMENTAL.
+
+        Returns:
+            bool: True se a revisão desta execução é incremental.
+        """
+        if enabled is None:
+            enabled = os.getenv("REVIEW_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+        if not enabled:
+            return False
+
+        snapshot = self.get_snapshot(repo_name, pr_number)
+        last_reviewed_sha = self.get_last_reviewed_sha(repo_name, pr_number)
+        if last_reviewed_sha is None:
+            print("Revisão incremental: nenhum head revisado anteriormente, revisando o PR completo.")
+            return False
+
+        try:
+            snapshot.load_incremental(last_reviewed_sha)
+        except GithubException as e:
+            # Ex: force-push removeu o commit revisado do histórico
+            print(f"Revisão incremental indisponível a partir de {last_reviewed_sha[:7]} ({e.status}); revisando o PR completo.")
+            return False
+
+        print(f"🔁 Revisão incremental: {len(snapshot.files_to_review())} arquivo(s) alterado(s) desde {last_reviewed_sha[:7]}.")
+        return True
 
     def delete_previous_comments(self, pr, bot_username="github-actions[bot]"):
         """
@@ -34,20 +174,111 @@ class GithubPRHandler:
             pr (PullRequest): Objeto do Pull Request.
             bot_username (str): Nome do bot que fez os comentários (padrão: github-actions[bot]).
         """
+        cancellation.checkpoint()
+        comments = [
+            ExistingComment(ISSUE_COMMENT, comment.id, comment.body)
+            for comment in pr.get_issue_comments()
+            if comment.user.login == bot_username
+        ]
+        self._delete_comments(pr.base.repo.full_name, comments)
+
+    def _comment_url(self, repo_name, comment):
+        """Monta a URL REST de um comentário de issue ou de review."""
+        if comment.kind == REVIEW_COMMENT:
+            return f"{self.api_url}/repos/{repo_name}/pulls/comments/{comment.id}"
+        return f"{self.api_url}/repos/{repo_name}/issues/comments/{comment.id}"
+
+    @run_telemetry.phase("cleanup")
+    def _delete_comments(self, repo_name, comments, max_concurrency=None):
+        """
+        Deleta comentários em paralelo, com concorrência limitada (MAX_CONCURRENCY).
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            comments (list): Comentários a deletar (ExistingComment).
+            max_concurrency (int): Limite de deleções simultâneas.
+        """
         headers = {"Authorization": f"Bearer {self.github_token}"}
-        comments = pr.get_issue_comments()
-        for comment in comments:
-            if comment.user.login == bot_username:
-                try:
-                    url = f"https://api.github.com/repos/{pr.base.repo.full_name}/issues/comments/{comment.id}"
-                    response = requests.delete(url, headers=headers)
-                    if response.status_code == 204:
-                        print(f"Comentário deletado: {comment.id}")
-                    else:
-                        print(f"Erro ao deletar comentário {comment.id}: {response.text}")
-                except Exception as e:
-                    print(f"Erro ao deletar comentário {comment.id}: {e}")
 
+        def delete(comment):
+            try:
+                response = sessions.delete(self._comment_url(repo_name, comment), headers=headers)
+                if response.status_code == 204:
+                    print(f"Comentário deletado: {comment.id}")
+                else:
+                    print(f"Erro ao deletar comentário {comment.id}: {response.text}")
+            except Exception as e:
+                print(f"Erro ao deletar comentário {comment.id}: {e}")
+
+        run_concurrently(delete, comments, max_concurrency)
+
+    def _edit_comment(self, repo_name, comment, body):
+        """
+        Atualiza o corpo de um comentário existente.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            comment (ExistingComment): Comentário a editar.
+            body (str): Novo corpo do comentário.
+        """
+        headers = {"Authorization": f"Bearer {self.github_token}"}
+        try:
+            with self._lock:
+                response = sessions.patch(self._comment_url(repo_name, comment), headers=headers, json={"body": body})
+            if response.status_code == 200:
+                print(f"Comentário atualizado: {comment.id}")
+            else:
+                print(f"Erro ao atualizar comentário {comment.id}: {response.text}")
+        except Exception as e:
+            print(f"Erro ao atualizar comentário {comment.id}: {e}")
+
+    @run_telemetry.phase("cleanup")
+    def reconcile_comments(self, repo_name, pr_number, desired, bot_username="github-actions[bot]"):
+        """
+        Reconcilia os comentários gerados nesta execução com os já publicados pelo bot.
+
+        Comentários idênticos são mantidos, os que mudaram na mesma âncora são editados e os que
+        não foram gerados novamente são deletados (em paralelo). Na revisão incremental nada é
+        deletado, pois os comentários sobre código não alterado continuam válidos.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            desired (list): Comentários gerados (DesiredComment), de issue e/ou inline.
+            bot_username (str): Nome do bot que fez os comentários (padrão: github-actions[bot]).
+
+        Returns:
+            ReconciliationPlan: Plano aplicado; `plan.create` contém os comentários ainda não publicados.
+        """
+        # Só a revisão do head mais recente altera os comentários do PR
+        cancellation.checkpoint()
+        snapshot = self.get_snapshot(repo_name, pr_number)
+        pr = snapshot.pull_request
+
+        if is_concurrent_pagination_enabled():
+            # Comentários de issue e de review buscados ao mesmo tempo, com as páginas em paralelo
+            existing = run_sync(get_async_client(self.github_token).get_bot_comments(repo_name, pr_number, bot_username))
+        else:
+            existing = [
+                ExistingComment(ISSUE_COMMENT, comment.id, comment.body)
+                for comment in pr.get_issue_comments()
+                if comment.user.login == bot_username
+            ] + [
+                ExistingComment(REVIEW_COMMENT, comment.id, comment.body)
+                for comment in pr.get_review_comments()
+                if comment.user.login == bot_username
+            ]
+
+        plan = plan_reconciliation(desired, existing, allow_delete=not snapshot.incremental)
+
+        for comment, new_comment in plan.edit:
+            self._edit_comment(repo_name, comment, new_comment.body)
+        self._delete_comments(repo_name, plan.delete)
+
+        print(f"♻️ Reconciliação de comentários: {plan.summary()}.")
+        return plan
+
+    @run_telemetry.phase("post_comments")
     def post_feedback_comment(self, repo_name, pr_number, feedback_list):
         """
         Monta e publica um comentário no Pull Request com base no feedback.
@@ -73,17 +304,33 @@ Após uma revisão detalhada do seu Pull Request, aqui estão as minhas consider
 ```
 <hr>
 """
-        # Monta o corpo do comentário com feedback consolidado
-        feedback_body = "\n\n".join([ascii_art] + feedback_list)
+        snapshot = self.get_snapshot(repo_name, pr_number)
+        if snapshot.incremental and not feedback_list:
+            print("Nenhuma alteração nova para revisar desde a última revisão.")
+            return
+
+        # Monta o corpo do comentário com feedback consolidado (e o marcador do head revisado)
+        marker = LAST_REVIEWED_MARKER.format(sha=snapshot.head_sha)
+        feedback_body = "\n\n".join([ascii_art] + feedback_list + [marker])
+
+        # Na revisão incremental cada head ganha o seu resumo; na completa o resumo é único
+        anchor = f"summary@{snapshot.head_sha}" if snapshot.incremental else "summary"
 
         try:
-            # Obtém o PR e posta o comentário
-            pr = self.get_pull_request(repo_name, pr_number)
-            pr.create_issue_comment(feedback_body)
-            print("Comentário criado com sucesso!")
+            plan = self.reconcile_comments(
+                repo_name, pr_number, [DesiredComment(ISSUE_COMMENT, anchor, feedback_body)]
+            )
+
+            # Posta o comentário apenas se não houver um equivalente já publicado
+            for comment in plan.create:
+                cancellation.checkpoint()
+                with self._lock:
+                    snapshot.pull_request.create_issue_comment(comment.body)
+                print("Comentário criado com sucesso!")
         except Exception as e:
             print(f"Erro ao criar comentário no PR: {e}")
 
+    @run_telemetry.phase("post_comments")
     def post_error_comment(self, repo_name, pr_number, error_message):
         """
         Publica um comentário no Pull Request indicando que ocorreu um erro.
@@ -93,57 +340,123 @@ Após uma revisão detalhada do seu Pull Request, aqui estão as minhas consider
             pr_number (int): Número do Pull Request.
             error_message (str): Mensagem de erro a ser publicada.
         """
+        cancellation.checkpoint()
         try:
             pr = self.get_pull_request(repo_name, pr_number)
-            pr.create_issue_comment(f"**Erro no review automatizado pelo RAICO 🤖:**\n\n{error_message}")
+            with self._lock:
+                pr.create_issue_comment(f"**Erro no review automatizado pelo RAICO 🤖:**\n\n{error_message}")
             print("Comentário de erro criado com sucesso!")
         except Exception as e:
             print(f"Erro ao criar comentário de erro no PR: {e}")
 
     def post_inline_comment(self, repo_name, pr_number, file_path, line_number, comment_body):
         """
-        Publica um comentário inline diretamente na diff do Pull Request.
+        Enfileira um comentário inline na diff do Pull Request.
+
+        Os comentários são publicados juntos por `submit_inline_review`, em uma única review.
 
         Args:
             repo_name (str): Nome do repositório no formato "owner/repo".
             pr_number (int): Número do Pull Request.
             file_path (str): Caminho do arquivo que foi alterado no PR.
-            line_number (int): Número da linha onde o comentário deve ser feito.
+            line_number (int): Posição da linha na diff onde o comentário deve ser feito.
             comment_body (str): Conteúdo do comentário.
         """
+        self.get_review_buffer(repo_name, pr_number).add(file_path, line_number, comment_body)
+        print(f"Comentário na diff enfileirado ({file_path}:{line_number})")
+
+    @run_telemetry.phase("post_comments")
+    def submit_inline_review(self, repo_name, pr_number):
+        """
+        Publica todos os comentários inline enfileirados através de POST /pulls/{n}/reviews.
+
+        Antes do envio os comentários são reconciliados com os já existentes (ver
+        `reconcile_comments`), então apenas os novos entram na review.
+
+        Os comentários só são divididos em mais de uma review quando passam dos limites de cada
+        lote (ver `ReviewBuffer`). Se uma review for rejeitada (ex: uma posição inválida invalida
+        o lote inteiro), os comentários daquele lote são publicados individualmente. Sem
+        comentários novos, uma review vazia registra o head revisado.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+        """
+        buffer = self.get_review_buffer(repo_name, pr_number)
+        desired = [
+            DesiredComment(
+                REVIEW_COMMENT,
+                f"{comment['path']}:{comment['position']}",
+                comment["body"],
+                payload={"path": comment["path"], "position": comment["position"]},
+            )
+            for comment in buffer.take()
+        ]
+
+        # Mantém/edita os comentários que já existem e só publica os novos
+        plan = self.reconcile_comments(repo_name, pr_number, desired)
+        batches = buffer.split([dict(comment.payload, body=comment.body) for comment in plan.create])
+        if not batches:
+            # Uma review sem comentários ainda grava o marcador do head revisado (base da revisão incremental)
+            print("Nenhum comentário inline novo para publicar; registrando o head revisado.")
+            batches = [[]]
+
         headers = {"Authorization": f"Bearer {self.github_token}"}
 
-        # Buscar a lista de commits para obter o último commit
-        url_commits = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/commits"
-        response = requests.get(url_commits, headers=headers)
+        # O último commit do PR vem do snapshot, sem novas consultas à API
+        commit_id = self.get_snapshot(repo_name, pr_number).head_sha
 
-        if response.status_code != 200:
-            print(f"Erro ao obter commits do PR: {response.text}")
-            return
+        url_reviews = f"{self.api_url}/repos/{repo_name}/pulls/{pr_number}/reviews"
+        for index, comments in enumerate(batches, start=1):
+            part = f" (parte {index}/{len(batches)})" if len(batches) > 1 else ""
+            summary = "" if comments else "Nenhum comentário novo nesta revisão.\n\n"
+            payload = {
+                "commit_id": commit_id,
+                "event": "COMMENT",
+                "body": f"**Revisão automatizada pelo RAICO 🤖**{part}\n\n{summary}{LAST_REVIEWED_MARKER.format(sha=commit_id)}",
+                "comments": comments,
+            }
+
+            cancellation.checkpoint()
+            with self._lock:
+                response = sessions.post(url_reviews, headers=headers, json=payload)
+
+            if response.status_code == 200:
+                print(f"✔️ Review publicada com {len(comments)} comentário(s) na diff{part}.")
+                continue
+
+            print(f"❌ Erro ao publicar review{part}: {response.text}. Publicando comentários individualmente.")
+            for comment in comments:
+                self._post_single_inline_comment(repo_name, pr_number, commit_id, comment)
 
-        commits = response.json()
-        commit_id = commits[-1]["sha"]  # Pegamos o último commit do PR
+    def _post_single_inline_comment(self, repo_name, pr_number, commit_id, comment):
+        """
+        Publica um único comentário na diff (fallback quando a review em lote é rejeitada).
 
-        # Criar comentário na diff
-        url_comments = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/comments"
-        payload = {
-            "body": comment_body,
-            "commit_id": commit_id,
-            "path": file_path,
-            "position": line_number,  # Linha do arquivo onde o comentário será feito
-        }
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            commit_id (str): SHA do commit ao qual o comentário se refere.
+            comment (dict): Comentário com as chaves path, position e body.
+        """
+        headers = {"Authorization": f"Bearer {self.github_token}"}
+        url_comments = f"{self.api_url}/repos/{repo_name}/pulls/{pr_number}/comments"
+        payload = dict(comment, commit_id=commit_id)
 
-        response = requests.post(url_comments, headers=headers, json=payload)
+        cancellation.checkpoint()
+        with self._lock:
+            response = sessions.post(url_comments, headers=headers, json=payload)
 
         if response.status_code == 201:
-            print(f"Comentário na diff criado com sucesso! ({file_path}:{line_number})")
+            print(f"Comentário na diff criado com sucesso! ({comment['path']}:{comment['position']})")
         else:
             print(f"Erro ao criar comentário na diff: {response.text}")
 
     # Validando ainda
-    def post_inline_comment_with_diff(self, repo_name, pr_number, file_path, patch_content, comment_body):
+    def post_inline_comment_with_diff(self, repo_name, pr_number, file_path, patch_content, comment_body, new_line=None):
             """
-            Publica um comentário inline diretamente na diff do Pull Request.
+            Enfileira um comentário inline em uma linha do arquivo novo (por padrão, a primeira linha
+            adicionada da diff do arquivo).
 
             Args:
                 repo_name (str): Nome do repositório no formato "owner/repo".
@@ -151,62 +464,22 @@ Após uma revisão detalhada do seu Pull Request, aqui estão as minhas consider
                 file_path (str): Caminho do arquivo que foi alterado no PR.
                 patch_content (str): Conteúdo do diff do arquivo.
                 comment_body (str): Conteúdo do comentário.
+                new_line (int): Linha do arquivo novo a comentar (opcional).
             """
-            headers = {"Authorization": f"Bearer {self.github_token}"}
-
-            # Buscar a lista de commits para obter o último commit do PR
-            url_commits = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/commits"
-            response = requests.get(url_commits, headers=headers)
-
-            if response.status_code != 200:
-                print(f"Erro ao obter commits do PR: {response.text}")
-                return
-
-            commits = response.json()
-            commit_id = commits[-1]["sha"]  # Pegamos o último commit do PR
-
-            # Obter a lista de alterações do PR para encontrar a posição correta
-            url_files = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/files"
-            response = requests.get(url_files, headers=headers)
-
-            if response.status_code != 200:
-                print(f"Erro ao obter arquivos do PR: {response.text}")
-                return
-
-            files = response.json()
+            # Usa o patch do snapshot do PR (analisado uma única vez) para encontrar a posição correta
+            file = self.get_snapshot(repo_name, pr_number).get_file(file_path)
             position = None  # Posição correta dentro do diff
 
-            for file in files:
-                if file["filename"] == file_path:
-                    diff_lines = file.get("patch", "").split("\n")
-                    line_count = 0  # Contador para a posição no diff
-                    
-                    for index, line in enumerate(diff_lines):
-                        if line.startswith("@@"):
-                            # Extraindo a numeração real da linha alterada no código
-                            line_count = int(line.split(" ")[2].split(",")[0].replace("-", ""))
-                        elif line.startswith("+"):
-                            # Se for uma linha adicionada, salvamos a posição no diff
-                            position = index + 1
-                            break
+            if file is not None:
+                parsed = parse_patch(file.patch)
+                if new_line is not None:
+                    position = parsed.position_for_line(new_line)
+                if position is None:
+                    position = parsed.first_added_position()
 
             if position is None:
                 print(f"Erro: Não foi possível encontrar a posição correta para {file_path}.")
                 return
 
-            # Criar comentário na diff
-            url_comments = f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}/comments"
-            payload = {
-                "body": comment_body,
-                "commit_id": commit_id,
-                "path": file_path,
-                "position": position,  # Linha correta dentro do diff
-                "side": "RIGHT"
-            }
-
-            response = requests.post(url_comments, headers=headers, json=payload)
-
-            if response.status_code == 201:
-                print(f"✔️ Comentário na diff criado com sucesso! ({file_path}:{position})")
-            else:
-                print(f"❌ Erro ao criar comentário na diff: {response.text}")
\ No newline at end of file
+            # Enfileira o comentário na posição correta dentro do diff
+            self.post_inline_comment(repo_name, pr_number, file_path, position, comment_body)
\ No newline at end of file
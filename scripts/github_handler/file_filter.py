@@ -0,0 +1,291 @@
+import os
+import re
+import subprocess
+from functools import lru_cache
+
+from github.GithubException import GithubException
+
+# Arquivos que não vale a pena enviar à IA: lockfiles, bundles minificados, snapshots e código de terceiros
+DEFAULT_EXCLUDE_PATTERNS = (
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+    "poetry.lock", "Pipfile.lock", "uv.lock", "Cargo.lock", "Gemfile.lock", "composer.lock",
+    "go.sum", "packages.lock.json", "mix.lock", "pubspec.lock", "Podfile.lock",
+    "*.min.js", "*.min.css", "*.map", "*.bundle.js", "*.chunk.js",
+    "*.snap", "__snapshots__/", "*.pb.go", "*_pb2.py", "*.generated.*",
+    "vendor/", "node_modules/", "third_party/", "bower_components/",
+)
+
+# Extensões de arquivos binários (a API do GitHub não envia patch para eles)
+BINARY_EXTENSIONS = frozenset((
+    "png", "jpg", "jpeg", "gif", "bmp", "ico", "webp", "tiff", "psd",
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx",
+    "zip", "gz", "tgz", "bz2", "xz", "7z", "rar", "tar", "jar", "war", "whl", "egg",
+    "exe", "dll", "so", "dylib", "a", "o", "class", "pyc", "wasm", "bin", "dat",
+    "woff", "woff2", "ttf", "otf", "eot", "mp3", "mp4", "mov", "avi", "wav", "ogg", "webm",
+    "sqlite", "sqlite3", "db",
+))
+
+# Limites padrão de linhas alteradas por arquivo (0 desativa o limite)
+DEFAULT_MAX_FILE_ADDITIONS = 2000
+DEFAULT_MAX_FILE_CHANGES = 5000
+
+# Atributos do .gitattributes que marcam um arquivo como gerado, de terceiros ou binário
+SKIP_ATTRIBUTES = {
+    "linguist-generated": "gerado (linguist-generated)",
+    "linguist-vendored": "código de terceiros (linguist-vendored)",
+    "binary": "binário (.gitattributes)",
+}
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    """
+    Converte um glob no estilo .gitignore/.gitattributes em expressão regular.
+
+    Padrões sem "/" casam com o nome do arquivo em qualquer diretório; padrões com "/" são
+    relativos à raiz do repositório; "**" atravessa diretórios e um "/" final casa com tudo
+    o que estiver dentro do diretório.
+
+    Args:
+        pattern (str): Glob (ex: "*.min.js", "docs/**/*.md", "vendor/").
+
+    Returns:
+        re.Pattern: Expressão equivalente, aplicada ao caminho completo do arquivo.
+    """
+    directory = pattern.endswith("/")
+    pattern = pattern.strip("/") if directory else pattern.lstrip("/")
+    anchored = "/" in pattern
+
+    regex, index = "", 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[" and "]" in pattern[index + 1:]:
+            end = pattern.index("]", index + 1)
+            content = pattern[index + 1:end]
+            regex += "[" + ("^" + content[1:] if content.startswith("!") else content) + "]"
+            index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    suffix = "/.*" if directory else "(?:/.*)?"
+    return re.compile(f"{prefix}{regex}{suffix}")
+
+
+def match_path(pattern, path):
+    """
+    Indica se o caminho casa com o glob (ver `compile_pattern`).
+
+    Args:
+        pattern (str): Glob.
+        path (str): Caminho do arquivo no repositório.
+
+    Returns:
+        bool: True se casar.
+    """
+    return compile_pattern(pattern).fullmatch(path) is not None
+
+
+def parse_patterns(value):
+    """
+    Lê uma lista de globs separados por vírgula, espaço ou quebra de linha.
+
+    Args:
+        value (str | None): Valor da variável de ambiente.
+
+    Returns:
+        list: Globs informados (vazio se nenhum).
+    """
+    return [pattern for pattern in re.split(r"[,\s]+", value or "") if pattern]
+
+
+def parse_gitattributes(text):
+    """
+    Extrai do .gitattributes as regras com atributos que interessam ao filtro.
+
+    Args:
+        text (str): Conteúdo do .gitattributes.
+
+    Returns:
+        list: Tuplas (padrão, {atributo: bool}) na ordem do arquivo (regras seguintes têm prioridade).
+    """
+    rules = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        attributes = {}
+        for field in fields[1:]:
+            name, _, value = field.lstrip("-!").partition("=")
+            if name not in SKIP_ATTRIBUTES:
+                continue
+            attributes[name] = not field.startswith(("-", "!")) and value.lower() not in ("false", "0")
+        if attributes:
+            rules.append((fields[0], attributes))
+    return rules
+
+
+def load_gitattributes(repo, ref, checkout=None):
+    """
+    Busca o .gitattributes da raiz do repositório no head do PR.
+
+    Args:
+        repo (Repository): Repositório (PyGithub).
+        ref (str): SHA do head do PR.
+        checkout (GitCheckout): Checkout local, consultado antes da API quando contém o head.
+
+    Returns:
+        str: Conteúdo do arquivo (vazio se não existir ou não puder ser lido).
+    """
+    if checkout is not None:
+        try:
+            checkout.run("cat-file", "-e", f"{ref}^{{commit}}")
+        except subprocess.CalledProcessError:
+            pass
+        else:
+            try:
+                return checkout.run("show", f"{ref}:.gitattributes").decode("utf-8", errors="replace")
+            except subprocess.CalledProcessError:
+                return ""
+    try:
+        return repo.get_contents(".gitattributes", ref=ref).decoded_content.decode("utf-8", errors="replace")
+    except GithubException as e:
+        if e.status != 404:
+            print(f"⚠️ Não foi possível ler o .gitattributes: {e}")
+        return ""
+
+
+def get_env_limit(name, default):
+    """Limite de linhas por arquivo lido da variável `name` (o padrão é usado se ausente ou inválido)."""
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+class FileFilter:
+    def __init__(self, include=None, exclude=None, gitattributes="", max_additions=DEFAULT_MAX_FILE_ADDITIONS,
+                 max_changes=DEFAULT_MAX_FILE_CHANGES):
+        """
+        Etapa que decide quais arquivos do PR são enviados à IA, antes de qualquer download de conteúdo.
+
+        Args:
+            include (list): Globs dos arquivos revisados (vazio: todos).
+            exclude (list): Globs ignorados (somados aos padrões de DEFAULT_EXCLUDE_PATTERNS).
+            gitattributes (str): Conteúdo do .gitattributes (linguist-generated, linguist-vendored e binary).
+            max_additions (int): Máximo de linhas adicionadas por arquivo (0: sem limite).
+            max_changes (int): Máximo de linhas alteradas (adições + remoções) por arquivo (0: sem limite).
+        """
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.attribute_rules = parse_gitattributes(gitattributes or "")
+        self.max_additions = max_additions
+        self.max_changes = max_changes
+
+    @classmethod
+    def from_env(cls, gitattributes=""):
+        """
+        Cria o filtro a partir de REVIEW_INCLUDE, REVIEW_EXCLUDE, REVIEW_DEFAULT_EXCLUDES,
+        MAX_FILE_ADDITIONS e MAX_FILE_CHANGES.
+
+        Args:
+            gitattributes (str): Conteúdo do .gitattributes do repositório revisado.
+
+        Returns:
+            FileFilter: Filtro configurado.
+        """
+        exclude = parse_patterns(os.getenv("REVIEW_EXCLUDE"))
+        if os.getenv("REVIEW_DEFAULT_EXCLUDES", "true").strip().lower() not in ("0", "false", "no", "off"):
+            exclude = list(DEFAULT_EXCLUDE_PATTERNS) + exclude
+        return cls(
+            include=parse_patterns(os.getenv("REVIEW_INCLUDE")),
+            exclude=exclude,
+            gitattributes=gitattributes,
+            max_additions=get_env_limit("MAX_FILE_ADDITIONS", DEFAULT_MAX_FILE_ADDITIONS),
+            max_changes=get_env_limit("MAX_FILE_CHANGES", DEFAULT_MAX_FILE_CHANGES),
+        )
+
+    def attributes_for(self, path):
+        """
+        Atributos do .gitattributes aplicáveis ao arquivo (a última regra que casar prevalece).
+
+        Args:
+            path (str): Caminho do arquivo.
+
+        Returns:
+            dict: {atributo: bool}.
+        """
+        attributes = {}
+        for pattern, values in self.attribute_rules:
+            if match_path(pattern, path):
+                attributes.update(values)
+        return attributes
+
+    def skip_reason(self, file):
+        """
+        Motivo para não revisar o arquivo.
+
+        Args:
+            file (File): Arquivo do PR (usa filename, status, patch, additions e changes).
+
+        Returns:
+            str | None: Motivo do descarte ou None se o arquivo deve ser revisado.
+        """
+        path = file.filename
+        if getattr(file, "status", None) == "removed":
+            return "arquivo removido"
+        if self.include and not any(match_path(pattern, path) for pattern in self.include):
+            return "fora de REVIEW_INCLUDE"
+        for pattern in self.exclude:
+            if match_path(pattern, path):
+                return f"excluído por `{pattern}`"
+        attributes = self.attributes_for(path)
+        for name, reason in SKIP_ATTRIBUTES.items():
+            if attributes.get(name):
+                return reason
+        name = path.rsplit("/", 1)[-1]
+        if "." in name and name.rsplit(".", 1)[-1].lower() in BINARY_EXTENSIONS:
+            return "binário"
+        if not file.patch:
+            if not getattr(file, "changes", 0):
+                return "sem alterações de conteúdo"
+            return "sem patch (binário ou diff grande demais)"
+        additions = getattr(file, "additions", 0) or 0
+        if self.max_additions and additions > self.max_additions:
+            return f"{additions} linhas adicionadas (limite: {self.max_additions})"
+        changes = getattr(file, "changes", 0) or 0
+        if self.max_changes and changes > self.max_changes:
+            return f"{changes} linhas alteradas (limite: {self.max_changes})"
+        return None
+
+    def split(self, files):
+        """
+        Separa os arquivos revisados dos ignorados, preservando a ordem.
+
+        Args:
+            files (list): Arquivos do PR.
+
+        Returns:
+            tuple: (arquivos a revisar, {caminho: motivo} dos ignorados).
+        """
+        selected, skipped = [], {}
+        for file in files:
+            reason = self.skip_reason(file)
+            if reason is None:
+                selected.append(file)
+            else:
+                skipped[file.filename] = reason
+        return selected, skipped
@@ -0,0 +1,68 @@
+import os
+
+from github.Requester import HTTPSRequestsConnectionClass, Requester
+
+from scripts.transport import sessions
+
+DEFAULT_API_URL = "https://api.github.com"
+
+
+def get_api_url():
+    """
+    URL base da API REST do GitHub.
+
+    Usa GITHUB_API_URL (definida pelo GitHub Actions, inclusive no GitHub Enterprise Server),
+    o que também permite apontar para servidores locais nos benchmarks.
+
+    Returns:
+        str: URL base, sem a barra final.
+    """
+    return (os.getenv("GITHUB_API_URL") or DEFAULT_API_URL).rstrip("/")
+
+
+class PooledGithubConnection(HTTPSRequestsConnectionClass):
+    protocol = "https"
+    default_port = 443
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        """
+        Conexão HTTPS do PyGithub que usa a sessão compartilhada do host (`scripts.transport.sessions`),
+        em vez de criar uma `requests.Session` própria: as chamadas do PyGithub reaproveitam o mesmo
+        pool keep-alive e passam pelo agendador de rate limit, como as chamadas REST diretas.
+
+        Args:
+            host (str): Host da API do GitHub.
+            port (int): Porta (padrão: 443).
+            timeout (float): Timeout de leitura.
+            **kwargs: `verify` e demais argumentos passados pelo PyGithub.
+        """
+        self.port = port if port else self.default_port
+        self.host = host
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self.retry = retry
+        self.pool_size = pool_size
+        netloc = f"{host}:{port}" if port else host
+        self.session = sessions.get_session(f"{self.protocol}://{netloc}")
+
+    def close(self):
+        # A sessão é compartilhada; não é fechada ao final de cada requisição
+        return
+
+
+class PooledGithubHTTPConnection(PooledGithubConnection):
+    """Variante HTTP (ex: GITHUB_API_URL apontando para um servidor local)."""
+
+    protocol = "http"
+    default_port = 80
+
+
+_installed = False
+
+
+def install_pooled_connections():
+    """Faz o PyGithub usar as conexões com pool (`PooledGithubConnection`) em HTTP e HTTPS (idempotente)."""
+    global _installed
+    if not _installed:
+        Requester.injectConnectionClasses(PooledGithubHTTPConnection, PooledGithubConnection)
+        _installed = True
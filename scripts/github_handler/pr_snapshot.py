@@ -0,0 +1,167 @@
+from scripts.checkout.content_source import get_checkout
+from scripts.checkout.local_diff import load_changed_files
+from scripts.diff.patch import parse_patch
+from scripts.github_handler.async_client import get_async_client, is_concurrent_pagination_enabled, run_sync
+from scripts.github_handler.file_filter import FileFilter, load_gitattributes
+from scripts.telemetry import run_telemetry
+
+
+class PRSnapshot:
+    def __init__(self, repo, pull_request, head_sha, base_sha, files, file_filter=None, checkout=None):
+        """
+        Fotografia do Pull Request obtida uma única vez por execução.
+
+        Todos os metadados usados durante a revisão (SHAs, arquivos e patches) são lidos daqui,
+        evitando chamadas repetidas à API do GitHub a cada comentário publicado.
+
+        Args:
+            repo (Repository): Objeto do repositório (PyGithub).
+            pull_request (PullRequest): Objeto do Pull Request (PyGithub).
+            head_sha (str): SHA do último commit do PR.
+            base_sha (str): SHA do commit base do PR.
+            files (list): Arquivos alterados no PR, já paginados, com seus patches.
+            file_filter (FileFilter): Filtro aplicado antes de qualquer download de conteúdo
+                (None: todos os arquivos são revisados).
+            checkout (GitCheckout): Checkout local usado para calcular as diffs (None: apenas a API).
+        """
+        self.repo = repo
+        self.pull_request = pull_request
+        self.head_sha = head_sha
+        self.base_sha = base_sha
+        self.files = files
+        self.checkout = checkout
+        self._files_by_name = {file.filename: file for file in files}
+
+        # Arquivos descartados antes da análise (lockfiles, gerados, binários...), com o motivo
+        self.reviewable_files, self.skipped_files = file_filter.split(files) if file_filter else (files, {})
+
+        # Revisão incremental: mudanças entre o último head revisado e o head atual
+        self.last_reviewed_sha = None
+        self._changes = None
+        self._changed_lines = {}
+
+    @classmethod
+    def load(cls, github_client, repo_name, pr_number, github_token=None):
+        """
+        Busca o repositório, o Pull Request e a lista completa de arquivos alterados, já separando
+        os arquivos que não serão enviados à IA (ver FileFilter).
+
+        Com um checkout local, a lista de arquivos e os patches são calculados com `git diff`
+        (sem paginação e sem o limite de 3000 arquivos da API); a API do GitHub é o fallback, com as
+        páginas buscadas em paralelo pelo cliente assíncrono quando o token é informado.
+
+        Args:
+            github_client (Github): Cliente autenticado do PyGithub.
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            github_token (str): Token do GitHub usado pelo cliente assíncrono (None: paginação do PyGithub).
+
+        Returns:
+            PRSnapshot: Snapshot do Pull Request.
+        """
+        repo = github_client.get_repo(repo_name)
+        pull_request = repo.get_pull(int(pr_number))
+        head_sha, base_sha = pull_request.head.sha, pull_request.base.sha
+        checkout = get_checkout()
+        files = load_changed_files(checkout, base_sha, head_sha)
+        if files is None and github_token and is_concurrent_pagination_enabled():
+            # A primeira página informa a última; as demais são buscadas ao mesmo tempo
+            files = run_sync(get_async_client(github_token).get_pull_files(repo_name, pr_number))
+        if files is None:
+            files = list(pull_request.get_files())
+        file_filter = FileFilter.from_env(gitattributes=load_gitattributes(repo, head_sha, checkout))
+        snapshot = cls(repo, pull_request, head_sha, base_sha, files, file_filter, checkout)
+        snapshot.log_skipped_files()
+        return snapshot
+
+    def log_skipped_files(self):
+        """Informa os arquivos ignorados pelo filtro e o motivo de cada um."""
+        for file_path, reason in self.skipped_files.items():
+            print(f"⏭️ Ignorando {file_path} ({reason}).")
+        if self.skipped_files:
+            run_telemetry.increment("files_skipped", len(self.skipped_files))
+            print(f"🧹 {len(self.skipped_files)} de {len(self.files)} arquivo(s) ignorado(s) antes da análise.")
+
+    def get_file(self, file_path):
+        """
+        Obtém um arquivo alterado do PR pelo caminho.
+
+        Args:
+            file_path (str): Caminho do arquivo no repositório.
+
+        Returns:
+            File | None: Arquivo do PR (com `patch`) ou None se não fizer parte do PR.
+        """
+        return self._files_by_name.get(file_path)
+
+    @property
+    def incremental(self):
+        """Indica se a revisão está restrita às mudanças desde o último head revisado."""
+        return self._changes is not None
+
+    def load_incremental(self, last_reviewed_sha):
+        """
+        Restringe a revisão às mudanças entre `last_reviewed_sha` e o head atual (diff no checkout
+        local ou API compare).
+
+        Args:
+            last_reviewed_sha (str): SHA do último head revisado pelo RAICO.
+        """
+        if last_reviewed_sha == self.head_sha:
+            changes = []
+        else:
+            changes = load_changed_files(self.checkout, last_reviewed_sha, self.head_sha)
+            if changes is None:
+                changes = self.repo.compare(last_reviewed_sha, self.head_sha).files
+
+        self.last_reviewed_sha = last_reviewed_sha
+        self._changes = {file.filename: file for file in changes}
+        self._changed_lines = {}
+
+    def files_to_review(self):
+        """
+        Arquivos que precisam ser analisados nesta execução.
+
+        Returns:
+            list: Arquivos do PR aceitos pelo filtro ou, no modo incremental, apenas os alterados desde
+            o último head revisado (mudanças vindas da base, fora do PR, são ignoradas).
+        """
+        if not self.incremental:
+            return self.reviewable_files
+        return [file for file in self.reviewable_files if file.filename in self._changes]
+
+    def get_review_patch(self, file):
+        """
+        Patch a ser enviado para a IA.
+
+        Args:
+            file (File): Arquivo do PR.
+
+        Returns:
+            str: Patch completo do PR ou, no modo incremental, apenas os hunks novos.
+        """
+        if not self.incremental:
+            return file.patch
+        change = self._changes.get(file.filename)
+        return change.patch if change is not None else None
+
+    def is_line_pending(self, file_path, new_line):
+        """
+        Indica se uma linha do arquivo novo ainda precisa ser revisada.
+
+        O head é o lado "novo" tanto da diff do PR quanto da comparação incremental,
+        por isso os números de linha das duas diffs são equivalentes.
+
+        Args:
+            file_path (str): Caminho do arquivo.
+            new_line (int): Número da linha no arquivo novo.
+
+        Returns:
+            bool: True se a linha deve ser analisada.
+        """
+        if not self.incremental:
+            return True
+        if file_path not in self._changed_lines:
+            change = self._changes.get(file_path)
+            self._changed_lines[file_path] = parse_patch(change.patch).added_lines if change is not None else set()
+        return new_line in self._changed_lines[file_path]
@@ -0,0 +1,152 @@
+import hashlib
+import re
+from urllib.parse import quote, unquote
+
+from scripts.github_handler.review_buffer import MAX_COMMENT_BODY_CHARS, TRUNCATED_SUFFIX
+
+# Marcador oculto com a âncora e a impressão digital de cada comentário gerado pelo RAICO
+FINGERPRINT_MARKER = "<!-- raico:anchor={anchor} fp={fingerprint} -->"
+FINGERPRINT_PATTERN = re.compile(r"<!-- raico:anchor=(\S+) fp=([0-9a-f]{16}) -->")
+
+# Outros marcadores do RAICO (ex: último head revisado) não entram na impressão digital
+MARKERS_PATTERN = re.compile(r"\s*<!-- raico:[^>]*-->")
+
+ISSUE_COMMENT = "issue"
+REVIEW_COMMENT = "review"
+
+
+def fingerprint(anchor, body):
+    """
+    Calcula a impressão digital de um comentário a partir da âncora e do corpo (sem marcadores).
+
+    Args:
+        anchor (str): Âncora do comentário (ex: "summary" ou "arquivo.py:12").
+        body (str): Corpo do comentário.
+
+    Returns:
+        str: Hash curto (16 caracteres hexadecimais).
+    """
+    content = f"{anchor}\x1f{MARKERS_PATTERN.sub('', body or '').strip()}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def append_marker(body, marker):
+    """
+    Anexa o marcador ao corpo do comentário sem ultrapassar o limite do GitHub (MAX_COMMENT_BODY_CHARS).
+
+    Se preciso, apenas o texto é truncado: os marcadores do RAICO (ex: último head revisado) são mantidos.
+
+    Args:
+        body (str): Corpo do comentário.
+        marker (str): Marcador oculto a anexar.
+
+    Returns:
+        str: Corpo com o marcador no final.
+    """
+    full = f"{body}\n\n{marker}"
+    if len(full) <= MAX_COMMENT_BODY_CHARS:
+        return full
+
+    markers = "".join(f"\n\n{found.strip()}" for found in MARKERS_PATTERN.findall(body)) + f"\n\n{marker}"
+    text = MARKERS_PATTERN.sub("", body)
+    return text[:MAX_COMMENT_BODY_CHARS - len(TRUNCATED_SUFFIX) - len(markers)] + TRUNCATED_SUFFIX + markers
+
+
+class DesiredComment:
+    __slots__ = ("kind", "anchor", "body", "fingerprint", "payload")
+
+    def __init__(self, kind, anchor, body, payload=None):
+        """
+        Comentário gerado na execução atual.
+
+        Args:
+            kind (str): ISSUE_COMMENT ou REVIEW_COMMENT.
+            anchor (str): Âncora do comentário.
+            body (str): Corpo do comentário (o marcador de impressão digital é adicionado aqui, dentro
+                do limite de tamanho do GitHub).
+            payload (dict): Dados extras para a criação (ex: path/position do comentário inline).
+        """
+        self.kind = kind
+        self.anchor = anchor
+        self.fingerprint = fingerprint(anchor, body)
+        marker = FINGERPRINT_MARKER.format(anchor=quote(anchor, safe=""), fingerprint=self.fingerprint)
+        self.body = append_marker(body, marker)
+        self.payload = payload
+
+
+class ExistingComment:
+    __slots__ = ("kind", "id", "body", "anchor", "fingerprint")
+
+    def __init__(self, kind, comment_id, body):
+        """
+        Comentário do bot já publicado no PR.
+
+        Args:
+            kind (str): ISSUE_COMMENT ou REVIEW_COMMENT.
+            comment_id (int): ID do comentário no GitHub.
+            body (str): Corpo do comentário publicado.
+        """
+        self.kind = kind
+        self.id = comment_id
+        self.body = body or ""
+        match = FINGERPRINT_PATTERN.search(self.body)
+        self.anchor = unquote(match.group(1)) if match else None
+        self.fingerprint = match.group(2) if match else None
+
+
+class ReconciliationPlan:
+    def __init__(self):
+        """Resultado da reconciliação: o que manter, editar, criar e deletar."""
+        self.keep = []
+        self.edit = []  # Pares (ExistingComment, DesiredComment)
+        self.create = []
+        self.delete = []
+
+    def summary(self):
+        return (
+            f"{len(self.keep)} mantido(s), {len(self.edit)} editado(s), "
+            f"{len(self.create)} novo(s), {len(self.delete)} removido(s)"
+        )
+
+
+def plan_reconciliation(desired, existing, allow_delete=True):
+    """
+    Compara os comentários gerados com os já publicados e decide a ação para cada um.
+
+    - Mesma impressão digital: mantém (ou edita, se apenas os marcadores mudaram).
+    - Mesma âncora com conteúdo diferente: edita o comentário existente.
+    - Sem correspondência: cria um novo comentário.
+    - Comentários existentes sem correspondência: deleta (se `allow_delete`).
+
+    Args:
+        desired (list): Comentários gerados (DesiredComment).
+        existing (list): Comentários do bot já publicados (ExistingComment).
+        allow_delete (bool): Se False (ex: revisão incremental), nada é deletado.
+
+    Returns:
+        ReconciliationPlan: Plano de ações.
+    """
+    plan = ReconciliationPlan()
+    available = list(existing)
+
+    def take(predicate):
+        for index, comment in enumerate(available):
+            if predicate(comment):
+                return available.pop(index)
+        return None
+
+    for comment in desired:
+        match = take(lambda c: c.kind == comment.kind and c.fingerprint == comment.fingerprint)
+        if match is None:
+            match = take(lambda c: c.kind == comment.kind and c.anchor is not None and c.anchor == comment.anchor)
+
+        if match is None:
+            plan.create.append(comment)
+        elif match.body.strip() == comment.body.strip():
+            plan.keep.append(match)
+        else:
+            plan.edit.append((match, comment))
+
+    if allow_delete:
+        plan.delete = available
+    return plan
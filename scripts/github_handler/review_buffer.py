@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+
+# Limites aplicados a cada review enviada para POST /pulls/{n}/reviews; a fila só é dividida em
+# mais de uma review quando algum deles é atingido.
+# Limite do GitHub: corpos de comentário acima de 65536 caracteres são rejeitados.
+MAX_COMMENT_BODY_CHARS = 65536
+
+# Escolhas locais, não limites documentados pelo GitHub: lotes menores mantêm cada requisição
+# pequena e limitam o que é reenviado individualmente quando uma review é rejeitada.
+# A quantidade pode ser ajustada por REVIEW_MAX_COMMENTS.
+DEFAULT_MAX_COMMENTS_PER_REVIEW = 100
+MAX_REVIEW_PAYLOAD_BYTES = 900_000
+
+TRUNCATED_SUFFIX = "\n\n_(comentário truncado pelo RAICO)_"
+
+
+class ReviewBuffer:
+    def __init__(self, max_comments=None, max_payload_bytes=MAX_REVIEW_PAYLOAD_BYTES):
+        """
+        Fila de comentários inline que serão publicados juntos em uma (ou poucas) review(s) do PR.
+
+        Args:
+            max_comments (int): Máximo de comentários por review
+                (padrão: REVIEW_MAX_COMMENTS ou DEFAULT_MAX_COMMENTS_PER_REVIEW).
+            max_payload_bytes (int): Tamanho máximo (em bytes) do array de comentários de cada review.
+        """
+        if max_comments is None:
+            try:
+                max_comments = int(os.getenv("REVIEW_MAX_COMMENTS", DEFAULT_MAX_COMMENTS_PER_REVIEW))
+            except ValueError:
+                max_comments = DEFAULT_MAX_COMMENTS_PER_REVIEW
+        self.max_comments = max(1, max_comments)
+        self.max_payload_bytes = max_payload_bytes
+        self._comments = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._comments)
+
+    def add(self, file_path, position, comment_body):
+        """
+        Enfileira um comentário inline.
+
+        Args:
+            file_path (str): Caminho do arquivo alterado no PR.
+            position (int): Posição da linha dentro da diff do arquivo.
+            comment_body (str): Conteúdo do comentário.
+        """
+        if len(comment_body) > MAX_COMMENT_BODY_CHARS:
+            comment_body = comment_body[:MAX_COMMENT_BODY_CHARS - len(TRUNCATED_SUFFIX)] + TRUNCATED_SUFFIX
+
+        with self._lock:
+            self._comments.append({"path": file_path, "position": position, "body": comment_body})
+
+    def take(self):
+        """
+        Remove e retorna todos os comentários enfileirados.
+
+        Returns:
+            list: Comentários (dicts com path, position e body) na ordem em que foram enfileirados.
+        """
+        with self._lock:
+            comments, self._comments = self._comments, []
+        return comments
+
+    def drain(self):
+        """
+        Remove e retorna todos os comentários enfileirados, divididos em lotes que respeitam os limites.
+
+        Returns:
+            list: Lista de lotes (cada lote é uma lista de comentários de uma review).
+        """
+        return self.split(self.take())
+
+    def split(self, comments):
+        """
+        Divide os comentários em lotes que respeitam os limites de uma review.
+
+        Args:
+            comments (list): Comentários (dicts com path, position e body).
+
+        Returns:
+            list: Lista de lotes (cada lote é uma lista de comentários de uma review).
+        """
+        batches = []
+        current, current_bytes = [], 0
+        for comment in comments:
+            size = len(json.dumps(comment).encode("utf-8"))
+            if current and (len(current) >= self.max_comments or current_bytes + size > self.max_payload_bytes):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(comment)
+            current_bytes += size
+
+        if current:
+            batches.append(current)
+        return batches
@@ -0,0 +1,18 @@
+from scripts.pr_review_auto import pr_review_auto
+
+
+def openai_pr_review_auto(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model, max_concurrency=None):
+    """
+    Revisa um Pull Request (PR) com a API OpenAI, escolhendo por arquivo entre o arquivo completo e a diff.
+
+    Args:
+        ai_api_key (str): Chave de autenticação da API OpenAI.
+        github_token (str): Token de autenticação do GitHub.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        prompt_path (str): Caminho para o arquivo de prompt personalizado.
+        ai_model (str): Modelo da IA.
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
+    """
+    pr_review_auto("openai", ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model,
+                   max_concurrency=max_concurrency)
@@ -1,8 +1,14 @@
+from scripts.cache.review_cache import get_review_cache, make_cache_key
+from scripts.checkout.content_source import get_content_source
 from scripts.github_handler.commented_pr import GithubPRHandler
-import openai
-import requests
-
-def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model="gpt-4"):
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
+from scripts.telemetry import run_telemetry
+from scripts.utils.concurrency import run_concurrently
+
+def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model="gpt-4", max_concurrency=None):
     """
     Função para revisar um arquivo inteiro alterado em um Pull Request (PR) utilizando a API OpenAI,
     adicionando comentários diretamente na diff com contexto completo.
@@ -14,10 +20,17 @@ def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
         pr_number (int): Número do Pull Request.
         prompt_path (str): Caminho para o arquivo de prompt personalizado.
         ai_model (str): Modelo da IA OpenAI (ex: gpt-4).
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
     """
 
-    # Configuração da chave da API OpenAI
-    openai.api_key = ai_api_key
+    # Cliente OpenAI compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer("openai", ai_api_key, ai_model)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
+
+    # Conteúdo dos arquivos lido do checkout local (com fallback para a API do GitHub)
+    content_source = get_content_source(repo_name, github_token)
 
     def load_prompt():
         """Carrega o texto do prompt a partir de um arquivo."""
@@ -27,22 +40,18 @@ def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file não encontrado em: {prompt_path}")
 
-    def fetch_file_content(file_url):
+    @run_telemetry.phase("fetch_content")
+    def fetch_file_content(file):
         """
         Obtém o conteúdo completo do arquivo para fornecer mais contexto.
 
         Args:
-            file_url (str): URL do arquivo no GitHub.
+            file (File): Arquivo do PR (lido do checkout local ou, como fallback, da API do GitHub).
 
         Returns:
-            str: Conteúdo do arquivo como texto.
+            str: Conteúdo do arquivo como texto (None se o download falhar).
         """
-        try:
-            response = requests.get(file_url)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            return f"Erro ao obter o conteúdo do arquivo: {e}"
+        return content_source.read_text(file)
 
     def analyze_file_with_openai(file_path, file_content, prompt):
         """
@@ -56,45 +65,40 @@ def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
         Returns:
             str: Resposta do modelo OpenAI.
         """
-        full_prompt = f"""
-        {prompt}
-        Arquivo: {file_path}
-
-        **Conteúdo completo do arquivo atualizado:**
-        ```python
-        {file_content}
-        ```
-        """
+        payload = build_user_prompt(file_path, ("Conteúdo completo do arquivo atualizado:", "", file_content))
 
         try:
-            response = openai.ChatCompletion.create(
-                model=ai_model,
-                messages=[{"role": "user", "content": full_prompt}],
-            )
-            return response['choices'][0]['message']['content']
-        except openai.error.OpenAIError as e:
+            return completer.complete(payload, system=build_system_prompt(prompt))
+        except ProviderError as e:
             return f"Erro ao processar o arquivo `{file_path}` com o modelo `{ai_model}`: {e}"
 
     try:
         prompt = load_prompt()
         github_handler = GithubPRHandler(github_token)
 
-        # Obtém o PR e exclui comentários anteriores
-        pr = github_handler.get_pull_request(repo_name, pr_number)
-        github_handler.delete_previous_comments(pr)
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
 
-        # Itera sobre os arquivos do PR e analisa o arquivo completo
-        for file in pr.get_files():
+        def review_file(file):
+            """Analisa um arquivo do PR e publica as sugestões na diff."""
             file_path = file.filename
-            file_url = file.raw_url  # URL do arquivo atualizado
 
             print(f"🔍 Analisando arquivo: {file_path}")
 
-            # Obtém o conteúdo completo do arquivo
-            file_content = fetch_file_content(file_url)
+            # Analisa o arquivo inteiro no contexto do prompt (o conteúdo só é baixado se não houver cache)
+            cache_key = make_cache_key("openai", ai_model, prompt, "file_inline", f"{file_path}@{file.sha}")
+            def analyze():
+                # Sem conteúdo (falha no download), nada é enviado à IA nem armazenado no cache
+                file_content = fetch_file_content(file)
+                return analyze_file_with_openai(file_path, file_content, prompt) if file_content is not None else None
 
-            # Analisa o arquivo inteiro no contexto do prompt
-            feedback = analyze_file_with_openai(file_path, file_content, prompt)
+            feedback = review_cache.get_or_compute(
+                cache_key, analyze, is_cacheable=lambda text: "Erro ao processar" not in text
+            )
+            if feedback is None:
+                print(f"⏭️ Ignorando `{file_path}`: conteúdo indisponível.")
+                return
 
             if "Erro ao processar" in feedback:
                 print(f"❌ Erro ao analisar `{file_path}`: {feedback}")
@@ -104,11 +108,21 @@ def openai_pr_review_file_inline(ai_api_key, github_token, repo_name, pr_number,
                 {feedback}
                 """
 
-                # Posta o comentário na primeira linha do arquivo modificado
-                github_handler.post_inline_comment(repo_name, pr_number, file_path, 1, comment_text)
+                # Posta o comentário na primeira linha adicionada do arquivo modificado
+                github_handler.post_inline_comment_with_diff(repo_name, pr_number, file_path, file.patch, comment_text)
 
             print(f"✅ Revisão concluída para `{file_path}`\n")
 
+        # Analisa os arquivos em paralelo; o handler enfileira os comentários inline
+        run_concurrently(review_file, snapshot.files_to_review(), max_concurrency)
+
+        # Publica todos os comentários inline em uma única review
+        github_handler.submit_inline_review(repo_name, pr_number)
+        review_cache.log_stats()
+        log_usage_stats()
+
     except Exception as e:
         print(f"Erro ao revisar o PR com OpenAI: {e}")
         github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
@@ -0,0 +1,444 @@
+import os
+import re
+
+from scripts.telemetry import run_telemetry
+from scripts.utils.concurrency import run_concurrently
+
+# Janela de contexto (em tokens) por prefixo de modelo; o prefixo mais longo que casar é usado
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1000000,
+    "o1": 128000,
+    "o3": 200000,
+    "claude-2": 100000,
+    "claude-3": 200000,
+    "claude-sonnet": 200000,
+    "claude-opus": 200000,
+    "claude-haiku": 200000,
+    "gemini-pro": 32768,
+    "gemini-1.5": 1000000,
+    "gemini-2": 1000000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Tokens reservados para a resposta do modelo e para o texto fixo em volta do conteúdo
+DEFAULT_OUTPUT_TOKENS = 1000
+PROMPT_OVERHEAD_TOKENS = 200
+
+# Limite adaptativo da resposta: base + fração dos tokens de entrada, entre o mínimo e o máximo
+MIN_OUTPUT_TOKENS = 256
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 0.25
+
+# Teto de cada requisição, mesmo em modelos com janelas enormes (respostas longas demais perdem qualidade)
+DEFAULT_MAX_REQUEST_TOKENS = 16000
+DEFAULT_MAX_FILES_PER_REQUEST = 8
+
+# Linhas repetidas no início de cada parte de um arquivo dividido, para não perder o contexto do corte
+DEFAULT_OVERLAP_LINES = 10
+
+# Linhas onde um arquivo pode ser dividido: cabeçalhos de hunk e início de funções/classes
+BOUNDARY_PATTERN = re.compile(
+    r"^(@@ |(async\s+)?def |class |function |func |fn |(export\s+)?(default\s+)?(async\s+)?function\b"
+    r"|(public|private|protected|internal|static)\b|interface |module |impl |type \w+ )"
+)
+
+# Delimitador das seções de cada arquivo em uma requisição agrupada
+FILE_SECTION = "=== ARQUIVO: {path} ==="
+FILE_SECTION_PATTERN = re.compile(r"^\s*[#*]*\s*=+\s*ARQUIVO:\s*`?(.+?)`?\s*=+\s*[*]*\s*$", re.MULTILINE)
+
+# Instruções fixas (enviadas junto do prompt de revisão) para as requisições agrupadas
+PACKED_INSTRUCTIONS = """
+Quando a requisição contiver vários arquivos, cada um iniciado por uma linha "=== ARQUIVO: <caminho> ===",
+revise cada arquivo separadamente e inicie a resposta de cada um com a mesma linha
+"=== ARQUIVO: <caminho> ===", na mesma ordem.
+""".strip()
+
+
+def estimate_tokens(text):
+    """
+    Estima o número de tokens de um texto (aproximadamente 4 caracteres por token).
+
+    Args:
+        text (str): Texto a medir.
+
+    Returns:
+        int: Quantidade estimada de tokens.
+    """
+    return (len(text or "") + 3) // 4
+
+
+def get_context_window(ai_model):
+    """
+    Obtém a janela de contexto do modelo (ou MODEL_CONTEXT_TOKENS, se definido).
+
+    Args:
+        ai_model (str): Nome do modelo.
+
+    Returns:
+        int: Tamanho da janela, em tokens.
+    """
+    try:
+        return int(os.getenv("MODEL_CONTEXT_TOKENS"))
+    except (TypeError, ValueError):
+        pass
+
+    model = (ai_model or "").lower()
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def get_content_budget(ai_model, prompt, output_tokens=DEFAULT_OUTPUT_TOKENS):
+    """
+    Calcula quantos tokens de código cabem em uma requisição, descontando o prompt e a resposta.
+
+    O resultado é limitado por MAX_REQUEST_TOKENS (padrão: DEFAULT_MAX_REQUEST_TOKENS).
+
+    Args:
+        ai_model (str): Nome do modelo.
+        prompt (str): Texto do prompt enviado em toda requisição.
+        output_tokens (int): Tokens reservados para a resposta.
+
+    Returns:
+        int: Orçamento de tokens para o conteúdo dos arquivos.
+    """
+    try:
+        max_request_tokens = int(os.getenv("MAX_REQUEST_TOKENS", DEFAULT_MAX_REQUEST_TOKENS))
+    except ValueError:
+        max_request_tokens = DEFAULT_MAX_REQUEST_TOKENS
+
+    available = get_context_window(ai_model) - output_tokens - PROMPT_OVERHEAD_TOKENS
+    budget = min(available, max_request_tokens) - estimate_tokens(prompt)
+    return max(budget, 256)
+
+
+def get_output_token_limit(ai_model, prompt, files=1):
+    """
+    Calcula o limite de tokens da resposta proporcional ao tamanho da entrada.
+
+    Revisões de trechos pequenos (a maioria, em geral aprovações) recebem limites baixos; o
+    teto é MAX_OUTPUT_TOKENS (padrão: DEFAULT_MAX_OUTPUT_TOKENS) por arquivo e o espaço livre
+    na janela do modelo. Em requisições agrupadas, o mínimo e o teto valem para cada arquivo,
+    já que a resposta traz uma revisão por arquivo.
+
+    Args:
+        ai_model (str): Nome do modelo.
+        prompt (str): Prompt completo enviado à IA.
+        files (int): Arquivos revisados na requisição (ver `count_packed_files`).
+
+    Returns:
+        int: Limite de tokens da resposta.
+    """
+    try:
+        max_output_tokens = int(os.getenv("MAX_OUTPUT_TOKENS", DEFAULT_MAX_OUTPUT_TOKENS))
+    except ValueError:
+        max_output_tokens = DEFAULT_MAX_OUTPUT_TOKENS
+
+    files = max(1, files)
+    input_tokens = estimate_tokens(prompt)
+    limit = MIN_OUTPUT_TOKENS * files + int(input_tokens * OUTPUT_TOKENS_PER_INPUT_TOKEN)
+    available = get_context_window(ai_model) - input_tokens - PROMPT_OVERHEAD_TOKENS
+    return max(MIN_OUTPUT_TOKENS, min(limit, max_output_tokens * files, available))
+
+
+def count_packed_files(text):
+    """
+    Conta os arquivos de uma requisição agrupada pelos delimitadores de seção.
+
+    Args:
+        text (str): Conteúdo da requisição (sem as instruções fixas).
+
+    Returns:
+        int: Quantidade de arquivos (1 quando o conteúdo não tem delimitadores).
+    """
+    return max(1, len(FILE_SECTION_PATTERN.findall(text or "")))
+
+
+class ModelResponse(str):
+    """
+    Texto gerado pelo modelo, com a indicação de que a geração parou no limite de tokens da resposta
+    (truncated) ou de que veio do provedor secundário (fallback).
+
+    Essas respostas são usadas na revisão atual, mas não são armazenadas no cache de revisões: as
+    chaves do cache identificam o provedor e o modelo principais.
+    """
+
+    def __new__(cls, text, truncated=False, fallback=False):
+        response = super().__new__(cls, text or "")
+        response.truncated = truncated
+        response.fallback = fallback
+        return response
+
+    @property
+    def cacheable(self):
+        return not (self.truncated or self.fallback)
+
+
+def is_truncated(text):
+    """Indica se a resposta foi interrompida pelo limite de tokens (ver `ModelResponse`)."""
+    return getattr(text, "truncated", False)
+
+
+def is_fallback(text):
+    """Indica se a resposta veio do provedor secundário (ver `ModelResponse`)."""
+    return getattr(text, "fallback", False)
+
+
+class Segment:
+    __slots__ = ("path", "text", "part", "total_parts")
+
+    def __init__(self, path, text, part=1, total_parts=1):
+        """
+        Trecho de um arquivo enviado à IA (o arquivo inteiro ou uma das partes).
+
+        Args:
+            path (str): Caminho do arquivo.
+            text (str): Conteúdo ou patch.
+            part (int): Número da parte (a partir de 1).
+            total_parts (int): Total de partes do arquivo.
+        """
+        self.path = path
+        self.text = text
+        self.part = part
+        self.total_parts = total_parts
+
+    @property
+    def label(self):
+        if self.total_parts == 1:
+            return self.path
+        return f"{self.path} (parte {self.part}/{self.total_parts})"
+
+
+class PlannedRequest:
+    def __init__(self, segments):
+        """
+        Uma requisição ao modelo: um trecho de arquivo grande ou vários arquivos pequenos.
+
+        Args:
+            segments (list): Trechos (Segment) incluídos na requisição.
+        """
+        self.segments = segments
+
+    @property
+    def tokens(self):
+        return sum(estimate_tokens(segment.text) for segment in self.segments)
+
+    @property
+    def label(self):
+        return ", ".join(segment.label for segment in self.segments)
+
+    def render(self):
+        """Monta o conteúdo da requisição (com delimitadores por arquivo quando agrupada)."""
+        if len(self.segments) == 1:
+            return self.segments[0].text
+
+        # As instruções de agrupamento (PACKED_INSTRUCTIONS) seguem no prompt fixo, não no conteúdo
+        return "\n\n".join(f"{FILE_SECTION.format(path=segment.path)}\n{segment.text}" for segment in self.segments)
+
+    def split_response(self, response_text):
+        """
+        Separa a resposta do modelo por arquivo.
+
+        Arquivos sem a própria seção na resposta agrupada (ex: mensagem de erro sem delimitadores ou
+        resposta interrompida) ficam de fora, para que o chamador os revise individualmente.
+
+        Args:
+            response_text (str): Resposta do modelo.
+
+        Returns:
+            dict: Caminho do arquivo -> feedback (apenas os arquivos encontrados na resposta).
+        """
+        paths = [segment.path for segment in self.segments]
+        if len(self.segments) == 1:
+            return {paths[0]: response_text}
+
+        matches = [match for match in FILE_SECTION_PATTERN.finditer(response_text or "") if match.group(1) in paths]
+        sections = {}
+        for index, match in enumerate(matches):
+            last = index + 1 == len(matches)
+            end = len(response_text) if last else matches[index + 1].start()
+            # Numa resposta truncada, só a última seção pode estar incompleta
+            sections[match.group(1)] = ModelResponse(
+                response_text[match.end():end].strip(),
+                truncated=last and is_truncated(response_text),
+                fallback=is_fallback(response_text),
+            )
+        return sections
+
+
+def split_text(text, budget_tokens, overlap_lines=DEFAULT_OVERLAP_LINES):
+    """
+    Divide um texto em partes que cabem no orçamento, cortando preferencialmente em cabeçalhos
+    de hunk ou no início de funções/classes, com algumas linhas de sobreposição entre as partes.
+
+    Args:
+        text (str): Conteúdo ou patch do arquivo.
+        budget_tokens (int): Orçamento de tokens por parte.
+        overlap_lines (int): Linhas repetidas no início da parte seguinte.
+
+    Returns:
+        list: Partes do texto (str).
+    """
+    lines = text.split("\n")
+    parts = []
+    start = 0
+
+    while start < len(lines):
+        size = 0
+        end = start
+        while end < len(lines) and (end == start or size + estimate_tokens(lines[end]) + 1 <= budget_tokens):
+            size += estimate_tokens(lines[end]) + 1
+            end += 1
+
+        if end < len(lines):
+            # Recua até a última fronteira da parte, desde que ela aproveite ao menos metade do orçamento
+            for cut in range(end - 1, start, -1):
+                if BOUNDARY_PATTERN.match(lines[cut]):
+                    if cut - start >= (end - start) // 2:
+                        end = cut
+                    break
+
+        parts.append("\n".join(lines[start:end]))
+        if end >= len(lines):
+            break
+        start = max(end - overlap_lines, start + 1)
+
+    return parts
+
+
+def plan_requests(items, budget_tokens, max_files_per_request=None):
+    """
+    Planeja as requisições: arquivos grandes são divididos e os pequenos agrupados (first-fit decreasing).
+
+    Args:
+        items (list): Pares (caminho, texto) a revisar.
+        budget_tokens (int): Orçamento de tokens de conteúdo por requisição.
+        max_files_per_request (int): Máximo de arquivos agrupados na mesma requisição
+            (padrão: MAX_FILES_PER_REQUEST).
+
+    Returns:
+        list: Requisições planejadas (PlannedRequest).
+    """
+    if max_files_per_request is None:
+        try:
+            max_files_per_request = int(os.getenv("MAX_FILES_PER_REQUEST", DEFAULT_MAX_FILES_PER_REQUEST))
+        except ValueError:
+            max_files_per_request = DEFAULT_MAX_FILES_PER_REQUEST
+    max_files_per_request = max(1, max_files_per_request)
+
+    requests_ = []
+    small = []
+    for path, text in items:
+        text = text or ""
+        if estimate_tokens(text) > budget_tokens:
+            parts = split_text(text, budget_tokens)
+            for index, part in enumerate(parts):
+                requests_.append(PlannedRequest([Segment(path, part, index + 1, len(parts))]))
+        else:
+            small.append(Segment(path, text))
+
+    bins = []
+    for segment in sorted(small, key=lambda segment: estimate_tokens(segment.text), reverse=True):
+        size = estimate_tokens(segment.text)
+        for bin_ in bins:
+            if len(bin_.segments) < max_files_per_request and bin_.tokens + size <= budget_tokens:
+                bin_.segments.append(segment)
+                break
+        else:
+            bins.append(PlannedRequest([segment]))
+
+    return requests_ + bins
+
+
+def review_in_batches(items, analyze, budget_tokens, max_concurrency=None):
+    """
+    Revisa os itens conforme o plano de requisições e remonta o feedback de cada arquivo.
+
+    Arquivos que ficaram sem a própria seção em uma resposta agrupada são enviados de novo, cada um
+    em uma requisição própria, em vez de receberem a resposta inteira do grupo.
+
+    Args:
+        items (list): Pares (caminho, texto) a revisar.
+        analyze (callable): Recebe (rótulo, conteúdo) e retorna a resposta do modelo.
+        budget_tokens (int): Orçamento de tokens de conteúdo por requisição.
+        max_concurrency (int): Número máximo de requisições em paralelo.
+
+    Returns:
+        dict: Caminho do arquivo -> feedback (as partes de arquivos divididos são concatenadas).
+    """
+    planned = plan_requests(items, budget_tokens)
+    if len(planned) != len(items):
+        print(f"🧮 {len(items)} arquivo(s) revisado(s) em {len(planned)} requisição(ões).")
+
+    def send(request):
+        return analyze(request.label, request.render())
+
+    parts = {}
+    missing = []
+    for request, response in zip(planned, run_concurrently(send, planned, max_concurrency)):
+        sections = request.split_response(response)
+        for path, feedback in sections.items():
+            parts.setdefault(path, []).append(feedback)
+        missing += [segment for segment in request.segments if segment.path not in sections]
+
+    if missing:
+        # Só arquivos pequenos são agrupados, então cada um cabe inteiro em uma requisição
+        print(f"↩️ {len(missing)} arquivo(s) sem seção na resposta agrupada; revisando individualmente.")
+        run_telemetry.increment("packed_retries", len(missing))
+        retried = [PlannedRequest([segment]) for segment in missing]
+        for request, response in zip(retried, run_concurrently(send, retried, max_concurrency)):
+            parts.setdefault(request.segments[0].path, []).append(response)
+
+    # Mantém a ordem original dos arquivos
+    return {
+        path: ModelResponse(
+            "\n\n".join(parts[path]),
+            truncated=any(is_truncated(part) for part in parts[path]),
+            fallback=any(is_fallback(part) for part in parts[path]),
+        )
+        for path, _ in items if path in parts
+    }
+
+
+def review_files_in_batches(files, cache_key, load_content, analyze, budget_tokens, review_cache,
+                            is_cacheable=None, max_concurrency=None):
+    """
+    Revisa os arquivos do PR em requisições planejadas, mantendo o cache de feedback por arquivo.
+
+    Args:
+        files (list): Arquivos do PR a revisar.
+        cache_key (callable): Recebe o arquivo e retorna sua chave no cache de revisões.
+        load_content (callable): Recebe o arquivo e retorna o texto enviado à IA (conteúdo ou patch),
+            ou None para ignorá-lo (ex: falha no download).
+        analyze (callable): Recebe (rótulo, conteúdo) e retorna a resposta do modelo.
+        budget_tokens (int): Orçamento de tokens de conteúdo por requisição.
+        review_cache (ReviewCache): Cache de revisões.
+        is_cacheable (callable): Decide se um feedback pode ser armazenado (ex: ignora erros).
+        max_concurrency (int): Número máximo de downloads/requisições em paralelo.
+
+    Returns:
+        dict: Caminho do arquivo -> feedback.
+    """
+    keys = {file.filename: cache_key(file) for file in files}
+    feedbacks = {path: review_cache.get(key) for path, key in keys.items()}
+    pending = [file for file in files if feedbacks[file.filename] is None]
+
+    # Só os arquivos sem feedback em cache são baixados e enviados à IA
+    def load(file):
+        with run_telemetry.phase("fetch_content"):
+            return file.filename, load_content(file)
+
+    # Arquivos sem conteúdo não são enviados à IA nem armazenados no cache
+    items = [item for item in run_concurrently(load, pending, max_concurrency) if item[1] is not None]
+    for path, feedback in review_in_batches(items, analyze, budget_tokens, max_concurrency).items():
+        feedbacks[path] = feedback
+        if is_cacheable is None or is_cacheable(feedback):
+            review_cache.set(keys[path], feedback)
+
+    return {path: feedback for path, feedback in feedbacks.items() if feedback is not None}
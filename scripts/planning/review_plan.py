@@ -0,0 +1,442 @@
+import math
+import os
+
+from scripts.diff.line_review import build_line_batches
+from scripts.diff.patch import parse_patch
+from scripts.planning.request_planner import (
+    DEFAULT_MAX_FILES_PER_REQUEST,
+    DEFAULT_MAX_OUTPUT_TOKENS,
+    PROMPT_OVERHEAD_TOKENS,
+    get_content_budget,
+    get_context_window,
+)
+
+# Caracteres por token de código, calibrados por provedor (os tokenizadores diferem entre si)
+CHARS_PER_TOKEN = {
+    "openai": 3.6,
+    "claude": 3.3,
+    "gemini": 3.9,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.6
+
+# Resposta esperada por requisição: base + fração dos tokens de conteúdo (aprovações são curtas)
+EXPECTED_OUTPUT_BASE_TOKENS = 150
+EXPECTED_OUTPUT_RATIO = 0.15
+
+# Preço (US$ por milhão de tokens de entrada e de saída) por prefixo de modelo; o prefixo mais longo vale
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "o1": (15.00, 60.00),
+    "o3": (2.00, 8.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-sonnet": (3.00, 15.00),
+    "claude-opus": (15.00, 75.00),
+    "gemini-pro": (0.50, 1.50),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+# Estratégias (sufixos dos modos de revisão) na ordem dos tipos 1 a 4
+STRATEGIES = ("file", "line", "line_inline", "file_inline")
+
+# Modo "auto": o arquivo completo só é enviado quando não for muito maior que a própria diff
+DEFAULT_AUTO_FILE_CONTEXT_RATIO = 4.0
+
+# Orçamento padrão de tokens (entrada + saída estimadas) por PR no modo "auto" (0: sem limite)
+DEFAULT_REVIEW_TOKEN_BUDGET = 200000
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def planned_tokens(chars):
+    """Tokens de um texto de `chars` caracteres pela razão usada no empacotamento (`estimate_tokens`)."""
+    return (chars + 3) // 4
+
+
+def get_chars_per_token(ai_provider):
+    """
+    Caracteres por token do provedor (ou TOKEN_CHARS_PER_TOKEN, se definido).
+
+    Args:
+        ai_provider (str): Provedor de IA.
+
+    Returns:
+        float: Razão usada para converter caracteres em tokens.
+    """
+    return _env_float("TOKEN_CHARS_PER_TOKEN", CHARS_PER_TOKEN.get(ai_provider, DEFAULT_CHARS_PER_TOKEN))
+
+
+def get_model_price(ai_model):
+    """
+    Preço do modelo, por milhão de tokens (TOKEN_PRICE_INPUT e TOKEN_PRICE_OUTPUT têm prioridade).
+
+    Args:
+        ai_model (str): Nome do modelo.
+
+    Returns:
+        tuple | None: (entrada, saída) em US$ ou None se o modelo não tiver preço conhecido.
+    """
+    if os.getenv("TOKEN_PRICE_INPUT") and os.getenv("TOKEN_PRICE_OUTPUT"):
+        return _env_float("TOKEN_PRICE_INPUT", 0.0), _env_float("TOKEN_PRICE_OUTPUT", 0.0)
+    model = (ai_model or "").lower()
+    matches = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+class FileInfo:
+    def __init__(self, path, patch, content_chars=None, exact_size=False, added=False):
+        """
+        Dados de um arquivo usados na estimativa (sem baixar o conteúdo).
+
+        Args:
+            path (str): Caminho do arquivo.
+            patch (str): Patch revisado.
+            content_chars (int): Tamanho do arquivo completo no head.
+            exact_size (bool): True se o tamanho veio do checkout; False se foi estimado pelo patch.
+            added (bool): Arquivo novo (o patch já contém o arquivo inteiro).
+        """
+        self.path = path
+        self.patch = patch or ""
+        self.content_chars = content_chars if content_chars is not None else estimate_content_chars(self.patch)
+        self.exact_size = exact_size
+        self.added = added
+
+
+def estimate_content_chars(patch):
+    """
+    Estima o tamanho do arquivo completo a partir do patch (última linha do último hunk × linha média).
+
+    Args:
+        patch (str): Patch do arquivo.
+
+    Returns:
+        int: Tamanho estimado, em caracteres (um limite inferior).
+    """
+    parsed = parse_patch(patch)
+    if not parsed.hunks:
+        return len(patch or "")
+    last = parsed.hunks[-1]
+    lines = last.new_start + last.new_count - 1
+    body = [line for line in (patch or "").split("\n") if not line.startswith("@@")]
+    average = sum(len(line) for line in body) / max(len(body), 1)
+    return max(len(patch), int(lines * average))
+
+
+def collect_file_infos(snapshot, files):
+    """
+    Monta os dados de estimativa dos arquivos, usando o checkout local para obter os tamanhos exatos.
+
+    Args:
+        snapshot (PRSnapshot): Snapshot do PR (patches revisados e checkout).
+        files (list): Arquivos a revisar.
+
+    Returns:
+        list: FileInfo de cada arquivo, na mesma ordem.
+    """
+    checkout = getattr(snapshot, "checkout", None)
+    sizes = checkout.blob_sizes([file.sha for file in files]) if checkout is not None else {}
+    return [
+        FileInfo(
+            file.filename,
+            snapshot.get_review_patch(file),
+            sizes.get(file.sha),
+            exact_size=file.sha in sizes,
+            added=getattr(file, "status", None) == "added",
+        )
+        for file in files
+    ]
+
+
+class Estimate:
+    def __init__(self, strategy, requests=0, input_tokens=0, output_tokens=0, inadequate=None):
+        """
+        Custo estimado de uma estratégia (para um arquivo ou para o PR inteiro).
+
+        Args:
+            strategy (str): file, line, line_inline, file_inline ou auto.
+            requests (int): Requisições ao modelo.
+            input_tokens (int): Tokens de entrada (instruções fixas + conteúdo).
+            output_tokens (int): Tokens de saída esperados.
+            inadequate (list): Arquivos para os quais a estratégia não é adequada, com o motivo.
+        """
+        self.strategy = strategy
+        self.requests = requests
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.inadequate = inadequate or []
+
+    @property
+    def total_tokens(self):
+        return self.input_tokens + self.output_tokens
+
+    def cost(self, ai_model):
+        """Custo estimado em US$ (None se o preço do modelo for desconhecido)."""
+        price = get_model_price(ai_model)
+        if price is None:
+            return None
+        return (self.input_tokens * price[0] + self.output_tokens * price[1]) / 1_000_000
+
+
+class ReviewEstimator:
+    def __init__(self, ai_provider, ai_model, system_prompt):
+        """
+        Estima requisições e tokens de cada estratégia de revisão antes de qualquer chamada à IA.
+
+        O empacotamento e a divisão dos arquivos seguem as mesmas regras dos modos de revisão
+        (`plan_requests` e `build_line_batches`); os tokens usam a razão calibrada do provedor.
+
+        Args:
+            ai_provider (str): Provedor de IA.
+            ai_model (str): Modelo.
+            system_prompt (str): Instruções fixas enviadas em toda requisição.
+        """
+        self.ai_provider = ai_provider
+        self.ai_model = ai_model
+        self.chars_per_token = get_chars_per_token(ai_provider)
+        self.system_tokens = self.tokens(len(system_prompt)) + PROMPT_OVERHEAD_TOKENS
+        self.budget = get_content_budget(ai_model, system_prompt)
+        self.context_window = get_context_window(ai_model)
+        try:
+            self.max_output = int(os.getenv("MAX_OUTPUT_TOKENS", DEFAULT_MAX_OUTPUT_TOKENS))
+        except ValueError:
+            self.max_output = DEFAULT_MAX_OUTPUT_TOKENS
+        try:
+            self.max_files_per_request = max(1, int(os.getenv("MAX_FILES_PER_REQUEST", DEFAULT_MAX_FILES_PER_REQUEST)))
+        except ValueError:
+            self.max_files_per_request = DEFAULT_MAX_FILES_PER_REQUEST
+
+    def tokens(self, chars):
+        """Tokens estimados para um texto de `chars` caracteres."""
+        return int(math.ceil(chars / self.chars_per_token))
+
+    def output_tokens(self, content_tokens):
+        """Tokens de resposta esperados para uma requisição com `content_tokens` de conteúdo."""
+        return min(self.max_output, int(EXPECTED_OUTPUT_BASE_TOKENS + content_tokens * EXPECTED_OUTPUT_RATIO))
+
+    def _packed(self, strategy, sizes):
+        """Estimativa dos modos agrupados (1 e 2): arquivos grandes divididos, pequenos agrupados."""
+        estimate = Estimate(strategy)
+        bins = []
+        for path, chars in sorted(sizes, key=lambda item: item[1], reverse=True):
+            planned = planned_tokens(chars)
+            content = self.tokens(chars)
+            if planned > self.budget:
+                parts = int(math.ceil(planned / self.budget))
+                estimate.requests += parts
+                estimate.input_tokens += content + parts * self.system_tokens
+                estimate.output_tokens += parts * self.output_tokens(content / parts)
+                estimate.inadequate.append((path, f"dividido em {parts} partes"))
+                continue
+            for bin_ in bins:
+                if len(bin_) < self.max_files_per_request and sum(size for size, _ in bin_) + planned <= self.budget:
+                    bin_.append((planned, content))
+                    break
+            else:
+                bins.append([(planned, content)])
+        for bin_ in bins:
+            content = sum(tokens for _, tokens in bin_)
+            estimate.requests += 1
+            estimate.input_tokens += content + self.system_tokens
+            estimate.output_tokens += self.output_tokens(content) + EXPECTED_OUTPUT_BASE_TOKENS * (len(bin_) - 1)
+        return estimate
+
+    def estimate(self, strategy, infos):
+        """
+        Estima uma estratégia para um conjunto de arquivos.
+
+        Args:
+            strategy (str): file, line, line_inline ou file_inline.
+            infos (list): FileInfo dos arquivos.
+
+        Returns:
+            Estimate: Requisições, tokens e arquivos para os quais a estratégia não é adequada.
+        """
+        if strategy == "file":
+            return self._packed(strategy, [(info.path, info.content_chars) for info in infos])
+        if strategy == "line":
+            return self._packed(strategy, [(info.path, len(info.patch)) for info in infos])
+
+        estimate = Estimate(strategy)
+        limit = self.context_window - self.system_tokens - self.max_output
+        for info in infos:
+            if strategy == "line_inline":
+                chunks = [len(batch.text) for batch in build_line_batches(info.patch)]
+            else:
+                # Arquivo completo em uma única requisição (o Gemini também recebe o patch)
+                chunks = [info.content_chars + (len(info.patch) if self.ai_provider == "gemini" else 0)]
+            for chars in chunks:
+                content = self.tokens(chars)
+                estimate.requests += 1
+                estimate.input_tokens += content + self.system_tokens
+                estimate.output_tokens += self.output_tokens(content)
+            largest = self.tokens(max(chunks, default=0))
+            if largest > limit:
+                estimate.inadequate.append((info.path, f"requisição de ~{largest} tokens excede a janela do modelo"))
+        return estimate
+
+    def choose_auto(self, infos, budget_tokens=None, file_context_ratio=None):
+        """
+        Escolhe, por arquivo, a estratégia mais barata adequada dentro do orçamento de tokens do PR.
+
+        O arquivo completo ("file") é usado quando cabe em uma requisição e não é muito maior que a
+        diff (AUTO_FILE_CONTEXT_RATIO); nos demais casos só a diff ("line") é enviada. Se o total
+        passar de REVIEW_TOKEN_BUDGET, os arquivos completos mais caros voltam para a diff e, por
+        fim, os maiores arquivos deixam de ser revisados.
+
+        Args:
+            infos (list): FileInfo dos arquivos.
+            budget_tokens (int): Orçamento de tokens do PR (padrão: REVIEW_TOKEN_BUDGET; 0 desativa).
+            file_context_ratio (float): Razão máxima entre arquivo completo e diff (padrão: AUTO_FILE_CONTEXT_RATIO).
+
+        Returns:
+            tuple: ({caminho: "file" | "line"}, {caminho: motivo} dos arquivos não revisados).
+        """
+        if budget_tokens is None:
+            budget_tokens = int(_env_float("REVIEW_TOKEN_BUDGET", DEFAULT_REVIEW_TOKEN_BUDGET))
+        if file_context_ratio is None:
+            file_context_ratio = _env_float("AUTO_FILE_CONTEXT_RATIO", DEFAULT_AUTO_FILE_CONTEXT_RATIO)
+
+        costs = {}
+        choices = {}
+        for info in infos:
+            diff = self.tokens(len(info.patch))
+            full = self.tokens(info.content_chars)
+            costs[info.path] = {
+                "line": diff + self.output_tokens(diff),
+                "file": full + self.output_tokens(full),
+            }
+            fits = planned_tokens(info.content_chars) <= self.budget
+            useful = not info.added and info.content_chars <= file_context_ratio * max(len(info.patch), 1)
+            choices[info.path] = "file" if fits and useful else "line"
+
+        skipped = {}
+        if budget_tokens > 0:
+            def total():
+                requests = math.ceil(len(choices) / self.max_files_per_request) if choices else 0
+                return sum(costs[path][choice] for path, choice in choices.items()) + requests * self.system_tokens
+
+            # Volta para a diff os arquivos completos com maior economia
+            for path in sorted(choices, key=lambda path: costs[path]["file"] - costs[path]["line"], reverse=True):
+                if total() <= budget_tokens:
+                    break
+                if choices[path] == "file":
+                    choices[path] = "line"
+            # Deixa de revisar os maiores arquivos até caber no orçamento
+            for path in sorted(choices, key=lambda path: costs[path]["line"], reverse=True):
+                if total() <= budget_tokens:
+                    break
+                del choices[path]
+                skipped[path] = f"orçamento de {budget_tokens} tokens do PR (REVIEW_TOKEN_BUDGET) esgotado"
+        return choices, skipped
+
+    def estimate_auto(self, infos, choices):
+        """Estimativa do modo "auto" para as escolhas de `choose_auto`."""
+        by_strategy = {strategy: [info for info in infos if choices.get(info.path) == strategy] for strategy in ("file", "line")}
+        parts = [self.estimate(strategy, group) for strategy, group in by_strategy.items() if group]
+        return Estimate(
+            "auto",
+            sum(part.requests for part in parts),
+            sum(part.input_tokens for part in parts),
+            sum(part.output_tokens for part in parts),
+            [item for part in parts for item in part.inadequate],
+        )
+
+
+def render_plan(estimator, infos, choices, skipped, title):
+    """
+    Formata o plano de revisão: tokens por arquivo e requisições, tokens e custo de cada estratégia.
+
+    Args:
+        estimator (ReviewEstimator): Estimador configurado.
+        infos (list): FileInfo dos arquivos.
+        choices (dict): Escolhas do modo "auto".
+        skipped (dict): Arquivos fora do orçamento do modo "auto".
+        title (str): Título do plano (ex: repositório e PR).
+
+    Returns:
+        str: Texto do plano.
+    """
+    lines = [
+        f"🧮 Plano de revisão — {title}",
+        f"   Modelo {estimator.ai_model} ({estimator.ai_provider}, ~{estimator.chars_per_token} caracteres/token), "
+        f"{estimator.system_tokens} tokens de instruções por requisição",
+        "",
+        f"{'arquivo':<48} {'diff':>8} {'completo':>9}  auto",
+    ]
+    for info in infos:
+        full = f"{'' if info.exact_size else '~'}{estimator.tokens(info.content_chars)}"
+        choice = choices.get(info.path) or "ignorado"
+        lines.append(f"{info.path[-48:]:<48} {estimator.tokens(len(info.patch)):>8} {full:>9}  {choice}")
+
+    lines += ["", f"{'estratégia':<14} {'requisições':>11} {'entrada':>10} {'saída':>9} {'custo (US$)':>12}  observações"]
+    estimates = [estimator.estimate(strategy, infos) for strategy in STRATEGIES]
+    estimates.append(estimator.estimate_auto(infos, choices))
+    for index, estimate in enumerate(estimates):
+        label = f"{index + 1}:{estimate.strategy}" if estimate.strategy in STRATEGIES else estimate.strategy
+        cost = estimate.cost(estimator.ai_model)
+        notes = f"{len(estimate.inadequate)} arquivo(s) inadequado(s)" if estimate.inadequate else ""
+        if estimate.strategy == "auto" and skipped:
+            notes = f"{len(skipped)} arquivo(s) fora do orçamento"
+        lines.append(
+            f"{label:<14} {estimate.requests:>11} {estimate.input_tokens:>10} {estimate.output_tokens:>9} "
+            f"{('%.4f' % cost) if cost is not None else '?':>12}  {notes}"
+        )
+        for path, reason in estimate.inadequate[:5]:
+            lines.append(f"{'':<14} ↳ {path}: {reason}")
+    for path, reason in skipped.items():
+        lines.append(f"{'':<14} ↳ {path}: {reason}")
+    return "\n".join(lines)
+
+
+def plan_pr_review(ai_provider, github_token, repo_name, pr_number, prompt_path, ai_model):
+    """
+    Mostra o plano de revisão do PR (dry-run): só consulta o GitHub, nenhuma requisição é enviada à IA.
+
+    Args:
+        ai_provider (str): Provedor de IA.
+        github_token (str): Token de autenticação do GitHub.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        prompt_path (str): Caminho para o arquivo de prompt personalizado.
+        ai_model (str): Modelo.
+
+    Returns:
+        str: Texto do plano (também impresso).
+    """
+    from scripts.github_handler.commented_pr import GithubPRHandler
+    from scripts.planning.request_planner import PACKED_INSTRUCTIONS
+    from scripts.providers.prompting import build_system_prompt
+
+    try:
+        with open(prompt_path, 'r', encoding="utf-8") as file:
+            prompt = file.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file não encontrado em: {prompt_path}")
+
+    snapshot = GithubPRHandler(github_token).get_snapshot(repo_name, pr_number)
+    files = [file for file in snapshot.files_to_review() if snapshot.get_review_patch(file)]
+    infos = collect_file_infos(snapshot, files)
+
+    estimator = ReviewEstimator(ai_provider, ai_model, build_system_prompt(prompt, PACKED_INSTRUCTIONS))
+    choices, skipped = estimator.choose_auto(infos)
+    text = render_plan(estimator, infos, choices, skipped, f"{repo_name}#{pr_number}")
+    print(text)
+    return text
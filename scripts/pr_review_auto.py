@@ -0,0 +1,151 @@
+from scripts.cache.review_cache import get_review_cache, hash_text, make_cache_key
+from scripts.checkout.content_source import get_content_source
+from scripts.github_handler.commented_pr import GithubPRHandler
+from scripts.planning.request_planner import PACKED_INSTRUCTIONS, get_content_budget, review_files_in_batches
+from scripts.planning.review_plan import ReviewEstimator, collect_file_infos
+from scripts.providers import get_completer
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+from scripts.providers.resilience import ProviderError
+from scripts.providers.usage import log_usage_stats
+
+# Bloco do prompt de cada estratégia: arquivo completo (tipo 1) ou só as alterações (tipo 2)
+STRATEGY_BLOCKS = {
+    "file": ("Código:", ""),
+    "line": ("Alterações (diff):", "diff"),
+}
+
+
+def pr_review_auto(ai_provider, ai_api_key, github_token, repo_name, pr_number, prompt_path, ai_model,
+                   ai_version=None, max_concurrency=None):
+    """
+    Revisa um Pull Request (PR) escolhendo, por arquivo, entre o arquivo completo e a diff.
+
+    O plano (`ReviewEstimator.choose_auto`) envia o arquivo completo apenas quando ele é pequeno
+    em relação às alterações, e respeita o orçamento de tokens do PR (REVIEW_TOKEN_BUDGET). O
+    feedback é publicado em um único comentário, como nos tipos 1 e 2.
+
+    Args:
+        ai_provider (str): Provedor de IA (openai, gemini ou claude).
+        ai_api_key (str): Chave de autenticação da API do provedor.
+        github_token (str): Token de autenticação do GitHub.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        prompt_path (str): Caminho para o arquivo de prompt personalizado.
+        ai_model (str): Modelo da IA.
+        ai_version (str): Versão da API (apenas Gemini).
+        max_concurrency (int): Número máximo de arquivos analisados em paralelo (padrão: MAX_CONCURRENCY).
+    """
+    # Cliente compartilhado entre os modos de revisão (com retentativas, circuit breaker e fallback)
+    completer = get_completer(ai_provider, ai_api_key, ai_model, ai_version)
+
+    # Cache de feedbacks reaproveitado entre execuções (por conteúdo)
+    review_cache = get_review_cache()
+
+    # Conteúdo dos arquivos lido do checkout local (com fallback para a API do GitHub)
+    content_source = get_content_source(repo_name, github_token)
+
+    def load_prompt():
+        """
+        Carrega o texto do prompt a partir de um arquivo.
+
+        Returns:
+            str: Texto do prompt.
+        """
+        try:
+            with open(prompt_path, 'r', encoding="utf-8") as file:
+                return file.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file não encontrado em: {prompt_path}")
+
+    def analyze(strategy, file_path, content, prompt):
+        """
+        Analisa o arquivo completo ou a diff, conforme a estratégia escolhida.
+
+        Args:
+            strategy (str): "file" ou "line".
+            file_path (str): Caminho (ou rótulo) do arquivo.
+            content (str): Conteúdo ou patch.
+            prompt (str): Texto do prompt.
+
+        Returns:
+            str: Resposta do modelo.
+        """
+        title, language = STRATEGY_BLOCKS[strategy]
+        payload = build_user_prompt(file_path, (title, language, content))
+        try:
+            return completer.complete(payload, system=build_system_prompt(prompt, PACKED_INSTRUCTIONS)) or "Nenhuma análise fornecida."
+        except ProviderError as e:
+            return f"Erro ao processar o arquivo {file_path} com o modelo {ai_model}: {e}"
+
+    try:
+        prompt = load_prompt()
+        github_handler = GithubPRHandler(github_token)
+
+        # Obtém o PR; os comentários anteriores são reconciliados ao publicar o novo feedback
+        snapshot = github_handler.get_snapshot(repo_name, pr_number)
+        github_handler.prepare_incremental_review(repo_name, pr_number)
+
+        # Arquivos com alterações a revisar (a ordem original é preservada no feedback)
+        files = []
+        for file in snapshot.files_to_review():
+            if not snapshot.get_review_patch(file):
+                print(f"Ignorando {file.filename} (sem alterações no PR).")
+                continue
+            files.append(file)
+
+        # Estratégia por arquivo, a partir dos tamanhos (nenhum conteúdo é baixado para decidir)
+        estimator = ReviewEstimator(ai_provider, ai_model, build_system_prompt(prompt, PACKED_INSTRUCTIONS))
+        choices, skipped = estimator.choose_auto(collect_file_infos(snapshot, files))
+        for path, reason in skipped.items():
+            print(f"⏭️ Ignorando {path}: {reason}.")
+        full = sum(1 for choice in choices.values() if choice == "file")
+        print(f"🧭 Modo auto: {full} arquivo(s) completo(s) e {len(choices) - full} pela diff.")
+
+        # Cada grupo usa as mesmas chaves de cache dos tipos 1 (blob) e 2 (patch)
+        strategies = {
+            "file": (
+                lambda file: make_cache_key(ai_provider, ai_model, prompt, "file", f"{file.filename}@{file.sha}"),
+                content_source.read_text,
+            ),
+            "line": (
+                lambda file: make_cache_key(ai_provider, ai_model, prompt, "line", f"{file.filename}@{hash_text(snapshot.get_review_patch(file))}"),
+                snapshot.get_review_patch,
+            ),
+        }
+        feedbacks = {}
+        for strategy, (cache_key, load_content) in strategies.items():
+            group = [file for file in files if choices.get(file.filename) == strategy]
+            if not group:
+                continue
+            feedbacks.update(review_files_in_batches(
+                group,
+                cache_key=cache_key,
+                load_content=load_content,
+                analyze=lambda label, content, strategy=strategy: analyze(strategy, label, content, prompt),
+                budget_tokens=get_content_budget(ai_model, prompt),
+                review_cache=review_cache,
+                is_cacheable=lambda text: "Erro ao processar" not in text,
+                max_concurrency=max_concurrency,
+            ))
+
+        # Lista para consolidar o feedback gerado
+        overall_feedback = []
+        for file in files:
+            feedback = feedbacks.get(file.filename)
+            if not feedback:
+                continue
+            if "Erro ao processar o arquivo" in feedback:
+                overall_feedback.append(f"**Erro ao analisar o arquivo `{file.filename}`:**\n\n{feedback}\n\n---")
+            else:
+                overall_feedback.append(f"### Arquivo: `{file.filename}`\n\n{feedback}\n\n---")
+
+        # Publica o comentário no PR com o feedback consolidado
+        github_handler.post_feedback_comment(repo_name, pr_number, overall_feedback)
+        review_cache.log_stats()
+        log_usage_stats()
+
+    except Exception as e:
+        print(f"Erro ao revisar o PR com {ai_provider}: {e}")
+        github_handler.post_error_comment(repo_name, pr_number, str(e))
+        # Propaga a falha: o job (servidor/lote) fica como falho e a Action termina com erro
+        raise
@@ -0,0 +1,84 @@
+import os
+import threading
+
+from scripts.providers.resilience import (
+    DEFAULT_HEDGE_MIN_DELAY,
+    DEFAULT_HEDGE_PERCENTILE,
+    CompletionTarget,
+    ResilientCompleter,
+)
+
+# Clientes dos provedores compartilhados por todos os modos de revisão (um por provedor + chave)
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_provider_client(ai_provider, ai_api_key):
+    """
+    Obtém o cliente reutilizável do provedor de IA, criando-o no primeiro uso.
+
+    Os SDKs são importados apenas quando o provedor é solicitado.
+
+    Args:
+        ai_provider (str): Provedor de IA (openai, gemini ou claude).
+        ai_api_key (str): Chave de autenticação da API do provedor.
+
+    Returns:
+        OpenAIClient | ClaudeClient | GeminiClient: Cliente do provedor.
+    """
+    key = (ai_provider, ai_api_key)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = _create_client(ai_provider, ai_api_key)
+        return _clients[key]
+
+
+def get_completer(ai_provider, ai_api_key, ai_model, ai_version=None):
+    """
+    Obtém o executor de prompts do provedor, com retentativas, circuit breaker e hedging.
+
+    O provedor secundário (hedging/fallback) é opcional e configurado por HEDGE_PROVIDER,
+    HEDGE_API_KEY, HEDGE_MODEL e HEDGE_VERSION; HEDGE_PERCENTILE e HEDGE_MIN_DELAY controlam
+    quando ele é acionado.
+
+    Args:
+        ai_provider (str): Provedor de IA principal (openai, gemini ou claude).
+        ai_api_key (str): Chave de autenticação da API do provedor principal.
+        ai_model (str): Modelo do provedor principal.
+        ai_version (str): Versão da API (apenas Gemini).
+
+    Returns:
+        ResilientCompleter: Executor com o método `complete(prompt)`.
+    """
+    primary = CompletionTarget(ai_provider, get_provider_client(ai_provider, ai_api_key), ai_model, ai_version)
+
+    secondary = None
+    hedge_provider = os.getenv("HEDGE_PROVIDER")
+    if hedge_provider and hedge_provider != ai_provider:
+        secondary = CompletionTarget(
+            hedge_provider,
+            get_provider_client(hedge_provider, os.getenv("HEDGE_API_KEY")),
+            os.getenv("HEDGE_MODEL"),
+            os.getenv("HEDGE_VERSION"),
+        )
+
+    try:
+        hedge_percentile = float(os.getenv("HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE))
+        hedge_min_delay = float(os.getenv("HEDGE_MIN_DELAY", DEFAULT_HEDGE_MIN_DELAY))
+    except ValueError:
+        hedge_percentile, hedge_min_delay = DEFAULT_HEDGE_PERCENTILE, DEFAULT_HEDGE_MIN_DELAY
+
+    return ResilientCompleter(primary, secondary, hedge_percentile=hedge_percentile, hedge_min_delay=hedge_min_delay)
+
+
+def _create_client(ai_provider, ai_api_key):
+    if ai_provider == "openai":
+        from scripts.providers.openai_client import OpenAIClient
+        return OpenAIClient(ai_api_key)
+    if ai_provider == "claude":
+        from scripts.providers.claude_client import ClaudeClient
+        return ClaudeClient(ai_api_key)
+    if ai_provider == "gemini":
+        from scripts.providers.gemini_client import GeminiClient
+        return GeminiClient(ai_api_key)
+    raise ValueError(f"Provedor de IA '{ai_provider}' não suportado.")
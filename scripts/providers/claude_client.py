@@ -0,0 +1,142 @@
+import os
+import time
+
+import anthropic
+import httpx
+
+from scripts.planning.request_planner import ModelResponse
+from scripts.providers.streaming import collect_stream
+from scripts.providers.usage import record_usage
+from scripts.telemetry import run_telemetry
+from scripts.transport import rate_limiter, sessions
+
+# Limite da resposta quando o chamador não informa um (o executor de prompts usa um limite adaptativo)
+DEFAULT_MAX_TOKENS = 1000
+
+
+class RateLimitedTransport(httpx.HTTPTransport):
+    """Transporte httpx que passa pelo agendador de rate limit do host (os reenvios ficam com a RetryPolicy)."""
+
+    def handle_request(self, request):
+        limiter = rate_limiter.get_limiter(str(request.url))
+        limiter.acquire(int(request.headers.get("content-length") or 0) // 4)
+        started = time.monotonic()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            run_telemetry.record_request(request.method, str(request.url), None, time.monotonic() - started)
+            raise
+        run_telemetry.record_request(request.method, str(request.url), response.status_code, time.monotonic() - started)
+        pause = limiter.observe(response.status_code, response.headers)
+        if pause is not None:
+            print(f"⏳ Limite de requisições atingido em {request.url.host}; pausando {pause:.1f}s.")
+            run_telemetry.increment("rate_limit_waits")
+        return response
+
+
+class ClaudeClient:
+    def __init__(self, api_key):
+        """
+        Cliente reutilizável da API Claude AI (Anthropic).
+
+        O SDK mantém o próprio pool de conexões (httpx), então uma única instância é criada por chave;
+        o transporte usa o tamanho de pool configurado e o agendador de rate limit.
+
+        Args:
+            api_key (str): Chave de autenticação da API Claude (Anthropic).
+        """
+        pool_size = sessions.get_pool_size()
+        timeout = sessions.get_timeout()[1]
+        transport = RateLimitedTransport(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+        # As retentativas ficam só com a RetryPolicy (resilience), sem os reenvios próprios do SDK
+        options = {"api_key": api_key, "timeout": timeout, "max_retries": 0}
+        if os.getenv("ANTHROPIC_BASE_URL"):
+            # Proxy compatível ou o servidor dos benchmarks
+            options["base_url"] = os.getenv("ANTHROPIC_BASE_URL")
+
+        options["http_client"] = httpx.Client(transport=transport, timeout=timeout)
+        self.client = anthropic.Anthropic(**options)
+
+    def create_message(self, model, messages, max_tokens=DEFAULT_MAX_TOKENS, **kwargs):
+        """
+        Executa uma chamada à API de mensagens.
+
+        Args:
+            model (str): Modelo da IA Claude (ex: claude-2).
+            messages (list): Mensagens da conversa.
+            max_tokens (int): Limite de tokens da resposta.
+            **kwargs: Parâmetros adicionais repassados ao SDK.
+
+        Returns:
+            Message | Stream: Resposta da API Claude (ou o stream de eventos, com stream=True).
+        """
+        return self.client.messages.create(model=model, max_tokens=max_tokens, messages=messages, **kwargs)
+
+    def complete(self, model, prompt, version=None, system=None, stream=False, should_stop=None, **kwargs):
+        """
+        Envia um prompt de texto e retorna apenas o texto da resposta (interface comum aos provedores).
+
+        As instruções fixas (`system`) são marcadas com `cache_control`, para que a Anthropic
+        as sirva do cache de prompt nas requisições seguintes.
+
+        Args:
+            model (str): Modelo da IA Claude.
+            prompt (str): Conteúdo variável da requisição.
+            version (str): Ignorado (usado apenas pelo Gemini).
+            system (str): Instruções fixas enviadas antes do conteúdo.
+            stream (bool): Recebe a resposta via streaming.
+            should_stop (callable): Critério de interrupção do streaming (ver `collect_stream`).
+            **kwargs: Parâmetros adicionais repassados ao SDK (ex: max_tokens).
+
+        Returns:
+            ModelResponse: Texto gerado (truncated se parou no limite de tokens).
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+        if not stream:
+            response = self.create_message(model=model, messages=messages, **kwargs)
+            _record_usage(response.usage)
+            return ModelResponse(response.content[0].text, truncated=getattr(response, "stop_reason", None) == "max_tokens")
+
+        events = self.create_message(model=model, messages=messages, stream=True, **kwargs)
+        close = getattr(events, "close", None) or getattr(getattr(events, "response", None), "close", None)
+        state = {}
+        text = collect_stream(_iter_stream_text(events, state), should_stop, close=close)
+        return ModelResponse(text, truncated=state.get("stop_reason") == "max_tokens")
+
+
+def _iter_stream_text(events, state):
+    """Texto dos eventos do streaming; o uso de entrada vem em `message_start` e o de saída em `message_delta`."""
+    usage = None
+    output_tokens = None
+    try:
+        for event in events:
+            if event.type == "message_start":
+                usage = event.message.usage
+            elif event.type == "message_delta":
+                output_tokens = getattr(event.usage, "output_tokens", output_tokens)
+                state["stop_reason"] = getattr(event.delta, "stop_reason", None)
+            elif event.type == "content_block_delta":
+                yield getattr(event.delta, "text", None)
+    finally:
+        _record_usage(usage, output_tokens)
+
+
+def _record_usage(usage, output_tokens=None):
+    if usage is None:
+        record_usage("claude")
+        return
+    # `input_tokens` conta apenas a parte fora do cache (lida ou gravada)
+    cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+    created = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    record_usage(
+        "claude",
+        usage.input_tokens + cached + created,
+        cached,
+        output_tokens if output_tokens is not None else getattr(usage, "output_tokens", 0),
+    )
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from scripts.planning.request_planner import ModelResponse, estimate_tokens
+from scripts.providers.streaming import collect_stream
+from scripts.providers.usage import record_usage
+from scripts.transport import sessions
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com"
+
+# Versão da API usada quando nenhuma é informada (ex: hedging configurado sem HEDGE_VERSION)
+DEFAULT_API_VERSION = "v1beta"
+
+# Cache de contexto explícito (cachedContents): só compensa (e só é aceito) para prefixos grandes
+CACHED_CONTENT_MIN_TOKENS = 4096
+CACHED_CONTENT_TTL_SECONDS = 600
+
+# Modelos sem suporte a systemInstruction: as instruções vão no início do conteúdo
+MODELS_WITHOUT_SYSTEM_INSTRUCTION = ("gemini-pro", "gemini-1.0")
+
+
+class GeminiClient:
+    def __init__(self, api_key):
+        """
+        Cliente reutilizável da API Gemini, usando a sessão com pool do host.
+
+        Args:
+            api_key (str): Chave de autenticação da API Gemini.
+        """
+        self.api_key = api_key
+        # GEMINI_API_BASE permite apontar para um proxy ou para o servidor dos benchmarks
+        self.api_base = (os.getenv("GEMINI_API_BASE") or GEMINI_API_BASE).rstrip("/")
+        self._cached_contents = {}
+        self._cache_lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        """
+        POST na sessão com pool do host, sem reenviar os 429 (as retentativas ficam com a RetryPolicy).
+
+        Args:
+            url (str): URL de destino.
+            **kwargs: Argumentos repassados para `requests.Session.post`.
+
+        Returns:
+            requests.Response: Resposta da requisição.
+        """
+        return sessions.get_session(url, max_waits=0).post(url, **kwargs)
+
+    def generate_content(self, model, version, payload):
+        """
+        Executa uma chamada `generateContent`.
+
+        Args:
+            model (str): Modelo da API Gemini.
+            version (str): Versão da API Gemini.
+            payload (dict): Corpo da requisição (contents, generationConfig, ...).
+
+        Returns:
+            dict: Resposta da API Gemini.
+
+        Raises:
+            requests.RequestException: Em caso de falha na requisição.
+        """
+        url = f"{self.api_base}/{version}/models/{model}:generateContent"
+        response = self.post(url, json=payload, params={"key": self.api_key})
+        response.raise_for_status()
+        return response.json()
+
+    def stream_generate_content(self, model, version, payload):
+        """
+        Executa uma chamada `streamGenerateContent` (eventos SSE).
+
+        Args:
+            model (str): Modelo da API Gemini.
+            version (str): Versão da API Gemini.
+            payload (dict): Corpo da requisição (contents, generationConfig, ...).
+
+        Returns:
+            requests.Response: Resposta aberta, a ser lida com `iter_stream_text` e fechada pelo chamador.
+
+        Raises:
+            requests.RequestException: Em caso de falha na requisição.
+        """
+        url = f"{self.api_base}/{version}/models/{model}:streamGenerateContent"
+        response = self.post(url, json=payload, params={"key": self.api_key, "alt": "sse"}, stream=True)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+    def create_cached_content(self, model, version, system):
+        """
+        Cria um cache de contexto (`cachedContents`) com as instruções fixas.
+
+        Args:
+            model (str): Modelo da API Gemini.
+            version (str): Versão da API Gemini.
+            system (str): Instruções fixas.
+
+        Returns:
+            str: Nome do recurso (ex: cachedContents/abc123).
+
+        Raises:
+            requests.RequestException: Em caso de falha na requisição.
+        """
+        body = {
+            "model": f"models/{model}",
+            "systemInstruction": {"parts": [{"text": system}]},
+            "ttl": f"{CACHED_CONTENT_TTL_SECONDS}s",
+        }
+        response = self.post(f"{self.api_base}/{version}/cachedContents", json=body, params={"key": self.api_key})
+        response.raise_for_status()
+        return response.json()["name"]
+
+    def get_cached_content(self, model, version, system):
+        """
+        Obtém (criando ou renovando, se preciso) o cache de contexto das instruções fixas.
+
+        Args:
+            model (str): Modelo da API Gemini.
+            version (str): Versão da API Gemini.
+            system (str): Instruções fixas.
+
+        Returns:
+            str | None: Nome do recurso, ou None se as instruções forem pequenas demais ou o cache falhar.
+        """
+        if estimate_tokens(system) < CACHED_CONTENT_MIN_TOKENS:
+            return None
+
+        key = (model, version, hashlib.sha256(system.encode("utf-8")).hexdigest())
+        with self._cache_lock:
+            name, expires_at = self._cached_contents.get(key, (None, 0))
+            if time.monotonic() < expires_at:
+                return name
+            try:
+                name = self.create_cached_content(model, version, system)
+            except Exception as e:
+                print(f"⚠️ Cache de contexto do Gemini indisponível ({e}); enviando as instruções completas.")
+                name = None
+            # Renova um minuto antes de expirar; uma falha não é repetida até lá
+            self._cached_contents[key] = (name, time.monotonic() + CACHED_CONTENT_TTL_SECONDS - 60)
+            return name
+
+    @staticmethod
+    def iter_stream_text(response, state=None):
+        """
+        Extrai o texto de cada evento SSE de `streamGenerateContent`.
+
+        Args:
+            response (requests.Response): Resposta aberta em streaming.
+            state (dict): Recebe o `finishReason` do último evento que o informar.
+
+        Returns:
+            generator: Trechos de texto na ordem de chegada.
+        """
+        response.encoding = "utf-8"
+        usage = None
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = json.loads(line[len("data:"):])
+                usage = data.get("usageMetadata") or usage
+                for candidate in data.get("candidates", [])[:1]:
+                    if state is not None and candidate.get("finishReason"):
+                        state["finish_reason"] = candidate["finishReason"]
+                    for part in candidate.get("content", {}).get("parts", []):
+                        yield part.get("text", "")
+        finally:
+            _record_usage(usage)
+
+    def build_payload(self, model, version, prompt, system=None, **kwargs):
+        """
+        Monta o corpo da requisição com as instruções fixas antes do conteúdo variável.
+
+        Args:
+            model (str): Modelo da API Gemini.
+            version (str): Versão da API Gemini.
+            prompt (str): Conteúdo variável da requisição.
+            system (str): Instruções fixas.
+            **kwargs: Campos adicionais do corpo da requisição (ex: generationConfig).
+
+        Returns:
+            dict: Corpo da requisição.
+        """
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}], **kwargs}
+        if not system:
+            return payload
+
+        cached_content = self.get_cached_content(model, version, system)
+        if cached_content:
+            payload["cachedContent"] = cached_content
+        elif model.startswith(MODELS_WITHOUT_SYSTEM_INSTRUCTION):
+            payload["contents"][0]["parts"].insert(0, {"text": system})
+        else:
+            payload["systemInstruction"] = {"parts": [{"text": system}]}
+        return payload
+
+    def complete(self, model, prompt, version=None, system=None, stream=False, should_stop=None, max_tokens=None,
+                 **kwargs):
+        """
+        Envia um prompt de texto e retorna apenas o texto da resposta (interface comum aos provedores).
+
+        As instruções fixas (`system`) vão em `systemInstruction` ou, quando grandes o bastante,
+        em um cache de contexto reaproveitado por todas as requisições.
+
+        Args:
+            model (str): Modelo da API Gemini.
+            prompt (str): Conteúdo variável da requisição.
+            version (str): Versão da API Gemini (padrão: DEFAULT_API_VERSION).
+            system (str): Instruções fixas enviadas antes do conteúdo.
+            stream (bool): Recebe a resposta via `streamGenerateContent`.
+            should_stop (callable): Critério de interrupção do streaming (ver `collect_stream`).
+            max_tokens (int): Limite de tokens da resposta (generationConfig.maxOutputTokens).
+            **kwargs: Campos adicionais do corpo da requisição (ex: generationConfig).
+
+        Returns:
+            ModelResponse: Texto gerado (vazio se a API não retornar candidatos; truncated se parou
+            no limite de tokens).
+        """
+        version = version or DEFAULT_API_VERSION
+        payload = self.build_payload(model, version, prompt, system, **kwargs)
+        if max_tokens:
+            payload["generationConfig"] = {**payload.get("generationConfig", {}), "maxOutputTokens": max_tokens}
+
+        if stream:
+            response = self.stream_generate_content(model, version, payload)
+            state = {}
+            text = collect_stream(self.iter_stream_text(response, state), should_stop, close=response.close)
+            return ModelResponse(text, truncated=state.get("finish_reason") == "MAX_TOKENS")
+
+        data = self.generate_content(model, version, payload)
+        _record_usage(data.get("usageMetadata"))
+        # Sem candidatos (ex: resposta bloqueada pelos filtros de segurança) a resposta fica vazia
+        candidate = next(iter((data.get("candidates") or [])[:1]), {})
+        return ModelResponse(
+            ((candidate.get("content") or {}).get("parts") or [{}])[0].get("text", ""),
+            truncated=candidate.get("finishReason") == "MAX_TOKENS",
+        )
+
+
+def _record_usage(usage):
+    if not usage:
+        record_usage("gemini")
+        return
+    record_usage(
+        "gemini",
+        usage.get("promptTokenCount", 0),
+        usage.get("cachedContentTokenCount", 0),
+        usage.get("candidatesTokenCount", 0),
+    )
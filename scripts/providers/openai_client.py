@@ -0,0 +1,110 @@
+import os
+
+import openai
+
+from scripts.planning.request_planner import ModelResponse
+from scripts.providers.streaming import collect_stream
+from scripts.providers.usage import record_usage
+from scripts.transport import sessions
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+
+
+def get_api_base():
+    """URL base da API OpenAI (OPENAI_API_BASE, ex: um proxy compatível ou o servidor dos benchmarks)."""
+    return (os.getenv("OPENAI_API_BASE") or OPENAI_API_BASE).rstrip("/")
+
+
+class OpenAIClient:
+    def __init__(self, api_key):
+        """
+        Cliente reutilizável da API OpenAI.
+
+        Args:
+            api_key (str): Chave de autenticação da API OpenAI.
+        """
+        self.api_key = api_key
+        self.api_base = get_api_base()
+
+        # O SDK 0.27 usa uma sessão `requests` global; apontamos para a sessão com pool do host.
+        # Os 429 não são reenviados pela sessão: as retentativas ficam com a RetryPolicy (resilience)
+        openai.requestssession = sessions.get_session(self.api_base, max_waits=0)
+
+    def chat_completion(self, model, messages, **kwargs):
+        """
+        Executa uma chamada de chat completion.
+
+        Args:
+            model (str): Modelo da IA OpenAI (ex: gpt-4).
+            messages (list): Mensagens da conversa.
+            **kwargs: Parâmetros adicionais repassados ao SDK.
+
+        Returns:
+            dict: Resposta da API OpenAI.
+        """
+        kwargs.setdefault("request_timeout", sessions.get_timeout())
+        return openai.ChatCompletion.create(
+            api_key=self.api_key, api_base=self.api_base, model=model, messages=messages, **kwargs
+        )
+
+    def complete(self, model, prompt, version=None, system=None, stream=False, should_stop=None, **kwargs):
+        """
+        Envia um prompt de texto e retorna apenas o texto da resposta (interface comum aos provedores).
+
+        As instruções fixas (`system`) vão na primeira mensagem, para que o cache automático de prefixo
+        da OpenAI as reaproveite entre as requisições.
+
+        Args:
+            model (str): Modelo da IA OpenAI.
+            prompt (str): Conteúdo variável da requisição.
+            version (str): Ignorado (usado apenas pelo Gemini).
+            system (str): Instruções fixas enviadas antes do conteúdo.
+            stream (bool): Recebe a resposta via streaming.
+            should_stop (callable): Critério de interrupção do streaming (ver `collect_stream`).
+            **kwargs: Parâmetros adicionais repassados ao SDK (ex: max_tokens).
+
+        Returns:
+            ModelResponse: Texto gerado (truncated se parou no limite de tokens).
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+
+        if not stream:
+            response = self.chat_completion(model=model, messages=messages, **kwargs)
+            _record_usage(response.get('usage'))
+            choice = response['choices'][0]
+            return ModelResponse(choice['message']['content'], truncated=choice.get('finish_reason') == "length")
+
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        chunks = self.chat_completion(model=model, messages=messages, stream=True, **kwargs)
+        state = {}
+        text = collect_stream(_iter_stream_text(chunks, state), should_stop, close=getattr(chunks, "close", None))
+        return ModelResponse(text, truncated=state.get("finish_reason") == "length")
+
+
+def _iter_stream_text(chunks, state):
+    """Texto de cada chunk do streaming; o uso de tokens vem no último chunk (sem `choices`)."""
+    usage = None
+    try:
+        for chunk in chunks:
+            usage = chunk.get('usage') or usage
+            if chunk.get('choices'):
+                choice = chunk['choices'][0]
+                state["finish_reason"] = choice.get('finish_reason') or state.get("finish_reason")
+                yield choice.get('delta', {}).get('content')
+    finally:
+        _record_usage(usage)
+
+
+def _record_usage(usage):
+    if not usage:
+        record_usage("openai")
+        return
+    details = usage.get('prompt_tokens_details') or {}
+    record_usage(
+        "openai",
+        usage.get('prompt_tokens', 0),
+        details.get('cached_tokens', 0),
+        usage.get('completion_tokens', 0),
+    )
@@ -0,0 +1,36 @@
+import textwrap
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
+def build_system_prompt(*parts):
+    """
+    Monta o bloco fixo de instruções enviado antes do conteúdo de cada requisição.
+
+    O texto é normalizado (sem a indentação de strings multilinha e sem espaços nas pontas) para
+    que seja idêntico em todas as requisições da execução e aproveite o cache de prefixo dos provedores.
+
+    Args:
+        *parts (str): Trechos das instruções (ex: o prompt do arquivo e instruções do modo de revisão).
+
+    Returns:
+        str: Instruções unidas por linhas em branco.
+    """
+    return "\n\n".join(textwrap.dedent(part).strip() for part in parts if part and part.strip())
+
+
+def build_user_prompt(file_path, *blocks):
+    """
+    Monta a parte variável da requisição: o caminho do arquivo seguido dos blocos de código.
+
+    Args:
+        file_path (str): Caminho (ou rótulo) do arquivo analisado.
+        *blocks (tuple): Blocos (título, linguagem, conteúdo), na ordem em que devem aparecer.
+
+    Returns:
+        str: Conteúdo da mensagem do usuário.
+    """
+    sections = [f"Arquivo: {file_path}"]
+    for title, language, content in blocks:
+        sections.append(f"{title}\n```{language}\n{content}\n```")
+    return "\n\n".join(sections)
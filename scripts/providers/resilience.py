@@ -0,0 +1,391 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from scripts.planning.request_planner import ModelResponse, count_packed_files, get_output_token_limit, is_truncated
+from scripts.providers.streaming import is_streaming_enabled, stop_on_approval
+from scripts.telemetry import run_telemetry
+from scripts.utils import cancellation
+
+# Retentativas com backoff exponencial e jitter completo
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20.0
+
+# Circuit breaker: falhas consecutivas para abrir e tempo até permitir uma nova tentativa
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Hedging: percentil de latência do provedor principal que dispara o secundário
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_MIN_DELAY = 2.0
+MIN_LATENCY_SAMPLES = 10
+LATENCY_WINDOW = 200
+
+# Status HTTP que indicam falhas transitórias
+RETRYABLE_STATUS = {408, 409, 429}
+
+_breakers = {}
+_latencies = {}
+_registry_lock = threading.Lock()
+_hedge_executor = None
+
+
+class ProviderError(Exception):
+    """Falha definitiva ao consultar o(s) provedor(es) de IA, após retentativas e fallback."""
+
+
+class CircuitOpenError(ProviderError):
+    """O circuit breaker do provedor está aberto; a chamada nem é enviada."""
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _status_of(error):
+    """Status HTTP de uma exceção dos SDKs (openai, anthropic) ou do requests, se houver."""
+    for attribute in ("http_status", "status_code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error):
+    """
+    Indica se a falha é transitória (rate limit, 5xx, timeout ou conexão).
+
+    Args:
+        error (Exception): Exceção lançada pelo cliente do provedor.
+
+    Returns:
+        bool: True se vale a pena tentar de novo.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = _status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    name = type(error).__name__
+    return any(word in name for word in ("Timeout", "Connection", "ServiceUnavailable", "TryAgain", "Overloaded"))
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        """
+        Política de retentativas com backoff exponencial e jitter completo.
+
+        Args:
+            max_attempts (int): Número total de tentativas.
+            base_delay (float): Espera base, em segundos.
+            max_delay (float): Espera máxima, em segundos.
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls):
+        """Política configurada por PROVIDER_MAX_ATTEMPTS e PROVIDER_RETRY_BASE_DELAY."""
+        return cls(
+            _env_float("PROVIDER_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+            _env_float("PROVIDER_RETRY_BASE_DELAY", DEFAULT_BASE_DELAY),
+        )
+
+    def delay(self, attempt):
+        """Espera antes da tentativa seguinte a `attempt` (a partir de 1)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT, clock=None):
+        """
+        Circuit breaker de um provedor: após N falhas consecutivas, rejeita as chamadas por um tempo
+        e depois libera uma única chamada de teste (meio-aberto).
+
+        Args:
+            failure_threshold (int): Falhas consecutivas para abrir o circuito.
+            reset_timeout (float): Segundos com o circuito aberto.
+            clock (callable): Relógio monotônico (para testes).
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock or time.monotonic
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Indica se a chamada pode ser enviada (no estado meio-aberto, apenas uma por vez)."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+            self._probing = False
+
+
+class LatencyTracker:
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        Latências recentes das chamadas bem-sucedidas de um provedor.
+
+        Args:
+            window (int): Quantidade de amostras mantidas.
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile):
+        """
+        Percentil das latências observadas.
+
+        Args:
+            percentile (float): Percentil (0-100).
+
+        Returns:
+            float | None: Latência em segundos, ou None sem amostras suficientes.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+def get_breaker(ai_provider):
+    """Circuit breaker compartilhado do provedor (PROVIDER_FAILURE_THRESHOLD, PROVIDER_RESET_TIMEOUT)."""
+    with _registry_lock:
+        if ai_provider not in _breakers:
+            _breakers[ai_provider] = CircuitBreaker(
+                int(_env_float("PROVIDER_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD)),
+                _env_float("PROVIDER_RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT),
+            )
+        return _breakers[ai_provider]
+
+
+def get_latency_tracker(ai_provider):
+    """Histórico de latência compartilhado do provedor."""
+    with _registry_lock:
+        if ai_provider not in _latencies:
+            _latencies[ai_provider] = LatencyTracker()
+        return _latencies[ai_provider]
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _registry_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="raico-hedge")
+        return _hedge_executor
+
+
+class CompletionTarget:
+    def __init__(self, ai_provider, client, ai_model, ai_version=None):
+        """
+        Provedor + modelo para onde um prompt pode ser enviado.
+
+        Args:
+            ai_provider (str): Provedor de IA (openai, gemini ou claude).
+            client: Cliente do provedor (com o método `complete`).
+            ai_model (str): Modelo da IA.
+            ai_version (str): Versão da API (apenas Gemini).
+        """
+        self.ai_provider = ai_provider
+        self.client = client
+        self.ai_model = ai_model
+        self.ai_version = ai_version
+        self.breaker = get_breaker(ai_provider)
+        self.latency = get_latency_tracker(ai_provider)
+
+    def complete(self, prompt, retry_policy, sleep=cancellation.sleep, **kwargs):
+        """
+        Envia o prompt com retentativas e circuit breaker.
+
+        Sem `max_tokens` explícito, o limite da resposta é proporcional ao tamanho do prompt e ao
+        número de arquivos agrupados nele.
+
+        Raises:
+            CircuitOpenError: Circuito aberto.
+            Exception: Última falha do provedor (não transitória ou após esgotar as tentativas).
+        """
+        kwargs.setdefault("max_tokens", get_output_token_limit(
+            self.ai_model, (kwargs.get("system") or "") + prompt, count_packed_files(prompt)
+        ))
+        for attempt in range(1, retry_policy.max_attempts + 1):
+            # Revisões substituídas por um head mais novo não enviam novas requisições
+            cancellation.checkpoint()
+            if not self.breaker.allow():
+                run_telemetry.increment("circuit_open_rejections")
+                raise CircuitOpenError(f"Circuito aberto para o provedor '{self.ai_provider}'.")
+
+            started = time.monotonic()
+            run_telemetry.increment(f"provider_calls.{self.ai_provider}")
+            try:
+                text = self.client.complete(self.ai_model, prompt, version=self.ai_version, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # Erros do próprio pedido (ex: 400, 401) não indicam indisponibilidade do provedor
+                    self.breaker.record_success()
+                if not retryable or attempt == retry_policy.max_attempts:
+                    raise
+                delay = retry_policy.delay(attempt)
+                print(f"🔁 Falha transitória em {self.ai_provider} ({e}); nova tentativa em {delay:.1f}s.")
+                run_telemetry.increment(f"provider_retries.{self.ai_provider}")
+                sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self.latency.record(time.monotonic() - started)
+            if is_truncated(text):
+                print(f"✂️ Resposta de {self.ai_provider} interrompida no limite de {kwargs['max_tokens']} tokens.")
+                run_telemetry.increment("truncated_responses")
+            return text
+
+
+class ResilientCompleter:
+    def __init__(self, primary, secondary=None, retry_policy=None,
+                 hedge_percentile=DEFAULT_HEDGE_PERCENTILE, hedge_min_delay=DEFAULT_HEDGE_MIN_DELAY):
+        """
+        Envia prompts ao provedor principal com retentativas, circuit breaker e, se configurado,
+        hedging/fallback para um provedor secundário.
+
+        Args:
+            primary (CompletionTarget): Provedor principal.
+            secondary (CompletionTarget): Provedor secundário (opcional).
+            retry_policy (RetryPolicy): Política de retentativas.
+            hedge_percentile (float): Percentil de latência do principal que dispara o secundário.
+            hedge_min_delay (float): Espera mínima antes do hedge (também usada sem amostras suficientes).
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+
+    def hedge_delay(self):
+        """Segundos de espera pelo principal antes de disparar o secundário."""
+        observed = self.primary.latency.percentile(self.hedge_percentile)
+        return max(self.hedge_min_delay, observed or 0.0)
+
+    @run_telemetry.phase("analyze")
+    def complete(self, prompt, system=None, early_stop=True, **kwargs):
+        """
+        Envia o prompt e retorna o texto da resposta.
+
+        As instruções fixas (`system`) são enviadas separadas do conteúdo, antes dele, para que o
+        provedor reaproveite o prefixo em cache entre as requisições da execução.
+
+        Com STREAM_RESPONSES habilitado (padrão), a resposta é recebida via streaming e, se
+        `early_stop`, interrompida assim que for uma aprovação simples.
+
+        Args:
+            prompt (str): Conteúdo variável da requisição (ex: o arquivo analisado).
+            system (str): Instruções fixas (ex: o prompt de revisão).
+            early_stop (bool): Interrompe a geração de respostas de aprovação simples.
+            **kwargs: Parâmetros repassados ao cliente (ex: max_tokens).
+
+        Returns:
+            str: Texto gerado.
+
+        Raises:
+            ProviderError: Nenhum provedor respondeu com sucesso.
+        """
+        if system:
+            kwargs["system"] = system
+        if is_streaming_enabled():
+            kwargs.setdefault("stream", True)
+            if early_stop:
+                kwargs.setdefault("should_stop", stop_on_approval)
+
+        if self.secondary is None:
+            try:
+                return self.primary.complete(prompt, self.retry_policy, **kwargs)
+            except ProviderError:
+                run_telemetry.increment("provider_failures")
+                raise
+            except Exception as e:
+                run_telemetry.increment("provider_failures")
+                raise ProviderError(str(e)) from e
+        return self._hedged(prompt, **kwargs)
+
+    def _hedged(self, prompt, **kwargs):
+        executor = _get_hedge_executor()
+        targets = {}
+
+        def submit(target):
+            # O contexto (ex: token de cancelamento) acompanha a chamada na thread do hedge
+            context = contextvars.copy_context()
+            targets[executor.submit(context.run, target.complete, prompt, self.retry_policy, **kwargs)] = target
+
+        submit(self.primary)
+        pending = set(targets)
+        done, pending = wait(pending, timeout=self.hedge_delay())
+        errors = []
+
+        if not done or any(future.exception() is not None for future in done):
+            reason = "demorou" if not done else "falhou"
+            print(f"🔀 {self.primary.ai_provider} {reason}; consultando também {self.secondary.ai_provider}.")
+            run_telemetry.increment("hedged_requests")
+            submit(self.secondary)
+            pending = set(targets) - done
+
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    if targets[future] is self.secondary:
+                        # O cache é endereçado pelo provedor principal: a resposta do secundário não é armazenada
+                        print(f"🔀 Resposta obtida de {self.secondary.ai_provider} ({self.secondary.ai_model}).")
+                        return ModelResponse(future.result(), truncated=is_truncated(future.result()), fallback=True)
+                    return future.result()
+                errors.append(f"{targets[future].ai_provider}: {future.exception()}")
+            if not pending:
+                run_telemetry.increment("provider_failures")
+                raise ProviderError("; ".join(errors))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+
+from scripts.utils import cancellation
+
+# Resposta de aprovação simples (categoria "✅ Alterações aprovadas" do prompt), sem ressalvas
+APPROVAL_PATTERN = re.compile(
+    r"^[\s#>*_]*✅[\s*_]*altera[çc][õo]es\s+aprovadas(?![\s*_:-]*com\s+ressalvas)",
+    re.IGNORECASE,
+)
+
+# Caracteres aceitos após o marcador (a breve parabenização) antes de interromper a geração
+APPROVAL_TAIL_CHARS = 280
+
+# Acima deste tamanho sem o marcador, a resposta não é uma aprovação e a verificação é desligada
+APPROVAL_DECISION_CHARS = 40
+
+_stats = {"streams": 0, "early_stops": 0, "chars_received": 0}
+_stats_lock = threading.Lock()
+
+
+def is_streaming_enabled():
+    """Indica se as respostas devem ser recebidas via streaming (STREAM_RESPONSES, padrão: true)."""
+    return os.getenv("STREAM_RESPONSES", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def is_plain_approval(text):
+    """
+    Indica se a resposta começa com o marcador de aprovação sem ressalvas.
+
+    Args:
+        text (str): Texto gerado pela IA.
+
+    Returns:
+        bool: True se for uma aprovação simples.
+    """
+    return bool(APPROVAL_PATTERN.match(text or ""))
+
+
+def stop_on_approval(text):
+    """
+    Critério de parada do streaming: interrompe assim que a resposta é uma aprovação simples.
+
+    A parabenização que segue o marcador é mantida até o fim do primeiro parágrafo
+    (ou APPROVAL_TAIL_CHARS caracteres).
+
+    Args:
+        text (str): Texto recebido até o momento.
+
+    Returns:
+        bool | None: True para interromper, False para continuar verificando,
+        None quando a resposta certamente não é uma aprovação (a verificação é encerrada).
+    """
+    match = APPROVAL_PATTERN.match(text)
+    if not match:
+        return None if len(text.lstrip()) >= APPROVAL_DECISION_CHARS else False
+    tail = text[match.end():]
+    return "\n\n" in tail.lstrip() or len(tail) >= APPROVAL_TAIL_CHARS
+
+
+def collect_stream(chunks, should_stop=None, close=None):
+    """
+    Concatena os trechos de uma resposta em streaming, interrompendo-a quando `should_stop` indicar.
+
+    Args:
+        chunks (iterable): Trechos de texto na ordem de chegada.
+        should_stop (callable): Recebe o texto acumulado e retorna True (parar), False (continuar)
+            ou None (nunca parar; encerra a verificação).
+        close (callable): Fecha a conexão do stream (chamado sempre ao final).
+
+    Returns:
+        str: Texto recebido.
+    """
+    parts = []
+    stopped = False
+    try:
+        for chunk in chunks:
+            # Revisão cancelada: a conexão é fechada e o restante da geração não é consumido
+            cancellation.checkpoint()
+            if not chunk:
+                continue
+            parts.append(chunk)
+            if should_stop is None:
+                continue
+            decision = should_stop("".join(parts))
+            if decision is None:
+                should_stop = None
+            elif decision:
+                stopped = True
+                break
+    finally:
+        # Encerra o gerador (que registra o uso de tokens) e a conexão
+        if hasattr(chunks, "close"):
+            chunks.close()
+        if close is not None:
+            close()
+
+    text = "".join(parts)
+    if stopped:
+        # Descarta o início do parágrafo seguinte, se recebido no mesmo trecho
+        stripped = text.rstrip()
+        end = stripped.rfind("\n\n")
+        if "\n\n" not in text[len(stripped):] and end > 0:
+            stripped = stripped[:end].rstrip()
+        text = stripped
+    with _stats_lock:
+        _stats["streams"] += 1
+        _stats["early_stops"] += int(stopped)
+        _stats["chars_received"] += len(text)
+    return text
+
+
+def reset_stats():
+    """Zera os contadores do streaming (ver `run_telemetry.reset`)."""
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def get_stats():
+    """
+    Contadores das respostas recebidas via streaming.
+
+    Returns:
+        dict: streams, early_stops e chars_received.
+    """
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,65 @@
+import threading
+
+from scripts.telemetry import run_telemetry
+
+_usage = {}
+_lock = threading.Lock()
+
+
+def record_usage(ai_provider, input_tokens=None, cached_tokens=0, output_tokens=0):
+    """
+    Registra os tokens consumidos por uma chamada ao provedor.
+
+    Args:
+        ai_provider (str): Provedor de IA (openai, gemini ou claude).
+        input_tokens (int): Tokens de entrada, incluindo os lidos do cache (None se o provedor não informou,
+            ex: streaming interrompido antes do resumo de uso).
+        cached_tokens (int): Tokens de entrada servidos pelo cache de prefixo do provedor.
+        output_tokens (int): Tokens gerados.
+    """
+    run_telemetry.record_job_tokens(ai_provider, input_tokens, cached_tokens, output_tokens)
+    with _lock:
+        usage = _usage.setdefault(
+            ai_provider,
+            {"requests": 0, "unreported": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0},
+        )
+        usage["requests"] += 1
+        if input_tokens is None:
+            usage["unreported"] += 1
+            return
+        usage["input_tokens"] += input_tokens
+        usage["cached_tokens"] += cached_tokens or 0
+        usage["output_tokens"] += output_tokens or 0
+
+
+def get_usage_stats():
+    """
+    Tokens consumidos por provedor desde o início da execução.
+
+    Returns:
+        dict: Provedor -> requests, unreported, input_tokens, cached_tokens, uncached_tokens e output_tokens.
+    """
+    with _lock:
+        return {
+            provider: {**usage, "uncached_tokens": usage["input_tokens"] - usage["cached_tokens"]}
+            for provider, usage in _usage.items()
+        }
+
+
+def reset_usage_stats():
+    """Zera os tokens registrados (ver `run_telemetry.reset`)."""
+    with _lock:
+        _usage.clear()
+
+
+def log_usage_stats():
+    """Imprime os tokens de entrada (em cache e sem cache) e de saída de cada provedor."""
+    for provider, usage in get_usage_stats().items():
+        message = (
+            f"🧾 Tokens ({provider}): entrada {usage['input_tokens']} "
+            f"({usage['cached_tokens']} em cache, {usage['uncached_tokens']} sem cache), "
+            f"saída {usage['output_tokens']}, {usage['requests']} requisição(ões)"
+        )
+        if usage["unreported"]:
+            message += f", {usage['unreported']} sem dados de uso"
+        print(f"{message}.")
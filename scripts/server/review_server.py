@@ -0,0 +1,226 @@
+import json
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from scripts.ai_dispatcher import ReviewSettings, resolve_review_method, run_review
+from scripts.server.webhook import parse_pull_request_event, parse_review_request, verify_signature
+from scripts.server.worker_pool import JOB_DURATION_BUCKETS, ReviewWorkerPool
+from scripts.telemetry import run_telemetry
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8080
+
+# Tamanho máximo aceito para o corpo de um webhook (o GitHub limita os eventos a 25 MB)
+MAX_BODY_BYTES = 25 * 1024 * 1024
+
+
+def render_pool_metrics(stats, prefix="raico"):
+    """
+    Métricas da fila e dos workers no formato de texto do Prometheus.
+
+    Args:
+        stats (dict): Resultado de `ReviewWorkerPool.stats`.
+        prefix (str): Prefixo dos nomes das métricas.
+
+    Returns:
+        str: Linhas das métricas.
+    """
+    labels = run_telemetry.prometheus_labels
+    lines = [
+        f"# TYPE {prefix}_workers gauge", f"{prefix}_workers {stats['workers']}",
+        f"# TYPE {prefix}_workers_alive gauge", f"{prefix}_workers_alive {stats['workers_alive']}",
+        f"# TYPE {prefix}_queue_depth gauge", f"{prefix}_queue_depth {stats['queued']}",
+        f"# TYPE {prefix}_jobs_running gauge", f"{prefix}_jobs_running {stats['running']}",
+        f"# TYPE {prefix}_jobs_total counter",
+    ]
+    for status, count in stats["jobs"].items():
+        lines.append(f"{prefix}_jobs_total{labels(status=status)} {count}")
+
+    lines.append(f"# TYPE {prefix}_job_duration_seconds histogram")
+    seen = 0
+    for limit, count in zip([*JOB_DURATION_BUCKETS, "+Inf"], stats["duration_seconds"]["buckets"].values()):
+        seen += count
+        lines.append(f"{prefix}_job_duration_seconds_bucket{labels(le=limit)} {seen}")
+    lines.append(f"{prefix}_job_duration_seconds_count {seen}")
+    lines.append(f"{prefix}_job_duration_seconds_sum {stats['duration_seconds']['sum']}")
+    return "\n".join(lines) + "\n"
+
+
+class ReviewRequestHandler(BaseHTTPRequestHandler):
+    """
+    Rotas do servidor:
+
+    - POST /webhook: eventos `pull_request` do GitHub (assinados com WEBHOOK_SECRET).
+    - POST /review: pedido local {"repository": "owner/repo", "pr_number": 7} (SERVER_API_TOKEN, se definido).
+    - GET /healthz, GET /metrics (Prometheus), GET /jobs e GET /jobs/<id>.
+    """
+
+    server_version = "raico"
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        pool = self.server.pool
+        if path == "/healthz":
+            healthy = pool.is_alive()
+            stats = pool.stats()
+            self._send_json(200 if healthy else 503, {
+                "status": "ok" if healthy else "unhealthy",
+                "workers_alive": stats["workers_alive"],
+                "queued": stats["queued"],
+                "running": stats["running"],
+            })
+        elif path == "/metrics":
+            body = run_telemetry.render_prometheus(run_telemetry.snapshot()) + render_pool_metrics(pool.stats())
+            self._send(200, body.encode(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/jobs":
+            self._send_json(200, {"jobs": pool.recent_jobs()})
+        elif path.startswith("/jobs/") and path[len("/jobs/"):].isdigit():
+            job = pool.get_job(int(path[len("/jobs/"):]))
+            if job is None:
+                self._send_json(404, {"error": "Job não encontrado."})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": "Rota não encontrada."})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path not in ("/webhook", "/review"):
+            self._send_json(404, {"error": "Rota não encontrada."})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Corpo da requisição grande demais."})
+            return
+        body = self.rfile.read(length)
+
+        if path == "/webhook":
+            if not verify_signature(self.server.webhook_secret, body, self.headers.get("X-Hub-Signature-256")):
+                self._send_json(401, {"error": "Assinatura do webhook inválida."})
+                return
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self._send_json(400, {"error": "Corpo não é um JSON válido."})
+                return
+            request, reason = parse_pull_request_event(self.headers.get("X-GitHub-Event"), payload)
+            if request is None:
+                self._send_json(200, {"ignored": reason})
+                return
+        else:
+            token = self.server.api_token
+            if token and self.headers.get("Authorization") != f"Bearer {token}":
+                self._send_json(401, {"error": "Token inválido."})
+                return
+            try:
+                request = parse_review_request(json.loads(body or b"{}"))
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+        job = self.server.pool.submit(request)
+        if job is None:
+            self._send_json(503, {"error": "Fila de revisões cheia; tente novamente mais tarde."})
+            return
+        print(f"📥 Revisão de {request.repo_name}#{request.pr_number} enfileirada (job {job.id}, via {request.source}).")
+        self._send_json(202, {"job": job.id, "status": job.status})
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode(), "application/json; charset=utf-8")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # As requisições de health check e métricas são frequentes; só os pedidos de revisão são registrados
+        return
+
+
+def create_server(pool, host=None, port=None, webhook_secret=None, api_token=None):
+    """
+    Cria o servidor HTTP (uma thread por conexão) ligado à fila de revisões.
+
+    Args:
+        pool (ReviewWorkerPool): Fila e workers das revisões.
+        host (str): Endereço de escuta (padrão: SERVER_HOST).
+        port (int): Porta (padrão: SERVER_PORT; 0 escolhe uma porta livre).
+        webhook_secret (str): Segredo dos webhooks do GitHub (padrão: WEBHOOK_SECRET).
+        api_token (str): Token exigido em POST /review (padrão: SERVER_API_TOKEN).
+
+    Returns:
+        ThreadingHTTPServer: Servidor pronto para `serve_forever()`.
+    """
+    host = host if host is not None else os.getenv("SERVER_HOST", DEFAULT_SERVER_HOST)
+    port = port if port is not None else int(os.getenv("SERVER_PORT") or DEFAULT_SERVER_PORT)
+    server = ThreadingHTTPServer((host, port), ReviewRequestHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    server.webhook_secret = webhook_secret if webhook_secret is not None else os.getenv("WEBHOOK_SECRET", "")
+    server.api_token = api_token if api_token is not None else os.getenv("SERVER_API_TOKEN", "")
+    return server
+
+
+def warm_up(settings):
+    """
+    Carrega antes do primeiro job o módulo de revisão, o SDK e o cliente do provedor e o cache de revisões.
+
+    Args:
+        settings (ReviewSettings): Configuração das revisões.
+    """
+    from scripts.cache.review_cache import get_review_cache
+    from scripts.providers import get_provider_client
+
+    resolve_review_method(settings.ai_provider, settings.review_type)
+    get_provider_client(settings.ai_provider, settings.ai_api_key)
+    get_review_cache()
+
+
+def run_server():
+    """
+    Servidor de revisões: recebe webhooks `pull_request` (ou pedidos locais) e os revisa em workers
+    mantidos aquecidos, com a configuração das variáveis de ambiente do dispatcher.
+    """
+    settings = ReviewSettings.from_env()
+    if not settings.github_token:
+        raise ValueError("GITHUB_TOKEN é obrigatório no modo servidor.")
+    warm_up(settings)
+
+    pool = ReviewWorkerPool(lambda request: run_review(settings, request.repo_name, request.pr_number, request.review_type)).start()
+    server = create_server(pool)
+    host, port = server.server_address[:2]
+    if not server.webhook_secret:
+        print("⚠️ WEBHOOK_SECRET não definido: as assinaturas dos webhooks não serão verificadas.")
+
+    def shutdown(signum, frame):
+        # `shutdown` bloqueia até o laço do servidor terminar; por isso roda em outra thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"🚀 RAICO ouvindo em http://{host}:{port} ({pool.workers} worker(s), {settings.ai_provider}/{settings.ai_model}).")
+    try:
+        server.serve_forever()
+    finally:
+        print("🛑 Encerrando: aguardando as revisões em andamento.")
+        server.server_close()
+        pool.stop()
+        from scripts.cache.review_cache import get_review_cache
+        from scripts.github_handler.async_client import close_async_clients
+        from scripts.transport.sessions import close_sessions
+
+        get_review_cache().close()
+        close_sessions()
+        close_async_clients()
+
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,51 @@
+"""
+Envia um evento `pull_request` assinado para o servidor de revisões (testes locais sem o GitHub).
+
+Exemplo:
+    python -m scripts.server.send_webhook --repo owner/repo --pr 7 --head-sha <sha> --secret "$WEBHOOK_SECRET"
+"""
+import argparse
+import json
+import os
+
+import requests
+
+from scripts.server.webhook import build_pull_request_event, encode_event
+
+
+def send_webhook(url, repo_name, pr_number, head_sha, action="synchronize", secret=None, timeout=10):
+    """
+    Envia o evento ao servidor, como o GitHub faria.
+
+    Args:
+        url (str): URL do endpoint /webhook.
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        head_sha (str): Head do PR.
+        action (str): Ação do evento (opened, synchronize, reopened...).
+        secret (str): Segredo do webhook (assina o corpo).
+        timeout (float): Timeout da requisição, em segundos.
+
+    Returns:
+        requests.Response: Resposta do servidor.
+    """
+    body, headers = encode_event(build_pull_request_event(repo_name, pr_number, head_sha, action), secret)
+    return requests.post(url, data=body, headers=headers, timeout=timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"http://127.0.0.1:{os.getenv('SERVER_PORT') or 8080}/webhook")
+    parser.add_argument("--repo", required=True, help="repositório no formato owner/repo")
+    parser.add_argument("--pr", type=int, required=True, help="número do PR")
+    parser.add_argument("--head-sha", default="0" * 40, help="head do PR")
+    parser.add_argument("--action", default="synchronize")
+    parser.add_argument("--secret", default=os.getenv("WEBHOOK_SECRET"), help="segredo do webhook (padrão: WEBHOOK_SECRET)")
+    args = parser.parse_args()
+
+    response = send_webhook(args.url, args.repo, args.pr, args.head_sha, args.action, args.secret)
+    print(f"{response.status_code} {json.dumps(response.json(), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import hashlib
+import hmac
+import json
+
+# Ações do evento `pull_request` que disparam uma revisão
+REVIEW_ACTIONS = frozenset(("opened", "reopened", "synchronize", "ready_for_review"))
+
+
+def sign_payload(secret, body):
+    """
+    Assinatura do corpo do webhook no formato do cabeçalho X-Hub-Signature-256.
+
+    Args:
+        secret (str): Segredo configurado no webhook.
+        body (bytes): Corpo da requisição.
+
+    Returns:
+        str: "sha256=<hmac hexadecimal>".
+    """
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, signature):
+    """
+    Confere a assinatura enviada pelo GitHub (comparação em tempo constante).
+
+    Args:
+        secret (str): Segredo configurado no webhook (vazio: nenhuma verificação).
+        body (bytes): Corpo da requisição.
+        signature (str): Valor do cabeçalho X-Hub-Signature-256.
+
+    Returns:
+        bool: True se a assinatura for válida ou se não houver segredo configurado.
+    """
+    if not secret:
+        return True
+    return bool(signature) and hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+class ReviewRequest:
+    def __init__(self, repo_name, pr_number, head_sha=None, review_type=None, source="api"):
+        """
+        Pedido de revisão de um PR, recebido por webhook ou pela API local.
+
+        Args:
+            repo_name (str): Nome do repositório no formato "owner/repo".
+            pr_number (int): Número do Pull Request.
+            head_sha (str): Head do PR no momento do evento (quando conhecido).
+            review_type (str): Tipo de revisão (padrão: REVIEW_TYPE do servidor).
+            source (str): Origem do pedido ("webhook" ou "api").
+        """
+        self.repo_name = repo_name
+        self.pr_number = int(pr_number)
+        self.head_sha = head_sha
+        self.review_type = review_type
+        self.source = source
+
+    def to_dict(self):
+        return {
+            "repository": self.repo_name,
+            "pr_number": self.pr_number,
+            "head_sha": self.head_sha,
+            "review_type": self.review_type,
+            "source": self.source,
+        }
+
+
+def parse_pull_request_event(event, payload):
+    """
+    Converte um evento do GitHub em pedido de revisão.
+
+    Args:
+        event (str): Valor do cabeçalho X-GitHub-Event.
+        payload (dict): Corpo do evento.
+
+    Returns:
+        tuple: (ReviewRequest ou None, motivo quando o evento é ignorado).
+    """
+    if event == "ping":
+        return None, "ping"
+    if event != "pull_request":
+        return None, f"evento '{event}' ignorado"
+    action = payload.get("action")
+    if action not in REVIEW_ACTIONS:
+        return None, f"ação '{action}' ignorada"
+    pull_request = payload.get("pull_request") or {}
+    if pull_request.get("draft") and action != "ready_for_review":
+        return None, "PR em rascunho"
+    try:
+        repo_name = payload["repository"]["full_name"]
+        pr_number = pull_request.get("number", payload.get("number"))
+        head_sha = (pull_request.get("head") or {}).get("sha")
+        return ReviewRequest(repo_name, pr_number, head_sha, source="webhook"), None
+    except (KeyError, TypeError, ValueError):
+        return None, "evento sem repositório ou número do PR"
+
+
+def parse_review_request(payload):
+    """
+    Lê o corpo de um pedido da API local (POST /review).
+
+    Args:
+        payload (dict): {"repository": "owner/repo", "pr_number": 7, "review_type": "2" (opcional)}.
+
+    Returns:
+        ReviewRequest: Pedido de revisão.
+
+    Raises:
+        ValueError: Se o repositório ou o número do PR estiverem ausentes ou forem inválidos.
+    """
+    repo_name = payload.get("repository")
+    if not repo_name or "/" not in repo_name:
+        raise ValueError("Informe 'repository' no formato owner/repo.")
+    try:
+        pr_number = int(payload.get("pr_number"))
+    except (TypeError, ValueError):
+        raise ValueError("Informe 'pr_number' (número do PR).")
+    review_type = payload.get("review_type")
+    return ReviewRequest(repo_name, pr_number, payload.get("head_sha"), str(review_type) if review_type else None)
+
+
+def build_pull_request_event(repo_name, pr_number, head_sha, action="synchronize", draft=False):
+    """
+    Monta um evento `pull_request` mínimo, com os campos lidos pelo servidor (testes e envio local).
+
+    Args:
+        repo_name (str): Nome do repositório no formato "owner/repo".
+        pr_number (int): Número do Pull Request.
+        head_sha (str): Head do PR.
+        action (str): Ação do evento.
+        draft (bool): PR em rascunho.
+
+    Returns:
+        dict: Corpo do evento.
+    """
+    return {
+        "action": action,
+        "number": int(pr_number),
+        "pull_request": {"number": int(pr_number), "draft": draft, "head": {"sha": head_sha}},
+        "repository": {"full_name": repo_name},
+    }
+
+
+def encode_event(payload, secret=None, event="pull_request"):
+    """
+    Serializa um evento com os cabeçalhos que o GitHub envia.
+
+    Args:
+        payload (dict): Corpo do evento.
+        secret (str): Segredo do webhook (assina o corpo, se informado).
+        event (str): Nome do evento (X-GitHub-Event).
+
+    Returns:
+        tuple: (corpo em bytes, cabeçalhos).
+    """
+    body = json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json", "X-GitHub-Event": event}
+    if secret:
+        headers["X-Hub-Signature-256"] = sign_payload(secret, body)
+    return body, headers
@@ -0,0 +1,249 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from scripts.telemetry import run_telemetry
+from scripts.utils.cancellation import CancelToken, ReviewCancelled, cancellation_scope
+
+# Revisões executadas em paralelo e pedidos aguardando na fila do servidor
+DEFAULT_REVIEW_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+
+# Jobs recentes mantidos para consulta (GET /jobs)
+RECENT_JOBS = 50
+
+# Limites (em segundos) do histograma de duração das revisões
+JOB_DURATION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1800)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SUPERSEDED = "superseded"  # Substituído na fila por um pedido mais novo do mesmo PR
+CANCELLED = "cancelled"  # Interrompido durante a execução por um pedido mais novo do mesmo PR
+
+
+class ReviewJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, request):
+        """
+        Revisão de um PR na fila do servidor.
+
+        Args:
+            request (ReviewRequest): Pedido de revisão.
+        """
+        self.id = next(self._ids)
+        self.request = request
+        self.status = QUEUED
+        self.error = None
+        self.token = CancelToken()
+        self.finished = threading.Event()
+        # Job anterior do mesmo PR que ainda está terminando (este só começa depois dele)
+        self.previous = None
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Métricas só deste job (fases, endpoints, contadores e tokens), separadas das do processo
+        self.metrics = None
+
+    @property
+    def key(self):
+        return (self.request.repo_name, self.request.pr_number)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "enqueued_at": self.enqueued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "metrics": self.metrics.snapshot() if self.metrics is not None else None,
+            **self.request.to_dict(),
+        }
+
+
+class ReviewWorkerPool:
+    def __init__(self, run_job, workers=None, max_queue=None):
+        """
+        Fila de revisões executadas por workers de longa duração.
+
+        Os workers rodam no mesmo processo, então os pools HTTP, os clientes dos provedores, o
+        cache de revisões e os módulos já importados são reaproveitados entre os jobs.
+
+        Os pedidos são agrupados por (repositório, PR): um head novo substitui o job ainda na fila
+        e cancela o que estiver em execução no próximo ponto de verificação, então apenas o head
+        mais recente publica comentários. Jobs do mesmo PR nunca rodam ao mesmo tempo.
+
+        Args:
+            run_job (callable): Recebe o ReviewRequest e executa a revisão.
+            workers (int): Quantidade de workers (padrão: REVIEW_WORKERS).
+            max_queue (int): Tamanho máximo da fila (padrão: REVIEW_QUEUE_SIZE).
+        """
+        self.run_job = run_job
+        self.workers = max(1, int(workers or os.getenv("REVIEW_WORKERS") or DEFAULT_REVIEW_WORKERS))
+        self._queue = queue.Queue(maxsize=int(max_queue or os.getenv("REVIEW_QUEUE_SIZE") or DEFAULT_QUEUE_SIZE))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=RECENT_JOBS)
+        self._running = 0
+        self._latest = {}
+        self._totals = {"submitted": 0, "rejected": 0, "coalesced": 0, DONE: 0, FAILED: 0, SUPERSEDED: 0, CANCELLED: 0}
+        self._durations = [0] * (len(JOB_DURATION_BUCKETS) + 1)
+        self._duration_sum = 0.0
+
+    def start(self):
+        """Inicia os workers."""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"raico-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, request):
+        """
+        Enfileira um pedido de revisão.
+
+        Args:
+            request (ReviewRequest): Pedido de revisão.
+
+        Returns:
+            ReviewJob | None: Job que revisará o head pedido (um job existente, se for o mesmo head)
+                ou None se a fila estiver cheia.
+        """
+        job = ReviewJob(request)
+        with self._lock:
+            previous = self._latest.get(job.key)
+            if previous is not None and previous.status not in (QUEUED, RUNNING):
+                previous = None
+            if previous is not None and request.head_sha and request.head_sha == previous.request.head_sha and not request.review_type:
+                # Evento repetido para o mesmo head (ex: reopened + synchronize): nada a refazer
+                self._totals["coalesced"] += 1
+                return previous
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._totals["rejected"] += 1
+                return None
+            if previous is not None:
+                self._supersede(previous, request)
+                job.previous = previous if previous.status == RUNNING else previous.previous
+            self._latest[job.key] = job
+            self._totals["submitted"] += 1
+            self._recent.append(job)
+        return job
+
+    def _supersede(self, previous, request):
+        """Descarta (na fila) ou cancela (em execução) o job anterior do mesmo PR."""
+        head = (request.head_sha or "novo pedido")[:7]
+        if previous.status == QUEUED:
+            previous.status = SUPERSEDED
+            previous.error = f"substituído pelo head {head}"
+            self._totals[SUPERSEDED] += 1
+            print(f"⏭️ Job {previous.id} ({previous.request.repo_name}#{previous.request.pr_number}) substituído pelo head {head}.")
+        else:
+            previous.token.cancel(f"substituído pelo head {head}")
+            print(f"🛑 Cancelando o job {previous.id} ({previous.request.repo_name}#{previous.request.pr_number}): novo head {head}.")
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            if job.previous is not None and job.status != SUPERSEDED:
+                # O job cancelado do mesmo PR termina antes (nunca há duas revisões do PR publicando)
+                job.previous.finished.wait()
+            job.previous = None
+            with self._lock:
+                skip = job.status == SUPERSEDED
+                if not skip:
+                    job.status, job.started_at = RUNNING, time.time()
+                    self._running += 1
+            if skip:
+                job.finished.set()
+                self._queue.task_done()
+                continue
+            try:
+                with cancellation_scope(job.token), run_telemetry.job_scope() as metrics:
+                    job.metrics = metrics
+                    self.run_job(job.request)
+                job.status = DONE
+            except ReviewCancelled as e:
+                job.status, job.error = CANCELLED, str(e)
+                run_telemetry.increment("reviews_cancelled")
+                print(f"🛑 Job {job.id} ({job.request.repo_name}#{job.request.pr_number}) cancelado: {e}.")
+            except Exception as e:
+                job.status, job.error = FAILED, str(e)
+                print(f"Erro ao revisar {job.request.repo_name}#{job.request.pr_number}: {e}")
+            finally:
+                job.finished_at = time.time()
+                self._record(job)
+                job.finished.set()
+                self._queue.task_done()
+
+    def _record(self, job):
+        duration = job.finished_at - job.started_at
+        index = next((i for i, limit in enumerate(JOB_DURATION_BUCKETS) if duration <= limit), len(JOB_DURATION_BUCKETS))
+        with self._lock:
+            self._running -= 1
+            self._totals[job.status] += 1
+            if self._latest.get(job.key) is job:
+                del self._latest[job.key]
+            self._durations[index] += 1
+            self._duration_sum += duration
+
+    def join(self):
+        """Aguarda até que todos os jobs enfileirados terminem."""
+        self._queue.join()
+
+    def stop(self, timeout=None):
+        """
+        Encerra os workers depois de concluir os jobs já enfileirados.
+
+        Args:
+            timeout (float): Tempo máximo de espera por worker, em segundos.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def is_alive(self):
+        """Indica se todos os workers estão em execução."""
+        return bool(self._threads) and all(thread.is_alive() for thread in self._threads)
+
+    def get_job(self, job_id):
+        """Job recente pelo id (None se não estiver entre os RECENT_JOBS últimos)."""
+        with self._lock:
+            return next((job for job in self._recent if job.id == job_id), None)
+
+    def recent_jobs(self):
+        """Jobs recentes, do mais novo para o mais antigo."""
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._recent)]
+
+    def stats(self):
+        """
+        Métricas da fila e dos workers.
+
+        Returns:
+            dict: workers, queued, running, totais por situação e histograma de duração dos jobs.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "workers_alive": sum(thread.is_alive() for thread in self._threads),
+                "queued": self._queue.qsize(),
+                "running": self._running,
+                "jobs": dict(self._totals),
+                "duration_seconds": {
+                    "sum": round(self._duration_sum, 3),
+                    "buckets": dict(zip([str(limit) for limit in JOB_DURATION_BUCKETS] + ["+Inf"], self._durations)),
+                },
+            }
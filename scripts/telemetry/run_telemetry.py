@@ -0,0 +1,397 @@
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Limites (em ms) dos intervalos dos histogramas de latência por endpoint
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Fases da execução, na ordem em que aparecem no resumo
+PHASES = ("fetch_pr", "fetch_content", "analyze", "post_comments", "cleanup")
+PHASE_LABELS = {
+    "fetch_pr": "Buscar PR",
+    "fetch_content": "Buscar conteúdo",
+    "analyze": "Análise da IA",
+    "post_comments": "Publicar comentários",
+    "cleanup": "Limpeza de comentários",
+}
+
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Metrics:
+    def __init__(self):
+        """Métricas acumuladas da execução inteira ou de um único job (ver `job_scope`)."""
+        self.started = time.monotonic()
+        self.phases = {}
+        self.endpoints = {}
+        self.counters = {}
+        self.tokens = {}
+
+    def snapshot(self):
+        """
+        Métricas acumuladas até o momento.
+
+        Returns:
+            dict: wall_seconds, phases, endpoints (com histogramas e p50/p95), counters e tokens.
+        """
+        with _lock:
+            return {
+                "wall_seconds": round(time.monotonic() - self.started, 3),
+                "phases": {
+                    name: {"seconds": round(entry["seconds"], 3), "count": entry["count"]}
+                    for name, entry in self.phases.items()
+                },
+                "endpoints": {
+                    name: {
+                        "requests": entry["requests"],
+                        "errors": entry["errors"],
+                        "avg_ms": round(entry["total_ms"] / entry["requests"], 1),
+                        "p50_ms": _percentile(entry, 50),
+                        "p95_ms": _percentile(entry, 95),
+                        "max_ms": round(entry["max_ms"], 1),
+                        "histogram": dict(zip([f"<={limit}ms" for limit in LATENCY_BUCKETS_MS] + ["+Inf"], entry["buckets"])),
+                    }
+                    for name, entry in sorted(self.endpoints.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "tokens": {
+                    provider: {**usage, "uncached_tokens": usage["input_tokens"] - usage["cached_tokens"]}
+                    for provider, usage in self.tokens.items()
+                },
+            }
+
+
+# Métricas do processo e, quando houver, do job em andamento no contexto atual
+# (propagado às threads de `run_concurrently`, como o token de cancelamento)
+_process = Metrics()
+_current_job = contextvars.ContextVar("raico_job_metrics", default=None)
+
+
+def _scopes():
+    job = _current_job.get()
+    return (_process,) if job is None else (_process, job)
+
+
+@contextmanager
+def job_scope():
+    """
+    Registra as métricas feitas dentro do bloco também nas métricas de um job, além dos totais do processo.
+
+    Yields:
+        Metrics: Métricas do job.
+    """
+    metrics = Metrics()
+    reset_token = _current_job.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_job.reset(reset_token)
+
+
+def endpoint_name(method, url):
+    """
+    Nome agregado do endpoint (IDs, SHAs e caminhos de arquivo substituídos por marcadores).
+
+    Args:
+        method (str): Método HTTP.
+        url (str): URL da requisição.
+
+    Returns:
+        str: Ex: "GET api.github.com/repos/{owner}/{repo}/pulls/{n}/files".
+    """
+    parts = urlsplit(url)
+    segments = []
+    for segment in parts.path.strip("/").split("/"):
+        if SHA_PATTERN.fullmatch(segment):
+            segments.extend(["{sha}", "{path}"])
+            break
+        if segment.isdigit():
+            segments.append("{n}")
+        elif segments[-1:] == ["repos"]:
+            segments.append("{owner}")
+        elif segments[-2:] == ["repos", "{owner}"]:
+            segments.append("{repo}")
+        else:
+            segments.append(segment)
+    return f"{method.upper()} {parts.netloc}/{'/'.join(segments)}".rstrip("/")
+
+
+@contextmanager
+def phase(name):
+    """
+    Mede o tempo gasto em uma fase da execução.
+
+    Fases aninhadas na mesma thread são exclusivas: o tempo da fase interna não é somado à externa
+    (ex: a limpeza de comentários feita durante a publicação). Em análises concorrentes, o tempo de
+    cada fase é a soma do tempo de todas as threads.
+
+    Args:
+        name (str): Nome da fase (ver PHASES).
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    now = time.monotonic()
+    if stack:
+        _add_phase_time(stack[-1][0], now - stack[-1][1], count=0)
+    stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.monotonic()
+        _, started = stack.pop()
+        _add_phase_time(name, now - started, count=1)
+        if stack:
+            stack[-1][1] = now
+
+
+def _add_phase_time(name, seconds, count):
+    with _lock:
+        for metrics in _scopes():
+            entry = metrics.phases.setdefault(name, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += seconds
+            entry["count"] += count
+
+
+def record_request(method, url, status, seconds):
+    """
+    Registra uma chamada HTTP no histograma de latência do endpoint.
+
+    Args:
+        method (str): Método HTTP.
+        url (str): URL da requisição.
+        status (int | None): Status HTTP (None em falhas de conexão).
+        seconds (float): Duração até a resposta.
+    """
+    name = endpoint_name(method, url)
+    milliseconds = seconds * 1000
+    index = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= limit), len(LATENCY_BUCKETS_MS))
+    with _lock:
+        for metrics in _scopes():
+            entry = metrics.endpoints.setdefault(
+                name,
+                {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)},
+            )
+            entry["requests"] += 1
+            entry["errors"] += int(status is None or status >= 400)
+            entry["total_ms"] += milliseconds
+            entry["max_ms"] = max(entry["max_ms"], milliseconds)
+            entry["buckets"][index] += 1
+
+
+def increment(name, amount=1):
+    """
+    Incrementa um contador da execução (ex: retentativas, acertos do cache).
+
+    Args:
+        name (str): Nome do contador.
+        amount (int): Valor somado.
+    """
+    with _lock:
+        for metrics in _scopes():
+            metrics.counters[name] = metrics.counters.get(name, 0) + amount
+
+
+def record_job_tokens(ai_provider, input_tokens, cached_tokens, output_tokens):
+    """
+    Soma os tokens de uma chamada ao provedor nas métricas do job em andamento
+    (os totais do processo ficam em `providers.usage`).
+
+    Args:
+        ai_provider (str): Provedor de IA.
+        input_tokens (int): Tokens de entrada, incluindo os lidos do cache.
+        cached_tokens (int): Tokens de entrada servidos pelo cache de prefixo.
+        output_tokens (int): Tokens gerados.
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    with _lock:
+        usage = job.tokens.setdefault(
+            ai_provider, {"requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+        )
+        usage["requests"] += 1
+        usage["input_tokens"] += input_tokens or 0
+        usage["cached_tokens"] += cached_tokens or 0
+        usage["output_tokens"] += output_tokens or 0
+
+
+def _percentile(entry, percentile):
+    """Percentil aproximado pelo limite superior do intervalo do histograma."""
+    target = entry["requests"] * percentile / 100
+    seen = 0
+    for index, count in enumerate(entry["buckets"]):
+        seen += count
+        if count and seen >= target:
+            limit = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else entry["max_ms"]
+            return round(min(limit, entry["max_ms"]))
+    return None
+
+
+def snapshot():
+    """
+    Métricas acumuladas da execução.
+
+    Returns:
+        dict: wall_seconds, phases, endpoints (com histogramas e p50/p95), counters, tokens,
+        streaming e rate_limit.
+    """
+    from scripts.providers.streaming import get_stats as get_streaming_stats
+    from scripts.providers.usage import get_usage_stats
+    from scripts.transport.rate_limiter import get_stats as get_rate_limit_stats
+
+    return {
+        **_process.snapshot(),
+        "tokens": get_usage_stats(),
+        "streaming": get_streaming_stats(),
+        "rate_limit": get_rate_limit_stats(),
+    }
+
+
+def render_markdown(data, title="📈 RAICO — telemetria da execução"):
+    """
+    Formata as métricas como markdown (resumo do job no GitHub Actions).
+
+    Args:
+        data (dict): Resultado de `snapshot` (com metadados opcionais em `run`).
+        title (str): Título da seção.
+
+    Returns:
+        str: Tabelas de fases, endpoints, tokens e contadores.
+    """
+    run = data.get("run", {})
+    context = ", ".join(f"{key}: `{value}`" for key, value in run.items() if value)
+    lines = [f"### {title}", "", f"Tempo total: **{data['wall_seconds']:.1f}s**" + (f" ({context})" if context else ""), ""]
+
+    lines += ["| Fase | Tempo (s) | Execuções |", "| --- | ---: | ---: |"]
+    ordered = [name for name in PHASES if name in data["phases"]] + sorted(set(data["phases"]) - set(PHASES))
+    for name in ordered:
+        entry = data["phases"][name]
+        lines.append(f"| {PHASE_LABELS.get(name, name)} | {entry['seconds']:.2f} | {entry['count']} |")
+
+    if data["endpoints"]:
+        lines += ["", "| Endpoint | Requisições | Erros | p50 (ms) | p95 (ms) | Máx (ms) |", "| --- | ---: | ---: | ---: | ---: | ---: |"]
+        for name, entry in data["endpoints"].items():
+            lines.append(
+                f"| `{name}` | {entry['requests']} | {entry['errors']} | {entry['p50_ms']} | {entry['p95_ms']} | {entry['max_ms']:.0f} |"
+            )
+
+    if data["tokens"]:
+        lines += ["", "| Provedor | Requisições | Entrada | Em cache | Sem cache | Saída |", "| --- | ---: | ---: | ---: | ---: | ---: |"]
+        for provider, usage in data["tokens"].items():
+            lines.append(
+                f"| {provider} | {usage['requests']} | {usage['input_tokens']} | {usage['cached_tokens']} "
+                f"| {usage['uncached_tokens']} | {usage['output_tokens']} |"
+            )
+
+    counters = {**data["counters"], **{f"streaming_{key}": value for key, value in data["streaming"].items()}}
+    if counters:
+        lines += ["", "Contadores: " + ", ".join(f"`{name}`={value}" for name, value in counters.items())]
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_labels(**labels):
+    """Rótulos no formato de exposição do Prometheus (ex: {endpoint="GET ..."})."""
+    escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"') for key, value in labels.items()}
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}" if labels else ""
+
+
+def render_prometheus(data, prefix="raico"):
+    """
+    Formata as métricas no formato de exposição de texto do Prometheus (endpoint /metrics do servidor).
+
+    Args:
+        data (dict): Resultado de `snapshot`.
+        prefix (str): Prefixo dos nomes das métricas.
+
+    Returns:
+        str: Métricas acumuladas desde o início do processo (ou o último `reset`).
+    """
+    lines = [f"# TYPE {prefix}_uptime_seconds gauge", f"{prefix}_uptime_seconds {data['wall_seconds']}"]
+
+    lines.append(f"# TYPE {prefix}_phase_seconds_total counter")
+    for name, entry in data["phases"].items():
+        lines.append(f"{prefix}_phase_seconds_total{prometheus_labels(phase=name)} {entry['seconds']}")
+
+    lines += [f"# TYPE {prefix}_http_requests_total counter", f"# TYPE {prefix}_http_errors_total counter"]
+    for name, entry in data["endpoints"].items():
+        lines.append(f"{prefix}_http_requests_total{prometheus_labels(endpoint=name)} {entry['requests']}")
+        lines.append(f"{prefix}_http_errors_total{prometheus_labels(endpoint=name)} {entry['errors']}")
+
+    lines.append(f"# TYPE {prefix}_http_request_duration_ms histogram")
+    for name, entry in data["endpoints"].items():
+        seen = 0
+        for limit, count in zip([*LATENCY_BUCKETS_MS, "+Inf"], entry["histogram"].values()):
+            seen += count
+            lines.append(f"{prefix}_http_request_duration_ms_bucket{prometheus_labels(endpoint=name, le=limit)} {seen}")
+        lines.append(f"{prefix}_http_request_duration_ms_count{prometheus_labels(endpoint=name)} {entry['requests']}")
+        lines.append(f"{prefix}_http_request_duration_ms_sum{prometheus_labels(endpoint=name)} {round(entry['avg_ms'] * entry['requests'], 1)}")
+
+    lines.append(f"# TYPE {prefix}_tokens_total counter")
+    for provider, usage in data["tokens"].items():
+        for kind in ("input", "cached", "output"):
+            lines.append(f"{prefix}_tokens_total{prometheus_labels(provider=provider, kind=kind)} {usage[f'{kind}_tokens']}")
+
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    counters = {**data["counters"], **{f"streaming_{key}": value for key, value in data["streaming"].items()}}
+    for name, value in counters.items():
+        lines.append(f"{prefix}_events_total{prometheus_labels(name=name)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def emit(**metadata):
+    """
+    Publica as métricas da execução: JSON em TELEMETRY_PATH (ou na saída padrão, se não definido)
+    e markdown em $GITHUB_STEP_SUMMARY (quando executado no GitHub Actions).
+
+    Args:
+        **metadata: Contexto da execução incluído no resultado (ex: provider, review_type, pr).
+
+    Returns:
+        dict: Métricas publicadas.
+    """
+    data = {"run": metadata, **snapshot()}
+
+    path = os.getenv("TELEMETRY_PATH")
+    if path:
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2, ensure_ascii=False)
+        print(f"📈 Telemetria gravada em {path}.")
+    else:
+        print(f"📈 Telemetria: {json.dumps(data, ensure_ascii=False)}")
+
+    summary_path = os.getenv("GITHUB_STEP_SUMMARY")
+    if summary_path:
+        try:
+            with open(summary_path, "a") as file:
+                file.write(render_markdown(data))
+        except OSError as e:
+            print(f"⚠️ Não foi possível escrever o resumo do job: {e}")
+    return data
+
+
+def reset():
+    """
+    Zera todas as métricas do processo: fases, endpoints, contadores, tokens, streaming e rate limit.
+
+    As métricas de cada job ficam separadas em `job_scope`, sem precisar zerar as do processo.
+    """
+    from scripts.providers.streaming import reset_stats as reset_streaming_stats
+    from scripts.providers.usage import reset_usage_stats
+    from scripts.transport.rate_limiter import reset_stats as reset_rate_limit_stats
+
+    global _process
+    with _lock:
+        _process = Metrics()
+    reset_usage_stats()
+    reset_streaming_stats()
+    reset_rate_limit_stats()
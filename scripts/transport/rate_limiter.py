@@ -0,0 +1,458 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from scripts.utils import cancellation
+
+# Taxa inicial (e teto, sem informação dos cabeçalhos) de requisições por minuto por host.
+# RATE_LIMIT_RPM=0 desativa o agendador.
+DEFAULT_REQUESTS_PER_MINUTE = 600
+
+# Rajada permitida: fração de um minuto que pode ser consumida de uma só vez
+BURST_SECONDS = 10
+
+# AIMD: aumento aditivo (por resposta bem-sucedida) e redução multiplicativa (por throttling)
+ADDITIVE_INCREASE = 5
+MULTIPLICATIVE_DECREASE = 0.5
+MIN_REQUESTS_PER_MINUTE = 6
+
+# Fração da cota anunciada pelos cabeçalhos usada como teto (fica logo abaixo do limite)
+QUOTA_HEADROOM = 0.95
+
+# Abaixo desta fração do limite a cota restante é considerada baixa: o ritmo passa a distribuí-la até o reset
+LOW_QUOTA_FRACTION = 0.1
+
+# Espera usada quando um 429 chega sem Retry-After nem horário de reset
+DEFAULT_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 300.0
+
+# Quantas vezes uma requisição limitada (429) é reenviada após aguardar
+DEFAULT_MAX_WAITS = 3
+
+# Cabeçalhos de rate limit, por família: (limite, restante, reset, janela do limite em segundos)
+REQUEST_HEADERS = (
+    ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests", 60),  # OpenAI
+    ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining",
+     "anthropic-ratelimit-requests-reset", 60),  # Anthropic
+    ("x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset", 3600),  # GitHub
+)
+TOKEN_HEADERS = (
+    ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens", 60),
+    ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset", 60),
+)
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_max_waits():
+    """Quantas vezes uma requisição limitada é reenviada (variável RATE_LIMIT_MAX_WAITS)."""
+    return max(0, int(_env_float("RATE_LIMIT_MAX_WAITS", DEFAULT_MAX_WAITS)))
+
+
+def parse_duration(value, now=None):
+    """
+    Converte o valor de um cabeçalho de reset em segundos a partir de agora.
+
+    Aceita durações ("1s", "6m0s", "20ms"), timestamps Unix (GitHub) e datas RFC 3339 (Anthropic).
+
+    Args:
+        value (str): Valor do cabeçalho.
+        now (float): Horário atual (epoch), para testes.
+
+    Returns:
+        float | None: Segundos até o reset, ou None se o valor não for reconhecido.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    now = time.time() if now is None else now
+
+    try:
+        number = float(value)
+        # Valores muito grandes são timestamps Unix (X-RateLimit-Reset do GitHub)
+        return max(number - now, 0.0) if number > 1e9 else max(number, 0.0)
+    except ValueError:
+        pass
+
+    parts = DURATION_PART.findall(value)
+    if parts and "".join(amount + unit for amount, unit in parts) == value:
+        factors = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        return sum(float(amount) * factors[unit] for amount, unit in parts)
+
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return max(moment.timestamp() - now, 0.0)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers, now=None):
+    """
+    Lê o tempo de espera pedido pelo servidor (Retry-After, em segundos ou data HTTP, ou retry-after-ms).
+
+    Args:
+        headers (Mapping): Cabeçalhos da resposta (sem diferenciar maiúsculas).
+        now (float): Horário atual (epoch), para testes.
+
+    Returns:
+        float | None: Segundos a aguardar.
+    """
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds is not None:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(moment.timestamp() - (time.time() if now is None else now), 0.0)
+
+
+def estimate_request_tokens(json_body=None, data=None):
+    """
+    Estima os tokens de uma requisição a partir do corpo (aproximadamente 4 bytes por token).
+
+    Args:
+        json_body: Corpo passado como `json=`.
+        data: Corpo passado como `data=` (str ou bytes).
+
+    Returns:
+        int: Tokens estimados (0 sem corpo).
+    """
+    if json_body is not None:
+        try:
+            return len(json.dumps(json_body)) // 4
+        except (TypeError, ValueError):
+            return 0
+    if isinstance(data, (str, bytes, bytearray)):
+        return len(data) // 4
+    return 0
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, burst_seconds=BURST_SECONDS):
+        """
+        Balde de tokens com reserva: quem chega consome (mesmo ficando negativo) e recebe o tempo
+        que deve aguardar, o que mantém a ordem de chegada entre as threads.
+
+        Args:
+            rate_per_minute (float): Taxa de reposição por minuto.
+            burst_seconds (float): Rajada permitida, em segundos de taxa.
+        """
+        self.burst_seconds = burst_seconds
+        self.rate = rate_per_minute
+        self.level = self.capacity
+        self.updated = None
+
+    @property
+    def capacity(self):
+        return max(1.0, self.rate * self.burst_seconds / 60)
+
+    def set_rate(self, rate_per_minute):
+        self.rate = max(rate_per_minute, 1e-6)
+        self.level = min(self.level, self.capacity)
+
+    def reserve(self, amount, now):
+        """
+        Consome `amount` tokens.
+
+        Args:
+            amount (float): Tokens a consumir.
+            now (float): Relógio monotônico atual.
+
+        Returns:
+            float: Segundos a aguardar antes de usar a reserva.
+        """
+        if self.updated is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate / 60)
+        self.updated = now
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level * 60 / self.rate
+
+
+class HostLimiter:
+    def __init__(self, host, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=None,
+                 clock=None, sleep=None):
+        """
+        Agendador de um host: baldes de requisições/min e tokens/min ajustados por AIMD
+        a partir dos 429 e dos cabeçalhos de rate limit observados.
+
+        Args:
+            host (str): Esquema + host (ex: https://api.openai.com).
+            requests_per_minute (float): Taxa inicial e teto de requisições por minuto.
+            tokens_per_minute (float): Taxa de tokens por minuto (None: só após os cabeçalhos informarem).
+            clock (callable): Relógio monotônico (para testes).
+            sleep (callable): Função de espera (para testes).
+        """
+        self.host = host
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or cancellation.sleep
+        self._lock = threading.Lock()
+
+        self.requests = TokenBucket(requests_per_minute)
+        self.request_ceiling = requests_per_minute
+        self.configured_requests_per_minute = requests_per_minute
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.token_ceiling = tokens_per_minute
+        self.paused_until = 0.0
+
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, tokens=0):
+        """
+        Aguarda até que a requisição possa ser enviada.
+
+        Args:
+            tokens (int): Tokens estimados da requisição.
+
+        Returns:
+            float: Segundos aguardados.
+
+        Raises:
+            ReviewCancelled: Se a revisão for cancelada durante a espera (a reserva é devolvida aos baldes).
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                self._sleep(wait)
+            except cancellation.ReviewCancelled:
+                # A requisição não será enviada: a cota reservada volta para as outras revisões
+                self.refund(tokens)
+                raise
+        return wait
+
+    def reserve(self, tokens=0):
+        """
+        Reserva a vez da requisição sem aguardar (o chamador espera o tempo devolvido, ex: com `asyncio.sleep`).
+
+        Args:
+            tokens (int): Tokens estimados da requisição.
+
+        Returns:
+            float: Segundos a aguardar antes de enviar.
+        """
+        with self._lock:
+            now = self._clock()
+            wait = max(self.paused_until - now, 0.0)
+            wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.waited_seconds += wait
+        return wait
+
+    def refund(self, tokens=0):
+        """
+        Devolve aos baldes uma reserva que não será usada (ex: revisão cancelada durante a espera).
+
+        Args:
+            tokens (int): Tokens informados na reserva.
+        """
+        with self._lock:
+            self.requests.level += 1
+            if self.tokens is not None and tokens:
+                self.tokens.level += tokens
+
+    def observe(self, status_code, headers):
+        """
+        Ajusta as taxas com base na resposta.
+
+        Args:
+            status_code (int): Status HTTP.
+            headers (Mapping): Cabeçalhos da resposta (sem diferenciar maiúsculas).
+
+        Returns:
+            float | None: Segundos de pausa quando a requisição foi limitada (deve ser reenviada), senão None.
+        """
+        retry_after = parse_retry_after(headers)
+        exhausted = headers.get("x-ratelimit-remaining") == "0"
+        throttled = status_code == 429 or (status_code == 403 and (retry_after is not None or exhausted))
+
+        with self._lock:
+            now = self._clock()
+            request_quota = self._read_quota(headers, REQUEST_HEADERS, self.configured_requests_per_minute)
+            token_quota = self._read_quota(headers, TOKEN_HEADERS)
+
+            if request_quota is not None:
+                self.request_ceiling = request_quota
+            if token_quota is not None:
+                self.token_ceiling = token_quota
+                if self.tokens is None:
+                    self.tokens = TokenBucket(token_quota)
+
+            if throttled:
+                self.throttled += 1
+                self.requests.set_rate(max(MIN_REQUESTS_PER_MINUTE, self.requests.rate * MULTIPLICATIVE_DECREASE))
+                if self.tokens is not None:
+                    self.tokens.set_rate(self.tokens.rate * MULTIPLICATIVE_DECREASE)
+
+                if retry_after is None:
+                    retry_after = self._reset_seconds(headers) or DEFAULT_BACKOFF_SECONDS
+                pause = min(retry_after, MAX_BACKOFF_SECONDS)
+                self.paused_until = max(self.paused_until, now + pause)
+                return pause
+
+            # Aumento aditivo até o teto conhecido (cota dos cabeçalhos ou taxa configurada)
+            self.requests.set_rate(min(self.request_ceiling, self.requests.rate + ADDITIVE_INCREASE))
+            if self.tokens is not None and self.token_ceiling:
+                step = self.token_ceiling * ADDITIVE_INCREASE / max(self.request_ceiling, 1)
+                self.tokens.set_rate(min(self.token_ceiling, self.tokens.rate + step))
+            return None
+
+    def _read_quota(self, headers, families, default=None):
+        """
+        Teto (por minuto) a partir dos cabeçalhos de rate limit, ou None se não houver cabeçalhos.
+
+        Cotas por minuto (OpenAI, Anthropic) valem como teto. Cotas de janelas longas (GitHub: 5000/h)
+        não limitam o ritmo enquanto sobra bastante: a média da hora (~79 req/min) anularia a
+        concorrência das revisões, e a própria cota absorve as rajadas. Quando a cota restante fica
+        baixa, o ritmo passa a distribuí-la até o reset.
+
+        Args:
+            headers (Mapping): Cabeçalhos da resposta.
+            families (tuple): Famílias de cabeçalhos (limite, restante, reset, janela).
+            default (float): Teto configurado, usado em janelas longas com cota sobrando.
+
+        Returns:
+            float | None: Requisições (ou tokens) por minuto.
+        """
+        for limit_name, remaining_name, reset_name, window in families:
+            limit = headers.get(limit_name)
+            if limit is None:
+                continue
+            try:
+                limit = float(limit)
+                remaining = float(headers.get(remaining_name, limit))
+            except ValueError:
+                return None
+
+            quota = limit * 60 / window * QUOTA_HEADROOM
+            if window > 60:
+                quota = max(quota, default or 0.0)
+
+            reset = parse_duration(headers.get(reset_name))
+            if remaining <= limit * LOW_QUOTA_FRACTION and reset:
+                # Cota baixa: distribui o que resta até o reset, para não esgotá-la antes da hora
+                quota = min(quota, remaining * 60 / reset * QUOTA_HEADROOM)
+            return max(quota, 1.0)
+        return None
+
+    def _reset_seconds(self, headers):
+        for _, remaining_name, reset_name, _ in REQUEST_HEADERS + TOKEN_HEADERS:
+            if headers.get(remaining_name) in ("0", 0):
+                return parse_duration(headers.get(reset_name))
+        return None
+
+    def reset_stats(self):
+        """Zera os contadores (as taxas aprendidas com os 429 e os cabeçalhos são mantidas)."""
+        with self._lock:
+            self.throttled = 0
+            self.waited_seconds = 0.0
+
+    def stats(self):
+        """
+        Contadores do agendador do host.
+
+        Returns:
+            dict: requisições limitadas, segundos aguardados e taxas atuais por minuto.
+        """
+        with self._lock:
+            return {
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "requests_per_minute": round(self.requests.rate, 1),
+                "tokens_per_minute": round(self.tokens.rate, 1) if self.tokens is not None else None,
+            }
+
+
+class NullLimiter:
+    """Agendador desativado (RATE_LIMIT_RPM=0)."""
+
+    def acquire(self, tokens=0):
+        return 0.0
+
+    def reserve(self, tokens=0):
+        return 0.0
+
+    def refund(self, tokens=0):
+        return
+
+    def observe(self, status_code, headers):
+        return None
+
+    def reset_stats(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def get_limiter(url):
+    """
+    Obtém o agendador do host da URL, criando-o no primeiro uso
+    (variáveis RATE_LIMIT_RPM e RATE_LIMIT_TPM).
+
+    Args:
+        url (str): URL (ou apenas esquema + host) do destino.
+
+    Returns:
+        HostLimiter | NullLimiter: Agendador compartilhado do host.
+    """
+    parts = urlsplit(str(url))
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        if host not in _limiters:
+            requests_per_minute = _env_float("RATE_LIMIT_RPM", DEFAULT_REQUESTS_PER_MINUTE)
+            tokens_per_minute = _env_float("RATE_LIMIT_TPM", 0) or None
+            if requests_per_minute <= 0:
+                _limiters[host] = NullLimiter()
+            else:
+                _limiters[host] = HostLimiter(host, requests_per_minute, tokens_per_minute)
+        return _limiters[host]
+
+
+def get_stats():
+    """
+    Contadores de todos os hosts usados na execução.
+
+    Returns:
+        dict: Host -> contadores (ver HostLimiter.stats).
+    """
+    with _lock:
+        limiters = dict(_limiters)
+    return {host: limiter.stats() for host, limiter in limiters.items() if limiter.stats()}
+
+
+def reset_stats():
+    """Zera os contadores de todos os hosts (ver `run_telemetry.reset`)."""
+    with _lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limiter.reset_stats()
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.telemetry import run_telemetry
+from scripts.transport import rate_limiter
+
+# Tamanho padrão do pool de conexões keep-alive por host
+DEFAULT_POOL_SIZE = 10
+
+# Timeouts padrão (em segundos): conexão e leitura. Antes não havia timeout algum.
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 120
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _env_number(name, default, cast=float):
+    """Lê um número do ambiente, caindo no padrão quando ausente ou inválido."""
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_pool_size():
+    """
+    Tamanho do pool de conexões por host (variável HTTP_POOL_SIZE).
+
+    Returns:
+        int: Número máximo de conexões mantidas abertas por host.
+    """
+    return max(1, _env_number("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE, int))
+
+
+def get_timeout():
+    """
+    Timeout padrão das requisições (variáveis HTTP_CONNECT_TIMEOUT e HTTP_TIMEOUT).
+
+    Returns:
+        tuple: (timeout de conexão, timeout de leitura) em segundos.
+    """
+    return (
+        _env_number("HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        _env_number("HTTP_TIMEOUT", DEFAULT_READ_TIMEOUT),
+    )
+
+
+class PooledSession(requests.Session):
+    def __init__(self, pool_size, timeout, max_waits=None):
+        """
+        Sessão HTTP com pool de conexões keep-alive e timeout padrão.
+
+        Toda requisição passa pelo agendador de rate limit do host (`rate_limiter`): aguarda a vez
+        antes de enviar e, ao receber 429, pausa o host e reenvia (até RATE_LIMIT_MAX_WAITS vezes).
+
+        Args:
+            pool_size (int): Número máximo de conexões mantidas por host.
+            timeout (tuple): Timeout padrão (conexão, leitura) aplicado quando não informado.
+            max_waits (int): Reenvios após um 429 (padrão: RATE_LIMIT_MAX_WAITS); 0 devolve o 429 ao
+                chamador, para quem já tem a própria política de retentativas (ex: provedores de IA).
+        """
+        super().__init__()
+        self.timeout = timeout
+        self.max_waits = max_waits
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = rate_limiter.get_limiter(url)
+        tokens = rate_limiter.estimate_request_tokens(kwargs.get("json"), kwargs.get("data"))
+
+        max_waits = rate_limiter.get_max_waits() if self.max_waits is None else self.max_waits
+        for attempt in range(max_waits + 1):
+            limiter.acquire(tokens)
+            started = time.monotonic()
+            try:
+                response = super().request(method, url, **kwargs)
+            except Exception:
+                run_telemetry.record_request(method, url, None, time.monotonic() - started)
+                raise
+            run_telemetry.record_request(method, url, response.status_code, time.monotonic() - started)
+            pause = limiter.observe(response.status_code, response.headers)
+            if pause is None or attempt == max_waits:
+                return response
+            print(f"⏳ Limite de requisições atingido em {urlsplit(url).netloc}; aguardando {pause:.1f}s.")
+            run_telemetry.increment("rate_limit_waits")
+            response.close()
+
+
+def get_session(url, max_waits=None):
+    """
+    Obtém a sessão compartilhada do host da URL, criando-a no primeiro uso.
+
+    Args:
+        url (str): URL (ou apenas esquema + host) do destino.
+        max_waits (int): Reenvios após um 429 nas requisições ao host (ver `PooledSession`).
+
+    Returns:
+        PooledSession: Sessão reutilizável para o host.
+    """
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        if host not in _sessions:
+            _sessions[host] = PooledSession(get_pool_size(), get_timeout())
+        if max_waits is not None:
+            _sessions[host].max_waits = max_waits
+        return _sessions[host]
+
+
+def request(method, url, **kwargs):
+    """
+    Executa uma requisição HTTP reaproveitando a sessão do host.
+
+    Args:
+        method (str): Método HTTP (GET, POST, ...).
+        url (str): URL de destino.
+        **kwargs: Argumentos repassados para `requests.Session.request`.
+
+    Returns:
+        requests.Response: Resposta da requisição.
+    """
+    return get_session(url).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
+
+
+def close_sessions():
+    """Fecha todas as sessões abertas (útil ao final de execuções longas)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
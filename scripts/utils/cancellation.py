@@ -0,0 +1,100 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReviewCancelled(BaseException):
+    """
+    Revisão cancelada (ex: um push mais novo substituiu o head revisado).
+
+    Herda de BaseException, como `asyncio.CancelledError`, para atravessar os `except Exception`
+    dos modos de revisão: nenhum comentário de erro é publicado e nada é gravado no cache.
+    """
+
+
+class CancelToken:
+    def __init__(self):
+        """Sinal de cancelamento compartilhado pelas threads de uma revisão."""
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason="cancelada"):
+        """
+        Solicita o cancelamento; a revisão para no próximo ponto de verificação.
+
+        Args:
+            reason (str): Motivo (ex: "substituída pelo head abc1234").
+        """
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """
+        Raises:
+            ReviewCancelled: Se o cancelamento foi solicitado.
+        """
+        if self._event.is_set():
+            raise ReviewCancelled(self.reason)
+
+    def wait(self, seconds):
+        """Aguarda `seconds` ou até o cancelamento, o que ocorrer primeiro (então levanta ReviewCancelled)."""
+        if self._event.wait(seconds):
+            raise ReviewCancelled(self.reason)
+
+
+# Token da revisão em andamento no contexto atual (propagado às threads de `run_concurrently`)
+_current_token = contextvars.ContextVar("raico_cancel_token", default=None)
+
+
+def current_token():
+    """Token de cancelamento da revisão em andamento (None fora do modo servidor)."""
+    return _current_token.get()
+
+
+@contextmanager
+def cancellation_scope(token):
+    """
+    Associa o token às chamadas feitas dentro do bloco.
+
+    Args:
+        token (CancelToken): Token da revisão.
+    """
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def checkpoint():
+    """
+    Ponto de verificação: interrompe a revisão se ela foi cancelada.
+
+    Raises:
+        ReviewCancelled: Se o token do contexto atual foi cancelado.
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def sleep(seconds):
+    """
+    `time.sleep` interrompível pelo cancelamento da revisão do contexto atual.
+
+    Args:
+        seconds (float): Tempo de espera.
+
+    Raises:
+        ReviewCancelled: Se a revisão for cancelada durante a espera.
+    """
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.wait(seconds)
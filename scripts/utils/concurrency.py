@@ -0,0 +1,52 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Quantidade padrão de análises executadas em paralelo quando MAX_CONCURRENCY não é informado
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def get_max_concurrency(max_concurrency=None):
+    """
+    Resolve o limite de concorrência a partir do parâmetro ou da variável de ambiente MAX_CONCURRENCY.
+
+    Args:
+        max_concurrency (int | str | None): Valor explícito (tem prioridade sobre o ambiente).
+
+    Returns:
+        int: Número máximo de workers (sempre >= 1).
+    """
+    value = max_concurrency if max_concurrency is not None else os.getenv("MAX_CONCURRENCY")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = DEFAULT_MAX_CONCURRENCY
+    return max(1, value)
+
+
+def run_concurrently(worker, items, max_concurrency=None):
+    """
+    Executa `worker` para cada item com concorrência limitada, preservando a ordem de entrada.
+
+    Os resultados são devolvidos na mesma ordem de `items`, independentemente da ordem em que
+    as chamadas terminam, para que o feedback consolidado seja determinístico.
+
+    Args:
+        worker (callable): Função chamada com cada item.
+        items (iterable): Itens a processar (ex: arquivos do PR).
+        max_concurrency (int | str | None): Limite de workers (padrão: MAX_CONCURRENCY).
+
+    Returns:
+        list: Resultado de `worker` para cada item, na ordem original.
+    """
+    # Materializa a lista na thread principal (ex: PaginatedList do PyGithub não é thread-safe)
+    items = list(items)
+    workers = min(get_max_concurrency(max_concurrency), len(items))
+
+    if workers <= 1:
+        return [worker(item) for item in items]
+
+    # Cada chamada roda com uma cópia do contexto de quem chamou (ex: o token de cancelamento da revisão)
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="raico") as executor:
+        return list(executor.map(lambda item: context.copy().run(worker, item), items))
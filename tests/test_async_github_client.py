@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github.GithubException import GithubException
+
+from scripts.github_handler.async_client import AsyncGithubClient, page_number, parse_link_header
+
+API = "https://api.github.test"
+LATENCY = 0.1
+
+
+def make_transport(files=450, per_page=100):
+    """API falsa com a lista de arquivos paginada como a do GitHub e latência fixa por requisição."""
+    state = {"requests": 0, "running": 0, "peak": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(LATENCY)
+        state["running"] -= 1
+
+        if request.url.path.endswith("/pulls/7/files"):
+            page = int(request.url.params.get("page", 1))
+            items = [{"filename": f"src/arquivo_{index}.py", "status": "modified", "sha": "a" * 40, "patch": "@@ -1 +1 @@\n+x"}
+                     for index in range((page - 1) * per_page, min(page * per_page, files))]
+            last = -(-files // per_page)
+            url = f"{API}/repos/o/r/pulls/7/files?per_page={per_page}"
+            links = [f'<{url}&page={page + 1}>; rel="next"', f'<{url}&page={last}>; rel="last"'] if page < last else []
+            return httpx.Response(200, json=items, headers={"Link": ", ".join(links)})
+        if request.url.path.endswith("/issues/7/comments"):
+            return httpx.Response(200, json=[
+                {"id": 1, "body": "ok <!-- raico:last-reviewed-sha=" + "b" * 40 + " -->",
+                 "user": {"login": "github-actions[bot]"}, "created_at": "2024-05-02T10:00:00Z"},
+                {"id": 2, "body": "comentário humano", "user": {"login": "dev"}, "created_at": "2024-05-03T10:00:00Z"},
+            ])
+        if request.url.path.endswith("/pulls/7/reviews"):
+            return httpx.Response(200, json=[
+                {"id": 3, "body": "<!-- raico:last-reviewed-sha=" + "c" * 40 + " -->",
+                 "user": {"login": "github-actions[bot]"}, "submitted_at": "2024-05-04T10:00:00Z"},
+            ])
+        if request.url.path.endswith("/pulls/7/comments"):
+            return httpx.Response(200, json=[{"id": 4, "body": "inline", "user": {"login": "github-actions[bot]"}}])
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    return httpx.MockTransport(handler), state
+
+
+def test_parse_link_header():
+    """O cabeçalho Link informa a próxima e a última página."""
+    links = parse_link_header(f'<{API}/x?per_page=100&page=2>; rel="next", <{API}/x?per_page=100&page=15>; rel="last"')
+    assert page_number(links["next"]) == 2 and page_number(links["last"]) == 15
+    assert parse_link_header(None) == {}
+
+
+def test_pages_after_the_first_are_fetched_concurrently(monkeypatch):
+    """Depois da primeira página, as demais são buscadas juntas: o tempo é ~2 latências, não 1 por página."""
+    monkeypatch.setenv("RATE_LIMIT_RPM", "0")
+    transport, state = make_transport(files=450)
+
+    async def main():
+        async with AsyncGithubClient("token", api_url=API, transport=transport) as client:
+            started = time.monotonic()
+            files = await client.get_pull_files("o/r", 7)
+            return files, time.monotonic() - started
+
+    files, elapsed = asyncio.run(main())
+
+    assert [file.filename for file in files] == [f"src/arquivo_{index}.py" for index in range(450)]
+    assert state["requests"] == 5 and state["peak"] == 4
+    assert elapsed < LATENCY * 3.5  # em sequência seriam 5 latências
+
+
+def test_handler_operations_and_errors(monkeypatch):
+    """Último head revisado, comentários do bot e erros da API com a mesma exceção do PyGithub."""
+    monkeypatch.setenv("RATE_LIMIT_RPM", "0")
+    transport, _ = make_transport()
+
+    async def main():
+        async with AsyncGithubClient("token", api_url=API, transport=transport) as client:
+            last_reviewed = await client.get_last_reviewed_sha("o/r", 7)
+            comments = await client.get_bot_comments("o/r", 7)
+            with pytest.raises(GithubException) as error:
+                await client.get_pull("o/r", 99)
+            return last_reviewed, comments, error.value.status
+
+    last_reviewed, comments, status = asyncio.run(main())
+
+    assert last_reviewed == "c" * 40
+    assert [(comment.kind, comment.id) for comment in comments] == [("issue", 1), ("review", 4)]
+    assert status == 404
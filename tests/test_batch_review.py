@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.batch.batch_review import build_search_query, parse_pr_ref, read_pr_refs, run_batch, summarize
+from scripts.cache.review_cache import NullReviewCache
+
+
+def test_parse_pr_refs(tmp_path):
+    """Referências curtas, URLs e números (com repositório padrão) viram pedidos de revisão."""
+    refs = ["o/r#7", "https://github.com/o/outro/pull/12", "o/r/pull/8/", "#9", "10"]
+    parsed = [(request.repo_name, request.pr_number) for request in (parse_pr_ref(ref, "o/padrao") for ref in refs)]
+    assert parsed == [("o/r", 7), ("o/outro", 12), ("o/r", 8), ("o/padrao", 9), ("o/padrao", 10)]
+
+    with pytest.raises(ValueError):
+        parse_pr_ref("7")
+    with pytest.raises(ValueError):
+        parse_pr_ref("o/r7")
+
+    path = tmp_path / "prs.txt"
+    path.write_text("# varredura noturna\no/r#1\n\n  o/r#2  \n")
+    assert read_pr_refs(str(path)) == ["o/r#1", "o/r#2"]
+
+
+def test_build_search_query():
+    """A busca restringe a PRs abertos dos repositórios e labels informados."""
+    query = build_search_query(["o/a", "o/b"], ["revisar-ia", "needs review"], "draft:false")
+    assert query == 'is:pr is:open archived:false repo:o/a repo:o/b label:revisar-ia label:"needs review" draft:false'
+
+
+def test_run_batch_reviews_each_pr_once_in_parallel():
+    """O lote revisa cada PR uma única vez, em paralelo, e isola as falhas de cada PR."""
+    lock = threading.Lock()
+    running, peak, reviewed = [0], [0], []
+
+    def run_job(request):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            reviewed.append(request.pr_number)
+        threading.Event().wait(0.02)
+        with lock:
+            running[0] -= 1
+        if request.pr_number == 3:
+            raise RuntimeError("falha simulada")
+
+    requests = [parse_pr_ref(f"o/r#{number}") for number in (1, 2, 3, 4, 5, 6, 2)]
+    jobs = run_batch(requests, run_job, workers=3)
+
+    assert [job.request.pr_number for job in jobs] == [1, 2, 3, 4, 5, 6]
+    assert sorted(reviewed) == [1, 2, 3, 4, 5, 6] and 1 < peak[0] <= 3
+
+    summary = summarize(jobs)
+    assert summary["statuses"] == {"done": 5, "failed": 1}
+    assert summary["failed"] == [{"repository": "o/r", "pr": 3, "error": "falha simulada"}]
+
+
+def test_falha_do_modo_de_revisao_marca_o_job_como_falho(monkeypatch, tmp_path):
+    """O modo publica o comentário de erro e propaga a falha: o job não termina como concluído."""
+    from scripts import openai_pr_review_file as mode
+
+    posted = []
+
+    class FailingHandler:
+        def __init__(self, github_token):
+            pass
+
+        def get_snapshot(self, repo_name, pr_number):
+            raise RuntimeError("GitHub indisponível")
+
+        def post_error_comment(self, repo_name, pr_number, error_message):
+            posted.append((repo_name, pr_number, error_message))
+
+    monkeypatch.setattr(mode, "GithubPRHandler", FailingHandler)
+    monkeypatch.setattr(mode, "get_completer", lambda *args: None)
+    monkeypatch.setattr(mode, "get_content_source", lambda *args: None)
+    monkeypatch.setattr(mode, "get_review_cache", NullReviewCache)
+    prompt_path = tmp_path / "prompt.md"
+    prompt_path.write_text("Revise o código.")
+
+    def run_job(request):
+        mode.openai_pr_review_file("chave", "token", request.repo_name, request.pr_number, str(prompt_path), "gpt-4o")
+
+    jobs = run_batch([parse_pr_ref("o/r#1")], run_job, workers=1)
+
+    assert summarize(jobs)["failed"] == [{"repository": "o/r", "pr": 1, "error": "GitHub indisponível"}]
+    assert posted == [("o/r", 1, "GitHub indisponível")]
@@ -0,0 +1,50 @@
+import os
+import sys
+import threading
+import time
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.utils.concurrency import get_max_concurrency, run_concurrently
+
+
+def test_run_concurrently_preserva_ordem():
+    """
+    Os resultados devem seguir a ordem dos itens, mesmo quando as chamadas terminam fora de ordem.
+    """
+    def worker(item):
+        time.sleep(0.01 * (5 - item))
+        return item * 10
+
+    assert run_concurrently(worker, range(5), max_concurrency=5) == [0, 10, 20, 30, 40]
+
+
+def test_run_concurrently_respeita_limite():
+    """
+    Nunca deve haver mais workers ativos do que o limite configurado.
+    """
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def worker(item):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.01)
+        with lock:
+            state["active"] -= 1
+        return item
+
+    run_concurrently(worker, range(12), max_concurrency=3)
+    assert state["peak"] <= 3
+
+
+def test_get_max_concurrency_valores_invalidos(monkeypatch):
+    """
+    Valores inválidos caem no padrão e o mínimo é sempre 1.
+    """
+    monkeypatch.setenv("MAX_CONCURRENCY", "abc")
+    assert get_max_concurrency() == 4
+    assert get_max_concurrency("0") == 1
+    assert get_max_concurrency(8) == 8
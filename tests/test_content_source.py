@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import requests
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.checkout import local_git
+from scripts.checkout.content_source import ContentSource
+from scripts.checkout.local_git import GitCheckout, git_blob_sha
+
+
+class FakeRemote:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def read(self, file):
+        self.calls.append(file.filename)
+        if self.error:
+            raise self.error
+        return "conteúdo remoto"
+
+
+def make_checkout(path, files):
+    for name, content in files.items():
+        target = path / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content.encode())
+    git = ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    subprocess.run([*git, "add", "-A"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "head"], check=True)
+    return GitCheckout.discover(str(path))
+
+
+def make_file(filename, content):
+    return SimpleNamespace(filename=filename, sha=git_blob_sha(content.encode()))
+
+
+def test_reads_blobs_from_local_checkout(tmp_path):
+    """O conteúdo vem do banco de objetos do checkout, sem HTTP."""
+    checkout = make_checkout(tmp_path, {"src/app.py": "print('olá')\n", "b.py": "x = 1\n"})
+    remote = FakeRemote()
+    source = ContentSource(checkout, remote)
+
+    try:
+        assert source.read(make_file("src/app.py", "print('olá')\n")) == "print('olá')\n"
+        assert source.read(make_file("b.py", "x = 1\n")) == "x = 1\n"
+    finally:
+        checkout.close()
+    assert remote.calls == []
+
+
+def test_large_files_are_memory_mapped_when_worktree_matches(tmp_path, monkeypatch):
+    """Arquivos grandes idênticos ao blob são lidos via mmap; divergentes vêm do banco de objetos."""
+    monkeypatch.setattr(local_git, "MMAP_MIN_BYTES", 10)
+    content = "linha\n" * 100
+    checkout = make_checkout(tmp_path, {"big.txt": content})
+    reads = []
+    monkeypatch.setattr(checkout, "read_blob", lambda sha: reads.append(sha) or content.encode())
+
+    assert checkout.read_text(git_blob_sha(content.encode()), "big.txt") == content
+    assert reads == []
+
+    (tmp_path / "big.txt").write_text("alterado localmente\n" * 10)
+    assert checkout.read_text(git_blob_sha(content.encode()), "big.txt") == content
+    assert len(reads) == 1
+
+
+def test_falls_back_to_http_when_blob_is_missing(tmp_path):
+    """Blobs ausentes do checkout (ou sem checkout) são baixados; falhas retornam None (o arquivo é ignorado)."""
+    checkout = make_checkout(tmp_path, {"a.py": "a = 1\n"})
+    try:
+        assert ContentSource(checkout, FakeRemote()).read(make_file("novo.py", "b = 2\n")) == "conteúdo remoto"
+    finally:
+        checkout.close()
+
+    failing = ContentSource(None, FakeRemote(requests.ConnectionError("sem rede")))
+    assert failing.read_text(make_file("a.py", "a = 1\n")) is None
+
+
+def test_discover_without_repository(tmp_path):
+    """Sem repositório git no caminho, não há checkout local."""
+    assert GitCheckout.discover(str(tmp_path / "inexistente")) is None
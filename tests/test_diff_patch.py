@@ -0,0 +1,60 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.diff.patch import ADDED, REMOVED, parse_patch
+
+PATCH = "\n".join([
+    "@@ -1,3 +1,4 @@",
+    " a",
+    "-b",
+    "+c",
+    "+d",
+    " e",
+    "@@ -10,2 +11,3 @@",
+    " x",
+    "+y",
+    "\\ No newline at end of file",
+])
+
+
+def test_posicoes_seguem_a_convencao_do_github():
+    """A primeira linha após o primeiro "@@" é a posição 1 e os cabeçalhos seguintes também contam."""
+    parsed = parse_patch(PATCH)
+
+    assert parsed.position_for_line(1) == 1
+    assert parsed.position_for_line(2) == 3
+    assert parsed.position_for_line(12) == 8
+    assert parsed.position_for_line(99) is None
+
+
+def test_mapeamento_inverso_e_linhas_adicionadas():
+    """Posição -> linha do arquivo novo, ignorando cabeçalhos e linhas removidas."""
+    parsed = parse_patch(PATCH)
+
+    assert parsed.line_for_position(0) is None
+    assert parsed.line_for_position(2) is None
+    assert parsed.line_for_position(4) == 3
+    assert parsed.line_for_position(100) is None
+    assert parsed.added_lines == {2, 3, 12}
+    assert parsed.first_added_position() == 3
+
+
+def test_hunks_e_registros_de_linha():
+    """Cada hunk guarda o cabeçalho e suas linhas, com a numeração dos dois lados."""
+    parsed = parse_patch(PATCH)
+
+    assert [(hunk.old_start, hunk.new_start, hunk.position) for hunk in parsed.hunks] == [(1, 1, 0), (10, 11, 6)]
+    removed = parsed.hunks[0].lines[1]
+    assert (removed.kind, removed.old_line, removed.new_line, removed.text) == (REMOVED, 2, None, "b")
+    assert parsed.hunks[1].lines[1].kind == ADDED
+
+
+def test_patch_vazio():
+    """Arquivos sem patch (ex: binários) não têm posições comentáveis."""
+    parsed = parse_patch(None)
+
+    assert parsed.hunks == []
+    assert parsed.first_added_position() is None
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from scripts.ai_dispatcher import PROVIDERS, REVIEW_REGISTRY, ReviewType, resolve_review_method
+
+
+def test_registro_cobre_todos_os_provedores_e_tipos():
+    """Cada combinação provedor x tipo aponta para um módulo existente."""
+    assert len(REVIEW_REGISTRY) == len(PROVIDERS) * len(ReviewType)
+    for target in REVIEW_REGISTRY.values():
+        module_name, function_name = target.split(":")
+        assert os.path.exists(os.path.join(ROOT, *module_name.split(".")) + ".py")
+        assert module_name.endswith(function_name)
+
+
+def test_provedor_ou_tipo_invalido():
+    """Combinações desconhecidas são rejeitadas sem importar nenhum módulo de revisão."""
+    with pytest.raises(ValueError, match="Provedor de IA"):
+        resolve_review_method("mistral", ReviewType.FILE_DIFF_REVIEW.value)
+    with pytest.raises(ValueError, match="Tipo de revisão"):
+        resolve_review_method("openai", "9")
+
+
+def test_importar_o_dispatcher_nao_carrega_sdks():
+    """Os SDKs dos provedores só são importados quando o método de revisão é resolvido."""
+    code = (
+        "import sys, scripts.ai_dispatcher; "
+        "print(','.join(sorted(m for m in ('openai', 'anthropic', 'github', 'requests') if m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == ""
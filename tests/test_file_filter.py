@@ -0,0 +1,102 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.github_handler.file_filter import (
+    DEFAULT_EXCLUDE_PATTERNS,
+    DEFAULT_MAX_FILE_CHANGES,
+    FileFilter,
+    match_path,
+)
+from scripts.github_handler.pr_snapshot import PRSnapshot
+
+
+def make_file(filename, patch="@@ -1 +1 @@\n+x", status="modified", additions=1, changes=1):
+    return SimpleNamespace(filename=filename, patch=patch, status=status, additions=additions, changes=changes,
+                           sha=f"sha-{filename}")
+
+
+def test_match_path_follows_gitignore_semantics():
+    """Globs sem "/" valem em qualquer diretório; com "/" são relativos à raiz."""
+    assert match_path("*.min.js", "static/js/app.min.js")
+    assert match_path("vendor/", "vendor/lib/x.go")
+    assert match_path("vendor/", "app/vendor/x.go")
+    assert match_path("docs/**/*.md", "docs/a/b/c.md")
+    assert match_path("docs/**/*.md", "docs/c.md")
+    assert not match_path("docs/*.md", "src/docs/c.md")
+    assert not match_path("*.lock", "src/lockfile.py")
+
+
+def test_default_excludes_and_binaries_are_skipped_with_reason():
+    """Lockfiles, bundles, snapshots, binários e arquivos removidos não chegam à IA."""
+    files = [
+        make_file("src/app.py"),
+        make_file("package-lock.json", additions=900, changes=1200),
+        make_file("web/dist/app.min.js"),
+        make_file("tests/__snapshots__/view.test.js.snap"),
+        make_file("assets/logo.png", patch=None),
+        make_file("data/dump", patch=None, changes=40),
+        make_file("old.py", status="removed"),
+    ]
+
+    selected, skipped = FileFilter(exclude=DEFAULT_EXCLUDE_PATTERNS).split(files)
+
+    assert [file.filename for file in selected] == ["src/app.py"]
+    assert skipped == {
+        "package-lock.json": "excluído por `package-lock.json`",
+        "web/dist/app.min.js": "excluído por `*.min.js`",
+        "tests/__snapshots__/view.test.js.snap": "excluído por `*.snap`",
+        "assets/logo.png": "binário",
+        "data/dump": "sem patch (binário ou diff grande demais)",
+        "old.py": "arquivo removido",
+    }
+
+
+def test_gitattributes_include_and_size_caps():
+    """Respeita linguist-generated/vendored (a última regra prevalece), REVIEW_INCLUDE e os limites de linhas."""
+    gitattributes = "api/*.py linguist-generated\napi/handwritten.py -linguist-generated\nlib/** linguist-vendored=true\n"
+    file_filter = FileFilter(include=["api/", "lib/", "big.py"], gitattributes=gitattributes, max_additions=100)
+
+    reasons = {
+        file.filename: file_filter.skip_reason(file)
+        for file in [
+            make_file("api/client.py"),
+            make_file("api/handwritten.py"),
+            make_file("lib/x/y.js"),
+            make_file("README.md"),
+            make_file("big.py", additions=150, changes=150),
+        ]
+    }
+
+    assert reasons == {
+        "api/client.py": "gerado (linguist-generated)",
+        "api/handwritten.py": None,
+        "lib/x/y.js": "código de terceiros (linguist-vendored)",
+        "README.md": "fora de REVIEW_INCLUDE",
+        "big.py": "150 linhas adicionadas (limite: 100)",
+    }
+
+
+def test_snapshot_filters_before_incremental_selection(monkeypatch):
+    """O snapshot só entrega à revisão os arquivos aceitos pelo filtro."""
+    monkeypatch.setenv("REVIEW_EXCLUDE", "docs/, *.txt")
+    files = [make_file("a.py"), make_file("docs/guide.md"), make_file("yarn.lock"), make_file("notes.txt")]
+
+    snapshot = PRSnapshot(None, None, "head", "base", files, FileFilter.from_env())
+
+    assert snapshot.files_to_review() == files[:1]
+    assert set(snapshot.skipped_files) == {"docs/guide.md", "yarn.lock", "notes.txt"}
+    assert snapshot.get_file("yarn.lock") is files[2]
+
+
+def test_invalid_size_caps_fall_back_to_defaults(monkeypatch):
+    """Valores inválidos em MAX_FILE_ADDITIONS/MAX_FILE_CHANGES usam os padrões em vez de abortar a revisão."""
+    monkeypatch.setenv("MAX_FILE_ADDITIONS", "300")
+    monkeypatch.setenv("MAX_FILE_CHANGES", "5k")
+
+    file_filter = FileFilter.from_env()
+
+    assert (file_filter.max_additions, file_filter.max_changes) == (300, DEFAULT_MAX_FILE_CHANGES)
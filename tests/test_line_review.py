@@ -0,0 +1,51 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.diff.line_review import build_line_batches, parse_line_comments
+
+PATCH = "\n".join([
+    "@@ -1,3 +1,4 @@",
+    " a",
+    "-b",
+    "+c",
+    "+d",
+    " e",
+    "@@ -10,2 +11,2 @@",
+    " x",
+    "+y",
+])
+
+
+def test_um_lote_por_arquivo_com_posicoes_da_diff():
+    """Todas as linhas adicionadas vão em um único lote, mapeadas para a posição na diff."""
+    batches = build_line_batches(PATCH)
+
+    assert len(batches) == 1
+    assert batches[0].positions == {2: 3, 3: 4, 12: 8}
+    assert "     2 +c" in batches[0].text
+
+
+def test_arquivos_grandes_sao_divididos_por_hunks():
+    """Quando o limite é excedido, os hunks vão em lotes separados."""
+    batches = build_line_batches(PATCH, max_chars=40)
+
+    assert [batch.positions for batch in batches] == [{2: 3, 3: 4}, {12: 8}]
+
+
+def test_hunks_sem_linhas_pendentes_sao_ignorados():
+    """No modo incremental, hunks já revisados não geram requisições."""
+    batches = build_line_batches(PATCH, is_pending=lambda new_line: new_line == 12)
+
+    assert len(batches) == 1
+    assert batches[0].positions == {12: 8}
+
+
+def test_parse_line_comments_aceita_bloco_markdown_e_ignora_invalidos():
+    """A resposta pode vir dentro de ```json``` e com itens malformados."""
+    response = '```json\n[{"line": 2, "comment": "Use um nome melhor."}, {"line": "x"}, {"line": 3}]\n```'
+
+    assert parse_line_comments(response) == [(2, "Use um nome melhor.")]
+    assert parse_line_comments("Nada a comentar.") == []
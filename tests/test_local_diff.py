@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.checkout.local_diff import iter_patches, load_changed_files
+from scripts.checkout.local_git import GitCheckout, git_blob_sha
+from scripts.diff.patch import parse_patch
+from scripts.github_handler.pr_snapshot import PRSnapshot
+
+
+def commit(path, files, message):
+    for name, content in files.items():
+        target = path / name
+        if content is None:
+            target.unlink()
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content if isinstance(content, bytes) else content.encode())
+    git = ["git", "-C", str(path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "add", "-A"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", message], check=True)
+    return subprocess.run([*git, "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def make_repo(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    long_text = "".join(f"linha {i}\n" for i in range(40))
+    base = commit(tmp_path, {"app.py": "a = 1\nb = 2\n", "old.py": "x = 1\n", "docs/guia.md": long_text}, "base")
+    head = commit(tmp_path, {
+        "app.py": "a = 1\nb = 3\nc = 4\n",
+        "old.py": None,
+        "novo.py": "print('novo')\n",
+        "docs/guia.md": None,
+        "docs/manual.md": long_text + "fim\n",
+        "logo.png": b"\x89PNG\x00\x01",
+    }, "head")
+    return GitCheckout.discover(str(tmp_path)), base, head
+
+
+def test_local_diff_matches_github_file_shape(tmp_path):
+    """Lista de arquivos, status, SHAs, contagens e patches equivalentes aos da API do GitHub."""
+    checkout, base, head = make_repo(tmp_path)
+
+    files = {file.filename: file for file in load_changed_files(checkout, base, head)}
+
+    assert {name: file.status for name, file in files.items()} == {
+        "app.py": "modified",
+        "docs/manual.md": "renamed",
+        "logo.png": "added",
+        "novo.py": "added",
+        "old.py": "removed",
+    }
+    app = files["app.py"]
+    assert app.patch == "@@ -1,2 +1,3 @@\n a = 1\n-b = 2\n+b = 3\n+c = 4"
+    assert (app.additions, app.deletions, app.changes) == (2, 1, 3)
+    assert app.sha == git_blob_sha(b"a = 1\nb = 3\nc = 4\n")
+    assert parse_patch(app.patch).added_lines == {2, 3}
+    assert files["docs/manual.md"].previous_filename == "docs/guia.md"
+    assert files["logo.png"].patch is None
+    assert files["old.py"].sha == git_blob_sha(b"x = 1\n")
+
+
+def test_iter_patches_splits_sections_without_headers():
+    """Cada seção da diff vira um patch iniciado no primeiro "@@" (sem os cabeçalhos do git)."""
+    diff = [
+        b"diff --git a/a.py b/a.py\n", b"index 1..2 100644\n", b"--- a/a.py\n", b"+++ b/a.py\n",
+        b"@@ -1 +1 @@\n", b"-x\n", b"+y\n",
+        b"diff --git a/b.bin b/b.bin\n", b"Binary files a/b.bin and b/b.bin differ\n",
+    ]
+
+    assert list(iter_patches(diff)) == [("@@ -1 +1 @@\n-x\n+y", 1, 1), (None, 0, 0)]
+
+
+def test_missing_commits_fall_back_to_api(tmp_path, monkeypatch):
+    """Sem os commits no checkout (ou com REVIEW_LOCAL_DIFF=false), a API do GitHub é usada."""
+    checkout, base, head = make_repo(tmp_path)
+
+    assert load_changed_files(checkout, "f" * 40, head) is None
+    assert load_changed_files(None, base, head) is None
+    monkeypatch.setenv("REVIEW_LOCAL_DIFF", "false")
+    assert load_changed_files(checkout, base, head) is None
+
+
+def test_incremental_review_uses_local_diff(tmp_path):
+    """A revisão incremental calcula as mudanças desde o último head revisado no checkout."""
+    checkout, base, head = make_repo(tmp_path)
+    files = load_changed_files(checkout, base, head)
+    newer = commit(tmp_path, {"novo.py": "print('novo')\nprint('mais')\n"}, "novo commit")
+
+    class NoCompareRepo:
+        def compare(self, base, head):
+            raise AssertionError("a API compare não deveria ser usada")
+
+    snapshot = PRSnapshot(NoCompareRepo(), None, newer, base, files, checkout=checkout)
+    snapshot.load_incremental(head)
+
+    assert [file.filename for file in snapshot.files_to_review()] == ["novo.py"]
+    assert [line for line in range(1, 3) if snapshot.is_line_pending("novo.py", line)] == [2]
+
+
+def test_typechange_keeps_patches_aligned(tmp_path):
+    """Uma mudança de tipo (arquivo -> symlink) gera duas seções na diff sem desalinhar os patches seguintes."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    base = commit(tmp_path, {"f": "conteudo\n", "g": "g = 1\n", "com espaço.py": "x = 1\n"}, "base")
+    (tmp_path / "f").unlink()
+    (tmp_path / "f").symlink_to("g")
+    head = commit(tmp_path, {"g": "g = 2\n", "h": "h = 1\n", "com espaço.py": "x = 2\n"}, "head")
+
+    files = {file.filename: file for file in load_changed_files(GitCheckout.discover(str(tmp_path)), base, head)}
+
+    assert files["f"].status == "changed"
+    assert files["f"].patch == "@@ -0,0 +1 @@\n+g\n\\ No newline at end of file"
+    assert files["g"].patch == "@@ -1 +1 @@\n-g = 1\n+g = 2"
+    assert files["h"].patch == "@@ -0,0 +1 @@\n+h = 1"
+    assert files["com espaço.py"].patch == "@@ -1 +1 @@\n-x = 1\n+x = 2"
+    assert (files["g"].additions, files["g"].deletions, files["h"].additions) == (1, 1, 1)
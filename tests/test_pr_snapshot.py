@@ -0,0 +1,58 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.github_handler.pr_snapshot import PRSnapshot
+
+
+def make_file(filename, patch):
+    return SimpleNamespace(filename=filename, patch=patch, sha=f"sha-{filename}")
+
+
+class FakeRepo:
+    def __init__(self, files):
+        self.files = files
+        self.calls = []
+
+    def compare(self, base, head):
+        self.calls.append((base, head))
+        return SimpleNamespace(files=self.files)
+
+
+def test_snapshot_completo_revisa_todos_os_arquivos():
+    files = [make_file("a.py", "@@ -1 +1 @@\n-x\n+y"), make_file("b.py", "@@ -1 +1 @@\n-x\n+z")]
+    snapshot = PRSnapshot(FakeRepo([]), None, "head", "base", files)
+
+    assert not snapshot.incremental
+    assert snapshot.files_to_review() == files
+    assert snapshot.get_review_patch(files[0]) == files[0].patch
+    assert snapshot.is_line_pending("a.py", 1)
+
+
+def test_snapshot_incremental_restringe_arquivos_hunks_e_linhas():
+    pr_patch = "@@ -1,2 +1,4 @@\n a\n+b\n+c\n+d"
+    files = [make_file("a.py", pr_patch), make_file("b.py", "@@ -1 +1 @@\n-x\n+z")]
+    # Desde o último head revisado só a linha 4 de a.py mudou; c.py veio da base e não faz parte do PR
+    changes = [make_file("a.py", "@@ -3 +3,2 @@\n c\n+d"), make_file("c.py", "@@ -1 +1 @@\n+w")]
+    repo = FakeRepo(changes)
+    snapshot = PRSnapshot(repo, None, "head", "base", files)
+
+    snapshot.load_incremental("last")
+
+    assert repo.calls == [("last", "head")]
+    assert [file.filename for file in snapshot.files_to_review()] == ["a.py"]
+    assert snapshot.get_review_patch(files[0]) == "@@ -3 +3,2 @@\n c\n+d"
+    assert [line for line in range(1, 5) if snapshot.is_line_pending("a.py", line)] == [4]
+
+
+def test_snapshot_incremental_sem_novos_commits():
+    repo = FakeRepo([make_file("a.py", "@@ -1 +1 @@\n+x")])
+    snapshot = PRSnapshot(repo, None, "head", "base", [make_file("a.py", "@@ -1 +1 @@\n+x")])
+
+    snapshot.load_incremental("head")
+
+    assert repo.calls == []
+    assert snapshot.files_to_review() == []
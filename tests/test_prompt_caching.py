@@ -0,0 +1,103 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.providers import usage
+from scripts.providers.claude_client import ClaudeClient
+from scripts.providers.gemini_client import CACHED_CONTENT_MIN_TOKENS, GeminiClient
+from scripts.providers.openai_client import OpenAIClient
+from scripts.providers.prompting import build_system_prompt, build_user_prompt
+
+
+def test_system_prompt_is_dedented_and_stable():
+    """O prefixo fixo não carrega a indentação das strings multilinha e é idêntico entre chamadas."""
+    prompt = """
+        Revise o código.
+          - Seja breve.
+    """
+    system = build_system_prompt(prompt, "Responda em JSON.")
+
+    assert system == "Revise o código.\n  - Seja breve.\n\nResponda em JSON."
+    assert build_system_prompt(prompt, "Responda em JSON.") is system
+
+
+def test_user_prompt_puts_payload_last():
+    """A mensagem variável traz o caminho e os blocos de código, nessa ordem."""
+    payload = build_user_prompt("app.py", ("Alterações (diff):", "diff", "+x = 1"))
+
+    assert payload == "Arquivo: app.py\n\nAlterações (diff):\n```diff\n+x = 1\n```"
+
+
+def test_claude_client_builds_with_installed_sdk(monkeypatch):
+    """O cliente do Claude é criado com o SDK e o httpx instalados (ex: httpx sem o argumento `proxies`)."""
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", "http://127.0.0.1:1")
+    client = ClaudeClient("chave-local")
+    assert str(client.client.base_url).startswith("http://127.0.0.1:1")
+    # As retentativas ficam só com a RetryPolicy do executor de prompts
+    assert client.client.max_retries == 0
+
+
+def test_claude_marks_system_prefix_for_caching(monkeypatch):
+    """O Claude recebe as instruções fixas com cache_control e reporta os tokens em cache."""
+    monkeypatch.setattr(usage, "_usage", {})
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="ok")],
+            usage=SimpleNamespace(input_tokens=50, cache_read_input_tokens=900, cache_creation_input_tokens=0,
+                                  output_tokens=20),
+        )
+
+    client = ClaudeClient.__new__(ClaudeClient)
+    client.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+
+    assert client.complete("claude-3-haiku", "Arquivo: a.py", system="Instruções") == "ok"
+    assert calls[0]["system"] == [{"type": "text", "text": "Instruções", "cache_control": {"type": "ephemeral"}}]
+    assert calls[0]["messages"] == [{"role": "user", "content": "Arquivo: a.py"}]
+    stats = usage.get_usage_stats()["claude"]
+    assert (stats["input_tokens"], stats["cached_tokens"], stats["uncached_tokens"]) == (950, 900, 50)
+
+
+def test_openai_sends_system_message_first(monkeypatch):
+    """Na OpenAI, o prefixo fixo é a primeira mensagem (cache automático de prefixo)."""
+    monkeypatch.setattr(usage, "_usage", {})
+    calls = []
+
+    def chat_completion(model, messages, **kwargs):
+        calls.append(messages)
+        return {
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 1500, "completion_tokens": 10, "prompt_tokens_details": {"cached_tokens": 1024}},
+        }
+
+    client = OpenAIClient.__new__(OpenAIClient)
+    monkeypatch.setattr(client, "chat_completion", chat_completion, raising=False)
+
+    client.complete("gpt-4o", "Arquivo: a.py", system="Instruções")
+
+    assert [message["role"] for message in calls[0]] == ["system", "user"]
+    assert usage.get_usage_stats()["openai"]["cached_tokens"] == 1024
+
+
+def test_gemini_uses_cached_content_for_large_prefix(monkeypatch):
+    """O Gemini cria um único cache de contexto para prefixos grandes e usa systemInstruction nos pequenos."""
+    client = GeminiClient("chave")
+    created = []
+    monkeypatch.setattr(
+        client, "create_cached_content", lambda model, version, system: created.append(model) or "cachedContents/1"
+    )
+
+    large = "x" * (CACHED_CONTENT_MIN_TOKENS * 4)
+    first = client.build_payload("gemini-1.5-flash", "v1beta", "Arquivo: a.py", large)
+    second = client.build_payload("gemini-1.5-flash", "v1beta", "Arquivo: b.py", large)
+    small = client.build_payload("gemini-1.5-flash", "v1beta", "Arquivo: c.py", "Instruções")
+
+    assert first["cachedContent"] == second["cachedContent"] == "cachedContents/1"
+    assert created == ["gemini-1.5-flash"]
+    assert small["systemInstruction"] == {"parts": [{"text": "Instruções"}]}
+    assert small["contents"][-1]["parts"][-1]["text"] == "Arquivo: c.py"
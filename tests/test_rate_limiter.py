@@ -0,0 +1,101 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from requests.structures import CaseInsensitiveDict
+
+from scripts.transport.rate_limiter import HostLimiter, parse_duration, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(requests_per_minute=60, tokens_per_minute=None):
+    clock = FakeClock()
+    return HostLimiter("https://api.test", requests_per_minute, tokens_per_minute, clock=clock, sleep=clock.sleep), clock
+
+
+def test_rajada_e_depois_ritmo_da_taxa():
+    """Com 60 req/min, a rajada inicial (10s) passa direto e as seguintes esperam ~1s cada."""
+    limiter, clock = make_limiter(60)
+
+    waits = [limiter.acquire() for _ in range(12)]
+
+    assert waits[:10] == [0.0] * 10
+    assert waits[10] == 1.0 and waits[11] == 1.0
+
+
+def test_429_reduz_a_taxa_e_pausa_pelo_retry_after():
+    """Redução multiplicativa no 429 e pausa do host pelo tempo pedido."""
+    limiter, clock = make_limiter(60)
+
+    pause = limiter.observe(429, {"retry-after": "7"})
+
+    assert pause == 7
+    assert limiter.requests.rate == 30
+    assert limiter.acquire() == 7
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_aumento_aditivo_limitado_pela_cota_dos_cabecalhos():
+    """Respostas bem-sucedidas aumentam a taxa até logo abaixo da cota anunciada."""
+    limiter, _ = make_limiter(60)
+    limiter.observe(429, {})
+
+    for _ in range(20):
+        limiter.observe(200, {"x-ratelimit-limit-requests": "50", "x-ratelimit-remaining-requests": "50"})
+
+    assert limiter.requests.rate == 50 * 0.95
+
+
+def test_cota_restante_do_github_e_distribuida_ate_o_reset():
+    """Com 60 requisições restantes e reset em 10 min, o ritmo fica abaixo de 6 req/min."""
+    limiter, _ = make_limiter(600)
+
+    headers = CaseInsensitiveDict({"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "60", "X-RateLimit-Reset": "600"})
+    limiter.observe(200, headers)
+
+    assert limiter.request_ceiling == 60 * 60 / 600 * 0.95
+    assert limiter.requests.rate == limiter.request_ceiling
+
+
+def test_cota_folgada_do_github_nao_limita_a_concorrencia():
+    """Com 4990 de 5000 requisições restantes, 16 páginas buscadas juntas não esperam."""
+    limiter, _ = make_limiter(600)
+
+    headers = CaseInsensitiveDict({"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4990", "X-RateLimit-Reset": "3500"})
+    limiter.observe(200, headers)
+
+    assert [limiter.reserve() for _ in range(16)] == [0.0] * 16
+    assert limiter.request_ceiling == 600
+
+
+def test_tokens_por_minuto_passam_a_valer_apos_os_cabecalhos():
+    """O balde de tokens é criado com a cota anunciada e limita requisições grandes."""
+    limiter, _ = make_limiter(600)
+    limiter.observe(200, {"x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "6000"})
+
+    assert limiter.acquire(tokens=950) == 0.0
+    assert limiter.acquire(tokens=950) > 0
+
+
+def test_parse_de_duracoes_e_retry_after():
+    """Formatos usados por OpenAI, GitHub e Anthropic."""
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("1700000100", now=1700000000) == 100
+    assert parse_duration("2024-01-01T00:00:10Z", now=1704067200) == 10
+    assert parse_retry_after({"retry-after-ms": "1500"}) == 1.5
+    assert parse_retry_after({}) is None
@@ -0,0 +1,68 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.github_handler.reconciler import (
+    ISSUE_COMMENT,
+    REVIEW_COMMENT,
+    DesiredComment,
+    ExistingComment,
+    plan_reconciliation,
+)
+from scripts.github_handler.review_buffer import MAX_COMMENT_BODY_CHARS, ReviewBuffer
+
+
+def published(comment_id, desired):
+    """Simula um comentário já publicado a partir de um comentário gerado."""
+    return ExistingComment(desired.kind, comment_id, desired.body)
+
+
+def test_reconciliacao_mantem_edita_cria_e_deleta():
+    unchanged = DesiredComment(REVIEW_COMMENT, "app.py:3", "Use f-strings.")
+    changed_old = DesiredComment(REVIEW_COMMENT, "app.py:7", "Trate a exceção.")
+    changed_new = DesiredComment(REVIEW_COMMENT, "app.py:7", "Trate a exceção `KeyError`.")
+    new = DesiredComment(REVIEW_COMMENT, "util.py:1", "Docstring ausente.")
+    stale = DesiredComment(REVIEW_COMMENT, "old.py:9", "Comentário antigo.")
+    legacy = ExistingComment(ISSUE_COMMENT, 99, "Comentário sem marcador")
+
+    existing = [published(1, unchanged), published(2, changed_old), published(3, stale), legacy]
+    plan = plan_reconciliation([unchanged, changed_new, new], existing)
+
+    assert [comment.id for comment in plan.keep] == [1]
+    assert [(old.id, desired.body) for old, desired in plan.edit] == [(2, changed_new.body)]
+    assert plan.create == [new]
+    assert sorted(comment.id for comment in plan.delete) == [3, 99]
+
+
+def test_marcadores_nao_alteram_a_impressao_digital():
+    first = DesiredComment(ISSUE_COMMENT, "summary", "Resumo\n\n<!-- raico:last-reviewed-sha=aaaaaaa -->")
+    second = DesiredComment(ISSUE_COMMENT, "summary", "Resumo\n\n<!-- raico:last-reviewed-sha=bbbbbbb -->")
+    assert first.fingerprint == second.fingerprint
+
+    # Mesmo conteúdo, mas o marcador do head mudou: edita em vez de recriar
+    plan = plan_reconciliation([second], [published(5, first)])
+    assert [old.id for old, _ in plan.edit] == [5]
+    assert plan.create == [] and plan.delete == []
+
+
+def test_revisao_incremental_nao_deleta():
+    stale = DesiredComment(REVIEW_COMMENT, "old.py:9", "Comentário antigo.")
+    plan = plan_reconciliation([], [published(3, stale)], allow_delete=False)
+    assert plan.delete == []
+
+
+def test_corpo_no_limite_mantem_os_marcadores():
+    """Um corpo truncado pela fila de review continua dentro do limite com o marcador de impressão digital."""
+    buffer = ReviewBuffer()
+    buffer.add("app.py", 1, "x" * (MAX_COMMENT_BODY_CHARS + 10))
+    comment = DesiredComment(REVIEW_COMMENT, "app.py:1", buffer.take()[0]["body"])
+    assert len(comment.body) <= MAX_COMMENT_BODY_CHARS
+    assert ExistingComment(REVIEW_COMMENT, 1, comment.body).fingerprint == comment.fingerprint
+
+    # No resumo, o marcador do último head revisado também é mantido
+    head = "<!-- raico:last-reviewed-sha=" + "a" * 40 + " -->"
+    summary = DesiredComment(ISSUE_COMMENT, "summary", "y" * MAX_COMMENT_BODY_CHARS + "\n\n" + head)
+    assert len(summary.body) == MAX_COMMENT_BODY_CHARS and head in summary.body
+    assert summary.body.endswith(" -->") and "fp=" + summary.fingerprint in summary.body
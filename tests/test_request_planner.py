@@ -0,0 +1,78 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.planning.request_planner import (
+    estimate_tokens,
+    get_context_window,
+    plan_requests,
+    review_in_batches,
+    split_text,
+)
+
+
+def test_janela_de_contexto_usa_o_prefixo_mais_longo():
+    """gpt-4-32k não deve cair na janela do gpt-4."""
+    assert get_context_window("gpt-4") == 8192
+    assert get_context_window("gpt-4-32k-0613") == 32768
+    assert get_context_window("modelo-desconhecido") == 8192
+
+
+def test_arquivos_pequenos_sao_agrupados():
+    """Arquivos pequenos compartilham a mesma requisição até o limite do orçamento."""
+    items = [("a.py", "x" * 400), ("b.py", "y" * 400), ("c.py", "z" * 400)]
+    planned = plan_requests(items, budget_tokens=250, max_files_per_request=8)
+
+    assert sorted(len(request.segments) for request in planned) == [1, 2]
+
+
+def test_arquivo_grande_e_dividido_em_fronteiras_com_sobreposicao():
+    """O corte acontece no início de uma função e a parte seguinte repete linhas do final da anterior."""
+    lines = [f"def f{i}():" if i % 10 == 0 else f"    linha {i}" for i in range(100)]
+    parts = split_text("\n".join(lines), budget_tokens=120, overlap_lines=2)
+
+    assert len(parts) > 1
+    assert all(estimate_tokens(part) <= 120 + 10 for part in parts)
+    first, second = parts[0].split("\n"), parts[1].split("\n")
+    assert second[:2] == first[-2:]
+    assert second[2].startswith("def ")
+
+
+def test_resposta_agrupada_e_separada_por_arquivo():
+    """Cada arquivo recebe apenas a sua seção da resposta; partes de um mesmo arquivo são concatenadas."""
+    items = [("a.py", "print(1)"), ("b.py", "print(2)")]
+
+    def analyze(label, content):
+        assert "=== ARQUIVO: a.py ===" in content
+        return "=== ARQUIVO: a.py ===\nSem problemas.\n=== ARQUIVO: b.py ===\nUse logging."
+
+    feedbacks = review_in_batches(items, analyze, budget_tokens=1000, max_concurrency=1)
+
+    assert feedbacks == {"a.py": "Sem problemas.", "b.py": "Use logging."}
+
+
+def test_resposta_sem_delimitadores_e_atribuida_a_todos():
+    """Mensagens de erro (sem delimitadores) não são perdidas."""
+    items = [("a.py", "print(1)"), ("b.py", "print(2)")]
+    feedbacks = review_in_batches(items, lambda label, content: "Erro ao processar", 1000, max_concurrency=1)
+
+    assert feedbacks == {"a.py": "Erro ao processar", "b.py": "Erro ao processar"}
+
+
+def test_arquivo_sem_secao_na_resposta_agrupada_e_revisado_sozinho():
+    """Quem ficou sem seção na resposta agrupada é reenviado sozinho, sem herdar a resposta do grupo."""
+    items = [("a.py", "print(1)"), ("b.py", "print(2)"), ("c.py", "print(3)")]
+    labels = []
+
+    def analyze(label, content):
+        labels.append(label)
+        if "=== ARQUIVO:" in content:
+            return "=== ARQUIVO: a.py ===\nSem problemas.\n=== ARQUIVO: c.py ===\nUse logging."
+        return f"Revisão individual de {label}."
+
+    feedbacks = review_in_batches(items, analyze, budget_tokens=1000, max_concurrency=1)
+
+    assert feedbacks == {"a.py": "Sem problemas.", "b.py": "Revisão individual de b.py.", "c.py": "Use logging."}
+    assert labels[1:] == ["b.py"]
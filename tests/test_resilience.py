@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.cache.review_cache import ReviewCache
+from scripts.providers.resilience import (
+    CircuitBreaker,
+    CompletionTarget,
+    ProviderError,
+    ResilientCompleter,
+    RetryPolicy,
+    is_retryable,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FakeClient:
+    def __init__(self, results, delay=0.0):
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+
+    def complete(self, model, prompt, version=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_target(name, client):
+    target = CompletionTarget(name, client, "modelo")
+    # Cada teste usa um breaker e um histórico próprios
+    target.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    return target
+
+
+def no_wait_policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, base_delay=0, max_delay=0)
+
+
+def test_falhas_transitorias_sao_retentadas():
+    """429/5xx são retentados; a resposta seguinte é usada."""
+    client = FakeClient([HTTPError(429), HTTPError(503), "ok"])
+    completer = ResilientCompleter(make_target("principal", client), retry_policy=no_wait_policy())
+
+    assert completer.complete("prompt") == "ok"
+    assert client.calls == 3
+
+
+def test_erro_do_pedido_nao_e_retentado():
+    """Um 400 falha de imediato, sem abrir o circuito."""
+    client = FakeClient([HTTPError(400)])
+    target = make_target("principal", client)
+
+    with pytest.raises(ProviderError):
+        ResilientCompleter(target, retry_policy=no_wait_policy()).complete("prompt")
+    assert client.calls == 1
+    assert target.breaker.state == "closed"
+    assert not is_retryable(HTTPError(401)) and is_retryable(TimeoutError())
+
+
+def test_circuito_abre_apos_falhas_consecutivas():
+    """Com o circuito aberto, as chamadas falham sem chegar ao provedor."""
+    client = FakeClient([HTTPError(500)])
+    target = make_target("principal", client)
+    completer = ResilientCompleter(target, retry_policy=no_wait_policy())
+
+    with pytest.raises(ProviderError):
+        completer.complete("prompt")
+    assert target.breaker.state == "open"
+
+    with pytest.raises(ProviderError, match="Circuito aberto"):
+        completer.complete("prompt")
+    assert client.calls == 3
+
+
+def test_meio_aberto_libera_uma_chamada_de_teste():
+    """Após o tempo de reset, uma chamada de teste fecha o circuito se tiver sucesso."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 10
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_fallback_para_o_secundario_quando_o_principal_falha():
+    """Falha definitiva no principal: a resposta vem do secundário."""
+    primary = make_target("principal", FakeClient([HTTPError(500)]))
+    secondary = make_target("secundario", FakeClient(["resposta do secundário"]))
+    completer = ResilientCompleter(primary, secondary, retry_policy=no_wait_policy(1), hedge_min_delay=5)
+
+    assert completer.complete("prompt") == "resposta do secundário"
+
+
+def test_resposta_do_secundario_nao_vai_para_o_cache(tmp_path):
+    """A chave do cache identifica o provedor principal; a resposta do secundário vale só para esta revisão."""
+    primary = make_target("principal", FakeClient([HTTPError(500)]))
+    secondary = make_target("secundario", FakeClient(["resposta do secundário"]))
+    completer = ResilientCompleter(primary, secondary, retry_policy=no_wait_policy(1), hedge_min_delay=5)
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"))
+
+    assert cache.get_or_compute("chave", lambda: completer.complete("prompt")) == "resposta do secundário"
+    assert cache.get("chave") is None
+
+
+def test_hedge_dispara_o_secundario_quando_o_principal_demora():
+    """Passado o atraso de hedge, o secundário é consultado e a primeira resposta vence."""
+    slow = FakeClient(["lento"], delay=1.0)
+    fast = FakeClient(["rápido"])
+    completer = ResilientCompleter(
+        make_target("principal", slow), make_target("secundario", fast),
+        retry_policy=no_wait_policy(), hedge_min_delay=0.05,
+    )
+
+    started = time.monotonic()
+    assert completer.complete("prompt") == "rápido"
+    assert time.monotonic() - started < 0.5
+    assert fast.calls == 1
+
+
+def test_sem_hedge_quando_o_principal_responde_rapido():
+    """O secundário não é consultado se o principal responde antes do atraso."""
+    secondary_client = FakeClient(["secundário"])
+    completer = ResilientCompleter(
+        make_target("principal", FakeClient(["principal"])), make_target("secundario", secondary_client),
+        retry_policy=no_wait_policy(), hedge_min_delay=1.0,
+    )
+
+    assert completer.complete("prompt") == "principal"
+    assert secondary_client.calls == 0
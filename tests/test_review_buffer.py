@@ -0,0 +1,78 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+from scripts.github_handler import commented_pr
+from scripts.github_handler.commented_pr import GithubPRHandler
+from scripts.github_handler.reconciler import ReconciliationPlan
+from scripts.github_handler.review_buffer import MAX_COMMENT_BODY_CHARS, ReviewBuffer
+
+
+def test_drain_gera_uma_unica_review_dentro_dos_limites():
+    """
+    Enquanto os limites não forem atingidos, todos os comentários vão em uma única review.
+    """
+    buffer = ReviewBuffer()
+    for position in range(1, 31):
+        buffer.add("app.py", position, f"comentário {position}")
+
+    batches = buffer.drain()
+    assert len(batches) == 1
+    assert [c["position"] for c in batches[0]] == list(range(1, 31))
+    assert len(buffer) == 0
+
+
+def test_drain_divide_por_quantidade_e_tamanho():
+    """
+    A fila só é dividida quando a quantidade de comentários ou o tamanho do payload excedem o limite.
+    """
+    buffer = ReviewBuffer(max_comments=10)
+    for position in range(25):
+        buffer.add("app.py", position, "ok")
+    assert [len(batch) for batch in buffer.drain()] == [10, 10, 5]
+
+    buffer = ReviewBuffer(max_payload_bytes=2_000)
+    for position in range(4):
+        buffer.add("app.py", position, "x" * 900)
+    assert [len(batch) for batch in buffer.drain()] == [2, 2]
+
+
+def test_add_trunca_comentarios_muito_grandes():
+    """
+    Corpos acima do limite do GitHub são truncados em vez de invalidar a review.
+    """
+    buffer = ReviewBuffer()
+    buffer.add("app.py", 1, "x" * (MAX_COMMENT_BODY_CHARS + 10))
+    body = buffer.drain()[0][0]["body"]
+    assert len(body) == MAX_COMMENT_BODY_CHARS
+
+
+def test_review_sem_comentarios_novos_registra_o_head(monkeypatch):
+    """Sem comentários novos, uma review vazia ainda grava o marcador do último head revisado."""
+    posted = []
+    monkeypatch.setattr(
+        commented_pr.sessions, "post", lambda url, headers, json: posted.append((url, json)) or SimpleNamespace(status_code=200)
+    )
+    handler = GithubPRHandler("token")
+    monkeypatch.setattr(handler, "reconcile_comments", lambda repo_name, pr_number, desired: ReconciliationPlan())
+    monkeypatch.setattr(handler, "get_snapshot", lambda repo_name, pr_number: SimpleNamespace(head_sha="c" * 40))
+
+    handler.submit_inline_review("o/r", 7)
+
+    assert len(posted) == 1
+    url, payload = posted[0]
+    assert url.endswith("/repos/o/r/pulls/7/reviews") and payload["comments"] == []
+    assert "<!-- raico:last-reviewed-sha=" + "c" * 40 + " -->" in payload["body"]
+
+
+def test_quantidade_por_review_configuravel(monkeypatch):
+    """REVIEW_MAX_COMMENTS ajusta a quantidade de comentários por review (escolha local, não do GitHub)."""
+    monkeypatch.setenv("REVIEW_MAX_COMMENTS", "3")
+    buffer = ReviewBuffer()
+    for position in range(7):
+        buffer.add("app.py", position, "ok")
+    assert [len(batch) for batch in buffer.drain()] == [3, 3, 1]
@@ -0,0 +1,91 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+from scripts.cache.review_cache import ReviewCache, make_cache_key
+from scripts.planning.request_planner import review_files_in_batches
+
+
+def test_get_or_compute_reaproveita_feedback(tmp_path):
+    """
+    A segunda consulta com a mesma chave não deve chamar o provedor.
+    """
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "✅ Alterações Aprovadas"
+
+    key = make_cache_key("openai", "gpt-4", "prompt", "file", "app.py@abc123")
+    assert cache.get_or_compute(key, compute) == "✅ Alterações Aprovadas"
+    assert cache.get_or_compute(key, compute) == "✅ Alterações Aprovadas"
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_chave_muda_com_prompt_modelo_e_conteudo():
+    """
+    Qualquer mudança de provedor, modelo, prompt, tipo ou conteúdo gera uma nova chave.
+    """
+    base = make_cache_key("openai", "gpt-4", "prompt", "file", "app.py@abc")
+    assert base != make_cache_key("claude", "gpt-4", "prompt", "file", "app.py@abc")
+    assert base != make_cache_key("openai", "gpt-4o", "prompt", "file", "app.py@abc")
+    assert base != make_cache_key("openai", "gpt-4", "outro prompt", "file", "app.py@abc")
+    assert base != make_cache_key("openai", "gpt-4", "prompt", "line", "app.py@abc")
+    assert base != make_cache_key("openai", "gpt-4", "prompt", "file", "app.py@def")
+
+
+def test_erros_nao_sao_armazenados(tmp_path):
+    """
+    Respostas de erro não entram no cache.
+    """
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"))
+    cache.get_or_compute("k", lambda: "Erro ao processar o arquivo", lambda text: "Erro" not in text)
+    assert cache.get("k") is None
+
+
+def test_arquivos_sem_conteudo_nao_sao_analisados_nem_armazenados(tmp_path):
+    """
+    Um arquivo cujo conteúdo não pôde ser obtido (None) não é enviado à IA nem entra no cache.
+    """
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"))
+    files = [SimpleNamespace(filename="ok.py"), SimpleNamespace(filename="falhou.py")]
+    sent = []
+
+    def analyze(label, content):
+        sent.append(content)
+        return "✅ Alterações Aprovadas"
+
+    feedbacks = review_files_in_batches(
+        files, cache_key=lambda file: file.filename,
+        load_content=lambda file: "a = 1\n" if file.filename == "ok.py" else None,
+        analyze=analyze, budget_tokens=10_000, review_cache=cache,
+    )
+    assert feedbacks == {"ok.py": "✅ Alterações Aprovadas"}
+    assert sent == ["a = 1\n"]
+    assert cache.get("falhou.py") is None
+
+    assert cache.get_or_compute("sem-conteudo", lambda: None) is None
+    assert cache.get("sem-conteudo") is None
+
+
+def test_remocao_por_ttl_e_lru(tmp_path):
+    """
+    Entradas expiradas e as menos acessadas recentemente são removidas.
+    """
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "a" passa a ser a mais recente
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    expired = ReviewCache(str(tmp_path / "expired.sqlite3"), ttl_seconds=-1)
+    expired.set("a", "1")
+    assert expired.get("a") is None
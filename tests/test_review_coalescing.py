@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.providers.streaming import collect_stream
+from scripts.server.webhook import ReviewRequest
+from scripts.server.worker_pool import ReviewWorkerPool
+from scripts.transport.rate_limiter import HostLimiter
+from scripts.utils import cancellation
+from scripts.utils.concurrency import run_concurrently
+
+
+def test_newer_head_supersedes_queued_and_cancels_running_job():
+    """Um head novo cancela a revisão em andamento, descarta a da fila e só o mais recente termina."""
+    started = threading.Event()
+    reviewed = []
+
+    def run_job(request):
+        reviewed.append(request.head_sha)
+        if request.head_sha == "a" * 40:
+            started.set()
+            # Simula as chamadas à IA: cada uma passa por um ponto de verificação
+            while True:
+                cancellation.checkpoint()
+                cancellation.sleep(0.01)
+
+    pool = ReviewWorkerPool(run_job, workers=2).start()
+    try:
+        first = pool.submit(ReviewRequest("o/r", 1, "a" * 40))
+        started.wait(5)
+        second = pool.submit(ReviewRequest("o/r", 1, "b" * 40))
+        third = pool.submit(ReviewRequest("o/r", 1, "c" * 40))
+        other = pool.submit(ReviewRequest("o/r", 2, "d" * 40))
+        pool.join()
+    finally:
+        pool.stop(timeout=5)
+
+    assert (first.status, second.status, third.status, other.status) == ("cancelled", "superseded", "done", "done")
+    assert reviewed.count("b" * 40) == 0 and third.started_at >= first.finished_at
+    assert pool.stats()["jobs"]["cancelled"] == 1
+
+
+def test_duplicate_event_for_same_head_is_coalesced():
+    """Eventos repetidos para o mesmo head reaproveitam o job existente."""
+    gate = threading.Event()
+    pool = ReviewWorkerPool(lambda request: gate.wait(5), workers=1).start()
+    try:
+        first = pool.submit(ReviewRequest("o/r", 1, "a" * 40))
+        assert pool.submit(ReviewRequest("o/r", 1, "a" * 40)) is first
+        gate.set()
+        pool.join()
+    finally:
+        pool.stop(timeout=5)
+    assert pool.stats()["jobs"]["coalesced"] == 1
+
+
+def test_cancellation_reaches_concurrent_workers_and_streams():
+    """O token acompanha as threads de `run_concurrently` e interrompe respostas em streaming."""
+    token = cancellation.CancelToken()
+    token.cancel("novo head")
+    with cancellation.cancellation_scope(token):
+        with pytest.raises(cancellation.ReviewCancelled):
+            run_concurrently(lambda item: cancellation.checkpoint(), [1, 2, 3], max_concurrency=3)
+
+        closed = []
+        with pytest.raises(cancellation.ReviewCancelled):
+            collect_stream(iter(["✅ Alterações", " aprovadas"]), close=lambda: closed.append(True))
+        assert closed == [True]
+
+    # Fora do escopo nada é cancelado
+    assert run_concurrently(lambda item: cancellation.checkpoint() or item, [1, 2], max_concurrency=2) == [1, 2]
+
+
+def test_cancelled_wait_returns_rate_limit_reservation():
+    """A cota reservada por uma requisição cancelada durante a espera volta para as demais."""
+    def cancelled_sleep(seconds):
+        raise cancellation.ReviewCancelled("novo head")
+
+    limiter = HostLimiter("https://api.test", 60, 6000, clock=lambda: 0.0, sleep=cancelled_sleep)
+    for _ in range(10):
+        limiter.acquire()
+    requests_level, tokens_level = limiter.requests.level, limiter.tokens.level
+
+    with pytest.raises(cancellation.ReviewCancelled):
+        limiter.acquire(tokens=500)
+    assert (limiter.requests.level, limiter.tokens.level) == (requests_level, tokens_level)
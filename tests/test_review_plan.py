@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.checkout.local_git import GitCheckout, git_blob_sha
+from scripts.planning.review_plan import (
+    FileInfo,
+    ReviewEstimator,
+    estimate_content_chars,
+    get_model_price,
+    render_plan,
+)
+
+
+def make_patch(start, lines):
+    body = "\n".join(f"+linha {i}" for i in range(lines))
+    return f"@@ -{start},0 +{start},{lines} @@\n{body}"
+
+
+def test_model_price_uses_longest_prefix():
+    """O preço do modelo usa o prefixo mais longo (gpt-4o-mini não herda o preço do gpt-4o)."""
+    assert get_model_price("gpt-4o-mini-2024-07-18") == (0.15, 0.60)
+    assert get_model_price("gpt-4o") == (2.50, 10.00)
+    assert get_model_price("modelo-desconhecido") is None
+
+
+def test_content_size_is_estimated_from_last_hunk():
+    """Sem checkout, o tamanho do arquivo é estimado pela última linha do último hunk."""
+    patch = make_patch(991, 10)
+    assert estimate_content_chars(patch) >= 1000 * 7
+
+
+def test_blob_sizes_from_checkout(tmp_path):
+    """Os tamanhos exatos vêm do `git cat-file --batch-check` do checkout."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "a.py").write_text("print(1)\n")
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "add", "-A"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "a"], check=True)
+
+    sha = git_blob_sha(b"print(1)\n")
+    sizes = GitCheckout.discover(str(tmp_path)).blob_sizes([sha, "f" * 40])
+    assert sizes == {sha: 9}
+
+
+def test_auto_prefers_diff_for_large_files_and_full_file_for_small_ones():
+    """No modo auto, arquivos grandes com poucas alterações são revisados pela diff."""
+    estimator = ReviewEstimator("openai", "gpt-4o", "Revise o código.")
+    small = FileInfo("small.py", make_patch(1, 20), content_chars=300, exact_size=True)
+    large = FileInfo("large.py", make_patch(5000, 5), content_chars=400000, exact_size=True)
+
+    choices, skipped = estimator.choose_auto([small, large], budget_tokens=0)
+    assert choices == {"small.py": "file", "large.py": "line"}
+    assert skipped == {}
+
+    # Arquivos grandes são divididos no tipo 1, mas cabem em uma requisição no tipo 2
+    assert [path for path, _ in estimator.estimate("file", [small, large]).inadequate] == ["large.py"]
+    assert estimator.estimate("line", [small, large]).requests == 1
+
+
+def test_auto_respects_pr_token_budget():
+    """Acima do orçamento, arquivos completos voltam para a diff e os maiores deixam de ser revisados."""
+    estimator = ReviewEstimator("openai", "gpt-4o", "Revise o código.")
+    infos = [
+        FileInfo("a.py", make_patch(1, 40), content_chars=1200, exact_size=True),
+        FileInfo("b.py", make_patch(1, 400), content_chars=6000, exact_size=True),
+    ]
+    unlimited, _ = estimator.choose_auto(infos, budget_tokens=0)
+    assert unlimited == {"a.py": "file", "b.py": "file"}
+
+    downgraded, skipped = estimator.choose_auto(infos, budget_tokens=2200)
+    assert downgraded == {"a.py": "line", "b.py": "line"} and skipped == {}
+
+    limited, skipped = estimator.choose_auto(infos, budget_tokens=1000)
+    assert list(limited) == ["a.py"]
+    assert "REVIEW_TOKEN_BUDGET" in skipped["b.py"]
+
+
+def test_render_plan_lists_every_strategy():
+    """O plano mostra a escolha por arquivo e os totais de cada tipo de revisão, com custo."""
+    estimator = ReviewEstimator("gemini", "gemini-1.5-flash", "Revise o código.")
+    infos = [FileInfo("a.py", make_patch(10, 3))]
+    choices, skipped = estimator.choose_auto(infos)
+    text = render_plan(estimator, infos, choices, skipped, "owner/repo#1")
+
+    assert "owner/repo#1" in text
+    for label in ("1:file", "2:line", "3:line_inline", "4:file_inline", "auto"):
+        assert label in text
+    assert "~" in text.split("\n")[4]  # tamanho do arquivo estimado (sem checkout)
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import threading
+
+import requests
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.server.review_server import create_server
+from scripts.server.send_webhook import send_webhook
+from scripts.server.webhook import build_pull_request_event, parse_pull_request_event
+from scripts.server.worker_pool import ReviewWorkerPool
+
+SECRET = "segredo-local"
+
+
+def start_server(run_job, workers=2):
+    pool = ReviewWorkerPool(run_job, workers=workers).start()
+    server = create_server(pool, host="127.0.0.1", port=0, webhook_secret=SECRET, api_token="token-local")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return pool, server, url
+
+
+def stop_server(pool, server):
+    server.shutdown()
+    server.server_close()
+    pool.stop(timeout=5)
+
+
+def test_parse_pull_request_event():
+    """Só as ações que alteram o código do PR (e PRs fora de rascunho) geram revisões."""
+    request, reason = parse_pull_request_event("pull_request", build_pull_request_event("o/r", 7, "a" * 40))
+    assert (request.repo_name, request.pr_number, request.head_sha) == ("o/r", 7, "a" * 40)
+
+    assert parse_pull_request_event("pull_request", build_pull_request_event("o/r", 7, "a", action="closed"))[0] is None
+    assert parse_pull_request_event("pull_request", build_pull_request_event("o/r", 7, "a", draft=True))[1] == "PR em rascunho"
+    assert parse_pull_request_event("push", {})[0] is None
+
+
+def test_webhook_is_queued_and_reviewed_by_workers():
+    """Um webhook assinado é enfileirado e revisado pelos workers; assinaturas inválidas são rejeitadas."""
+    reviewed = []
+    pool, server, url = start_server(lambda request: reviewed.append((request.repo_name, request.pr_number)))
+    try:
+        response = send_webhook(f"{url}/webhook", "o/r", 7, "a" * 40, secret=SECRET)
+        assert response.status_code == 202
+
+        assert send_webhook(f"{url}/webhook", "o/r", 8, "b" * 40, secret="outro").status_code == 401
+
+        local = requests.post(f"{url}/review", json={"repository": "o/r", "pr_number": 9}, headers={"Authorization": "Bearer token-local"})
+        assert local.status_code == 202
+        assert requests.post(f"{url}/review", json={"repository": "o/r", "pr_number": 9}).status_code == 401
+        assert requests.post(f"{url}/review", json={"repository": "o/r"}, headers={"Authorization": "Bearer token-local"}).status_code == 400
+
+        pool.join()
+        assert sorted(reviewed) == [("o/r", 7), ("o/r", 9)]
+
+        job = requests.get(f"{url}/jobs/{response.json()['job']}").json()
+        assert job["status"] == "done" and job["source"] == "webhook"
+    finally:
+        stop_server(pool, server)
+
+
+def test_health_and_metrics():
+    """O health check reflete os workers e as métricas expõem os jobs no formato do Prometheus."""
+    def fail(request):
+        raise RuntimeError("falha simulada")
+
+    pool, server, url = start_server(fail, workers=1)
+    try:
+        health = requests.get(f"{url}/healthz")
+        assert health.status_code == 200 and health.json()["status"] == "ok"
+
+        requests.post(f"{url}/review", data=json.dumps({"repository": "o/r", "pr_number": 1}), headers={"Authorization": "Bearer token-local"})
+        pool.join()
+
+        metrics = requests.get(f"{url}/metrics").text
+        assert 'raico_jobs_total{status="failed"} 1' in metrics
+        assert "raico_workers 1" in metrics
+        assert 'raico_job_duration_seconds_bucket{le="+Inf"} 1' in metrics
+    finally:
+        stop_server(pool, server)
+
+    assert not pool.is_alive()
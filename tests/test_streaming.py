@@ -0,0 +1,141 @@
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.cache.review_cache import ReviewCache
+from scripts.planning.request_planner import (
+    MIN_OUTPUT_TOKENS,
+    PlannedRequest,
+    Segment,
+    count_packed_files,
+    get_output_token_limit,
+)
+from scripts.providers.openai_client import OpenAIClient
+from scripts.providers.gemini_client import GeminiClient
+from scripts.providers.streaming import collect_stream, is_plain_approval, stop_on_approval
+
+
+class FakeSSEResponse:
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+        self.closed = False
+        self.encoding = None
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+def test_is_plain_approval_ignores_case_and_reservations():
+    """Reconhece o marcador de aprovação, mas não as aprovações com ressalvas."""
+    assert is_plain_approval("✅ Alterações Aprovadas")
+    assert is_plain_approval("### ✅ **Alterações aprovadas**: ótimo trabalho!")
+    assert not is_plain_approval("✅ Alterações aprovadas com ressalvas")
+    assert not is_plain_approval("⚠️ Alterações aprovadas com ressalvas")
+    assert not is_plain_approval("❌ Alterações precisam de correção")
+
+
+def test_collect_stream_stops_after_approval_paragraph():
+    """Interrompe o streaming ao fim do parágrafo de aprovação e fecha a conexão."""
+    received = []
+
+    def chunks():
+        for chunk in ["✅ Alterações ", "aprovadas\n\n", "Parabéns pelo código.", "\n\nMais", " texto", " inútil"]:
+            received.append(chunk)
+            yield chunk
+
+    closed = []
+    text = collect_stream(chunks(), stop_on_approval, close=lambda: closed.append(True))
+
+    assert text == "✅ Alterações aprovadas\n\nParabéns pelo código."
+    assert len(received) == 4
+    assert closed == [True]
+
+
+def test_collect_stream_keeps_full_review():
+    """Respostas que não são aprovações são recebidas por inteiro."""
+    chunks = ["❌ Alterações precisam de correção\n\n", "- Falta tratar erro.\n\n", "✅ Alterações aprovadas"]
+
+    assert collect_stream(iter(chunks), stop_on_approval) == "".join(chunks)
+
+
+def test_output_token_limit_grows_with_input(monkeypatch):
+    """O limite da resposta acompanha o tamanho da entrada, até o teto configurado."""
+    monkeypatch.setenv("MAX_OUTPUT_TOKENS", "2000")
+
+    small = get_output_token_limit("gpt-4o", "x" * 400)
+    large = get_output_token_limit("gpt-4o", "x" * 4000)
+    huge = get_output_token_limit("gpt-4o", "x" * 400000)
+
+    assert MIN_OUTPUT_TOKENS <= small < large < huge
+    assert huge == 2000
+
+
+def test_output_token_limit_scales_with_packed_files(monkeypatch):
+    """Numa requisição agrupada, o mínimo e o teto da resposta valem para cada arquivo."""
+    monkeypatch.setenv("MAX_OUTPUT_TOKENS", "2000")
+    content = PlannedRequest([Segment(f"f{index}.py", "x" * 4000) for index in range(8)]).render()
+
+    assert count_packed_files(content) == 8 and count_packed_files("print(1)") == 1
+    assert get_output_token_limit("gpt-4o", content, 8) == MIN_OUTPUT_TOKENS * 8 + (len(content) + 3) // 4 // 4
+    assert get_output_token_limit("gpt-4o", "x" * 400000, 8) == 2000 * 8
+
+
+def test_truncated_response_is_not_cached(monkeypatch, tmp_path):
+    """Respostas que pararam no limite de tokens não vão para o cache; só a última seção agrupada é afetada."""
+    def chat_completion(model, messages, **kwargs):
+        return {"choices": [{"message": {"content": "=== ARQUIVO: a.py ===\nOk.\n=== ARQUIVO: b.py ===\nFalta"},
+                             "finish_reason": "length"}]}
+
+    client = OpenAIClient.__new__(OpenAIClient)
+    monkeypatch.setattr(client, "chat_completion", chat_completion, raising=False)
+    response = client.complete("gpt-4o", "conteúdo")
+    sections = PlannedRequest([Segment("a.py", "1"), Segment("b.py", "2")]).split_response(response)
+
+    cache = ReviewCache(str(tmp_path / "reviews.sqlite3"))
+    for path, feedback in sections.items():
+        cache.set(path, feedback)
+
+    assert response.truncated and sections == {"a.py": "Ok.", "b.py": "Falta"}
+    assert cache.get("a.py") == "Ok." and cache.get("b.py") is None
+
+
+def test_gemini_stream_parses_sse_events(monkeypatch):
+    """O Gemini em streaming lê os eventos SSE e interrompe aprovações simples."""
+    events = [
+        'data: {"candidates": [{"content": {"parts": [{"text": "✅ Alterações aprovadas"}]}}]}',
+        "",
+        'data: {"candidates": [{"content": {"parts": [{"text": "\\n\\nBom trabalho.\\n\\n"}]}}]}',
+        'data: {"candidates": [{"content": {"parts": [{"text": "Texto extra"}]}}]}',
+    ]
+    response = FakeSSEResponse(events)
+    client = GeminiClient("chave")
+    monkeypatch.setattr(client, "stream_generate_content", lambda model, version, payload: response)
+
+    text = client.complete("gemini-pro", "prompt", version="v1beta", stream=True, should_stop=stop_on_approval)
+
+    assert text == "✅ Alterações aprovadas\n\nBom trabalho."
+    assert response.read == 3
+    assert response.closed
+
+
+def test_gemini_without_candidates_or_version(monkeypatch):
+    """Respostas sem candidatos (bloqueio de segurança) ficam vazias e a versão padrão é usada sem HEDGE_VERSION."""
+    client = GeminiClient("chave")
+    versions = []
+
+    def generate_content(model, version, payload):
+        versions.append(version)
+        return {"candidates": [], "promptFeedback": {"blockReason": "SAFETY"}}
+
+    monkeypatch.setattr(client, "generate_content", generate_content)
+
+    assert client.complete("gemini-pro", "prompt", version=None) == ""
+    assert versions == ["v1beta"]
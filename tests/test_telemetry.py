@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import time
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.telemetry import run_telemetry
+
+
+def setup_function():
+    run_telemetry.reset()
+
+
+def test_endpoint_name_groups_ids_and_paths():
+    """IDs, owner/repo e caminhos de arquivos viram marcadores para agregar os endpoints."""
+    sha = "a" * 40
+
+    assert run_telemetry.endpoint_name("get", "https://api.github.com/repos/org/app/pulls/12/files?page=2") == (
+        "GET api.github.com/repos/{owner}/{repo}/pulls/{n}/files"
+    )
+    assert run_telemetry.endpoint_name("GET", f"https://github.com/org/app/raw/{sha}/src/app.py") == (
+        "GET github.com/org/app/raw/{sha}/{path}"
+    )
+
+
+def test_nested_phases_are_exclusive():
+    """O tempo de uma fase interna não é somado à fase externa."""
+    with run_telemetry.phase("post_comments"):
+        time.sleep(0.02)
+        with run_telemetry.phase("cleanup"):
+            time.sleep(0.05)
+
+    phases = run_telemetry.snapshot()["phases"]
+    assert phases["cleanup"]["count"] == phases["post_comments"]["count"] == 1
+    assert phases["cleanup"]["seconds"] >= 0.05
+    assert 0.02 <= phases["post_comments"]["seconds"] < 0.05
+
+
+def test_request_histogram_percentiles():
+    """As latências ficam em um histograma por endpoint, com p50/p95 aproximados."""
+    url = "https://api.github.com/repos/org/app/pulls/1"
+    for milliseconds in [10] * 9 + [700]:
+        run_telemetry.record_request("GET", url, 200, milliseconds / 1000)
+    run_telemetry.record_request("GET", url, 500, 0.02)
+
+    entry = run_telemetry.snapshot()["endpoints"]["GET api.github.com/repos/{owner}/{repo}/pulls/{n}"]
+    assert (entry["requests"], entry["errors"]) == (11, 1)
+    assert entry["p50_ms"] == 50
+    assert entry["p95_ms"] == 700
+
+
+def test_emit_writes_json_and_job_summary(tmp_path, monkeypatch):
+    """Publica o JSON em TELEMETRY_PATH e as tabelas no resumo do job."""
+    monkeypatch.setenv("TELEMETRY_PATH", str(tmp_path / "telemetria.json"))
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(tmp_path / "summary.md"))
+    run_telemetry.increment("review_cache_hits", 2)
+    with run_telemetry.phase("analyze"):
+        pass
+
+    run_telemetry.emit(provider="openai", pr="7")
+
+    data = json.loads((tmp_path / "telemetria.json").read_text())
+    assert data["run"] == {"provider": "openai", "pr": "7"}
+    assert data["counters"]["review_cache_hits"] == 2
+    summary = (tmp_path / "summary.md").read_text()
+    assert "| Análise da IA |" in summary
+    assert "`review_cache_hits`=2" in summary
+
+
+def test_reset_clears_tokens_streaming_and_rate_limit(monkeypatch):
+    """O reset zera também os tokens, o streaming e os contadores de rate limit."""
+    from scripts.providers import usage
+    from scripts.providers.streaming import collect_stream
+    from scripts.transport import rate_limiter
+
+    monkeypatch.setenv("RATE_LIMIT_RPM", "600")
+    limiter = rate_limiter.get_limiter("https://api.telemetria.test")
+    limiter.observe(429, {"Retry-After": "0"})
+    usage.record_usage("openai", 100, 0, 10)
+    collect_stream(iter(["ok"]))
+    run_telemetry.increment("provider_retries.openai")
+
+    run_telemetry.reset()
+
+    data = run_telemetry.snapshot()
+    assert data["tokens"] == {} and data["counters"] == {}
+    assert set(data["streaming"].values()) == {0}
+    assert limiter.stats()["throttled"] == 0
+
+
+def test_job_scope_separates_metrics_of_each_job():
+    """Cada job tem as próprias métricas (inclusive nas threads da análise); o processo soma todas."""
+    from scripts.providers.usage import record_usage
+    from scripts.utils.concurrency import run_concurrently
+
+    def review(tokens):
+        with run_telemetry.job_scope() as metrics:
+            run_concurrently(lambda _: record_usage("claude", tokens, 0, 1), range(2), max_concurrency=2)
+            run_telemetry.increment("reviews")
+            return metrics.snapshot()
+
+    first, second = review(100), review(300)
+
+    assert first["tokens"]["claude"]["input_tokens"] == 200 and first["counters"] == {"reviews": 1}
+    assert second["tokens"]["claude"]["input_tokens"] == 600
+    assert run_telemetry.snapshot()["counters"]["reviews"] == 2